@@ -0,0 +1,92 @@
+"""
+LogicCore v2 - Editor Benchmark
+Opening and scrolling a very large file in the editor.
+
+Writes a log-like file of the given size, then times Document.open,
+the first painted frame, repaints at random positions while the line
+index is still being built and after, and the index build itself:
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_editor.py [size MB]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from PySide6.QtWidgets import QApplication
+
+from src.editor.document import Document
+from src.editor.editor_view import EditorView
+from src.ui.theme import theme
+
+
+LINE = b"2026-10-17 07:49:42,292 INFO worker-12 processed request id=%010d in 12.5 ms\n"
+
+
+def write_file(path, mb):
+    block = b"".join(LINE % i for i in range(100_000))
+    with open(path, "wb") as f:
+        written = 0
+        while written < mb << 20:
+            f.write(block)
+            written += len(block)
+
+
+def scroll(app, view, frames=60):
+    """Mean ms per repaint at random scroll positions."""
+    bar = view.verticalScrollBar()
+    start = time.perf_counter()
+    for _ in range(frames):
+        bar.setValue(random.randint(0, bar.maximum()))
+        view.viewport().repaint()
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def run(mb=1024):
+    app = QApplication.instance() or QApplication(sys.argv)
+    theme.apply(app)
+    results = {}
+    fd, path = tempfile.mkstemp(suffix=".log")
+    os.close(fd)
+    try:
+        write_file(path, mb)
+
+        start = time.perf_counter()
+        document = Document.open(path)
+        results["open_ms"] = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        view = EditorView(document)
+        view.resize(1200, 800)
+        view.show()
+        app.processEvents()
+        view.viewport().repaint()
+        results["first_frame_ms"] = (time.perf_counter() - start) * 1000
+        results["scroll_indexing_ms"] = scroll(app, view)
+
+        start = time.perf_counter()
+        while not document.index.complete:
+            time.sleep(0.01)
+        results["index_s"] = time.perf_counter() - start + results["open_ms"] / 1000
+        view._on_index_progress()
+        results["scroll_ms"] = scroll(app, view)
+        results["lines"] = document.line_count()
+        view.close()
+        document.close()
+    finally:
+        os.unlink(path)
+    return results
+
+
+def main():
+    mb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    print(f"Editor benchmark ({mb} MB file)")
+    for name, value in run(mb).items():
+        print(f"  {name:<22}{value:14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+LogicCore v2 - Graph Canvas Benchmark
+Frame times of the graph canvas panning and zooming a large graph.
+
+Builds a layered pipeline graph with the given number of nodes, indexes
+it (and waits for the overview shapes made in the background), then
+repaints the canvas while panning at each level of detail and while
+zooming from the whole graph down to single nodes and back:
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_graph.py [nodes]
+"""
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from PySide6.QtCore import QPointF
+from PySide6.QtWidgets import QApplication
+
+from src.graph.model import LAYER_GAP, ROW_GAP, Graph
+from src.ui.graph_canvas import GraphCanvas
+from src.ui.theme import theme
+
+
+def make_graph(nodes, layers=100):
+    """
+    Layered DAG, positioned as a saved layout would be: each node feeds
+    one or two neighbours in the next layer, and 1% also a far one.
+    """
+    random.seed(0)
+    graph = Graph()
+    rows = nodes // layers
+    kinds = ("source", "map", "filter", "join", "sink")
+    for layer in range(layers):
+        for row in range(rows):
+            graph.add_node(f"n{layer}_{row}", f"step_{layer}_{row}", random.choice(kinds),
+                           x=layer * LAYER_GAP, y=row * ROW_GAP)
+    for layer in range(layers - 1):
+        for row in range(rows):
+            for _ in range(random.choice((1, 1, 2))):
+                target = min(rows - 1, max(0, row + random.randint(-4, 4)))
+                graph.add_edge(f"n{layer}_{row}", f"n{layer + 1}_{target}")
+            if random.random() < 0.01:
+                far = random.randint(layer + 1, layers - 1)
+                graph.add_edge(f"n{layer}_{row}", f"n{far}_{random.randrange(rows)}")
+    return graph
+
+
+def frames(canvas, count=60, step=(40, 25)):
+    """ms per repaint while panning `step` pixels per frame."""
+    times = []
+    for _ in range(count):
+        center = canvas.mapToScene(canvas.viewport().rect().center())
+        scale = canvas.zoom()
+        canvas.centerOn(center + QPointF(step[0] / scale, step[1] / scale))
+        start = time.perf_counter()
+        canvas.viewport().repaint()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return statistics.mean(times), times[int(len(times) * 0.95)]
+
+
+def set_zoom(canvas, scale, center):
+    canvas.resetTransform()
+    canvas.scale(scale, scale)
+    canvas.centerOn(center)
+
+
+def run(nodes=100_000):
+    app = QApplication.instance() or QApplication(sys.argv)
+    theme.apply(app)
+    results = {}
+
+    start = time.perf_counter()
+    graph = make_graph(nodes)
+    results["make_graph_ms"] = (time.perf_counter() - start) * 1000
+    results["edges"] = graph.edge_count()
+
+    canvas = GraphCanvas()
+    canvas.resize(1600, 900)
+    canvas.show()
+    app.processEvents()
+    start = time.perf_counter()
+    canvas.set_graph(graph)
+    results["index_ms"] = (time.perf_counter() - start) * 1000
+    start = time.perf_counter()
+    canvas._pool.waitForDone()
+    results["prepare_bg_ms"] = (time.perf_counter() - start) * 1000
+    x0, y0, x1, y1 = graph.bounds()
+    center = QPointF((x0 + x1) / 2, (y0 + y1) / 2)
+
+    for name, scale in (("fit", canvas.zoom()), ("overview", 0.03),
+                        ("blocks", 0.15), ("detail", 1.0)):
+        set_zoom(canvas, scale, center)
+        mean, p95 = frames(canvas)
+        results[f"pan_{name}_ms"] = mean
+        results[f"pan_{name}_p95_ms"] = p95
+
+    # Zoom all the way in and out again, one frame per wheel step
+    set_zoom(canvas, canvas.zoom(), center)
+    canvas.fit_graph()
+    times = []
+    for factor in [1.15] * 40 + [1 / 1.15] * 40:
+        canvas.scale(factor, factor)
+        start = time.perf_counter()
+        canvas.viewport().repaint()
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    results["zoom_ms"] = statistics.mean(times)
+    results["zoom_p95_ms"] = times[int(len(times) * 0.95)]
+    results["zoom_max_ms"] = times[-1]
+    canvas.close()
+    return results
+
+
+def main():
+    nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"Graph canvas benchmark ({nodes} nodes)")
+    for name, value in run(nodes).items():
+        print(f"  {name:<22}{value:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
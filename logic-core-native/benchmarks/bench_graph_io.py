@@ -0,0 +1,118 @@
+"""
+LogicCore v2 - Graph Loading Benchmark
+Time and peak memory of opening a large graph.json.
+
+Writes a graph file with the given number of nodes, then compares
+reading it with json.load and Graph.from_dict against the streaming
+reader, and times writing the binary cache and opening the file again
+through it (the cache hit, and a touched file whose digest still
+matches):
+
+    python benchmarks/bench_graph_io.py [nodes]
+"""
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.graph import storage
+from src.graph.model import LAYER_GAP, ROW_GAP, Graph
+
+
+def write_graph(path, nodes, layers=100):
+    """A layered pipeline as saved by an editor: positioned nodes, then edges."""
+    random.seed(0)
+    rows = nodes // layers
+    kinds = ("source", "map", "filter", "join", "sink")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"version": 1, "nodes": [\n')
+        f.write(",\n".join(
+            json.dumps({"id": f"n{layer}_{row}", "label": f"step_{layer}_{row}",
+                        "kind": random.choice(kinds),
+                        "x": layer * LAYER_GAP, "y": row * ROW_GAP})
+            for layer in range(layers) for row in range(rows)))
+        f.write('\n], "edges": [\n')
+        edges = []
+        for layer in range(layers - 1):
+            for row in range(rows):
+                for _ in range(random.choice((1, 1, 2))):
+                    target = min(rows - 1, max(0, row + random.randint(-4, 4)))
+                    edges.append(f'["n{layer}_{row}", "n{layer + 1}_{target}"]')
+        f.write(",\n".join(edges))
+        f.write("\n]}\n")
+
+
+def measure(results, name, fn):
+    """Time `fn`, then run it again under tracemalloc for its peak memory."""
+    start = time.perf_counter()
+    fn()
+    results[f"{name}_ms"] = (time.perf_counter() - start) * 1000
+    tracemalloc.start()
+    value = fn()
+    results[f"{name}_peak_mb"] = tracemalloc.get_traced_memory()[1] / (1 << 20)
+    tracemalloc.stop()
+    return value
+
+
+def json_load(path):
+    with open(path, encoding="utf-8") as f:
+        return Graph.from_dict(json.load(f))
+
+
+def stream_load(path):
+    with open(path, "rb") as f:
+        return storage.read_graph(f)
+
+
+def run(nodes=100_000):
+    results = {}
+    tmp = tempfile.mkdtemp()
+    os.environ["XDG_CACHE_HOME"] = tmp     # keep the real cache untouched
+    path = os.path.join(tmp, "bench.graph.json")
+    try:
+        write_graph(path, nodes)
+        results["file_mb"] = os.path.getsize(path) / (1 << 20)
+        measure(results, "json_load", lambda: json_load(path))
+        graph = measure(results, "stream", lambda: stream_load(path))
+        results["edges"] = graph.edge_count()
+
+        st = os.stat(path)
+        cached_at = storage.cache_path(path)
+        start = time.perf_counter()
+        storage.save_cache(graph, cached_at, st.st_mtime_ns, st.st_size,
+                           storage.file_digest(path))
+        results["cache_write_ms"] = (time.perf_counter() - start) * 1000
+        results["cache_mb"] = os.path.getsize(cached_at) / (1 << 20)
+        del graph
+
+        cached = measure(results, "cache_hit", lambda: storage.load_graph(path))
+        assert isinstance(cached.x, memoryview)
+        del cached
+
+        def touched():
+            os.utime(path, ns=(st.st_atime_ns, time.time_ns()))
+            return storage.load_graph(path)
+        cached = measure(results, "cache_touched", touched)
+        assert isinstance(cached.x, memoryview)
+        del cached
+    finally:
+        for name in (path, storage.cache_path(path)):
+            if os.path.exists(name):
+                os.unlink(name)
+    return results
+
+
+def main():
+    nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"Graph loading benchmark ({nodes} nodes)")
+    for name, value in run(nodes).items():
+        print(f"  {name:<22}{value:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
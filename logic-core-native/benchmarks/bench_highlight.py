@@ -0,0 +1,168 @@
+"""
+LogicCore v2 - Syntax Highlighting Benchmark
+Keystroke-to-highlight latency on a large Python file.
+
+Writes a Python file of the given number of lines, then times the
+first styled viewport, the full initial lex, the delay between a
+keystroke in the editor and the styled batch covering the edited line,
+and the worst case: typing a triple quote that restyles the rest of
+the file:
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_highlight.py [lines]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from PySide6.QtCore import QEventLoop, QTimer
+from PySide6.QtWidgets import QApplication
+
+from src.editor.document import Document
+from src.editor.editor_view import EditorView
+from src.editor.highlighter import SyntaxHighlighter
+from src.ui.theme import theme
+
+
+CHUNK = '''\
+@dataclass(frozen=True)
+class Record%d(Base):
+    """
+    A stored record; fields are validated on construction.
+    """
+    name: str = "record"
+    size: int = 0x%04x
+
+    def total(self, items, scale=1.5):
+        # Sum the sizes, skipping empty items
+        result = 0
+        for item in items:
+            if item is None or not item.size:
+                continue
+            result += len(item.name) * scale + %d
+        return f"{self.name}: {result!r}"
+
+'''
+
+
+def write_file(path, lines):
+    chunk_lines = CHUNK.count("\n")
+    with open(path, "w") as f:
+        for i in range(lines // chunk_lines):
+            f.write(CHUNK % (i, i & 0xFFFF, i))
+
+
+class StyledWaiter:
+    """Connected before an edit, so a batch delivered early is not missed."""
+
+    def __init__(self, highlighter, line):
+        self.highlighter = highlighter
+        self.line = line
+        self.done = False
+        self.loop = QEventLoop()
+        highlighter.signals.styled.connect(self.on_styled)
+
+    def on_styled(self, first, last):
+        if first <= self.line <= last:
+            self.done = True
+            self.loop.quit()
+
+    def wait(self, timeout=30.0):
+        if not self.done:
+            QTimer.singleShot(int(timeout * 1000), self.loop.quit)
+            self.loop.exec()
+        self.highlighter.signals.styled.disconnect(self.on_styled)
+
+
+def wait_idle(highlighter, timeout=60.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        with highlighter._lock:
+            if 1 not in highlighter._pending:
+                return
+        QApplication.processEvents(QEventLoop.AllEvents, 10)
+        time.sleep(0.002)
+
+
+def keystroke(view, line):
+    """ms from typing at `line` until that line is styled again."""
+    view.set_cursor(line, 4)
+    waiter = StyledWaiter(view.highlighter, line)
+    start = time.perf_counter()
+    view.insert_text("x")
+    waiter.wait()
+    return (time.perf_counter() - start) * 1000
+
+
+def run(lines=100_000, samples=200):
+    app = QApplication.instance() or QApplication(sys.argv)
+    theme.apply(app)
+    results = {}
+    fd, path = tempfile.mkstemp(suffix=".py")
+    os.close(fd)
+    try:
+        write_file(path, lines)
+        document = Document.open(path)
+        document.index.build()
+        view = EditorView(document)
+        view.resize(1200, 800)
+        view.show()
+        app.processEvents()
+
+        start = time.perf_counter()
+        highlighter = SyntaxHighlighter(document)
+        waiter = StyledWaiter(highlighter, view._visible_rows() - 1)
+        view.set_highlighter(highlighter)
+        view.viewport().repaint()
+        waiter.wait()
+        results["first_viewport_ms"] = (time.perf_counter() - start) * 1000
+        wait_idle(highlighter)
+        results["full_lex_ms"] = (time.perf_counter() - start) * 1000
+        results["lines"] = document.line_count()
+
+        random.seed(0)
+        times = []
+        for _ in range(samples):
+            line = random.randrange(document.line_count() - 1)
+            view.go_to_line(line)
+            app.processEvents()
+            times.append(keystroke(view, line))
+            wait_idle(highlighter)
+        times.sort()
+        results["keystroke_p50_ms"] = statistics.median(times)
+        results["keystroke_p99_ms"] = times[int(len(times) * 0.99)]
+
+        # Opening a triple quote near the top restyles everything below
+        line = 10
+        view.go_to_line(line)
+        app.processEvents()
+        view.set_cursor(line, 0)
+        waiter = StyledWaiter(highlighter, line)
+        start = time.perf_counter()
+        view.insert_text('"""')
+        waiter.wait()
+        results["triple_quote_ms"] = (time.perf_counter() - start) * 1000
+        wait_idle(highlighter)
+        results["triple_quote_rest_ms"] = (time.perf_counter() - start) * 1000
+
+        highlighter.shutdown()
+        view.close()
+        document.close()
+    finally:
+        os.unlink(path)
+    return results
+
+
+def main():
+    lines = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    print(f"Syntax highlighting benchmark ({lines} lines)")
+    for name, value in run(lines).items():
+        print(f"  {name:<24}{value:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
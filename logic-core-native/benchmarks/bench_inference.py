@@ -0,0 +1,99 @@
+"""
+LogicCore v2 - Inference Gateway Benchmark
+Throughput and latency of many concurrent callers sharing a local model.
+
+Callers on separate threads each send prompts drawn from a skewed
+distribution (a few prompts are asked often, as repeated UI features
+do). Calling the stand-in model directly, one request at a time, is
+compared with going through the gateway, cold and with a warm cache:
+
+    python benchmarks/bench_inference.py [callers] [requests_per_caller]
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.services.inference import InferenceGateway, ResponseCache, StandInModel
+from src.services.metrics import MetricsRegistry
+
+
+def workload(callers, count, prompts=400):
+    random.seed(0)
+    weights = [1 / (rank + 1) for rank in range(prompts)]
+    return [random.choices(range(prompts), weights, k=count) for _ in range(callers)]
+
+
+def drive(call, plan):
+    """Run every caller's plan on its own thread; per-request latencies."""
+    latencies = []
+    lock = threading.Lock()
+
+    def caller(ids):
+        mine = []
+        for i in ids:
+            start = time.perf_counter()
+            call(f"Explain node {i} of main.pipeline")
+            mine.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=caller, args=(ids,)) for ids in plan]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, sorted(latencies)
+
+
+def report(results, name, elapsed, latencies, model):
+    results[f"{name}_req_per_s"] = len(latencies) / elapsed
+    results[f"{name}_p50_ms"] = statistics.median(latencies) * 1000
+    results[f"{name}_p99_ms"] = latencies[int(len(latencies) * 0.99)] * 1000
+    results[f"{name}_model_calls"] = model.calls
+
+
+def run(callers=32, count=50):
+    results = {}
+    plan = workload(callers, count)
+
+    model = StandInModel()
+    lock = threading.Lock()
+
+    def direct(prompt):
+        with lock:     # one local model serves one call at a time
+            return model.generate([prompt], {})[0]
+    report(results, "direct", *drive(direct, plan), model)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "responses.sqlite")
+        for name in ("gateway_cold", "gateway_warm"):
+            model = StandInModel()
+            registry = MetricsRegistry()
+            gateway = InferenceGateway(model, ResponseCache(path), registry=registry)
+            report(results, name, *drive(gateway.generate, plan), model)
+            gateway.shutdown()
+            observations = registry._observations
+            total, n = observations.get("inference.batch_size", (0.0, 0))
+            results[f"{name}_mean_batch"] = total / n if n else 0.0
+            total, n = observations["inference.hit_pct"]
+            results[f"{name}_hit_pct"] = total / n
+    return results
+
+
+def main():
+    callers = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+    print(f"Inference gateway benchmark ({callers} callers x {count} requests)")
+    for name, value in run(callers, count).items():
+        print(f"  {name:<26}{value:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
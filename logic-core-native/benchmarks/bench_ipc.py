@@ -0,0 +1,133 @@
+"""
+LogicCore v2 - Service Host IPC Benchmark
+Latency and throughput of the GUI <-> service host channel.
+
+Measures ping round trips, pipelined small requests, large payloads
+(copied through reused shared memory segments, or handed over by name
+as a SharedBlob) against a multiprocessing.Pipe echo, and reading a
+file through a SharedBlob:
+
+    python benchmarks/bench_ipc.py [payload MB]
+"""
+import multiprocessing
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.services.host.client import HostClient
+from src.services.host.protocol import SharedBlob
+
+
+def pipe_echo(conn):
+    while True:
+        data = conn.recv_bytes()
+        if not data:
+            break
+        conn.send_bytes(data)
+
+
+def bench_latency(client, n=2000):
+    samples = []
+    for _ in range(n):
+        start = time.perf_counter()
+        client.call("ping")
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        "ping_p50_us": samples[len(samples) // 2] * 1e6,
+        "ping_p99_us": samples[int(len(samples) * 0.99)] * 1e6,
+    }
+
+
+def bench_pipelined(client, n=20000):
+    payload = b"x" * 256
+    start = time.perf_counter()
+    futures = [client.submit("echo", payload) for _ in range(n)]
+    for future in futures:
+        future.result()
+    return {"echo_256B_req_per_s": n / (time.perf_counter() - start)}
+
+
+def bench_large(client, mb, repeat=5):
+    payload = os.urandom(mb << 20)
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        assert len(client.call("echo", payload)) == len(payload)
+        times.append(time.perf_counter() - start)
+    host = 2 * mb / statistics.median(times)
+
+    # The same payload handed over by name: filled once, never copied
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        blob = SharedBlob(len(payload))
+        blob.buf[:] = payload
+        echoed = client.call("echo", blob)
+        assert len(echoed) == len(payload)
+        echoed.release()
+        times.append(time.perf_counter() - start)
+    blob_rate = 2 * mb / statistics.median(times)
+
+    context = multiprocessing.get_context("spawn")
+    parent, child = context.Pipe()
+    proc = context.Process(target=pipe_echo, args=(child,), daemon=True)
+    proc.start()
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        parent.send_bytes(payload)
+        assert len(parent.recv_bytes()) == len(payload)
+        times.append(time.perf_counter() - start)
+    parent.send_bytes(b"")
+    proc.join()
+    pipe = 2 * mb / statistics.median(times)
+    return {f"echo_{mb}MB_host_MB_per_s": host, f"echo_{mb}MB_blob_MB_per_s": blob_rate,
+            f"echo_{mb}MB_pipe_MB_per_s": pipe}
+
+
+def bench_read_file(client, mb, repeat=5):
+    with tempfile.NamedTemporaryFile(delete=False) as f:
+        f.write(os.urandom(mb << 20))
+        path = f.name
+    try:
+        times = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            blob = client.call("read_file", path)
+            assert len(blob) == mb << 20
+            blob.release()
+            times.append(time.perf_counter() - start)
+    finally:
+        os.unlink(path)
+    return {f"read_file_{mb}MB_MB_per_s": mb / statistics.median(times)}
+
+
+def run(mb=32):
+    client = HostClient()
+    client.start()
+    try:
+        client.call("ping")  # wait for the host to come up
+        results = {}
+        results.update(bench_latency(client))
+        results.update(bench_pipelined(client))
+        results.update(bench_large(client, mb))
+        results.update(bench_read_file(client, mb))
+    finally:
+        client.stop()
+    return results
+
+
+def main():
+    mb = int(sys.argv[1]) if len(sys.argv) > 1 else 32
+    print(f"Service host IPC benchmark ({mb} MB payloads)")
+    for name, value in run(mb).items():
+        print(f"  {name:<32}{value:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+LogicCore v2 - Quick Open Benchmark
+Per-keystroke latency of the fuzzy path matcher on a large workspace.
+
+Builds a path index of generated paths, then types queries a character
+at a time (with some backspacing), timing the first step of each
+keystroke, which is what the UI thread spends before repainting, and
+the time until the keystroke's results are complete:
+
+    python benchmarks/bench_quick_open.py [paths]
+"""
+import gc
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.services.fuzzy import FuzzyMatcher, PathIndex
+from src.ui.quick_open import FRAME_BUDGET
+
+
+WORDS = ("core", "util", "view", "model", "graph", "node", "render", "index", "search",
+         "file", "test", "main", "config", "worker", "stream", "layout", "editor", "panel")
+
+
+def generate_paths(count):
+    random.seed(0)
+    paths = []
+    for i in range(count):
+        dirs = "/".join(random.choice(WORDS) + str(random.randrange(50))
+                        for _ in range(random.randint(1, 5)))
+        paths.append(f"src/{dirs}/{random.choice(WORDS)}_{random.choice(WORDS)}_{i}.py")
+    return paths
+
+
+def keystrokes(queries):
+    """Query texts as typed, backspacing over the last two characters of each."""
+    for query in queries:
+        for i in range(1, len(query) + 1):
+            yield query[:i]
+        yield query[:-1]
+        yield query[:-2]
+
+
+def percentiles(times):
+    times = sorted(times)
+    return statistics.median(times), times[int(len(times) * 0.99)]
+
+
+def run(count=1_000_000):
+    results = {}
+    paths = generate_paths(count)
+    start = time.perf_counter()
+    index = PathIndex.from_paths(paths)
+    results["build_ms"] = (time.perf_counter() - start) * 1000
+    results["index_mb"] = (len(index.data) + sum(b.matrix.nbytes for b in index.blocks)) / 2**20
+    del paths
+    gc.collect()
+
+    random.seed(1)
+    queries = ["mainwin", "graphcanvas", "rendernode", "cfgworker", "streamtest", "idxview"]
+    queries += [random.choice(WORDS)[:3] + random.choice(WORDS)[:3] for _ in range(14)]
+    matcher = FuzzyMatcher(index)
+    first, complete = [], []
+    for text in keystrokes(queries):
+        start = time.perf_counter()
+        matcher.set_query(text)
+        matcher.step(FRAME_BUDGET)
+        first.append((time.perf_counter() - start) * 1000)
+        while not matcher.done:
+            matcher.step(FRAME_BUDGET)
+        complete.append((time.perf_counter() - start) * 1000)
+    results["keystrokes"] = len(first)
+    results["first_step_p50_ms"], results["first_step_p99_ms"] = percentiles(first)
+    results["complete_p50_ms"], results["complete_p99_ms"] = percentiles(complete)
+    return results
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"Quick Open benchmark ({count} paths)")
+    for name, value in run(count).items():
+        print(f"  {name:<22}{value:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+LogicCore v2 - Retrieval Index Benchmark
+Indexing time and BM25 top-k latency of the retrieval index.
+
+Indexes a workspace of generated source files (first run, restart with
+nothing changed, restart after edits), then times top-k queries on a
+synthetic segment of a million chunks whose terms follow a Zipf
+distribution, as words in source code do:
+
+    python benchmarks/bench_retrieval.py [files] [chunks]
+"""
+import math
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy
+
+from src.services.file_index import FileIndex
+from src.services.retrieval import RetrievalIndex, Segment, _Part, _State, term_hash
+
+
+LINE = "    result_{i} = compute_{j}(record.{word}, scale={i}) + cache.lookup_{k}(key)\n"
+WORDS = ("name", "size", "offset", "parent", "buffer", "token", "stream", "window", "layout")
+
+
+def write_workspace(root, files, lines=400, per_dir=100):
+    random.seed(0)
+    for f in range(files):
+        directory = os.path.join(root, f"pkg{f // per_dir}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"module_{f}.py"), "w") as out:
+            out.write(f"def handler_{f}(record):\n")
+            for i in range(lines):
+                out.write(LINE.format(i=i, j=random.randrange(5000), k=random.randrange(500),
+                                      word=random.choice(WORDS)))
+
+
+def open_index(root, work):
+    file_index = FileIndex(root, snapshot_path=os.path.join(work, "files.idx"))
+    file_index.start()
+    file_index.wait_ready()
+    path = os.path.join(work, "retrieval")
+    os.makedirs(path, exist_ok=True)
+    return file_index, RetrievalIndex(root, file_index, path=path)
+
+
+def timed_refresh(root, work):
+    file_index, index = open_index(root, work)
+    start = time.perf_counter()
+    index.load()
+    read = index.refresh()
+    return file_index, index, (time.perf_counter() - start) * 1000, read
+
+
+def latency(index, queries, k=8):
+    times = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, k)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.99)]
+
+
+def word(i):
+    """Distinct lowercase word for term i; it tokenizes to itself."""
+    letters = ""
+    i += 26 * 27
+    while i:
+        i, r = divmod(i, 26)
+        letters += chr(97 + r)
+    return letters
+
+
+def synthetic_segment(chunks, terms_per_chunk=40, vocabulary=200_000):
+    """Segment of `chunks` chunks with Zipf-distributed terms."""
+    rng = numpy.random.default_rng(0)
+    hashes = numpy.array([term_hash(word(i)) for i in range(vocabulary)], numpy.int64)
+    # Draw each chunk's words and drop repeats within the chunk
+    terms = (rng.zipf(1.2, chunks * terms_per_chunk) - 1) % vocabulary
+    keys = numpy.unique(numpy.repeat(numpy.arange(chunks, dtype=numpy.int64), terms_per_chunk)
+                        * vocabulary + terms)
+    del terms
+    post_term = hashes[keys % vocabulary]
+    post_chunk = (keys // vocabulary).astype(numpy.uint32)
+    del keys
+    post_tf = rng.integers(1, 6, len(post_chunk), dtype=numpy.uint16)
+    files = chunks // 25
+    return Segment.build("synthetic", [f"file_{i}.py" for i in range(files)],
+                         numpy.zeros(files, numpy.int64), numpy.zeros(files, numpy.int64),
+                         numpy.arange(chunks, dtype=numpy.uint32) // 25,
+                         (numpy.arange(chunks, dtype=numpy.uint32) % 25) * 40 + 1,
+                         numpy.full(chunks, terms_per_chunk * 3, numpy.uint32),
+                         post_term, post_chunk, post_tf)
+
+
+def run(files=2000, chunks=1_000_000, edited=50):
+    results = {}
+    work = tempfile.mkdtemp(prefix="bench_retrieval")
+    root = os.path.join(work, "workspace")
+    try:
+        write_workspace(root, files)
+        file_index, index, results["full_index_ms"], read = timed_refresh(root, work)
+        results["files_read"] = read
+        results["chunks"] = index.chunk_count()
+        index.shutdown()
+        file_index.stop()
+
+        file_index, index, results["unchanged_ms"], _ = timed_refresh(root, work)
+        index.shutdown()
+        file_index.stop()
+
+        for f in random.sample(range(files), edited):
+            with open(os.path.join(root, f"pkg{f // 100}", f"module_{f}.py"), "a") as out:
+                out.write("    return edited_marker\n")
+        file_index, index, results["edited_ms"], results["edited_read"] = timed_refresh(root, work)
+        queries = [f"compute_{random.randrange(5000)} {random.choice(WORDS)} lookup"
+                   for _ in range(200)]
+        results["workspace_query_p50_ms"], results["workspace_query_p99_ms"] = latency(
+            index, queries)
+        index.shutdown()
+        file_index.stop()
+
+        start = time.perf_counter()
+        segment = synthetic_segment(chunks)
+        results["synthetic_build_ms"] = (time.perf_counter() - start) * 1000
+        path = os.path.join(work, "synthetic.bin")
+        segment.save(path)
+        del segment
+        start = time.perf_counter()
+        segment = Segment.load("synthetic", path)
+        index._state = _State([_Part(segment, ())])
+        results["synthetic_load_ms"] = (time.perf_counter() - start) * 1000
+        results["synthetic_postings"] = len(segment.post_chunk)
+        rng = random.Random(0)
+        for terms in (1, 2, 4, 8):
+            # Word ranks spread evenly over each order of magnitude, so
+            # queries mix very common and rare words
+            queries = [" ".join(word(int(math.exp(rng.uniform(0, math.log(200_000)))) - 1)
+                                for _ in range(terms))
+                       for _ in range(200)]
+            p50, p99 = latency(index, queries)
+            results[f"top8_{terms}_terms_p50_ms"] = p50
+            results[f"top8_{terms}_terms_p99_ms"] = p99
+        del index, segment
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return results
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    chunks = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+    print(f"Retrieval index benchmark ({files} files, {chunks} synthetic chunks)")
+    for name, value in run(files, chunks).items():
+        print(f"  {name:<26}{value:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+LogicCore v2 - Token Streaming Benchmark
+UI frame times while parallel token streams are written into text views.
+
+Ten producer threads each stream tokens into their own QPlainTextEdit,
+at several total rates. Posting a queued signal per token (each one a
+cursor insert) is compared with the StreamFlusher, which hands every
+view its new text once per frame. A 16 ms probe timer on the UI thread
+measures how late frames come out:
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_streaming.py [seconds]
+"""
+import os
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from PySide6.QtCore import QEventLoop, QObject, QTimer, Signal
+from PySide6.QtGui import QTextCursor
+from PySide6.QtWidgets import QApplication, QGridLayout, QPlainTextEdit, QWidget
+
+from src.ui.stream_flusher import StreamFlusher, TextEditSink
+from src.ui.theme import theme
+
+
+STREAMS = 10
+RATES = (1000, 2000, 5000, 10000)   # tokens per second, all streams together
+
+
+def tokens(rate, seconds, stop):
+    """Words at `rate` per second, paced in 10 ms steps, 16 to a line."""
+    step = 0.010
+    per_step = max(1, round(rate * step))
+    start = time.perf_counter()
+    sent = 0
+    while sent < rate * seconds and not stop.is_set():
+        for _ in range(per_step):
+            sent += 1
+            yield f"tok{sent % 1000}" + ("\n" if sent % 16 == 0 else " ")
+        delay = start + sent / rate - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class _TokenSignals(QObject):
+    token = Signal(int, str)
+
+
+class NaiveStreams:
+    """One queued signal and cursor insert per token."""
+
+    def __init__(self, views):
+        self.views = views
+        self.sent = self.received = 0
+        self.lock = threading.Lock()
+        self.signals = _TokenSignals()
+        self.signals.token.connect(self.on_token)
+
+    def on_token(self, index, text):
+        cursor = QTextCursor(self.views[index].document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text)
+        self.received += 1
+
+    def pending(self):
+        return self.received < self.sent
+
+    def start(self, rate, seconds, stop):
+        def produce(index):
+            for token in tokens(rate, seconds, stop):
+                with self.lock:
+                    self.sent += 1
+                self.signals.token.emit(index, token)
+        threads = [threading.Thread(target=produce, args=(i,), daemon=True)
+                   for i in range(len(self.views))]
+        for thread in threads:
+            thread.start()
+        return threads
+
+
+class FlushedStreams:
+    def __init__(self, views):
+        self.views = views
+        self.flusher = StreamFlusher()
+
+    def pending(self):
+        return bool(self.flusher.hub.streams())
+
+    def start(self, rate, seconds, stop):
+        for i, view in enumerate(self.views):
+            self.flusher.start(tokens(rate, seconds, stop), TextEditSink(view), f"s{i}")
+        return []
+
+
+def measure(app, views, streams, rate, seconds):
+    for view in views:
+        view.clear()
+    gaps = []
+    last = [time.perf_counter()]
+
+    def probe():
+        now = time.perf_counter()
+        gaps.append((now - last[0]) * 1000)
+        last[0] = now
+
+    timer = QTimer()
+    timer.setInterval(16)
+    timer.timeout.connect(probe)
+    stop = threading.Event()
+    cpu = time.thread_time()
+    start = time.perf_counter()
+    timer.start()
+    threads = streams.start(rate / len(views), seconds, stop)
+    spin(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    # Time to deliver what was still queued when the producers stopped
+    stopped = time.perf_counter()
+    while streams.pending() and time.perf_counter() - stopped < 120:
+        spin(0.05)
+    backlog = time.perf_counter() - stopped
+    timer.stop()
+    wall = time.perf_counter() - start
+    gaps.sort()
+    return {
+        "frame_p50_ms": statistics.median(gaps),
+        "frame_p99_ms": gaps[int(len(gaps) * 0.99)],
+        "frame_max_ms": gaps[-1],
+        "ui_cpu_pct": (time.thread_time() - cpu) / wall * 100,
+        "backlog_ms": backlog * 1000,
+    }
+
+
+def spin(seconds):
+    """Run the event loop (idle, not busy-polling) for `seconds`."""
+    loop = QEventLoop()
+    QTimer.singleShot(int(seconds * 1000), loop.quit)
+    loop.exec()
+
+
+def run(seconds=3.0):
+    app = QApplication.instance() or QApplication(sys.argv)
+    theme.apply(app)
+    window = QWidget()
+    layout = QGridLayout(window)
+    views = [QPlainTextEdit() for _ in range(STREAMS)]
+    for i, view in enumerate(views):
+        view.setReadOnly(True)
+        layout.addWidget(view, i // 5, i % 5)
+    window.resize(1600, 900)
+    window.show()
+    app.processEvents()
+
+    results = {}
+    for name, streams in (("naive", NaiveStreams(views)), ("flusher", FlushedStreams(views))):
+        for rate in RATES:
+            for key, value in measure(app, views, streams, rate, seconds).items():
+                results[f"{name}_{rate}_{key}"] = value
+    window.close()
+    return results
+
+
+def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 3.0
+    print(f"Token streaming benchmark ({STREAMS} streams, {seconds:g} s per rate)")
+    for name, value in run(seconds).items():
+        print(f"  {name:<32}{value:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
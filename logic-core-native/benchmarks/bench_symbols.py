@@ -0,0 +1,148 @@
+"""
+LogicCore v2 - Symbol Index Benchmark
+Indexing and lookup times of the workspace symbol index.
+
+Writes a workspace of generated Python modules, then times the first
+full index, a restart with nothing changed, a restart after files were
+only touched (same content) and after they were edited, and the
+latency of go-to-symbol, definition and find-references lookups:
+
+    python benchmarks/bench_symbols.py [files]
+"""
+import os
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from src.services.file_index import FileIndex
+from src.services.symbols import SymbolIndex
+
+
+MODULE = '''\
+import os
+from .module_{prev} import Record{prev}, helper_{prev}
+
+
+class Record{i}(Record{prev}):
+    """A generated record."""
+    limit = {i}
+
+    def total(self, items):
+        return sum(helper_{prev}(item) for item in items if item.size < self.limit)
+
+    def render(self):
+        return os.path.join(self.name, str(self.total([])))
+
+
+def helper_{i}(value, scale=2):
+    record = Record{i}()
+    return record.total([value]) * scale
+'''
+
+
+def write_workspace(root, files, per_dir=100):
+    for i in range(files):
+        directory = os.path.join(root, f"pkg{i // per_dir}")
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, f"module_{i}.py"), "w") as f:
+            f.write(MODULE.format(i=i, prev=max(0, i - 1)))
+
+
+def open_index(root, work):
+    file_index = FileIndex(root, snapshot_path=os.path.join(work, "files.idx"))
+    file_index.start()
+    file_index.wait_ready()
+    symbols = SymbolIndex(root, file_index, db_path=os.path.join(work, "symbols.sqlite"))
+    return file_index, symbols
+
+
+def close_index(file_index, symbols):
+    symbols.shutdown()
+    file_index.stop()
+
+
+def timed_refresh(root, work):
+    """ms to open the index and bring it up to date, and files parsed."""
+    file_index, symbols = open_index(root, work)
+    start = time.perf_counter()
+    db = symbols._open()
+    parsed = symbols.refresh(db)
+    elapsed = (time.perf_counter() - start) * 1000
+    return file_index, symbols, elapsed, parsed
+
+
+def latency(fn, args):
+    times = []
+    for arg in args:
+        start = time.perf_counter()
+        fn(arg)
+        times.append((time.perf_counter() - start) * 1000)
+    times.sort()
+    return statistics.median(times), times[int(len(times) * 0.99)]
+
+
+def run(files=50_000, changed=100):
+    results = {}
+    work = tempfile.mkdtemp(prefix="bench_symbols")
+    root = os.path.join(work, "workspace")
+    try:
+        write_workspace(root, files)
+        rels = [f"pkg{i // 100}/module_{i}.py" for i in range(files)]
+
+        index = timed_refresh(root, work)
+        close_index(*index[:2])
+        results["full_index_ms"] = index[2]
+        results["files_parsed"] = index[3]
+
+        index = timed_refresh(root, work)
+        close_index(*index[:2])
+        results["unchanged_ms"] = index[2]
+
+        random.seed(0)
+        for rel in random.sample(rels, changed):
+            os.utime(os.path.join(root, rel))
+        index = timed_refresh(root, work)
+        close_index(*index[:2])
+        results["touched_ms"] = index[2]
+        results["touched_parsed"] = index[3]
+
+        for rel in random.sample(rels, changed):
+            with open(os.path.join(root, rel), "a") as f:
+                f.write("\n\ndef extra():\n    return 1\n")
+        index = timed_refresh(root, work)
+        results["edited_ms"] = index[2]
+        results["edited_parsed"] = index[3]
+
+        symbols = index[1]
+        names = [f"helper_{random.randrange(files)}" for _ in range(200)]
+        prefixes = [f"Record{random.randrange(files)}"[:8] for _ in range(200)]
+        results["find_symbol_p50_ms"], results["find_symbol_p99_ms"] = latency(
+            symbols.find_symbol, prefixes)
+        results["definitions_p50_ms"], results["definitions_p99_ms"] = latency(
+            symbols.definitions, names)
+        results["references_p50_ms"], results["references_p99_ms"] = latency(
+            symbols.references, names)
+        start = time.perf_counter()
+        results["references_total"] = len(symbols.references("total"))
+        results["references_total_ms"] = (time.perf_counter() - start) * 1000
+        close_index(*index[:2])
+        results["db_mb"] = os.path.getsize(os.path.join(work, "symbols.sqlite")) / 1e6
+    finally:
+        shutil.rmtree(work, ignore_errors=True)
+    return results
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    print(f"Symbol index benchmark ({files} files)")
+    for name, value in run(files).items():
+        print(f"  {name:<24}{value:12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+LogicCore v2 - Theme Benchmark
+Per-widget stylesheets versus one compiled application stylesheet.
+
+Builds the same widget mix both ways and times construction through the
+first polish, and a full restyle (theme switch). Run offscreen:
+
+    QT_QPA_PLATFORM=offscreen python benchmarks/bench_theme.py
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from PySide6.QtWidgets import (
+    QApplication, QWidget, QVBoxLayout, QHBoxLayout, QLabel, QPushButton, QLineEdit
+)
+
+from src.ui.theme import THEMES, theme, set_role
+
+
+# Old-style sheets, as the widgets used to set them on themselves
+LEGACY_BUTTON = """
+    QPushButton {{
+        background-color: transparent;
+        border: none;
+        border-left: 2px solid transparent;
+        color: {text_dim};
+        font-size: 18px;
+    }}
+    QPushButton:hover {{
+        color: {text_muted};
+    }}
+    QPushButton:checked {{
+        color: {text};
+        border-left: 2px solid {accent};
+    }}
+"""
+LEGACY_HEADER = """
+    background-color: {surface};
+    border-bottom: 1px solid {border};
+"""
+LEGACY_LABEL = "color: {text_dim}; font-size: 10px; font-weight: 600; letter-spacing: 1px;"
+LEGACY_EDIT = """
+    QLineEdit {{
+        background-color: {surface};
+        border: 1px solid {border};
+        border-radius: 3px;
+        color: {text};
+        padding: 4px 6px;
+        font-size: 12px;
+    }}
+    QLineEdit:focus {{
+        border: 1px solid {accent};
+    }}
+"""
+
+
+def build(rows, legacy, tokens):
+    """A panel of `rows` header/label/button/edit groups."""
+    root = QWidget()
+    layout = QVBoxLayout(root)
+    styled = []
+    for i in range(rows):
+        header = QWidget()
+        row = QHBoxLayout(header)
+        label = QLabel(f"ROW {i}")
+        button = QPushButton("◆")
+        button.setCheckable(True)
+        edit = QLineEdit()
+        for widget in (label, button, edit):
+            row.addWidget(widget)
+        layout.addWidget(header)
+        if legacy:
+            for widget, sheet in ((header, LEGACY_HEADER), (label, LEGACY_LABEL),
+                                  (button, LEGACY_BUTTON), (edit, LEGACY_EDIT)):
+                widget.setStyleSheet(sheet.format(**tokens))
+                styled.append((widget, sheet))
+        else:
+            set_role(header, "header")
+            set_role(label, "header")
+            set_role(button, "toggle")
+    return root, styled
+
+
+def legacy_base(name):
+    """The qdarktheme sheet the app used to install, if it is available."""
+    try:
+        import qdarktheme
+    except ImportError:
+        return ""
+    return qdarktheme.load_stylesheet(name)
+
+
+def settle(app):
+    app.processEvents()
+    app.processEvents()
+
+
+def measure(app, rows, legacy):
+    """(build + first polish seconds, restyle seconds)."""
+    if legacy:
+        app.setStyleSheet(legacy_base("dark"))
+    else:
+        theme.apply(app, "dark")
+    start = time.perf_counter()
+    root, styled = build(rows, legacy, THEMES["dark"])
+    root.show()
+    settle(app)
+    built = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if legacy:
+        app.setStyleSheet(legacy_base("light"))
+        for widget, sheet in styled:
+            widget.setStyleSheet(sheet.format(**THEMES["light"]))
+    else:
+        theme.apply(app, "light")
+    settle(app)
+    restyled = time.perf_counter() - start
+    # Destroy now: deleteLater would leave the widgets alive (and
+    # repolished) until the event loop runs
+    root.close()
+    del root, styled
+    settle(app)
+    return built, restyled
+
+
+def measure_main_window(app):
+    from src.ui.main_window import MainWindow
+    theme.apply(app, "dark")
+    start = time.perf_counter()
+    window = MainWindow()
+    window.show()
+    settle(app)
+    elapsed = time.perf_counter() - start
+    window.close()
+    settle(app)
+    return elapsed
+
+
+def run(rows=200, repeat=3):
+    """Best-of-`repeat` timings in milliseconds."""
+    app = QApplication.instance() or QApplication(sys.argv)
+    results = {}
+    for legacy in (True, False):
+        key = "per_widget" if legacy else "compiled"
+        samples = [measure(app, rows, legacy) for _ in range(repeat)]
+        results[f"{key}.build_ms"] = min(s[0] for s in samples) * 1000
+        results[f"{key}.restyle_ms"] = min(s[1] for s in samples) * 1000
+    results["main_window.build_ms"] = measure_main_window(app) * 1000
+    return results
+
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    results = run(rows)
+    print(f"Theme benchmark ({rows} rows, {rows * 4} widgets)")
+    if not legacy_base("dark"):
+        print("  (qdarktheme not installed: per-widget runs without its app sheet)")
+    for name, value in results.items():
+        print(f"  {name:<28}{value:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""
+LogicCore v2 - UI Benchmark Runner
+Times the scenarios in benchmarks/scenarios.py on the offscreen Qt
+platform, records them in a JSON history and compares against an
+earlier run.
+
+    python benchmarks/run.py                    # run all, record
+    python benchmarks/run.py --only terminal    # a subset
+    python benchmarks/run.py --compare last     # fail on >10% regressions
+
+Each scenario runs `--repeat` times; the median is recorded and
+compared, the minimum is kept for reference. Caches and session state
+go to a temporary directory, removed afterwards, so the windows the
+scenarios open never touch the user's own. A scenario that takes longer
+than `--timeout` seconds stops the run with every thread's stack.
+"""
+import argparse
+import atexit
+import faulthandler
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Before the app is imported, so every cache and state path lands here
+SCRATCH = tempfile.mkdtemp(prefix="logiccore-bench-home-")
+os.environ["XDG_CACHE_HOME"] = os.path.join(SCRATCH, "cache")
+os.environ["XDG_STATE_HOME"] = os.path.join(SCRATCH, "state")
+if sys.platform == "win32":
+    os.environ["LOCALAPPDATA"] = SCRATCH
+atexit.register(shutil.rmtree, SCRATCH, ignore_errors=True)
+
+from scenarios import ROOT, SCENARIOS, ensure_app
+
+
+DEFAULT_HISTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                               "results", "history.json")
+
+# Metrics below this many milliseconds are too noisy to flag
+NOISE_FLOOR_MS = 1.0
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+            capture_output=True, text=True, timeout=5,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def start_deadline(name, seconds):
+    """Abort the run, with every thread's stack, if `name` is not done in time."""
+    def expire():
+        print(f"\n{name}: no result after {seconds:.0f} s; aborting", file=sys.stderr)
+        faulthandler.dump_traceback(all_threads=True)
+        shutil.rmtree(SCRATCH, ignore_errors=True)
+        os._exit(3)
+
+    timer = threading.Timer(seconds, expire)
+    timer.daemon = True
+    timer.start()
+    return timer
+
+
+def run_scenarios(names, repeat, timeout):
+    """{"scenario.metric": {"median": ms, "min": ms}}."""
+    app = ensure_app()
+    results = {}
+    for name in names:
+        samples = {}
+        for _ in range(repeat):
+            # The scenarios block the UI thread, so only another thread
+            # can notice one that hangs
+            deadline = start_deadline(name, timeout)
+            try:
+                measured = SCENARIOS[name](app)
+            finally:
+                deadline.cancel()
+            for metric, value in measured.items():
+                samples.setdefault(metric, []).append(value)
+        for metric, values in samples.items():
+            key = f"{name}.{metric}"
+            results[key] = {"median": statistics.median(values), "min": min(values)}
+            print(f"  {key:<40}{results[key]['median']:10.2f} ms")
+    return results
+
+
+def load_history(path):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def save_history(path, history):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + ".tmp", "w", encoding="utf-8") as f:
+        json.dump(history, f, indent=1)
+    os.replace(path + ".tmp", path)
+
+
+def find_baseline(history, ref):
+    """History entry matching `ref`: "last", a label or a revision."""
+    if not history:
+        return None
+    if ref == "last":
+        return history[-1]
+    for entry in reversed(history):
+        if ref in (entry.get("label"), entry.get("revision")):
+            return entry
+    return None
+
+
+def compare(baseline, results, threshold):
+    """Print a comparison table; return the regressed metric names."""
+    regressions = []
+    print(f"\nCompared with {baseline.get('label') or baseline.get('revision')}"
+          f" ({baseline['timestamp']}), threshold {threshold:.0%}")
+    for metric, value in results.items():
+        old = baseline["results"].get(metric)
+        if old is None:
+            print(f"  {metric:<40}{value['median']:10.2f} ms   (new)")
+            continue
+        change = (value["median"] - old["median"]) / old["median"] if old["median"] else 0.0
+        flag = ""
+        if change > threshold and value["median"] - old["median"] > NOISE_FLOOR_MS:
+            flag = "  REGRESSION"
+            regressions.append(metric)
+        print(f"  {metric:<40}{old['median']:10.2f} -> {value['median']:8.2f} ms"
+              f"  {change:+7.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="LogicCore UI benchmarks")
+    parser.add_argument("--only", nargs="+", choices=sorted(SCENARIOS),
+                        help="scenarios to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=120, metavar="SECONDS",
+                        help="abort if one run of a scenario takes longer")
+    parser.add_argument("--history", default=DEFAULT_HISTORY,
+                        help="JSON history file")
+    parser.add_argument("--label", help="name for this run in the history")
+    parser.add_argument("--compare", metavar="REF",
+                        help='compare with a history entry: "last", a label or a revision')
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="relative slowdown counted as a regression")
+    parser.add_argument("--no-record", action="store_true",
+                        help="do not append this run to the history")
+    parser.add_argument("--list", action="store_true", help="list scenarios")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, func in SCENARIOS.items():
+            print(f"  {name:<14}{func.__doc__}")
+        return 0
+
+    history = load_history(args.history)
+    baseline = None
+    if args.compare:
+        baseline = find_baseline(history, args.compare)
+        if baseline is None:
+            print(f"No history entry for {args.compare!r} in {args.history}", file=sys.stderr)
+            return 2
+
+    from PySide6 import __version__ as pyside_version
+    names = args.only or list(SCENARIOS)
+    print(f"Running {len(names)} scenario(s), {args.repeat} repeat(s), "
+          f"platform {os.environ['QT_QPA_PLATFORM']}")
+    results = run_scenarios(names, args.repeat, args.timeout)
+
+    if not args.no_record:
+        history.append({
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "label": args.label,
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "pyside": pyside_version,
+            "repeat": args.repeat,
+            "results": results,
+        })
+        save_history(args.history, history)
+
+    if baseline is not None:
+        regressions = compare(baseline, results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.threshold:.0%}")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
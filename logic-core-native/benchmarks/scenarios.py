@@ -0,0 +1,250 @@
+"""
+LogicCore v2 - Benchmark Scenarios
+UI scenarios timed by benchmarks/run.py. Each returns {metric: ms}.
+"""
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from PySide6.QtWidgets import QApplication, QSplitter, QTabWidget, QTreeView
+
+SCENARIOS = {}
+
+
+def scenario(name):
+    def register(func):
+        SCENARIOS[name] = func
+        return func
+    return register
+
+
+def settle(app, rounds=2):
+    for _ in range(rounds):
+        app.processEvents()
+
+
+def wait_until(app, predicate, timeout=30.0):
+    deadline = time.perf_counter() + timeout
+    while not predicate():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("benchmark condition not reached")
+        app.processEvents()
+        time.sleep(0.001)
+
+
+def close_window(app, window):
+    window.close()
+    settle(app)
+
+
+class Workspace:
+    """Temporary workspace of `files` files, optionally `per_dir` per folder."""
+
+    def __init__(self, files, per_dir=None):
+        self.path = tempfile.mkdtemp(prefix="logiccore-bench-")
+        for i in range(files):
+            folder = self.path
+            if per_dir:
+                folder = os.path.join(self.path, f"pkg{i // per_dir}")
+                os.makedirs(folder, exist_ok=True)
+            with open(os.path.join(folder, f"module_{i}.py"), "w") as f:
+                f.write(f"value = {i}\n")
+
+    def __enter__(self):
+        return self.path
+
+    def __exit__(self, *exc):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+
+# --- Main window -------------------------------------------------------------
+
+COLD_START = """
+import sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+from PySide6.QtWidgets import QApplication
+app = QApplication(sys.argv)
+from src.ui.theme import theme
+theme.apply(app)
+from src.ui.main_window import MainWindow
+window = MainWindow({workspace!r})
+window.show()
+app.processEvents()
+app.processEvents()
+print((time.perf_counter() - start) * 1000)
+window.close()
+"""
+
+
+@scenario("main_window")
+def main_window(app):
+    """Cold start in a fresh interpreter, then warm in-process construction."""
+    from src.ui.main_window import MainWindow
+
+    with Workspace(200, per_dir=50) as workspace:
+        env = dict(os.environ, QT_QPA_PLATFORM="offscreen")
+        out = subprocess.run(
+            [sys.executable, "-c", COLD_START.format(root=ROOT, workspace=workspace)],
+            capture_output=True, text=True, env=env, timeout=60, check=True,
+        ).stdout.split()
+        cold = float(out[-1])
+
+        close_window(app, MainWindow(workspace))  # warm the imports and caches
+        start = time.perf_counter()
+        window = MainWindow(workspace)
+        window.show()
+        settle(app)
+        warm = (time.perf_counter() - start) * 1000
+        close_window(app, window)
+    return {"cold_ms": cold, "warm_ms": warm}
+
+
+# --- Explorer ----------------------------------------------------------------
+
+@scenario("explorer")
+def explorer(app, items=5000):
+    """Listing and inserting a directory of `items` files into the tree."""
+    from src.ui.file_tree import FileTreeModel
+
+    with Workspace(items) as workspace:
+        start = time.perf_counter()
+        model = FileTreeModel(workspace)
+        view = QTreeView()
+        view.setModel(model)
+        view.show()
+        root = model.root_index()
+        view.expand(root)
+
+        def populated():
+            if model.canFetchMore(root):
+                model.fetchMore(root)
+            return model.rowCount(root) == items
+
+        wait_until(app, populated)
+        settle(app)
+        elapsed = (time.perf_counter() - start) * 1000
+        model.shutdown()
+        view.close()
+    return {f"populate_{items}_ms": elapsed}
+
+
+# --- Terminal ----------------------------------------------------------------
+
+@scenario("terminal")
+def terminal(app, lines=100_000):
+    """append_line and raw output parsing throughput, plus one frame."""
+    from src.ui.bottom_panel import TerminalWidget
+
+    widget = TerminalWidget()
+    widget.start_session = lambda: None  # no shell for the benchmark
+    widget.resize(900, 300)
+    widget.show()
+    settle(app)
+
+    start = time.perf_counter()
+    for i in range(lines):
+        widget.append_line(f"build step {i}: compiling module_{i}.py")
+    widget._on_frame()
+    widget.viewport().repaint()
+    append = (time.perf_counter() - start) * 1000
+
+    chunk = b"".join(b"\x1b[32mOK\x1b[0m test_%d passed in 0.01s\r\n" % i for i in range(1000))
+    # feed() normally runs on the PTY reader thread and, while the widget
+    # shows, waits for its next frame; here the UI thread feeds, so it
+    # must not wait for itself
+    widget.screen.set_paced(False)
+    start = time.perf_counter()
+    for _ in range(lines // 1000):
+        widget.screen.feed(chunk)
+    widget._on_frame()
+    widget.viewport().repaint()
+    feed = (time.perf_counter() - start) * 1000
+    widget.close_session()
+    widget.close()
+    return {f"append_{lines}_ms": append, f"feed_{lines}_ms": feed}
+
+
+# --- Layout ------------------------------------------------------------------
+
+@scenario("splitter")
+def splitter(app, steps=40):
+    """Dragging the editor/bottom-panel splitter through `steps` positions."""
+    from src.ui.main_window import MainWindow
+
+    with Workspace(50) as workspace:
+        window = MainWindow(workspace)
+        window.show()
+        settle(app)
+        split = window.findChild(QSplitter)
+        total = sum(split.sizes())
+        start = time.perf_counter()
+        for i in range(steps):
+            bottom = 150 + (i * 37) % (total // 2)
+            split.setSizes([total - bottom, bottom])
+            window.repaint()
+        settle(app)
+        per_step = (time.perf_counter() - start) * 1000 / steps
+        close_window(app, window)
+    return {"relayout_ms": per_step}
+
+
+# --- Metrics panel -----------------------------------------------------------
+
+@scenario("metrics")
+def metrics(app, frames=30):
+    """Repainting the METRICS tab with an hour of history behind each card."""
+    from src.ui.bottom_panel import BottomPanel
+    from src.services.metrics import default_registry
+
+    now = time.time()
+    for name in ("requests/s", "latency_ms", "cpu.process_pct", "memory.rss_mb"):
+        for t in range(3600):
+            default_registry.record(name, (t * 7) % 100, now - 3600 + t)
+
+    panel = BottomPanel()
+    panel.terminal.start_session = lambda: None
+    panel.resize(1200, 260)
+    panel.show()
+    panel.findChild(QTabWidget).setCurrentIndex(1)
+    settle(app)
+
+    start = time.perf_counter()
+    panel.update_history()
+    history = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    for i in range(frames):
+        for card in panel.metric_cards.values():
+            card._pending = float(i)
+            card._apply()
+        panel.repaint()
+    per_frame = (time.perf_counter() - start) * 1000 / frames
+    panel.shutdown()
+    panel.close()
+    return {"history_ms": history, "repaint_ms": per_frame}
+
+
+# --- Theme -------------------------------------------------------------------
+
+@scenario("theme")
+def theme_switch(app):
+    """Compiled-stylesheet build and full restyle (see bench_theme.py)."""
+    from bench_theme import measure
+    from src.ui.theme import theme
+    build, restyle = measure(app, 200, legacy=False)
+    theme.apply(app, "dark")
+    return {"build_ms": build * 1000, "restyle_ms": restyle * 1000}
+
+
+def ensure_app():
+    app = QApplication.instance() or QApplication([sys.argv[0]])
+    from src.ui.theme import theme
+    theme.apply(app)
+    return app
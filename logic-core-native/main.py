@@ -2,34 +2,152 @@
 LogicCore v2 - Native Edition
 Entry point for the Qt-based native application.
 """
+import os
 import sys
-from PySide6.QtWidgets import QApplication
-from PySide6.QtCore import Qt
-from src.ui.main_window import MainWindow
+import argparse
+
+def parse_args(argv):
+    """Parse command line arguments, leaving Qt's own options alone."""
+    parser = argparse.ArgumentParser(prog="logiccore")
+    parser.add_argument("workspace", nargs="?", default=None,
+                        help="workspace folder, or file[:line], to open (default: cwd)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="print a startup timing breakdown after the first frame")
+    parser.add_argument("--no-defer", action="store_true",
+                        help="build hidden tabs and views up front")
+    parser.add_argument("--theme", default=None,
+                        help="color theme (dark or light; checked once Qt is loaded)")
+    parser.add_argument("--stall-budget", type=float, default=50, metavar="MS",
+                        help="report UI stalls longer than MS milliseconds (0: off)")
+    parser.add_argument("--new-instance", action="store_true",
+                        help="start a separate instance instead of using the running one")
+    parser.add_argument("--keep-warm", action="store_true",
+                        help="keep running, with a hidden window ready, after the last window closes")
+    parser.add_argument("--quit", action="store_true",
+                        help="close the running instance (e.g. one kept warm)")
+    args, _ = parser.parse_known_args(argv[1:])
+    return args
+
+def install_first_frame_hook(app, profiler):
+    """Report the startup profile once the first paint has finished."""
+    from PySide6.QtCore import QObject, QEvent, QTimer
+
+    class FirstFrame(QObject):
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Paint and obj.isWidgetType():
+                app.removeEventFilter(self)
+                # Runs after the paint event has been handled
+                QTimer.singleShot(0, self.report)
+            return False
+
+        def report(self):
+            profiler.mark("first frame")
+            profiler.print_report()
+
+    hook = FirstFrame(app)
+    app.installEventFilter(hook)
+    return hook
+
+def start_watchdog(app, budget_ms):
+    """Heartbeat the event loop so stalls are caught with their stack."""
+    from PySide6.QtCore import Qt, QTimer
+    from src.services.watchdog import default_watchdog as watchdog
+
+    watchdog.budget = budget_ms / 1000.0
+    timer = QTimer(app)
+    timer.setTimerType(Qt.PreciseTimer)
+    timer.setInterval(int(watchdog.interval * 1000))
+    timer.timeout.connect(watchdog.beat)
+    # Start once the loop is running so startup is not reported as a stall
+    QTimer.singleShot(0, timer.start)
+    QTimer.singleShot(0, watchdog.start)
+    return watchdog
+
+def serve_launches(app, windows):
+    """Take over launches from later runs; they then exit right away."""
+    from src.ui.instance_server import InstanceServer
+
+    def launch(argv, cwd):
+        args = parse_args(["logiccore"] + argv)
+        if args.quit:
+            windows.quit()
+        else:
+            windows.open(args.workspace, cwd)
+
+    server = InstanceServer(app)
+    server.launch_requested.connect(launch)
+    server.listen()
+    app.aboutToQuit.connect(server.close)
+    return server
 
 def main():
+    args = parse_args(sys.argv)
+
+    # Hand the launch to a running instance before anything heavy is imported
+    if not args.new_instance:
+        from src.services import single_instance
+        if single_instance.forward(sys.argv[1:], os.getcwd()) or args.quit:
+            return
+
+    # Imports happen here so --profile-startup can time them
+    from src.services.startup import profiler
+    if args.profile_startup:
+        profiler.begin()
+
+    with profiler.phase("import PySide6"):
+        from PySide6.QtWidgets import QApplication
+        from PySide6.QtCore import Qt
+    with profiler.phase("import MainWindow"):
+        from src.ui import lazy
+        from src.ui.main_window import MainWindow
+        from src.ui.instance_server import WindowManager
+        from src.services.metrics import ProcSampler, default_registry
+        try:
+            from src.services.host.client import default_host
+        except ImportError:  # No shared memory / Unix sockets (e.g. Windows)
+            default_host = None
+    lazy.DEFER = not args.no_defer
+
     # Enable High DPI scaling
     QApplication.setHighDpiScaleFactorRoundingPolicy(
         Qt.HighDpiScaleFactorRoundingPolicy.PassThrough
     )
-    
-    app = QApplication(sys.argv)
+
+    with profiler.phase("QApplication"):
+        app = QApplication(sys.argv)
     app.setApplicationName("LogicCore")
     app.setOrganizationName("LogicCore Team")
     app.setApplicationVersion("2.0.0")
-    
-    # Apply dark theme
-    try:
-        import qdarktheme
-        app.setStyleSheet(qdarktheme.load_stylesheet("dark"))
-    except ImportError:
-        pass  # Fallback to default styling
-    
+
+    # One application-wide stylesheet; widgets only carry roles
+    with profiler.phase("Stylesheet"):
+        from src.ui.theme import theme
+        try:
+            theme.apply(app, args.theme)
+        except KeyError:
+            print(f"logiccore: unknown theme {args.theme!r} (choose from "
+                  f"{', '.join(theme.names())}); using {theme.name}", file=sys.stderr)
+            theme.apply(app)
+
     # Create and show main window
-    window = MainWindow()
-    window.show()
-    
-    sys.exit(app.exec())
+    if args.profile_startup:
+        install_first_frame_hook(app, profiler)
+    windows = WindowManager(app, MainWindow, keep_warm=args.keep_warm,
+                            sampler=ProcSampler(default_registry))
+    if default_host is not None:
+        # Shared by every window and started by the first request; stopped
+        # only once the whole application quits
+        app.aboutToQuit.connect(default_host.stop)
+    with profiler.phase("MainWindow"):
+        windows.open(args.workspace)
+    if not args.new_instance:
+        serve_launches(app, windows)
+
+    watchdog = start_watchdog(app, args.stall_budget) if args.stall_budget > 0 else None
+    code = app.exec()
+    if watchdog is not None:
+        watchdog.stop()
+    sys.exit(code)
 
 if __name__ == "__main__":
     main()
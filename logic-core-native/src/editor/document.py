@@ -0,0 +1,494 @@
+"""
+LogicCore v2 - Editor Document
+Piece table over a memory-mapped file, with a lazily built line index.
+"""
+import mmap
+import os
+import threading
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+
+try:
+    import numpy
+except ImportError:  # Line scanning falls back to bytes.find
+    numpy = None
+
+
+# Newlines are counted per block of the original file
+BLOCK_SIZE = 1 << 20
+# Decoded newline positions kept for this many blocks
+BLOCK_CACHE = 32
+# Lines are cut here for display; the document itself keeps them whole
+MAX_LINE_BYTES = 64 * 1024
+# Average line length assumed before anything has been indexed
+DEFAULT_LINE_LENGTH = 80
+# Edits up to this far past the indexed prefix wait for the indexer to
+# reach them; line numbers of edits further on are estimated
+EXACT_EDIT_BYTES = 32 << 20
+
+ORIGINAL, ADDED = 0, 1
+
+
+def _newlines_in(data, start, end):
+    """Offsets of the b"\\n" bytes in data[start:end]."""
+    if numpy is not None:
+        chunk = numpy.frombuffer(data, numpy.uint8, end - start, start)
+        return array("q", (numpy.flatnonzero(chunk == 10) + start).tolist())
+    out = array("q")
+    find = data.find
+    pos = find(b"\n", start, end)
+    while pos != -1:
+        out.append(pos)
+        pos = find(b"\n", pos + 1, end)
+    return out
+
+
+def _count_newlines(data, start, end):
+    if numpy is not None:
+        chunk = numpy.frombuffer(data, numpy.uint8, end - start, start)
+        return int(numpy.count_nonzero(chunk == 10))
+    return data[start:end].count(b"\n")
+
+
+class LineIndex:
+    """
+    Newline positions of a read-only buffer, built block by block.
+
+    Only a newline count per block is kept for the whole buffer; exact
+    positions are recovered for a block when it is needed and cached.
+    Until every block is counted, positions past the indexed prefix
+    are estimated from the average line length so far.
+    """
+
+    def __init__(self, data, size, block_size=BLOCK_SIZE):
+        self.data = data
+        self.size = size
+        self.block_size = block_size
+        self.block_count = (size + block_size - 1) // block_size
+        # prefix[b] = newlines before block b, for the counted blocks
+        self.prefix = array("q", [0])
+        self._positions = OrderedDict()
+        self._lock = threading.Lock()
+        self._grown = threading.Condition(self._lock)
+
+    @property
+    def indexed_blocks(self):
+        return len(self.prefix) - 1
+
+    @property
+    def complete(self):
+        return self.indexed_blocks >= self.block_count
+
+    @property
+    def indexed_bytes(self):
+        return min(self.size, self.indexed_blocks * self.block_size)
+
+    def progress(self):
+        return 1.0 if not self.block_count else self.indexed_blocks / self.block_count
+
+    def index_next(self):
+        """Count one more block; False once the buffer is fully indexed."""
+        b = self.indexed_blocks
+        if b >= self.block_count:
+            return False
+        start = b * self.block_size
+        count = _count_newlines(self.data, start, min(self.size, start + self.block_size))
+        with self._grown:
+            # Another thread may have counted the block meanwhile
+            if self.indexed_blocks == b:
+                self.prefix.append(self.prefix[-1] + count)
+                self._grown.notify_all()
+        return True
+
+    def build(self, until=None, stop=None):
+        """Index blocks up to byte offset `until` (default: all)."""
+        while self.indexed_bytes < (self.size if until is None else min(until, self.size)):
+            if stop is not None and stop.is_set():
+                return
+            self.index_next()
+
+    def wait(self, until, timeout=None):
+        """Block until another thread has indexed up to `until`; False on timeout."""
+        with self._grown:
+            return self._grown.wait_for(
+                lambda: self.indexed_bytes >= min(until, self.size), timeout)
+
+    def _average_line(self):
+        lines = self.prefix[-1]
+        return self.indexed_bytes / lines if lines else DEFAULT_LINE_LENGTH
+
+    def newline_count(self):
+        """Newlines in the buffer (estimated until complete)."""
+        if self.complete:
+            return self.prefix[-1]
+        return self.prefix[-1] + int((self.size - self.indexed_bytes) / self._average_line())
+
+    def positions(self, b):
+        """Offsets of the newlines in block `b`."""
+        with self._lock:
+            found = self._positions.get(b)
+            if found is not None:
+                self._positions.move_to_end(b)
+                return found
+        start = b * self.block_size
+        found = _newlines_in(self.data, start, min(self.size, start + self.block_size))
+        with self._lock:
+            self._positions[b] = found
+            if len(self._positions) > BLOCK_CACHE:
+                self._positions.popitem(last=False)
+        return found
+
+    def lines_before(self, offset):
+        """Newlines in data[:offset]; estimated past the indexed prefix."""
+        b = offset // self.block_size
+        if b < self.indexed_blocks:
+            return self.prefix[b] + bisect_left(self.positions(b), offset)
+        extra = offset - self.indexed_bytes
+        return self.prefix[-1] + int(extra / self._average_line())
+
+    def is_exact(self, offset):
+        return offset <= self.indexed_bytes or self.complete
+
+    def line_start(self, line):
+        """Offset where line `line` (0-based) starts."""
+        if line <= 0:
+            return 0
+        prefix = self.prefix
+        if line <= prefix[-1]:
+            b = bisect_left(prefix, line) - 1
+            return self.positions(b)[line - prefix[b] - 1] + 1
+        # Not indexed yet: estimate, then move to the next line start
+        guess = self.indexed_bytes + int((line - prefix[-1]) * self._average_line())
+        if guess >= self.size:
+            guess = max(0, self.size - 1)
+        pos = self.data.rfind(b"\n", max(self.indexed_bytes, guess - MAX_LINE_BYTES), guess)
+        return pos + 1 if pos != -1 else guess
+
+
+class Piece:
+    __slots__ = ("buffer", "start", "length", "newlines")
+
+    def __init__(self, buffer, start, length, newlines=None):
+        self.buffer = buffer
+        self.start = start
+        self.length = length
+        self.newlines = newlines    # None until known exactly
+
+
+class Document:
+    """
+    Editable text backed by a piece table.
+
+    The file is memory-mapped, not read, so opening costs the same for
+    any size. Edits append to an in-memory add buffer and only split
+    pieces. Line positions come from a LineIndex over the mapped file,
+    which a background thread fills in after opening; line numbers past
+    the indexed part are estimated until it finishes. Offsets are byte
+    offsets into the UTF-8 text.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.modified = False
+        self.revision = 0
+        self._file = None
+        self._map = None
+        self.added = bytearray()
+        self._stop = threading.Event()
+        self._indexer = None
+        self._listeners = []
+        self._load(path)
+
+    @classmethod
+    def open(cls, path):
+        document = cls(os.path.abspath(path))
+        document.start_indexing()
+        return document
+
+    def _load(self, path):
+        data, size = b"", 0
+        if path is not None:
+            self._file = open(path, "rb")
+            size = os.fstat(self._file.fileno()).st_size
+            if size:
+                self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+                data = self._map
+        self.original = data
+        self.index = LineIndex(data, size)
+        self.index.index_next()
+        self.pieces = [Piece(ORIGINAL, 0, size)] if size else []
+        self._layout_dirty = True
+
+    def start_indexing(self):
+        """Count lines of the mapped file on a background thread."""
+        if self._indexer is None and not self.index.complete:
+            self._indexer = threading.Thread(target=self.index.build, name="LineIndex",
+                                             kwargs={"stop": self._stop}, daemon=True)
+            self._indexer.start()
+
+    def close(self):
+        self._stop.set()
+        if self._indexer is not None:
+            self._indexer.join()
+            self._indexer = None
+        self.original = b""
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # --- Layout ---------------------------------------------------------
+
+    def _buffer(self, piece):
+        return self.original if piece.buffer == ORIGINAL else self.added
+
+    def _piece_newlines(self, piece):
+        if piece.newlines is not None:
+            return piece.newlines
+        if piece.buffer == ADDED:
+            piece.newlines = self.added.count(b"\n", piece.start, piece.start + piece.length)
+            return piece.newlines
+        end = piece.start + piece.length
+        count = self.index.lines_before(end) - self.index.lines_before(piece.start)
+        if self.index.is_exact(end):
+            piece.newlines = count
+        return count
+
+    def _layout(self):
+        """Cumulative byte offsets and newline counts per piece."""
+        if not self._layout_dirty:
+            return
+        self._offsets = array("q", [0])
+        self._lines = array("q", [0])
+        exact = True
+        for piece in self.pieces:
+            self._offsets.append(self._offsets[-1] + piece.length)
+            self._lines.append(self._lines[-1] + self._piece_newlines(piece))
+            exact = exact and piece.newlines is not None
+        # Estimated counts are recomputed as the index grows
+        self._layout_dirty = not exact
+
+    @property
+    def size(self):
+        self._layout()
+        return self._offsets[-1]
+
+    def line_count(self):
+        """Number of lines (estimated while the index is being built)."""
+        self._layout()
+        return self._lines[-1] + 1
+
+    def is_exact(self):
+        self._layout()
+        return not self._layout_dirty
+
+    def _locate(self, offset):
+        """(piece number, offset within it) for a document offset."""
+        i = bisect_right(self._offsets, offset) - 1
+        return min(i, len(self.pieces) - 1), offset - self._offsets[i]
+
+    def line_offset(self, line):
+        """Byte offset where `line` (0-based) starts."""
+        self._layout()
+        if line <= 0 or not self.pieces:
+            return 0
+        if line > self._lines[-1]:
+            line = self._lines[-1]
+        i = bisect_left(self._lines, line) - 1
+        piece = self.pieces[i]
+        k = line - self._lines[i]   # the k-th newline in this piece ends the previous line
+        if piece.buffer == ORIGINAL:
+            first = self.index.lines_before(piece.start)
+            at = self.index.line_start(first + k)
+            at = min(max(at, piece.start), piece.start + piece.length)
+            return self._offsets[i] + at - piece.start
+        pos = piece.start - 1
+        for _ in range(k):
+            pos = self.added.find(b"\n", pos + 1, piece.start + piece.length)
+        return self._offsets[i] + pos + 1 - piece.start
+
+    def line_of(self, offset):
+        """Line number containing byte `offset`."""
+        self._layout()
+        if not self.pieces:
+            return 0
+        i, inner = self._locate(offset)
+        piece = self.pieces[i]
+        if piece.buffer == ORIGINAL:
+            before = (self.index.lines_before(piece.start + inner)
+                      - self.index.lines_before(piece.start))
+        else:
+            before = self.added.count(b"\n", piece.start, piece.start + inner)
+        return self._lines[i] + before
+
+    # --- Reading --------------------------------------------------------
+
+    def read(self, start, length):
+        """Bytes [start, start + length) of the document."""
+        self._layout()
+        end = min(self._offsets[-1], start + length)
+        if start >= end:
+            return b""
+        i, inner = self._locate(start)
+        parts = []
+        while start < end:
+            piece = self.pieces[i]
+            take = min(piece.length - inner, end - start)
+            base = piece.start + inner
+            parts.append(self._buffer(piece)[base:base + take])
+            start += take
+            i, inner = i + 1, 0
+        return b"".join(parts)
+
+    def find_newline(self, start):
+        """Offset of the next b"\\n" at or after `start`, or the document size."""
+        self._layout()
+        if start >= self._offsets[-1]:
+            return self._offsets[-1]
+        i, inner = self._locate(start)
+        while i < len(self.pieces):
+            piece = self.pieces[i]
+            pos = self._buffer(piece).find(b"\n", piece.start + inner,
+                                           piece.start + piece.length)
+            if pos != -1:
+                return self._offsets[i] + pos - piece.start
+            i, inner = i + 1, 0
+        return self._offsets[-1]
+
+    def line_bytes(self, line):
+        start = self.line_offset(line)
+        end = self.find_newline(start)
+        return self.read(start, min(end - start, MAX_LINE_BYTES))
+
+    def lines(self, first, count):
+        """Up to `count` decoded lines from `first`, cut at MAX_LINE_BYTES."""
+        out = []
+        start = self.line_offset(first)
+        size = self.size
+        while len(out) < count:
+            end = self.find_newline(start)
+            data = self.read(start, min(end - start, MAX_LINE_BYTES))
+            out.append(data.decode("utf-8", "replace").rstrip("\r"))
+            if end >= size:
+                break
+            start = end + 1
+        return out
+
+    def line(self, line):
+        return self.line_bytes(line).decode("utf-8", "replace").rstrip("\r")
+
+    def offset_at(self, line, column):
+        """Byte offset of character `column` on `line`."""
+        start = self.line_offset(line)
+        text = self.line_bytes(line).decode("utf-8", "replace")
+        return start + len(text[:column].encode("utf-8"))
+
+    # --- Editing --------------------------------------------------------
+
+    def _split(self, offset):
+        """Split pieces so one starts at `offset`; returns its index."""
+        self._layout()
+        if offset >= self._offsets[-1]:
+            return len(self.pieces)
+        i, inner = self._locate(offset)
+        if inner == 0:
+            return i
+        piece = self.pieces[i]
+        head = Piece(piece.buffer, piece.start, inner)
+        tail = Piece(piece.buffer, piece.start + inner, piece.length - inner)
+        self.pieces[i:i + 1] = [head, tail]
+        self._layout_dirty = True
+        return i + 1
+
+    def insert(self, offset, text):
+        """Insert `text` (str or bytes) at byte `offset`."""
+        data = text.encode("utf-8") if isinstance(text, str) else bytes(text)
+        if not data:
+            return
+        self._ensure_indexed(offset)
+        first = self.line_of(offset)
+        i = self._split(offset)
+        start = len(self.added)
+        self.added += data
+        previous = self.pieces[i - 1] if i else None
+        if (previous is not None and previous.buffer == ADDED
+                and previous.start + previous.length == start):
+            # Typing: grow the last added piece instead of adding one per key
+            previous.length += len(data)
+            previous.newlines = None
+        else:
+            self.pieces.insert(i, Piece(ADDED, start, len(data)))
+        self._changed(first, 1, 1 + data.count(b"\n"))
+
+    def delete(self, offset, length):
+        """Remove `length` bytes starting at `offset`."""
+        if length <= 0:
+            return
+        self._ensure_indexed(offset + length)
+        line = self.line_of(offset)
+        removed = self.read(offset, length).count(b"\n")
+        first = self._split(offset)
+        last = self._split(offset + length)
+        del self.pieces[first:last]
+        self._changed(line, 1 + removed, 1)
+
+    def _ensure_indexed(self, offset):
+        # Pieces cut from the original get exact line counts when that
+        # is cheap; far past the indexed prefix they stay estimated and
+        # are recounted as the index grows
+        index = self.index
+        if index.is_exact(offset) or offset - index.indexed_bytes > EXACT_EDIT_BYTES:
+            return
+        if self._indexer is not None and self._indexer.is_alive():
+            index.wait(offset + 1)
+        else:
+            index.build(until=offset + 1)
+
+    def _changed(self, first, old, new):
+        self._layout_dirty = True
+        self.modified = True
+        self.revision += 1
+        for callback in list(self._listeners):
+            callback(first, old, new)
+
+    def subscribe(self, callback):
+        """
+        Call `callback(first, old, new)` after each edit: lines
+        [first, first + old) were replaced by [first, first + new).
+        """
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    # --- Saving ---------------------------------------------------------
+
+    def save(self, path=None):
+        """Write the document out and remap it; returns the path."""
+        path = os.path.abspath(path or self.path)
+        tmp = path + ".lctmp"
+        with open(tmp, "wb") as f:
+            for piece in self.pieces:
+                buffer = self._buffer(piece)
+                start = piece.start
+                end = piece.start + piece.length
+                while start < end:
+                    step = min(end, start + (16 << 20))
+                    f.write(buffer[start:step])
+                    start = step
+        if os.path.exists(path):
+            os.chmod(tmp, os.stat(path).st_mode & 0o7777)
+        self.close()
+        os.replace(tmp, path)
+        self.path = path
+        self.added = bytearray()
+        self._stop = threading.Event()
+        self._load(path)
+        self.modified = False
+        self.revision += 1
+        self.start_indexing()
+        return path
@@ -0,0 +1,381 @@
+"""
+LogicCore v2 - Editor View
+Viewport-only text editor over a piece-table Document.
+"""
+import math
+
+from PySide6.QtWidgets import QAbstractScrollArea, QApplication
+from PySide6.QtCore import Qt, QTimer, Signal
+from PySide6.QtGui import QFont, QPainter
+
+from ..ui.theme import theme
+
+
+TAB_WIDTH = 4
+# Scroll bars hold ints; beyond this many lines one step covers several
+SCROLL_LIMIT = 1 << 30
+
+
+class EditorView(QAbstractScrollArea):
+    """
+    Code editor that asks the document only for the lines in view.
+
+    Nothing proportional to the file is ever handed to Qt: each paint
+    reads the visible rows from the Document, so a multi-GB file opens
+    and scrolls like a small one. While the document's line index is
+    still being built the scroll range follows its estimate.
+    """
+
+    PADDING = 8
+    GUTTER_GAP = 16
+    INDEX_POLL_MS = 200
+
+    cursor_moved = Signal(int, int)     # line, column (0-based)
+    modified_changed = Signal(bool)
+
+    def __init__(self, document, parent=None):
+        super().__init__(parent)
+        self.document = document
+        self.cursor_line = 0
+        self.cursor_col = 0
+        self._goal_col = None
+        self._scale = 1
+        self._modified = document.modified
+        self.highlighter = None
+
+        font = QFont("JetBrains Mono", 11)
+        font.setStyleHint(QFont.TypeWriter)
+        self.setFont(font)
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.viewport().setCursor(Qt.IBeamCursor)
+        self.verticalScrollBar().valueChanged.connect(self.viewport().update)
+        self.horizontalScrollBar().valueChanged.connect(self.viewport().update)
+
+        self._index_timer = QTimer(self)
+        self._index_timer.setInterval(self.INDEX_POLL_MS)
+        self._index_timer.timeout.connect(self._on_index_progress)
+        if not document.is_exact():
+            self._index_timer.start()
+
+    def set_highlighter(self, highlighter):
+        """Color the text with a SyntaxHighlighter's spans."""
+        self.highlighter = highlighter
+        highlighter.signals.styled.connect(self._on_styled)
+        self.viewport().update()
+
+    def _on_styled(self, first, last):
+        top = self.top_line()
+        if first < top + self._visible_rows() + 1 and last >= top:
+            self.viewport().update()
+
+    # --- Geometry -------------------------------------------------------
+
+    def _line_height(self):
+        return self.fontMetrics().height()
+
+    def _char_width(self):
+        return max(1, self.fontMetrics().horizontalAdvance("M"))
+
+    def _visible_rows(self):
+        return max(1, (self.viewport().height() - self.PADDING) // self._line_height())
+
+    def _gutter_width(self):
+        digits = len(str(self.document.line_count()))
+        return self.PADDING + max(3, digits) * self._char_width() + self.GUTTER_GAP
+
+    def top_line(self):
+        return self.verticalScrollBar().value() * self._scale
+
+    def _set_top_line(self, line):
+        self.verticalScrollBar().setValue(line // self._scale)
+
+    def _update_scrollbars(self):
+        rows = self._visible_rows()
+        lines = self.document.line_count()
+        self._scale = max(1, math.ceil(lines / SCROLL_LIMIT))
+        bar = self.verticalScrollBar()
+        bar.setRange(0, max(0, lines - rows) // self._scale)
+        bar.setPageStep(max(1, rows // self._scale))
+        width = max((len(line.expandtabs(TAB_WIDTH)) for line in
+                     self.document.lines(self.top_line(), rows)), default=0)
+        hbar = self.horizontalScrollBar()
+        text_width = self.viewport().width() - self._gutter_width() - self.PADDING
+        hbar.setRange(0, max(0, width * self._char_width() - text_width))
+        hbar.setPageStep(max(1, text_width))
+
+    def _on_index_progress(self):
+        if self.document.is_exact():
+            self._index_timer.stop()
+        self._update_scrollbars()
+        self.viewport().update()
+
+    # --- Cursor ---------------------------------------------------------
+
+    def _line_text(self, line):
+        return self.document.line(line)
+
+    def set_cursor(self, line, col, keep_goal=False):
+        line = max(0, min(line, self.document.line_count() - 1))
+        col = max(0, min(col, len(self._line_text(line))))
+        self.cursor_line, self.cursor_col = line, col
+        if not keep_goal:
+            self._goal_col = None
+        self.ensure_cursor_visible()
+        self.viewport().update()
+        self.cursor_moved.emit(line, col)
+
+    def go_to_line(self, line):
+        """Put the cursor on `line` (0-based) and center it."""
+        line = max(0, min(line, self.document.line_count() - 1))
+        self._set_top_line(max(0, line - self._visible_rows() // 2))
+        self.set_cursor(line, 0)
+
+    def ensure_cursor_visible(self):
+        rows = self._visible_rows()
+        top = self.top_line()
+        if self.cursor_line < top:
+            self._set_top_line(self.cursor_line)
+        elif self.cursor_line >= top + rows:
+            self._set_top_line(self.cursor_line - rows + 1)
+        x = self._cursor_x() - self._gutter_width()
+        hbar = self.horizontalScrollBar()
+        text_width = self.viewport().width() - self._gutter_width() - self.PADDING
+        if x < hbar.value():
+            hbar.setValue(x)
+        elif x > hbar.value() + text_width:
+            hbar.setRange(0, max(hbar.maximum(), x - text_width + self._char_width()))
+            hbar.setValue(x - text_width + self._char_width())
+
+    def _cursor_x(self):
+        prefix = self._line_text(self.cursor_line)[:self.cursor_col]
+        return self._gutter_width() + len(prefix.expandtabs(TAB_WIDTH)) * self._char_width()
+
+    def _column_at(self, line, x):
+        """Character column for a viewport x position on `line`."""
+        target = (x - self._gutter_width() + self.horizontalScrollBar().value()
+                  + self._char_width() // 2) // self._char_width()
+        column = 0
+        for i, ch in enumerate(self._line_text(line)):
+            column = column + TAB_WIDTH - column % TAB_WIDTH if ch == "\t" else column + 1
+            if column > target:
+                return i
+        return len(self._line_text(line))
+
+    # --- Editing --------------------------------------------------------
+
+    def _offset(self):
+        return self.document.offset_at(self.cursor_line, self.cursor_col)
+
+    def insert_text(self, text):
+        if not text:
+            return
+        self.document.insert(self._offset(), text)
+        parts = text.split("\n")
+        if len(parts) == 1:
+            line, col = self.cursor_line, self.cursor_col + len(text)
+        else:
+            line, col = self.cursor_line + len(parts) - 1, len(parts[-1])
+        self._after_edit()
+        self.set_cursor(line, col)
+
+    def backspace(self):
+        if self.cursor_col > 0:
+            line, col = self.cursor_line, self.cursor_col - 1
+        elif self.cursor_line > 0:
+            line = self.cursor_line - 1
+            col = len(self._line_text(line))
+        else:
+            return
+        start = self.document.offset_at(line, col)
+        self.document.delete(start, self._offset() - start)
+        self._after_edit()
+        self.set_cursor(line, col)
+
+    def delete_forward(self):
+        start = self._offset()
+        if self.cursor_col < len(self._line_text(self.cursor_line)):
+            end = self.document.offset_at(self.cursor_line, self.cursor_col + 1)
+        elif self.cursor_line + 1 < self.document.line_count():
+            end = self.document.line_offset(self.cursor_line + 1)
+        else:
+            return
+        self.document.delete(start, end - start)
+        self._after_edit()
+        self.set_cursor(self.cursor_line, self.cursor_col)
+
+    def save(self):
+        self.document.save()
+        self._after_edit()
+
+    def _after_edit(self):
+        self._update_scrollbars()
+        if self.document.modified != self._modified:
+            self._modified = self.document.modified
+            self.modified_changed.emit(self._modified)
+
+    # --- Rendering ------------------------------------------------------
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        painter.fillRect(self.viewport().rect(), theme.color("bg"))
+        metrics = self.fontMetrics()
+        line_height = metrics.height()
+        ascent = metrics.ascent()
+        char_width = self._char_width()
+        gutter = self._gutter_width()
+        scroll_x = self.horizontalScrollBar().value()
+        first = self.top_line()
+        rows = self.viewport().height() // line_height + 1
+        max_chars = (self.viewport().width() + scroll_x) // char_width + 1
+
+        painter.fillRect(0, 0, gutter - self.GUTTER_GAP // 2, self.viewport().height(),
+                         theme.color("surface"))
+        painter.setClipRect(gutter, 0, self.viewport().width() - gutter,
+                            self.viewport().height())
+        y = self.PADDING // 2
+        x = gutter - scroll_x
+        highlighter = self.highlighter
+        if highlighter is not None:
+            highlighter.set_viewport(first, rows)
+        colors = {None: theme.color("text")}
+        for line, text in enumerate(self.document.lines(first, rows), first):
+            text = text[:max_chars]
+            spans = highlighter.spans(line) if highlighter is not None else ()
+            if not spans:
+                painter.setPen(colors[None])
+                painter.drawText(x, y + ascent, text.expandtabs(TAB_WIDTH))
+            else:
+                self._draw_styled(painter, x, y + ascent, text, spans, colors)
+            y += line_height
+
+        # Caret
+        if self.hasFocus() and first <= self.cursor_line < first + rows:
+            x = self._cursor_x() - scroll_x
+            y = self.PADDING // 2 + (self.cursor_line - first) * line_height
+            painter.fillRect(x, y, 2, line_height, theme.color("accent"))
+
+        # Line numbers
+        painter.setClipping(False)
+        painter.setPen(theme.color("text_dim"))
+        y = self.PADDING // 2
+        number_right = gutter - self.GUTTER_GAP
+        for line in range(first, min(first + rows, self.document.line_count())):
+            if line == self.cursor_line:
+                painter.setPen(theme.color("text_muted"))
+            label = str(line + 1)
+            painter.drawText(number_right - len(label) * char_width, y + ascent, label)
+            if line == self.cursor_line:
+                painter.setPen(theme.color("text_dim"))
+            y += line_height
+        painter.end()
+
+    def _draw_styled(self, painter, x, baseline, text, spans, colors):
+        """Draw `text` one run per span, in the span's syntax color."""
+        expanded = text.expandtabs(TAB_WIDTH)
+        if len(expanded) == len(text):
+            columns = None
+        else:
+            # Display column of every character, for lines with tabs
+            columns, column = [], 0
+            for ch in text:
+                columns.append(column)
+                column = column + TAB_WIDTH - column % TAB_WIDTH if ch == "\t" else column + 1
+            columns.append(column)
+        char_width = self._char_width()
+
+        def draw(start, end, kind):
+            if kind not in colors:
+                colors[kind] = theme.color("syntax_" + kind)
+            if columns is not None:
+                start, end = columns[start], columns[end]
+            painter.setPen(colors[kind])
+            painter.drawText(x + start * char_width, baseline, expanded[start:end])
+
+        pos, length = 0, len(text)
+        for start, end, kind in spans:
+            if start >= length:
+                break
+            if start > pos:
+                draw(pos, start, None)
+            pos = min(end, length)
+            draw(start, pos, kind)
+        if pos < length:
+            draw(pos, length, None)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self._update_scrollbars()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self._update_scrollbars()
+
+    def focusInEvent(self, event):
+        super().focusInEvent(event)
+        self.viewport().update()
+
+    def focusOutEvent(self, event):
+        super().focusOutEvent(event)
+        self.viewport().update()
+
+    # --- Input ----------------------------------------------------------
+
+    def mousePressEvent(self, event):
+        if event.button() != Qt.LeftButton:
+            return super().mousePressEvent(event)
+        pos = event.position().toPoint()
+        row = max(0, (pos.y() - self.PADDING // 2) // self._line_height())
+        line = min(self.top_line() + row, self.document.line_count() - 1)
+        self.set_cursor(line, self._column_at(line, pos.x()))
+
+    def keyPressEvent(self, event):
+        key = event.key()
+        ctrl = bool(event.modifiers() & Qt.ControlModifier)
+        line, col = self.cursor_line, self.cursor_col
+        rows = self._visible_rows()
+        if key in (Qt.Key_Up, Qt.Key_Down, Qt.Key_PageUp, Qt.Key_PageDown):
+            step = {Qt.Key_Up: -1, Qt.Key_Down: 1,
+                    Qt.Key_PageUp: -rows, Qt.Key_PageDown: rows}[key]
+            if self._goal_col is None:
+                self._goal_col = col
+            if key in (Qt.Key_PageUp, Qt.Key_PageDown):
+                self._set_top_line(max(0, self.top_line() + step))
+            self.set_cursor(line + step, self._goal_col, keep_goal=True)
+        elif key == Qt.Key_Left:
+            if col > 0:
+                self.set_cursor(line, col - 1)
+            elif line > 0:
+                self.set_cursor(line - 1, len(self._line_text(line - 1)))
+        elif key == Qt.Key_Right:
+            if col < len(self._line_text(line)):
+                self.set_cursor(line, col + 1)
+            elif line + 1 < self.document.line_count():
+                self.set_cursor(line + 1, 0)
+        elif key == Qt.Key_Home:
+            self.set_cursor(0 if ctrl else line, 0)
+        elif key == Qt.Key_End:
+            if ctrl:
+                last = self.document.line_count() - 1
+                self.set_cursor(last, len(self._line_text(last)))
+            else:
+                self.set_cursor(line, len(self._line_text(line)))
+        elif key in (Qt.Key_Return, Qt.Key_Enter):
+            self.insert_text("\n")
+        elif key == Qt.Key_Backspace:
+            self.backspace()
+        elif key == Qt.Key_Delete:
+            self.delete_forward()
+        elif key == Qt.Key_Tab:
+            self.insert_text(" " * (TAB_WIDTH - col % TAB_WIDTH))
+        elif ctrl and key == Qt.Key_S:
+            self.save()
+        elif ctrl and key == Qt.Key_V:
+            self.insert_text(QApplication.clipboard().text().replace("\r\n", "\n"))
+        elif event.text() and event.text().isprintable() and not ctrl:
+            self.insert_text(event.text())
+        else:
+            super().keyPressEvent(event)
+
+    def focusNextPrevChild(self, next):
+        # Keep Tab for indentation
+        return False
@@ -0,0 +1,263 @@
+"""
+LogicCore v2 - Syntax Highlighter
+Incremental Python highlighting on a worker thread with per-line lexer state.
+"""
+import builtins
+import keyword
+import re
+import threading
+
+from PySide6.QtCore import QObject, Signal
+
+
+# Token kinds, also the suffix of their theme token ("syntax_<kind>")
+KEYWORD = "keyword"
+BUILTIN = "builtin"
+STRING = "string"
+COMMENT = "comment"
+NUMBER = "number"
+DECORATOR = "decorator"
+DEFINITION = "def"
+
+# Lexer state at a line boundary: inside no string, a ''' or a """ string
+NORMAL, TRIPLE_SINGLE, TRIPLE_DOUBLE = 0, 1, 2
+_TRIPLE = {TRIPLE_SINGLE: "'''", TRIPLE_DOUBLE: '"""'}
+
+# Lines lexed per batch once the viewport is done
+BATCH_LINES = 2000
+# Files above this size open without highlighting
+MAX_HIGHLIGHT_BYTES = 32 << 20
+
+_KEYWORDS = set(keyword.kwlist) | set(keyword.softkwlist) - {"_", "type"}
+_BUILTINS = {name for name in dir(builtins) if not name.startswith("_")}
+
+_TOKEN = re.compile(r"""
+    (?P<comment>\#.*)
+  | (?P<string>(?:[rRbBuUfF]{1,2})?(?:'''|\"\"\"|'(?:[^'\\\n]|\\.)*'?|"(?:[^"\\\n]|\\.)*"?))
+  | (?P<decorator>^\s*@[\w.]+)
+  | (?P<number>\b(?:0[xXoObB][0-9a-fA-F_]+|\d[\d_]*\.?[\d_]*(?:[eE][+-]?\d+)?j?|\.\d[\d_]*)\b)
+  | (?P<name>[A-Za-z_]\w*)
+""", re.VERBOSE)
+
+
+def _close_triple(text, start, quote):
+    """End of a triple-quoted string opened before `start`, or -1."""
+    pos = start
+    while True:
+        pos = text.find(quote, pos)
+        if pos == -1:
+            return -1
+        backslashes = 0
+        while pos - backslashes > start and text[pos - backslashes - 1] == "\\":
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return pos + 3
+        pos += 1
+
+
+def lex_line(text, state=NORMAL):
+    """
+    Styled spans of one line of Python: ([(start, end, kind)], end_state).
+
+    `state` is the lexer state at the start of the line; only
+    triple-quoted strings carry over from one line to the next.
+    """
+    spans = []
+    pos = 0
+    if state != NORMAL:
+        end = _close_triple(text, 0, _TRIPLE[state])
+        if end == -1:
+            return [(0, len(text), STRING)] if text else [], state
+        spans.append((0, end, STRING))
+        pos = end
+    after_def = False
+    while True:
+        match = _TOKEN.search(text, pos)
+        if match is None:
+            break
+        kind = match.lastgroup
+        start, end = match.span()
+        pos = end
+        if kind == "string":
+            body = match.group().lstrip("rRbBuUfF")
+            if body in ("'''", '"""'):
+                close = _close_triple(text, end, body)
+                if close == -1:
+                    spans.append((start, len(text), STRING))
+                    return spans, TRIPLE_SINGLE if body == "'''" else TRIPLE_DOUBLE
+                end = pos = close
+            spans.append((start, end, STRING))
+        elif kind == "name":
+            word = match.group()
+            if after_def:
+                spans.append((start, end, DEFINITION))
+            elif word in _KEYWORDS:
+                spans.append((start, end, KEYWORD))
+            elif word in _BUILTINS:
+                spans.append((start, end, BUILTIN))
+            after_def = word in ("def", "class")
+            continue
+        elif kind == "decorator":
+            spans.append((match.start() + len(match.group()) - len(match.group().lstrip()),
+                          end, DECORATOR))
+        else:
+            spans.append((start, end, kind))
+        after_def = False
+    return spans, NORMAL
+
+
+def scan_state(text, state=NORMAL):
+    """End state of a line, without building spans when it cannot change."""
+    if state == NORMAL:
+        if "'''" not in text and '"""' not in text:
+            return NORMAL
+    elif _TRIPLE[state] not in text:
+        return state
+    return lex_line(text, state)[1]
+
+
+class HighlighterSignals(QObject):
+    # first, last (inclusive) line of a batch of newly styled lines
+    styled = Signal(int, int)
+
+
+class SyntaxHighlighter:
+    """
+    Keeps a Document's lines lexed on a worker thread.
+
+    The lexer state at the end of every line is cached, so after an edit
+    only the changed lines are re-lexed, continuing down the file until a
+    line ends in the state the next line was already lexed from. The
+    lines in view are always lexed first, and results are published in
+    batches through `signals.styled`.
+    """
+
+    def __init__(self, document, batch_lines=BATCH_LINES):
+        self.document = document
+        self.batch_lines = batch_lines
+        self.signals = HighlighterSignals()
+        self._lock = threading.Lock()
+        self._wake = threading.Condition(self._lock)
+        self._stopping = False
+        self._edits = 0
+        self._viewport = (0, 0)
+        text = document.read(0, document.size).decode("utf-8", "replace")
+        self._text = [line.rstrip("\r") for line in text.split("\n")]
+        count = len(self._text)
+        self._spans = [[] for _ in range(count)]
+        self._pending = bytearray(b"\x01") * count    # 1: needs lexing
+        self._starts = [NORMAL] * count   # state each line was lexed from
+        self._ends = [NORMAL] * count
+        self._dirty = 0                   # no line above this needs lexing
+        document.subscribe(self._on_change)
+        self._thread = threading.Thread(target=self._run, name="highlighter", daemon=True)
+        self._thread.start()
+
+    @classmethod
+    def supports(cls, document):
+        path = document.path or ""
+        return path.endswith((".py", ".pyw")) and document.size <= MAX_HIGHLIGHT_BYTES
+
+    def shutdown(self):
+        self.document.unsubscribe(self._on_change)
+        with self._wake:
+            self._stopping = True
+            self._wake.notify()
+        self._thread.join(1.0)
+
+    # --- UI thread ------------------------------------------------------
+
+    def spans(self, line):
+        """
+        Styled spans of `line`. A line waiting to be re-lexed keeps its
+        previous spans until then, so typing does not flash it unstyled.
+        """
+        with self._lock:
+            if 0 <= line < len(self._spans):
+                return self._spans[line]
+            return []
+
+    def set_viewport(self, first, count):
+        """Lines on screen; they are lexed before anything else."""
+        with self._wake:
+            if self._viewport != (first, count):
+                self._viewport = (first, count)
+                self._wake.notify()
+
+    def _on_change(self, first, old, new):
+        text = self.document.lines(first, new)
+        with self._wake:
+            self._edits += 1
+            self._text[first:first + old] = text
+            previous = self._spans[first] if first < len(self._spans) else []
+            self._spans[first:first + old] = [previous] + [[]] * (new - 1)
+            self._pending[first:first + old] = b"\x01" * new
+            self._starts[first:first + old] = [NORMAL] * new
+            self._ends[first:first + old] = [NORMAL] * new
+            self._dirty = min(self._dirty, first)
+            self._wake.notify()
+
+    # --- Worker ---------------------------------------------------------
+
+    def _next_dirty(self, start):
+        return self._pending.find(1, start)
+
+    def _run(self):
+        while True:
+            with self._wake:
+                while not self._stopping:
+                    line = self._next_dirty(self._dirty)
+                    if line != -1:
+                        break
+                    self._dirty = len(self._spans)
+                    self._wake.wait()
+                if self._stopping:
+                    return
+                self._dirty = line
+                edits = self._edits
+                state = self._ends[line - 1] if line else NORMAL
+                top, rows = self._viewport
+                bottom = min(top + rows, len(self._spans))
+                skipped = ()
+                visible = self._next_dirty(top)
+                if line + self.batch_lines < top and -1 < visible < bottom:
+                    # The view is far below: carry the state down to its
+                    # first pending line cheaply and lex from there before
+                    # the lines in between.
+                    skipped = self._text[line:visible]
+                    first, limit = visible, bottom - visible
+                elif line < bottom:
+                    first, limit = line, bottom - line
+                else:
+                    first, limit = line, self.batch_lines
+                window = self._text[first:first + limit]
+                following = [(not self._pending[i], self._starts[i])
+                             for i in range(first + 1, first + len(window) + 1)
+                             if i < len(self._spans)]
+            for text in skipped:
+                state = scan_state(text, state)
+            self._lex(edits, first, window, state, following)
+
+    def _lex(self, edits, first, window, state, following):
+        """Lex `window` from line `first`; dropped if an edit came in meanwhile."""
+        start = state
+        spans, ends = [], []
+        for i, text in enumerate(window):
+            line_spans, state = lex_line(text, state)
+            spans.append(line_spans)
+            ends.append(state)
+            if i < len(following) and following[i] == (True, state):
+                break   # the rest was already lexed from this state
+        with self._wake:
+            if self._edits != edits or self._stopping:
+                return
+            last = first + len(spans)
+            self._spans[first:last] = spans
+            self._pending[first:last] = bytes(last - first)
+            self._starts[first:last] = [start] + ends[:-1]
+            self._ends[first:last] = ends
+            if last < len(self._spans) and self._starts[last] != state:
+                self._pending[last] = 1
+            if first == self._dirty:
+                self._dirty = last
+        self.signals.styled.emit(first, last - 1)
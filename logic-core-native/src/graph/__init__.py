@@ -0,0 +1,3 @@
+"""
+LogicCore v2 - Graph Package
+"""
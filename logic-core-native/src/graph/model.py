@@ -0,0 +1,214 @@
+"""
+LogicCore v2 - Graph Model
+Column-wise storage of a pipeline graph, with a layered fallback layout.
+"""
+import json
+import math
+from array import array
+from collections import deque
+
+
+NODE_WIDTH = 160
+NODE_HEIGHT = 56
+# Spacing of the layered layout, between node origins
+LAYER_GAP = 240
+ROW_GAP = 88
+
+
+class PackedStrings:
+    """Read-only string column: UTF-8 bytes plus an offsets column."""
+
+    __slots__ = ("data", "offsets")
+
+    def __init__(self, data, offsets):
+        self.data = data            # bytes-like
+        self.offsets = offsets      # len(self) + 1 int64 offsets into data
+
+    @classmethod
+    def pack(cls, strings):
+        offsets = array("q", [0])
+        parts = []
+        total = 0
+        for s in strings:
+            encoded = s.encode("utf-8", "surrogateescape")
+            parts.append(encoded)
+            total += len(encoded)
+            offsets.append(total)
+        return cls(b"".join(parts), offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        return str(self.data[self.offsets[i]:self.offsets[i + 1]], "utf-8", "surrogateescape")
+
+    def __iter__(self):
+        return (self[i] for i in range(len(self)))
+
+
+class Graph:
+    """
+    Directed graph of positioned nodes, stored column-wise.
+
+    Node i has id `ids[i]`, position `x[i], y[i]` and size `w[i], h[i]`
+    (typed arrays), a kind from `kinds` via `kind_index[i]`, and an
+    optional label (empty means "same as the id") and parameters (a JSON
+    object, see `params`). Edge j goes from node
+    `sources[j]` to node `targets[j]`. A graph built in memory keeps
+    Python lists and arrays; one loaded from the binary cache has
+    read-only views of a mapped file instead. Nodes without a position
+    (NaN) are placed by `layout`.
+    """
+
+    def __init__(self):
+        self.ids = []
+        self.labels = []
+        self.kinds = [""]
+        self.kind_index = array("H")
+        self.x = array("d")
+        self.y = array("d")
+        self.w = array("d")
+        self.h = array("d")
+        self.sources = array("i")
+        self.targets = array("i")
+        self._params = {}           # node index -> params, only where set
+        self._params_json = None    # the same, still encoded (cache loads)
+        self._index = {}
+        self._kind_ids = {"": 0}
+
+    def __len__(self):
+        return len(self.x)
+
+    def edge_count(self):
+        return len(self.sources)
+
+    def add_node(self, id, label=None, kind="", x=None, y=None,
+                 w=NODE_WIDTH, h=NODE_HEIGHT, params=None):
+        id = str(id)
+        if id in self._index:
+            raise ValueError(f"duplicate node id: {id!r}")
+        i = len(self.x)
+        self._index[id] = i
+        self.ids.append(id)
+        self.labels.append("" if label is None or label == id else str(label))
+        k = self._kind_ids.get(kind)
+        if k is None:
+            k = self._kind_ids[kind] = len(self.kinds)
+            self.kinds.append(kind)
+        self.kind_index.append(k)
+        self.x.append(math.nan if x is None else x)
+        self.y.append(math.nan if y is None else y)
+        self.w.append(w)
+        self.h.append(h)
+        if params:
+            self._params[i] = params
+        return i
+
+    def add_edge(self, source, target):
+        """Connect two node ids."""
+        self.sources.append(self._index[str(source)])
+        self.targets.append(self._index[str(target)])
+
+    def freeze(self):
+        """Pack the string columns once no more nodes will be added."""
+        if isinstance(self.ids, list):
+            self.ids = PackedStrings.pack(self.ids)
+            self.labels = PackedStrings.pack(self.labels)
+            self._index = {}
+
+    def index_of(self, id):
+        if len(self._index) != len(self.ids):
+            self._index = {node_id: i for i, node_id in enumerate(self.ids)}
+        return self._index[str(id)]
+
+    def label(self, i):
+        return self.labels[i] or self.ids[i]
+
+    def kind(self, i):
+        return self.kinds[self.kind_index[i]]
+
+    def params(self, i):
+        """Parameters of node i ({} if it has none); do not modify."""
+        if self._params_json is not None:
+            self._params = {int(k): v for k, v in json.loads(self._params_json).items()}
+            self._params_json = None
+        return self._params.get(i, {})
+
+    def params_json(self):
+        """Every node's parameters as encoded JSON ({"index": params})."""
+        if self._params_json is not None:
+            return self._params_json
+        return json.dumps(self._params, separators=(",", ":")).encode("utf-8")
+
+    def rect(self, i):
+        return (self.x[i], self.y[i], self.x[i] + self.w[i], self.y[i] + self.h[i])
+
+    def bounds(self):
+        """(x0, y0, x1, y1) around every node."""
+        if not len(self):
+            return (0.0, 0.0, 0.0, 0.0)
+        return (min(self.x), min(self.y),
+                max(map(float.__add__, self.x, self.w)), max(map(float.__add__, self.y, self.h)))
+
+    def layout(self):
+        """
+        Place unpositioned nodes left to right by longest path from a
+        source, each source just before the nearest node it feeds;
+        nodes on cycles go in the first layer.
+        """
+        pending = [i for i in range(len(self)) if math.isnan(self.x[i]) or math.isnan(self.y[i])]
+        if not pending:
+            return
+        incoming = [0] * len(self)
+        outgoing = [[] for _ in range(len(self))]
+        for source, target in zip(self.sources, self.targets):
+            outgoing[source].append(target)
+            incoming[target] += 1
+        layer = [0] * len(self)
+        sources = [i for i, count in enumerate(incoming) if count == 0]
+        queue = deque(sources)
+        while queue:
+            i = queue.popleft()
+            for j in outgoing[i]:
+                layer[j] = max(layer[j], layer[i] + 1)
+                incoming[j] -= 1
+                if incoming[j] == 0:
+                    queue.append(j)
+        for i in sources:
+            # Pull sources next to what they feed instead of the first layer
+            if outgoing[i]:
+                layer[i] = min(layer[j] for j in outgoing[i]) - 1
+        rows = {}
+        for i in pending:
+            row = rows.get(layer[i], 0)
+            rows[layer[i]] = row + 1
+            self.x[i] = float(layer[i] * LAYER_GAP)
+            self.y[i] = float(row * ROW_GAP)
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Graph from {"nodes": [{"id", "label", "kind", "x", "y", "params"}, ...],
+        "edges": [{"source", "target"} or [source, target], ...]}.
+        """
+        graph = cls()
+        for item in data.get("nodes", ()):
+            graph.add_node_item(item)
+        for item in data.get("edges", ()):
+            graph.add_edge_item(item)
+        graph.layout()
+        return graph
+
+    def add_node_item(self, item):
+        """Add a node from its JSON object."""
+        return self.add_node(item["id"], item.get("label"), item.get("kind", ""),
+                             item.get("x"), item.get("y"),
+                             item.get("w", NODE_WIDTH), item.get("h", NODE_HEIGHT),
+                             item.get("params"))
+
+    def add_edge_item(self, item):
+        """Add an edge from its JSON form: an object or a pair."""
+        if isinstance(item, dict):
+            self.add_edge(item["source"], item["target"])
+        else:
+            self.add_edge(item[0], item[1])
@@ -0,0 +1,137 @@
+"""
+LogicCore v2 - Spatial Index
+Quadtree over axis-aligned rectangles for viewport queries.
+"""
+
+
+class QuadTree:
+    """
+    Region quadtree of (x0, y0, x1, y1) rectangles keyed by an id.
+
+    A leaf splits into four once it holds more than `capacity` items;
+    items that straddle a split line stay in the node above, so large
+    rectangles (long edges) never get duplicated. `query` returns the
+    ids of every item that intersects a rectangle.
+    """
+
+    __slots__ = ("bounds", "capacity", "depth", "items", "children")
+
+    MAX_DEPTH = 16
+
+    def __init__(self, bounds, capacity=32, depth=0):
+        self.bounds = bounds
+        self.capacity = capacity
+        self.depth = depth
+        self.items = []         # (x0, y0, x1, y1, id)
+        self.children = None
+
+    @classmethod
+    def build(cls, rects, capacity=32):
+        """Tree over `rects`, a sequence of (x0, y0, x1, y1, id)."""
+        if not rects:
+            return cls((0.0, 0.0, 1.0, 1.0), capacity)
+        x0 = min(r[0] for r in rects)
+        y0 = min(r[1] for r in rects)
+        x1 = max(r[2] for r in rects)
+        y1 = max(r[3] for r in rects)
+        # Square bounds keep the cells square at every depth
+        side = max(x1 - x0, y1 - y0, 1.0)
+        tree = cls((x0, y0, x0 + side, y0 + side), capacity)
+        for rect in rects:
+            tree.insert(rect)
+        return tree
+
+    def insert(self, rect):
+        node = self
+        while True:
+            if node.children is None:
+                node.items.append(rect)
+                if len(node.items) > node.capacity and node.depth < self.MAX_DEPTH:
+                    node._split()
+                return
+            child = node._child_for(rect)
+            if child is None:
+                node.items.append(rect)
+                return
+            node = child
+
+    def _child_for(self, rect):
+        """The child that fully contains `rect`, or None."""
+        x0, y0, x1, y1 = self.bounds
+        if rect[0] < x0 or rect[1] < y0 or rect[2] > x1 or rect[3] > y1:
+            return None     # outside the tree: kept at the root
+        mx, my = (x0 + x1) / 2, (y0 + y1) / 2
+        if rect[2] <= mx:
+            column = 0
+        elif rect[0] >= mx:
+            column = 1
+        else:
+            return None
+        if rect[3] <= my:
+            row = 0
+        elif rect[1] >= my:
+            row = 2
+        else:
+            return None
+        return self.children[row + column]
+
+    def _split(self):
+        x0, y0, x1, y1 = self.bounds
+        mx, my = (x0 + x1) / 2, (y0 + y1) / 2
+        depth = self.depth + 1
+        self.children = [
+            QuadTree((x0, y0, mx, my), self.capacity, depth),
+            QuadTree((mx, y0, x1, my), self.capacity, depth),
+            QuadTree((x0, my, mx, y1), self.capacity, depth),
+            QuadTree((mx, my, x1, y1), self.capacity, depth),
+        ]
+        items, self.items = self.items, []
+        for rect in items:
+            child = self._child_for(rect)
+            (self.items if child is None else child.items).append(rect)
+        for child in self.children:
+            if len(child.items) > child.capacity and child.depth < self.MAX_DEPTH:
+                child._split()
+
+    def remove(self, rect):
+        """Remove an item inserted as `rect`; False if it is not there."""
+        node = self
+        while node is not None:
+            if rect in node.items:
+                node.items.remove(rect)
+                return True
+            if node.children is None:
+                return False
+            node = node._child_for(rect)
+        return False
+
+    def query(self, x0, y0, x1, y1):
+        """Ids of the items intersecting the rectangle."""
+        found = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            for item in node.items:
+                if item[0] <= x1 and item[2] >= x0 and item[1] <= y1 and item[3] >= y0:
+                    found.append(item[4])
+            if node.children is not None:
+                for child in node.children:
+                    b = child.bounds
+                    if b[0] <= x1 and b[2] >= x0 and b[1] <= y1 and b[3] >= y0:
+                        if (child.children is None and b[0] >= x0 and b[2] <= x1
+                                and b[1] >= y0 and b[3] <= y1):
+                            # Leaf fully inside: take everything
+                            found.extend(item[4] for item in child.items)
+                        else:
+                            stack.append(child)
+        return found
+
+    def __len__(self):
+        count = 0
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            count += len(node.items)
+            if node.children is not None:
+                stack.extend(node.children)
+        return count
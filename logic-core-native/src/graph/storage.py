@@ -0,0 +1,327 @@
+"""
+LogicCore v2 - Graph Storage
+Streaming graph.json reader and a memory-mappable binary cache.
+"""
+import codecs
+import hashlib
+import json
+import json.scanner
+import logging
+import mmap
+import os
+import re
+import struct
+import sys
+
+from ..services.paths import cache_dir
+from .model import Graph, PackedStrings
+
+
+log = logging.getLogger(__name__)
+
+CACHE_MAGIC = b"LCGR"
+CACHE_VERSION = 2
+READ_CHUNK = 1 << 20
+
+# magic, version, section count, source mtime_ns, source size,
+# source digest, node count, edge count
+_HEADER = struct.Struct("<4sHHqq16sqq")
+_SECTION = struct.Struct("<qq")     # offset, length in bytes
+# Cached columns, in file order: (attribute, typecode)
+SECTIONS = (
+    ("x", "d"), ("y", "d"), ("w", "d"), ("h", "d"),
+    ("sources", "i"), ("targets", "i"), ("kind_index", "H"),
+    ("ids.offsets", "q"), ("ids.data", "B"),
+    ("labels.offsets", "q"), ("labels.data", "B"),
+    ("kinds", "B"), ("params", "B"),
+)
+
+_WS = re.compile(r"[ \t\n\r]*")
+_SEPARATOR = re.compile(r"[ \t\n\r]*([,\]])[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+_SCAN = json.scanner.make_scanner(_DECODER)
+
+
+def is_graph_file(path):
+    """graph.json, *.graph.json and *.pipeline files (all graph JSON)."""
+    name = os.path.basename(path)
+    return name == "graph.json" or name.endswith((".graph.json", ".pipeline"))
+
+
+def _digest():
+    return hashlib.blake2b(digest_size=16)
+
+
+def file_digest(path):
+    digest = _digest()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+# --- Streaming JSON -----------------------------------------------------------
+
+class JsonStream:
+    """
+    Pulls JSON values out of a binary file a chunk at a time.
+
+    Only the structure of the enclosing object and arrays is walked by
+    hand; each element is decoded on its own with the C decoder, so a
+    large "nodes" array never exists as one list of dicts. Every byte
+    read also goes into `digest`.
+    """
+
+    def __init__(self, f, digest=None, chunk=READ_CHUNK):
+        self.f = f
+        self.digest = digest
+        self.chunk = chunk
+        self.decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        data = self.f.read(self.chunk)
+        if self.digest is not None and data:
+            self.digest.update(data)
+        self.eof = not data
+        self.buf = self.buf[self.pos:] + self.decoder.decode(data, final=self.eof)
+        self.pos = 0
+        return not self.eof
+
+    def peek(self):
+        """Next non-blank character ("" at the end)."""
+        while True:
+            self.pos = _WS.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf) or not self._fill():
+                return self.buf[self.pos:self.pos + 1]
+
+    def take(self, expected):
+        found = self.peek()
+        if found not in expected or not found:
+            raise ValueError(f"expected {expected!r}, found {found!r}")
+        self.pos += 1
+        return found
+
+    def value(self):
+        """Decode the next complete value."""
+        self.peek()
+        while True:
+            try:
+                value, end = _DECODER.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise ValueError(str(e)) from None
+                self._fill()
+                continue
+            # A number at the end of the buffer may go on in the next chunk
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def items(self):
+        """Iterate the elements of the array that comes next."""
+        self.take("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        scan = _SCAN
+        separator = _SEPARATOR.match
+        while True:
+            # Fast path: decode straight from the buffer while the element
+            # and its separator are both inside it.
+            buf, pos = self.buf, self.pos
+            try:
+                value, end = scan(buf, pos)
+            except (StopIteration, json.JSONDecodeError):
+                value = end = None     # cut off by the buffer end, or invalid
+            match = separator(buf, end) if end is not None else None
+            if match is None:
+                value = self.value()
+                yield value
+                if self.take(",]") == "]":
+                    return
+                self.peek()
+                continue
+            self.pos = match.end()
+            yield value
+            if match.group(1) == "]":
+                return
+
+    def finish(self):
+        """Read (and hash) whatever is left of the file."""
+        while self._fill():
+            pass
+
+
+def read_graph(f, digest=None):
+    """
+    Parse a graph.json stream into a Graph (see Graph.from_dict for the
+    format) without holding the whole document in memory.
+    """
+    stream = JsonStream(f, digest)
+    graph = Graph()
+    pending = []    # edges seen before the nodes they name
+    stream.take("{")
+    if stream.peek() == "}":
+        stream.pos += 1
+    else:
+        while True:
+            key = stream.value()
+            stream.take(":")
+            if key == "nodes":
+                for item in stream.items():
+                    graph.add_node_item(item)
+            elif key == "edges":
+                for item in stream.items():
+                    try:
+                        graph.add_edge_item(item)
+                    except KeyError:
+                        pending.append(item)
+            else:
+                stream.value()
+            if stream.take(",}") == "}":
+                break
+    stream.finish()
+    for item in pending:
+        graph.add_edge_item(item)
+    graph.layout()
+    graph.freeze()
+    return graph
+
+
+# --- Binary cache -------------------------------------------------------------
+
+def cache_path(path):
+    key = hashlib.sha1(os.path.abspath(path).encode("utf-8", "surrogateescape")).hexdigest()
+    return os.path.join(cache_dir("graphs"), key[:16] + ".lcg")
+
+
+def _columns(graph):
+    graph.freeze()
+    return {
+        "x": graph.x, "y": graph.y, "w": graph.w, "h": graph.h,
+        "sources": graph.sources, "targets": graph.targets,
+        "kind_index": graph.kind_index,
+        "ids.offsets": graph.ids.offsets, "ids.data": graph.ids.data,
+        "labels.offsets": graph.labels.offsets, "labels.data": graph.labels.data,
+        "kinds": json.dumps(graph.kinds).encode("utf-8"),
+        "params": graph.params_json(),
+    }
+
+
+def save_cache(graph, path, mtime_ns, size, digest):
+    """Write `graph` to the cache file `path` atomically."""
+    columns = _columns(graph)
+    offset = _HEADER.size + _SECTION.size * len(SECTIONS)
+    table, body = [], []
+    for name, _ in SECTIONS:
+        data = memoryview(columns[name]).cast("B")
+        pad = -offset % 8
+        body += [b"\0" * pad, data]
+        offset += pad
+        table.append(_SECTION.pack(offset, len(data)))
+        offset += len(data)
+    header = _HEADER.pack(CACHE_MAGIC, CACHE_VERSION, len(SECTIONS), mtime_ns, size,
+                          digest, len(graph), graph.edge_count())
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(header)
+        f.write(b"".join(table))
+        for part in body:
+            f.write(part)
+    os.replace(tmp, path)
+
+
+def _read_header(view):
+    if len(view) < _HEADER.size:
+        return None
+    header = _HEADER.unpack_from(view, 0)
+    if header[0] != CACHE_MAGIC or header[1] != CACHE_VERSION or header[2] != len(SECTIONS):
+        return None
+    return header
+
+
+def map_cache(path):
+    """
+    Open a cache file; returns (graph, mtime_ns, size, digest) or None.
+
+    The graph's columns are views of the mapped file, so nothing is
+    parsed or copied.
+    """
+    try:
+        with open(path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    view = memoryview(mapped)
+    header = _read_header(view)
+    if header is None:
+        view.release()
+        mapped.close()
+        return None
+    _, _, count, mtime_ns, size, digest, nodes, edges = header
+    columns = {}
+    for i, (name, typecode) in enumerate(SECTIONS):
+        offset, length = _SECTION.unpack_from(view, _HEADER.size + i * _SECTION.size)
+        if offset + length > len(view):
+            return None
+        columns[name] = view[offset:offset + length].cast(typecode)
+    graph = Graph()
+    for name in ("x", "y", "w", "h", "sources", "targets", "kind_index"):
+        setattr(graph, name, columns[name])
+    graph.ids = PackedStrings(columns["ids.data"], columns["ids.offsets"])
+    graph.labels = PackedStrings(columns["labels.data"], columns["labels.offsets"])
+    graph.kinds = json.loads(bytes(columns["kinds"]))
+    graph._kind_ids = {kind: i for i, kind in enumerate(graph.kinds)}
+    graph._params_json = bytes(columns["params"])   # decoded on first use
+    if len(graph) != nodes or graph.edge_count() != edges or len(graph.ids) != nodes:
+        return None
+    return graph, mtime_ns, size, digest
+
+
+def _touch_cache(path, mtime_ns):
+    """Record a new source mtime for a cache whose content still matches."""
+    with open(path, "r+b") as f:
+        f.seek(8)   # after magic, version and section count
+        f.write(struct.pack("<q", mtime_ns))
+
+
+def load_graph(path, use_cache=True):
+    """
+    Load a graph file; raises OSError or ValueError.
+
+    Once a file has been parsed, its columns are kept in a binary cache
+    keyed by the file's mtime and size, and later loads map that cache
+    instead of parsing. If only the mtime changed, the content digest
+    decides whether the cache is still good.
+    """
+    st = os.stat(path)
+    cached_at = cache_path(path) if use_cache and sys.byteorder == "little" else None
+    if cached_at is not None:
+        cached = map_cache(cached_at)
+        if cached is not None:
+            graph, mtime_ns, size, digest = cached
+            if size == st.st_size:
+                if mtime_ns == st.st_mtime_ns:
+                    return graph
+                if digest == file_digest(path):
+                    try:
+                        _touch_cache(cached_at, st.st_mtime_ns)
+                    except OSError:
+                        pass
+                    return graph
+    digest = _digest()
+    with open(path, "rb") as f:
+        try:
+            graph = read_graph(f, digest)
+        except (KeyError, TypeError, AttributeError) as e:
+            raise ValueError(f"not a graph file: {e}") from None
+    if cached_at is not None:
+        try:
+            save_cache(graph, cached_at, st.st_mtime_ns, st.st_size, digest.digest())
+        except OSError as e:
+            log.warning("could not write graph cache %s: %s", cached_at, e)
+    return graph
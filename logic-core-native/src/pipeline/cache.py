@@ -0,0 +1,220 @@
+"""
+LogicCore v2 - Result Cache
+Content-addressed node outputs in memory, spilling to disk when full.
+"""
+import logging
+import os
+import pickle
+import sys
+import threading
+from collections import OrderedDict
+from itertools import islice
+
+from ..services.paths import cache_dir
+
+
+log = logging.getLogger(__name__)
+
+MEMORY_BYTES = 256 << 20
+DISK_BYTES = 2 << 30
+# Outputs larger than this skip the memory tier
+MAX_ENTRY_BYTES = 64 << 20
+
+MISSING = object()
+# Items looked at when estimating the size of a container
+SIZE_SAMPLE = 64
+
+
+def estimate_size(value):
+    """
+    Approximate bytes held by `value`, from a sample of its items, so
+    that storing an output does not mean serializing it.
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        sample = list(islice(value.items(), SIZE_SAMPLE))
+        per_item = sum(estimate_size(k) + estimate_size(v) for k, v in sample)
+    elif isinstance(value, (list, tuple)):
+        sample = value[::max(1, len(value) // SIZE_SAMPLE)]
+        per_item = sum(estimate_size(item) for item in sample)
+    elif isinstance(value, (set, frozenset)):
+        sample = list(islice(value, SIZE_SAMPLE))
+        per_item = sum(estimate_size(item) for item in sample)
+    else:
+        return size
+    if sample:
+        size += len(value) * per_item // len(sample)
+    return size
+
+
+class ResultCache:
+    """
+    LRU cache of node outputs keyed by their content hash.
+
+    Entries are sized by `estimate_size`. When the memory tier is
+    over `memory_bytes`, the least recently used outputs are written to
+    `spill_dir` (one file per key) and dropped from memory; a later hit
+    on disk moves the output back into memory. Spilled files outlive the
+    process, so results are reused across sessions, and the oldest are
+    deleted once the folder holds more than `disk_bytes`. With no
+    `spill_dir`, evicted outputs are simply forgotten.
+    """
+
+    def __init__(self, memory_bytes=MEMORY_BYTES, spill_dir=None, disk_bytes=DISK_BYTES):
+        self.memory_bytes = memory_bytes
+        self.spill_dir = spill_dir
+        self.disk_bytes = disk_bytes
+        self._entries = OrderedDict()   # key -> (value, size, on disk)
+        self._size = 0
+        self._disk_size = None          # counted on first spill
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.spills = 0
+
+    @classmethod
+    def default(cls):
+        return cls(spill_dir=cache_dir("pipeline"))
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def size(self):
+        """Bytes held in memory."""
+        return self._size
+
+    def _path(self, key):
+        return os.path.join(self.spill_dir, key + ".pkl")
+
+    def __contains__(self, key):
+        with self._lock:
+            if key in self._entries:
+                return True
+        return self.spill_dir is not None and os.path.exists(self._path(key))
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+        if self.spill_dir is not None:
+            try:
+                with open(self._path(key), "rb") as f:
+                    blob = f.read()
+                value = pickle.loads(blob)
+            except FileNotFoundError:
+                pass
+            except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError) as e:
+                log.warning("dropping unreadable cached result %s: %s", key, e)
+                self._unlink(key)
+            else:
+                try:
+                    os.utime(self._path(key))   # recently used: trimmed last
+                except OSError:
+                    pass
+                with self._lock:
+                    self.disk_hits += 1
+                self._insert(key, value, estimate_size(value), spilled=True)
+                return value
+        with self._lock:
+            self.misses += 1
+        return default
+
+    def put(self, key, value):
+        """Store `value` under `key`; it is pickled only if it spills."""
+        size = estimate_size(value)
+        if size > MAX_ENTRY_BYTES:
+            self._spill(key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL))
+            return
+        self._insert(key, value, size, spilled=False)
+
+    def _insert(self, key, value, size, spilled):
+        evicted = []
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            self._entries[key] = (value, size, spilled)
+            self._size += size
+            while self._size > self.memory_bytes and len(self._entries) > 1:
+                old_key, (old_value, old_size, old_spilled) = self._entries.popitem(last=False)
+                self._size -= old_size
+                if not old_spilled:
+                    evicted.append((old_key, old_value))
+        for old_key, old_value in evicted:
+            self._spill(old_key, pickle.dumps(old_value, pickle.HIGHEST_PROTOCOL))
+
+    def _spill(self, key, blob):
+        if self.spill_dir is None:
+            return
+        path = self._path(key)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(blob)
+            os.replace(tmp, path)
+        except OSError as e:
+            log.warning("could not spill result %s: %s", key, e)
+            return
+        with self._lock:
+            self.spills += 1
+            if self._disk_size is None:
+                self._disk_size = self._scan_disk()[1]
+            else:
+                self._disk_size += len(blob)
+            over = self._disk_size > self.disk_bytes
+        if over:
+            self._trim_disk()
+
+    def _scan_disk(self):
+        files, total = [], 0
+        try:
+            with os.scandir(self.spill_dir) as it:
+                for entry in it:
+                    if entry.name.endswith(".pkl"):
+                        st = entry.stat()
+                        files.append((st.st_mtime_ns, st.st_size, entry.path))
+                        total += st.st_size
+        except OSError:
+            pass
+        return files, total
+
+    def _trim_disk(self):
+        """Delete the least recently used spill files down to 3/4 of the limit."""
+        files, total = self._scan_disk()
+        files.sort()
+        target = self.disk_bytes * 3 // 4
+        for _, size, path in files:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+            except OSError:
+                continue
+            total -= size
+        with self._lock:
+            self._disk_size = total
+
+    def _unlink(self, key):
+        try:
+            os.unlink(self._path(key))
+        except OSError:
+            pass
+
+    def clear(self):
+        """Forget every output, in memory and on disk."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+        if self.spill_dir is not None:
+            for _, _, path in self._scan_disk()[0]:
+                try:
+                    os.unlink(path)
+                except OSError:
+                    pass
+            with self._lock:
+                self._disk_size = 0
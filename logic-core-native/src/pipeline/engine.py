@@ -0,0 +1,294 @@
+"""
+LogicCore v2 - Pipeline Engine
+Runs a pipeline graph on thread and process pools, memoizing node outputs.
+"""
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+)
+
+from ..services.metrics import default_registry
+from . import operators
+from .cache import MISSING, ResultCache
+
+
+log = logging.getLogger(__name__)
+
+
+def node_keys(graph, order, inputs):
+    """
+    Content hash of every node in `order` (a topological order).
+
+    A node's key covers its kind, operator version and parameters, and
+    the keys of its inputs, so it changes exactly when the node or
+    anything upstream of it changes.
+    """
+    keys = {}
+    for i in order:
+        kind = graph.kind(i)
+        try:
+            version = operators.get(kind).version
+        except KeyError:
+            version = None
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(json.dumps([kind, version, graph.params(i)], sort_keys=True,
+                                 separators=(",", ":"), default=repr).encode("utf-8"))
+        for j in inputs[i]:
+            digest.update(keys[j].encode("ascii"))
+        keys[i] = digest.hexdigest()
+    return keys
+
+
+def topological_order(count, inputs, outputs):
+    """Kahn's algorithm; nodes on (or behind) a cycle are left out."""
+    waiting = [len(inputs[i]) for i in range(count)]
+    queue = deque(i for i in range(count) if not waiting[i])
+    order = []
+    while queue:
+        i = queue.popleft()
+        order.append(i)
+        for j in outputs[i]:
+            waiting[j] -= 1
+            if not waiting[j]:
+                queue.append(j)
+    return order
+
+
+def _call(fn, inputs, params):
+    """Worker entry point: the output and the seconds it took."""
+    start = time.perf_counter()
+    value = fn(inputs, params)
+    return value, time.perf_counter() - start
+
+
+class PipelineRun:
+    """A pipeline run that can be cancelled, and its results so far."""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+        self.keys = {}
+        self.outputs = {}       # node -> output, for nodes nothing consumes
+        self.timings = {}       # node -> seconds, for nodes that ran
+        self.cached = set()     # nodes whose output was reused
+        self.errors = {}        # node -> exception
+        self.skipped = set()    # nodes behind a failure, a cycle or a cancel
+        self.elapsed = 0.0
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def is_cancelled(self):
+        return self.cancelled.is_set()
+
+    @property
+    def ok(self):
+        return self.done.is_set() and not self.errors and not self.skipped
+
+    def summary(self):
+        return (f"{len(self.timings)} ran, {len(self.cached)} cached, "
+                f"{len(self.errors)} failed, {len(self.skipped)} skipped "
+                f"in {self.elapsed * 1000:.0f} ms")
+
+
+class PipelineEngine:
+    """
+    Executes pipeline graphs (see graph.model.Graph).
+
+    Each node is an operator chosen by its kind (see operators); an edge
+    feeds the source's output into the target. Nodes run as soon as
+    their inputs are ready, so independent branches run concurrently,
+    each on the thread or process pool its operator asks for.
+
+    Every output is memoized in a ResultCache under a hash of the
+    node's kind, parameters and input hashes. A run first works out
+    which nodes have no memoized output; only those run, fed from the
+    cache where their inputs did not change. Re-running after an edit
+    therefore recomputes just the edited nodes and what is downstream.
+    Each node's run time is recorded as a request in the metrics
+    registry, which the THROUGHPUT and LATENCY cards show.
+    """
+
+    def __init__(self, cache=None, threads=None, processes=None, registry=default_registry):
+        self.cache = cache if cache is not None else ResultCache.default()
+        self.threads = threads or min(32, (os.cpu_count() or 1) + 4)
+        self.processes = processes or max(1, (os.cpu_count() or 2) - 1)
+        self.registry = registry
+        self._pools = {}
+        self._pool_lock = threading.Lock()
+
+    def _executor(self, kind):
+        with self._pool_lock:
+            pool = self._pools.get(kind)
+            if pool is None:
+                if kind == operators.PROCESS:
+                    # Never fork a process that is running Qt threads
+                    context = multiprocessing.get_context("spawn")
+                    pool = ProcessPoolExecutor(self.processes, mp_context=context)
+                else:
+                    pool = ThreadPoolExecutor(self.threads, thread_name_prefix="pipeline")
+                self._pools[kind] = pool
+            return pool
+
+    def start(self, graph, on_done=None):
+        """
+        Run `graph` on a coordinator thread; returns its PipelineRun.
+        `on_done(run)` is called from that thread.
+        """
+        run = PipelineRun(graph)
+        thread = threading.Thread(target=self._run, name="Pipeline",
+                                  args=(run, on_done), daemon=True)
+        thread.start()
+        return run
+
+    def run(self, graph):
+        """Run `graph` to completion on the calling thread."""
+        run = PipelineRun(graph)
+        self._run(run, None)
+        return run
+
+    def _run(self, run, on_done):
+        start = time.perf_counter()
+        try:
+            self._execute(run)
+        except Exception:
+            log.exception("pipeline run failed")
+        run.elapsed = time.perf_counter() - start
+        run.done.set()
+        if on_done is not None:
+            on_done(run)
+
+    def _plan(self, run, inputs, outputs):
+        """Nodes to run, and the memoized inputs they need."""
+        graph = run.graph
+        order = topological_order(len(graph), inputs, outputs)
+        run.skipped.update(set(range(len(graph))) - set(order))
+        run.keys = keys = node_keys(graph, order, inputs)
+        cache = self.cache
+        todo = {i for i in order if keys[i] not in cache}
+        run.cached.update(i for i in order if i not in todo)
+        values = {}
+        stack = list(todo)
+        while stack:
+            i = stack.pop()
+            for j in inputs[i]:
+                if j in todo or j in values:
+                    continue
+                value = cache.get(keys[j])
+                if value is MISSING:
+                    # Evicted since it was looked up: compute it after all
+                    todo.add(j)
+                    run.cached.discard(j)
+                    stack.append(j)
+                else:
+                    values[j] = value
+        return [i for i in order if i in todo], values
+
+    def _execute(self, run):
+        graph = run.graph
+        count = len(graph)
+        inputs = [[] for _ in range(count)]
+        outputs = [[] for _ in range(count)]
+        for source, target in zip(graph.sources, graph.targets):
+            inputs[target].append(source)
+            outputs[source].append(target)
+        todo, values = self._plan(run, inputs, outputs)
+        for i in run.cached:
+            if not outputs[i] and i in values:
+                run.outputs[i] = values[i]
+        if run.cached:
+            self.registry.incr("pipeline.cache_hits", len(run.cached))
+
+        planned = set(todo)
+        waiting = {i: sum(1 for j in inputs[i] if j in planned) for i in todo}
+        # Consumers still to run per value held, so it can be dropped after
+        readers = {}
+        for i in todo:
+            for j in inputs[i]:
+                readers[j] = readers.get(j, 0) + 1
+        ready = deque(i for i in todo if not waiting[i])
+        pending = {}
+
+        def submit(i):
+            kind = graph.kind(i)
+            try:
+                op = operators.get(kind)
+            except KeyError:
+                fail(i, ValueError(f"unknown node kind: {kind!r}"))
+                return
+            args = [values[j] for j in inputs[i]]
+            future = self._executor(op.executor).submit(_call, op.fn, args, graph.params(i))
+            pending[future] = i
+
+        def fail(i, error):
+            run.errors[i] = error
+            stack = [i]
+            while stack:
+                for j in outputs[stack.pop()]:
+                    if j in planned and j not in run.skipped:
+                        run.skipped.add(j)
+                        stack.append(j)
+
+        while (ready or pending) and not run.is_cancelled():
+            while ready:
+                i = ready.popleft()
+                if i not in run.skipped:
+                    submit(i)
+            if not pending:
+                break
+            done, _ = wait(list(pending), timeout=0.1, return_when=FIRST_COMPLETED)
+            for future in done:
+                i = pending.pop(future)
+                try:
+                    value, seconds = future.result()
+                except Exception as e:
+                    log.debug("pipeline node %s failed", graph.ids[i], exc_info=True)
+                    fail(i, e)
+                    continue
+                run.timings[i] = seconds
+                self.registry.record_request(seconds)
+                self.registry.observe("pipeline.node_ms", seconds * 1000.0)
+                try:
+                    self.cache.put(run.keys[i], value)
+                except Exception as e:    # an output that does not pickle
+                    log.warning("not caching output of %s: %s", graph.ids[i], e)
+                for j in inputs[i]:
+                    readers[j] -= 1
+                    if not readers[j]:
+                        values.pop(j, None)
+                if readers.get(i):
+                    values[i] = value
+                if not outputs[i]:
+                    run.outputs[i] = value
+                for j in outputs[i]:
+                    if j in planned:
+                        waiting[j] -= 1
+                        if not waiting[j]:
+                            ready.append(j)
+        if run.is_cancelled():
+            for future in pending:
+                future.cancel()
+            run.skipped.update(i for i in todo if i not in run.timings and i not in run.errors)
+
+    def output(self, run, i):
+        """Output of node i in `run`, from the cache if it was not kept."""
+        value = run.outputs.get(i, MISSING)
+        if value is MISSING and i in run.keys:
+            value = self.cache.get(run.keys[i])
+        if value is MISSING:
+            raise KeyError(i)
+        return value
+
+    def shutdown(self):
+        with self._pool_lock:
+            for pool in self._pools.values():
+                pool.shutdown(wait=False, cancel_futures=True)
+            self._pools = {}
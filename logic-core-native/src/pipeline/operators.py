@@ -0,0 +1,135 @@
+"""
+LogicCore v2 - Pipeline Operators
+What each kind of pipeline node computes, and where it runs.
+"""
+import operator
+
+
+# Executors an operator can run on: the scheduler's thread pool for
+# light or GIL-releasing work, its process pool for CPU-bound work.
+THREAD = "thread"
+PROCESS = "process"
+
+
+class Operator:
+    """
+    A node kind: `fn(inputs, params)` returns the node's output, given
+    its upstream outputs in edge order and its JSON parameters.
+
+    Functions meant for the process pool must be module-level so they
+    pickle by name. Bump `version` when a change to `fn` alters its
+    results, so memoized outputs are recomputed.
+    """
+
+    __slots__ = ("kind", "fn", "executor", "version")
+
+    def __init__(self, kind, fn, executor=THREAD, version=1):
+        if executor not in (THREAD, PROCESS):
+            raise ValueError(f"unknown executor: {executor!r}")
+        self.kind = kind
+        self.fn = fn
+        self.executor = executor
+        self.version = version
+
+    def __repr__(self):
+        return f"Operator({self.kind!r}, {self.executor})"
+
+
+_operators = {}
+
+
+def register(kind, executor=THREAD, version=1):
+    """Decorator registering `fn` as the operator for `kind`."""
+    def decorate(fn):
+        _operators[kind] = Operator(kind, fn, executor, version)
+        return fn
+    return decorate
+
+
+def get(kind):
+    """The operator for `kind`; raises KeyError for unknown kinds."""
+    return _operators[kind]
+
+
+def kinds():
+    return sorted(_operators)
+
+
+# --- Built-in operators ---------------------------------------------------
+# Data flows as lists; a node with several inputs sees them concatenated.
+
+_MAPS = {
+    "add": operator.add, "sub": operator.sub, "mul": operator.mul,
+    "div": operator.truediv, "mod": operator.mod, "pow": operator.pow,
+}
+_TESTS = {
+    "gt": operator.gt, "ge": operator.ge, "lt": operator.lt,
+    "le": operator.le, "eq": operator.eq, "ne": operator.ne,
+}
+_REDUCTIONS = {
+    "sum": sum, "min": min, "max": max, "count": len,
+    "mean": lambda items: sum(items) / len(items) if items else 0.0,
+}
+
+
+def _concat(inputs):
+    if len(inputs) == 1:
+        return list(inputs[0])
+    return [item for data in inputs for item in data]
+
+
+def _choice(table, params, key, default):
+    name = params.get(key, default)
+    try:
+        return table[name]
+    except KeyError:
+        raise ValueError(f"unknown {key}: {name!r}") from None
+
+
+@register("source")
+def source(inputs, params):
+    """params: {"values": [...]} or {"range": [start, stop, step]}."""
+    if "range" in params:
+        return list(range(*params["range"]))
+    return list(params.get("values", ()))
+
+
+@register("")
+@register("join")
+@register("sink")
+def join(inputs, params):
+    return _concat(inputs)
+
+
+@register("map")
+def map_items(inputs, params):
+    """params: {"op": "add" | "mul" | ..., "value": number}."""
+    fn = _choice(_MAPS, params, "op", "add")
+    value = params.get("value", 0)
+    return [fn(item, value) for item in _concat(inputs)]
+
+
+@register("filter")
+def filter_items(inputs, params):
+    """params: {"op": "gt" | "eq" | ..., "value": number}."""
+    fn = _choice(_TESTS, params, "op", "ne")
+    value = params.get("value")
+    return [item for item in _concat(inputs) if fn(item, value)]
+
+
+@register("reduce")
+def reduce_items(inputs, params):
+    """params: {"op": "sum" | "min" | "max" | "count" | "mean"}."""
+    return [_choice(_REDUCTIONS, params, "op", "sum")(_concat(inputs))]
+
+
+@register("sort", executor=PROCESS)
+def sort_items(inputs, params):
+    """params: {"reverse": bool}; CPU-bound on large inputs."""
+    return sorted(_concat(inputs), reverse=bool(params.get("reverse")))
+
+
+@register("distinct", executor=PROCESS)
+def distinct(inputs, params):
+    """Items in first-seen order without repeats."""
+    return list(dict.fromkeys(_concat(inputs)))
@@ -0,0 +1,64 @@
+"""
+LogicCore v2 - Chat Context
+Assembles the workspace context sent along with an AI Chat prompt.
+"""
+import re
+
+
+# Retrieved chunks included per prompt
+CONTEXT_CHUNKS = 6
+# Definitions looked up for identifiers named in the prompt
+CONTEXT_SYMBOLS = 8
+# Characters of workspace text per prompt, at most
+CONTEXT_BUDGET = 16000
+
+# Names worth a symbol lookup: snake_case, CamelCase or dotted.name
+_IDENTIFIER = re.compile(r"\b[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*\b")
+
+
+def _looks_like_code(word):
+    return "_" in word or "." in word or (word[0].isupper() and not word.isupper()
+                                          and any(c.isupper() for c in word[1:]))
+
+
+def gather_context(question, retrieval=None, symbols=None, chunks=CONTEXT_CHUNKS,
+                   budget=CONTEXT_BUDGET):
+    """
+    (prompt, sources) for `question`.
+
+    The prompt carries the definitions of identifiers the question
+    names, from the symbol index, then the best matching workspace
+    chunks from the retrieval index, cut to `budget` characters.
+    `sources` lists "path:line" of everything included. Either index
+    may be missing or still building.
+    """
+    parts, sources = [], []
+    if symbols is not None:
+        seen = set()
+        for word in _IDENTIFIER.findall(question):
+            name = word.rpartition(".")[2]
+            if name in seen or not _looks_like_code(word):
+                continue
+            seen.add(name)
+            for symbol in symbols.definitions(name)[:2]:
+                parts.append(f"{symbol.kind} {symbol.qualname} is defined at "
+                             f"{symbol.path}:{symbol.line}")
+                sources.append(f"{symbol.path}:{symbol.line}")
+            if len(seen) >= CONTEXT_SYMBOLS:
+                break
+    if retrieval is not None and retrieval.available:
+        used = sum(len(p) for p in parts)
+        for passage in retrieval.search(question, chunks):
+            text = retrieval.passage_text(passage)
+            if not text.strip():
+                continue
+            text = text[:max(0, budget - used)]
+            if not text:
+                break
+            used += len(text)
+            parts.append(f"--- {passage.path}:{passage.line}\n{text}")
+            sources.append(f"{passage.path}:{passage.line}")
+    if not parts:
+        return question, sources
+    context = "\n\n".join(parts)
+    return f"Workspace context:\n{context}\n\nQuestion: {question}", sources
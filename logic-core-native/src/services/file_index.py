@@ -0,0 +1,494 @@
+"""
+LogicCore v2 - Workspace File Index
+Persistent index of every file in the workspace, kept current with
+inotify so no consumer has to walk the tree itself.
+"""
+import errno
+import logging
+import os
+import stat
+import struct
+import threading
+import time
+from array import array
+
+from . import inotify
+from .paths import cache_dir, workspace_key
+
+
+log = logging.getLogger(__name__)
+
+# Directories that are never indexed
+DEFAULT_EXCLUDES = frozenset({".git", ".hg", ".svn", "__pycache__"})
+
+SNAPSHOT_MAGIC = b"LCIX"
+SNAPSHOT_VERSION = 1
+
+WATCH_MASK = (
+    inotify.IN_CREATE | inotify.IN_DELETE | inotify.IN_MOVED_FROM
+    | inotify.IN_MOVED_TO | inotify.IN_MODIFY | inotify.IN_ATTRIB
+    | inotify.IN_CLOSE_WRITE | inotify.IN_DELETE_SELF | inotify.IN_MOVE_SELF
+    | inotify.IN_ONLYDIR | inotify.IN_DONT_FOLLOW
+)
+
+FLAG_DIR = 1
+
+_U16 = struct.Struct("<H")
+_U32 = struct.Struct("<I")
+_DIR_HEADER = struct.Struct("<qI")
+
+
+class DirRecord:
+    """Entries of one directory, stored column-wise."""
+
+    __slots__ = ("mtime_ns", "names", "flags", "sizes", "mtimes", "inodes")
+
+    def __init__(self, mtime_ns=0):
+        self.mtime_ns = mtime_ns
+        self.names = []
+        self.flags = bytearray()
+        self.sizes = array("q")
+        self.mtimes = array("q")
+        self.inodes = array("Q")
+
+    def append(self, name, is_dir, size, mtime_ns, inode):
+        self.names.append(name)
+        self.flags.append(FLAG_DIR if is_dir else 0)
+        self.sizes.append(size)
+        self.mtimes.append(mtime_ns)
+        self.inodes.append(inode)
+
+    def sort(self):
+        """Order entries folders first, then by case-folded name."""
+        order = sorted(range(len(self.names)),
+                       key=lambda i: (not self.flags[i] & FLAG_DIR,
+                                      self.names[i].casefold()))
+        self.names = [self.names[i] for i in order]
+        self.flags = bytearray(self.flags[i] for i in order)
+        self.sizes = array("q", (self.sizes[i] for i in order))
+        self.mtimes = array("q", (self.mtimes[i] for i in order))
+        self.inodes = array("Q", (self.inodes[i] for i in order))
+
+    def subdirs(self):
+        return [n for n, f in zip(self.names, self.flags) if f & FLAG_DIR]
+
+    def same_entries(self, other):
+        return (self.names == other.names and self.flags == other.flags
+                and self.sizes == other.sizes and self.mtimes == other.mtimes
+                and self.inodes == other.inodes)
+
+
+def _join(rel, name):
+    return f"{rel}/{name}" if rel else name
+
+
+def in_dirs(rel, dirs):
+    """Whether a file lies in one of `dirs` (as passed to subscribers) or below."""
+    parent = rel
+    while parent:
+        parent = parent.rpartition("/")[0]
+        if parent in dirs:
+            return True
+    return False
+
+
+class FileIndex:
+    """
+    Workspace file index service.
+
+    On start the snapshot saved by the previous session is loaded and
+    only directories whose mtime changed are listed again. After that
+    inotify events are coalesced into batched directory rescans, and
+    subscribers are told which directories changed.
+    """
+
+    def __init__(self, root, snapshot_path=None, excludes=DEFAULT_EXCLUDES,
+                 coalesce_ms=100, max_latency_ms=500, poll_interval=10.0):
+        self.root = os.path.abspath(root)
+        self.snapshot_path = snapshot_path or os.path.join(
+            cache_dir("index"), workspace_key(self.root) + ".idx")
+        self.excludes = excludes
+        self.coalesce = coalesce_ms / 1000.0
+        self.max_latency = max_latency_ms / 1000.0
+        self.poll_interval = poll_interval
+
+        self._dirs = {}
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._dirty_snapshot = False
+
+        self._inotify = None
+        self._watches = {}
+        self._watched = {}
+        self._watch_limit_hit = False
+
+    # --- Lifecycle ----------------------------------------------------
+
+    def start(self):
+        """Load the snapshot and start the background indexing thread."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="FileIndex", daemon=True)
+        self._thread.start()
+
+    def stop(self, save=True):
+        """Stop watching and persist the snapshot."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+        if save and self._ready.is_set():
+            self.save_snapshot()
+
+    def wait_ready(self, timeout=None):
+        """Block until the initial snapshot has been loaded or built."""
+        return self._ready.wait(timeout)
+
+    def subscribe(self, callback):
+        """Call `callback(changed_dirs)` from the index thread on changes."""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    # --- Queries ------------------------------------------------------
+
+    def list_dir(self, rel=""):
+        """Sorted (name, is_dir) entries of a workspace directory."""
+        with self._lock:
+            record = self._dirs.get(rel)
+        if record is None:
+            record = self._scan_dir(rel)
+            if record is None:
+                return []
+            with self._lock:
+                self._dirs[rel] = record
+                self._dirty_snapshot = True
+        return [(n, bool(f & FLAG_DIR)) for n, f in zip(record.names, record.flags)]
+
+    def stat(self, rel):
+        """Cached (size, mtime_ns, inode) of a file, or None."""
+        parent, _, name = rel.rpartition("/")
+        with self._lock:
+            record = self._dirs.get(parent)
+            if record is None:
+                return None
+            try:
+                i = record.names.index(name)
+            except ValueError:
+                return None
+            return record.sizes[i], record.mtimes[i], record.inodes[i]
+
+    def iter_files(self):
+        """Yield (relpath, size, mtime_ns) for every indexed file."""
+        with self._lock:
+            items = list(self._dirs.items())
+        for rel, record in items:
+            for i, name in enumerate(record.names):
+                if not record.flags[i] & FLAG_DIR:
+                    yield _join(rel, name), record.sizes[i], record.mtimes[i]
+
+    def file_count(self):
+        with self._lock:
+            return sum(len(r.names) - sum(f & FLAG_DIR for f in r.flags)
+                       for r in self._dirs.values())
+
+    def abspath(self, rel):
+        return os.path.join(self.root, *rel.split("/")) if rel else self.root
+
+    # --- Scanning -----------------------------------------------------
+
+    def _scan_dir(self, rel):
+        """List one directory from disk into a fresh DirRecord."""
+        path = self.abspath(rel)
+        self._watch(rel, path)
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            record = DirRecord(mtime_ns)
+            with os.scandir(path) as it:
+                for entry in it:
+                    if entry.name in self.excludes:
+                        continue
+                    try:
+                        st = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    is_dir = stat.S_ISDIR(st.st_mode)
+                    record.append(entry.name, is_dir, 0 if is_dir else st.st_size,
+                                  st.st_mtime_ns, st.st_ino)
+        except OSError:
+            return None
+        record.sort()
+        return record
+
+    def _crawl(self, rels):
+        """Index the given directories and everything below them."""
+        stack = list(rels)
+        while stack and not self._stop.is_set():
+            rel = stack.pop()
+            record = self._scan_dir(rel)
+            if record is None:
+                continue
+            with self._lock:
+                self._dirs[rel] = record
+            stack.extend(_join(rel, name) for name in record.subdirs())
+        self._dirty_snapshot = True
+
+    def _drop(self, rel):
+        """Forget a directory and its whole subtree."""
+        prefix = rel + "/"
+        with self._lock:
+            doomed = [k for k in self._dirs if k == rel or k.startswith(prefix)]
+            for key in doomed:
+                del self._dirs[key]
+        for key in doomed:
+            self._unwatch(key)
+
+    def _rescan(self, rels):
+        """Refresh directories; returns the ones whose entries changed."""
+        changed = []
+        for rel in sorted(rels, key=len):
+            with self._lock:
+                old = self._dirs.get(rel)
+            if old is None and rel and rel.rpartition("/")[0] not in self._dirs:
+                continue  # Parent was dropped, nothing to refresh
+            record = self._scan_dir(rel)
+            if record is None:
+                if old is not None:
+                    self._drop(rel)
+                    changed.append(rel)
+                continue
+            with self._lock:
+                self._dirs[rel] = record
+            if old is not None and old.same_entries(record):
+                continue
+            changed.append(rel)
+            old_subdirs = set(old.subdirs()) if old is not None else set()
+            new_subdirs = set(record.subdirs())
+            for name in old_subdirs - new_subdirs:
+                self._drop(_join(rel, name))
+            self._crawl(_join(rel, name) for name in new_subdirs - old_subdirs)
+        if changed:
+            self._dirty_snapshot = True
+        return changed
+
+    def _validate(self):
+        """Re-list only the directories whose mtime changed since the snapshot."""
+        with self._lock:
+            items = list(self._dirs.items())
+        stale = []
+        for rel, record in items:
+            path = self.abspath(rel)
+            self._watch(rel, path)
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                stale.append(rel)
+                continue
+            if mtime_ns != record.mtime_ns:
+                stale.append(rel)
+        return self._rescan(stale) if stale else []
+
+    # --- Watching -----------------------------------------------------
+
+    def _watch(self, rel, path):
+        with self._lock:
+            if self._inotify is None or self._watch_limit_hit or rel in self._watched:
+                return
+            try:
+                wd = self._inotify.add_watch(path, WATCH_MASK)
+            except OSError as e:
+                if e.errno == errno.ENOSPC:
+                    self._watch_limit_hit = True
+                    log.warning("inotify watch limit reached; %s and later "
+                                "directories are refreshed on restart only", rel or ".")
+                return
+            self._watches[wd] = rel
+            self._watched[rel] = wd
+
+    def _unwatch(self, rel):
+        with self._lock:
+            wd = self._watched.pop(rel, None)
+            if wd is None:
+                return
+            self._watches.pop(wd, None)
+        if self._inotify is not None:
+            try:
+                self._inotify.rm_watch(wd)
+            except OSError:
+                pass
+
+    def _collect_events(self, timeout):
+        """Read inotify events and map them to dirty directories."""
+        dirty = set()
+        for wd, mask, _, name in self._inotify.read_events(timeout):
+            if mask & inotify.IN_Q_OVERFLOW:
+                with self._lock:
+                    dirty.update(self._dirs)
+                continue
+            rel = self._watches.get(wd)
+            if rel is None:
+                continue
+            if mask & inotify.IN_IGNORED:
+                self._watches.pop(wd, None)
+                self._watched.pop(rel, None)
+            if name in self.excludes:
+                continue
+            dirty.add(rel)
+        return dirty
+
+    # --- Thread -------------------------------------------------------
+
+    def _run(self):
+        if inotify.is_supported():
+            try:
+                self._inotify = inotify.Inotify()
+            except OSError as e:
+                log.warning("inotify unavailable (%s); falling back to polling", e)
+
+        start = time.perf_counter()
+        if self.load_snapshot():
+            self._ready.set()
+            changed = self._validate()
+            log.info("index snapshot validated in %.0f ms (%d dirs changed)",
+                     (time.perf_counter() - start) * 1000, len(changed))
+            self._notify(changed)
+        else:
+            self._crawl([""])
+            self._ready.set()
+            log.info("workspace indexed in %.0f ms", (time.perf_counter() - start) * 1000)
+            self._notify([""])
+        if self._dirty_snapshot:
+            self.save_snapshot()
+
+        if self._inotify is not None:
+            self._watch_loop()
+        else:
+            self._poll_loop()
+
+    def _watch_loop(self):
+        pending = set()
+        first_event = last_event = 0.0
+        last_save = time.monotonic()
+        while not self._stop.is_set():
+            timeout = self.coalesce if pending else 1.0
+            try:
+                dirty = self._collect_events(timeout)
+            except (OSError, ValueError):
+                if self._stop.is_set():
+                    return
+                raise
+            now = time.monotonic()
+            if dirty:
+                if not pending:
+                    first_event = now
+                pending |= dirty
+                last_event = now
+            if pending and (now - last_event >= self.coalesce
+                            or now - first_event >= self.max_latency):
+                batch, pending = pending, set()
+                self._notify(self._rescan(batch))
+            if self._dirty_snapshot and now - last_save > 30.0:
+                self.save_snapshot()
+                last_save = now
+
+    def _poll_loop(self):
+        while not self._stop.wait(self.poll_interval):
+            self._notify(self._validate())
+
+    def _notify(self, changed):
+        if not changed:
+            return
+        for callback in list(self._listeners):
+            try:
+                callback(changed)
+            except Exception:
+                log.exception("file index listener failed")
+
+    # --- Persistence --------------------------------------------------
+
+    def save_snapshot(self):
+        """Write the index to disk atomically."""
+        with self._lock:
+            items = list(self._dirs.items())
+            self._dirty_snapshot = False
+        root = self.root.encode("utf-8", "surrogateescape")
+        parts = [SNAPSHOT_MAGIC, _U16.pack(SNAPSHOT_VERSION), _U16.pack(len(root)),
+                 root, _U32.pack(len(items))]
+        for rel, record in items:
+            rel_bytes = rel.encode("utf-8", "surrogateescape")
+            names = "\0".join(record.names).encode("utf-8", "surrogateescape")
+            parts += [_U16.pack(len(rel_bytes)), rel_bytes,
+                      _DIR_HEADER.pack(record.mtime_ns, len(record.names)),
+                      _U32.pack(len(names)), names, bytes(record.flags),
+                      record.sizes.tobytes(), record.mtimes.tobytes(),
+                      record.inodes.tobytes()]
+        tmp = self.snapshot_path + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(b"".join(parts))
+            os.replace(tmp, self.snapshot_path)
+        except OSError as e:
+            log.warning("could not save index snapshot: %s", e)
+
+    def load_snapshot(self):
+        """Load a saved snapshot; returns False if none is usable."""
+        try:
+            with open(self.snapshot_path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return False
+        try:
+            dirs = self._parse_snapshot(data)
+        except (struct.error, ValueError, UnicodeDecodeError):
+            log.warning("ignoring corrupt index snapshot %s", self.snapshot_path)
+            return False
+        if dirs is None:
+            return False
+        with self._lock:
+            self._dirs = dirs
+        return True
+
+    def _parse_snapshot(self, data):
+        view = memoryview(data)
+        if bytes(view[:4]) != SNAPSHOT_MAGIC:
+            return None
+        (version,) = _U16.unpack_from(view, 4)
+        if version != SNAPSHOT_VERSION:
+            return None
+        (root_len,) = _U16.unpack_from(view, 6)
+        offset = 8
+        root = bytes(view[offset:offset + root_len]).decode("utf-8", "surrogateescape")
+        offset += root_len
+        if root != self.root:
+            return None
+        (count,) = _U32.unpack_from(view, offset)
+        offset += 4
+        dirs = {}
+        for _ in range(count):
+            (rel_len,) = _U16.unpack_from(view, offset)
+            offset += 2
+            rel = bytes(view[offset:offset + rel_len]).decode("utf-8", "surrogateescape")
+            offset += rel_len
+            mtime_ns, n = _DIR_HEADER.unpack_from(view, offset)
+            offset += _DIR_HEADER.size
+            (names_len,) = _U32.unpack_from(view, offset)
+            offset += 4
+            record = DirRecord(mtime_ns)
+            names = bytes(view[offset:offset + names_len]).decode("utf-8", "surrogateescape")
+            record.names = names.split("\0") if n else []
+            offset += names_len
+            record.flags = bytearray(view[offset:offset + n])
+            offset += n
+            for column in (record.sizes, record.mtimes, record.inodes):
+                column.frombytes(view[offset:offset + 8 * n])
+                offset += 8 * n
+            dirs[rel] = record
+        return dirs
@@ -0,0 +1,235 @@
+"""
+LogicCore v2 - Fuzzy Path Matching
+Path index behind Quick Open: every workspace path precomputed into
+fixed-width byte blocks that a query is matched against with numpy.
+"""
+import os
+import time
+
+try:
+    import numpy
+except ImportError:  # Quick Open is unavailable without numpy
+    numpy = None
+
+from .ignore import IgnoreRules
+
+
+# Block size, in paths and in bytes of the padded matrix; one block is
+# the unit of work between deadline checks
+BLOCK_ROWS = 16384
+BLOCK_BYTES = 1024 * 1024
+# Results kept per query
+MAX_RESULTS = 50
+
+# Score bits; a match gets the bit of every tier it falls in
+NAME_PREFIX = 8         # the file name starts with the query
+NAME_SUBSTRING = 4      # the file name contains the query
+NAME_SUBSEQUENCE = 2    # the query's characters all fall in the file name
+SUBSTRING = 1           # the path contains the query
+ALL_TIERS = 15
+
+available = numpy is not None
+
+
+class _Block:
+    """Case-folded paths of consecutive rows, one per matrix row, zero padded."""
+
+    __slots__ = ("start", "matrix", "columns", "name_starts")
+
+    def __init__(self, start, matrix, name_starts):
+        self.start = start
+        self.matrix = matrix
+        self.columns = numpy.arange(matrix.shape[1], dtype=numpy.int32)
+        self.name_starts = name_starts
+
+    def advance(self, rows, pos, char):
+        """
+        (rows, pos) of the rows with `char` at or after `pos`, `pos` then
+        just past the first such `char`; rows None means all of them.
+        """
+        if rows is None:
+            found = self.matrix == char
+        else:
+            found = self.matrix[rows] == char
+            found &= self.columns >= pos[:, None]
+        first = found.argmax(1)
+        hit = found[numpy.arange(len(first)), first]
+        rows = numpy.flatnonzero(hit) if rows is None else rows[hit]
+        return rows, (first[hit] + 1).astype(numpy.int32)
+
+    def score(self, rows, query):
+        """Score bits of `rows`, all of which match `query` somewhere."""
+        text = self.matrix[rows]
+        names = self.name_starts[rows]
+        in_name = self.columns >= names[:, None]
+        # Query as a substring: windows where every character lines up
+        window = text == query[0]
+        for i in range(1, len(query)):
+            window[:, :-i] &= text[:, i:] == query[i]
+            window[:, -i:] = False
+        score = window.any(1) * SUBSTRING
+        window &= in_name
+        score |= window.any(1) * NAME_SUBSTRING
+        score |= window[numpy.arange(len(rows)), names] * NAME_PREFIX
+        # Query as a subsequence, searched from the start of the file name
+        pos, hit = names, numpy.ones(len(rows), bool)
+        for char in query:
+            found = (text == char) & (self.columns >= pos[:, None])
+            first = found.argmax(1)
+            hit &= found[numpy.arange(len(first)), first]
+            pos = first + 1
+        score |= hit * NAME_SUBSEQUENCE
+        return score
+
+
+class PathIndex:
+    """
+    Workspace paths, precomputed for fuzzy matching.
+
+    Paths are ordered by length and cut into blocks, each a matrix as
+    wide as its longest path, so padding stays small and a row number
+    doubles as the length tiebreak. The original text lives in one
+    buffer for display.
+    """
+
+    def __init__(self, data, offsets):
+        """Index `data`, paths back to back and shortest first, split at `offsets`."""
+        self.data = data
+        self.offsets = offsets
+        lengths = numpy.diff(offsets)
+        folded = numpy.frombuffer(data.lower(), numpy.uint8)
+        # File names start after the last slash before each path's end
+        slashes = numpy.flatnonzero(folded == ord("/"))
+        name_starts = numpy.zeros(len(lengths), numpy.int32)
+        if len(slashes):
+            last = numpy.searchsorted(slashes, offsets[1:]) - 1
+            found = last >= 0
+            last = slashes[numpy.maximum(last, 0)]
+            found &= last >= offsets[:-1]
+            name_starts[found] = (last - offsets[:-1] + 1)[found]
+        self.blocks = []
+        start = 0
+        while start < len(lengths):
+            end = min(start + BLOCK_ROWS, len(lengths))
+            while end - start > 1 and (end - start) * lengths[end - 1] > BLOCK_BYTES:
+                end = start + max(1, BLOCK_BYTES // int(lengths[end - 1]))
+            width = int(lengths[end - 1])
+            matrix = numpy.zeros((end - start, width), numpy.uint8)
+            # Row-major order of the mask is the order of the path bytes
+            matrix[numpy.arange(width) < lengths[start:end, None]] = \
+                folded[offsets[start]:offsets[end]]
+            self.blocks.append(_Block(start, matrix, name_starts[start:end]))
+            start = end
+
+    @classmethod
+    def from_paths(cls, paths):
+        """Index a list of relative paths."""
+        encoded = [os.fsencode(p) for p in paths]
+        lengths = numpy.fromiter(map(len, encoded), numpy.int64, len(encoded))
+        order = numpy.argsort(lengths, kind="stable")
+        offsets = numpy.zeros(len(encoded) + 1, numpy.int64)
+        numpy.cumsum(lengths[order], out=offsets[1:])
+        return cls(b"".join([encoded[i] for i in order]), offsets)
+
+    @classmethod
+    def from_file_index(cls, file_index, ignore=None):
+        """Index the FileIndex's files, less any that .gitignore excludes."""
+        ignore = ignore or IgnoreRules(file_index.root)
+        return cls.from_paths([rel for rel, _, _ in file_index.iter_files()
+                               if not ignore.is_ignored(rel)])
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def path(self, row):
+        return os.fsdecode(self.data[self.offsets[row]:self.offsets[row + 1]])
+
+
+class FuzzyMatcher:
+    """
+    Incremental subsequence matching of a query against a PathIndex.
+
+    Matching keeps one level per query character: the rows of each
+    block that match the query up to that character, and where that
+    character was found. Typing a character adds a level computed from
+    the one before it, and deleting one drops levels, so a keystroke
+    only does the work for what it changed. `step` does that work a
+    block at a time until its deadline, so results for a large
+    workspace arrive progressively; ranking the last level's rows is
+    part of the same steps.
+    """
+
+    def __init__(self, index, limit=MAX_RESULTS):
+        self.index = index
+        self.limit = limit
+        self.query = b""
+        self.matched = 0
+        self._levels = []
+        self._ranked = 0
+        self._best = numpy.empty(0, numpy.int64)
+
+    def set_query(self, query):
+        """Match `query` (case-insensitive, spaces ignored) from now on."""
+        query = os.fsencode("".join(query.split())).lower()
+        keep = 0
+        while keep < min(len(query), len(self.query)) and query[keep] == self.query[keep]:
+            keep += 1
+        del self._levels[keep:]
+        self._levels.extend([] for _ in query[keep:])
+        self.query = query
+        self.matched = 0
+        self._ranked = 0
+        self._best = numpy.empty(0, numpy.int64)
+
+    @property
+    def done(self):
+        return self._ranked == len(self.index.blocks) or not self.query
+
+    def progress(self):
+        return self._ranked / len(self.index.blocks) if self.index.blocks else 1.0
+
+    def step(self, budget):
+        """Match and rank blocks for up to `budget` seconds (at least one); True when done."""
+        deadline = time.perf_counter() + budget
+        while not self.done:
+            if self._ranked == len(self._levels[-1]):
+                self._scan(self._ranked)
+            self._rank(self._ranked)
+            self._ranked += 1
+            if time.perf_counter() >= deadline:
+                break
+        return self.done
+
+    def _scan(self, b):
+        """Bring every level up to date for block `b`."""
+        block = self.index.blocks[b]
+        rows = pos = None
+        for char, level in zip(self.query, self._levels):
+            if len(level) <= b:
+                if rows is None or len(rows):
+                    rows, pos = block.advance(rows, pos, char)
+                level.append((rows, pos))
+            else:
+                rows, pos = level[b]
+
+    def _rank(self, b):
+        rows, _ = self._levels[-1][b]
+        if not len(rows):
+            return
+        block = self.index.blocks[b]
+        self.matched += len(rows)
+        # Later blocks hold longer paths, which only displace a kept
+        # result by scoring higher; nothing scores higher than a full house
+        if len(self._best) == self.limit and self._best.max() >> 32 == 0:
+            return
+        score = block.score(rows, self.query).astype(numpy.int64)
+        keys = ((ALL_TIERS - score) << 32) | (rows + block.start)
+        if len(self._best):
+            keys = numpy.concatenate((self._best, keys))
+        if len(keys) > self.limit:
+            keys = numpy.partition(keys, self.limit - 1)[:self.limit]
+        self._best = keys
+
+    def results(self):
+        """Best paths so far, best first."""
+        return [self.index.path(int(key & 0xFFFFFFFF)) for key in numpy.sort(self._best)]
@@ -0,0 +1,493 @@
+"""
+LogicCore v2 - Git Status
+Working tree status computed from .git/index without running git.
+"""
+import hashlib
+import logging
+import os
+import stat
+import struct
+import threading
+import time
+
+from .ignore import IgnoreRules
+
+
+log = logging.getLogger(__name__)
+
+MODIFIED = "M"
+DELETED = "D"
+UNTRACKED = "U"
+CONFLICT = "C"
+
+_INDEX_HEADER = struct.Struct(">4sII")
+_ENTRY = struct.Struct(">10I20sH")
+_EXTENDED_FLAGS = struct.Struct(">H")
+
+FLAG_ASSUME_VALID = 0x8000
+FLAG_EXTENDED = 0x4000
+FLAG_SKIP_WORKTREE = 0x4000  # In the extended flags word
+GITLINK_MODE = 0o160000
+
+
+class IndexEntry:
+    """One stage-0 entry of .git/index."""
+
+    __slots__ = ("path", "mtime_s", "mtime_ns", "ino", "mode", "size", "sha",
+                 "flags", "stage")
+
+    def __init__(self, path, mtime_s, mtime_ns, ino, mode, size, sha, flags, stage):
+        self.path = path
+        self.mtime_s = mtime_s
+        self.mtime_ns = mtime_ns
+        self.ino = ino
+        self.mode = mode
+        self.size = size
+        self.sha = sha
+        self.flags = flags
+        self.stage = stage
+
+
+def find_git_dir(path):
+    """Return (repo_root, git_dir) for the repository containing `path`."""
+    path = os.path.abspath(path)
+    while True:
+        dot_git = os.path.join(path, ".git")
+        if os.path.isdir(dot_git):
+            return path, dot_git
+        if os.path.isfile(dot_git):
+            try:
+                with open(dot_git, encoding="utf-8") as f:
+                    line = f.read().strip()
+            except OSError:
+                return None
+            if line.startswith("gitdir:"):
+                git_dir = line[len("gitdir:"):].strip()
+                return path, os.path.normpath(os.path.join(path, git_dir))
+        parent = os.path.dirname(path)
+        if parent == path:
+            return None
+        path = parent
+
+
+def _read_varint(data, offset):
+    """Offset-encoded varint used by index v4 path compression."""
+    byte = data[offset]
+    offset += 1
+    value = byte & 0x7F
+    while byte & 0x80:
+        byte = data[offset]
+        offset += 1
+        value = ((value + 1) << 7) | (byte & 0x7F)
+    return value, offset
+
+
+def parse_index(data):
+    """Parse the entries of a version 2, 3 or 4 .git/index."""
+    signature, version, count = _INDEX_HEADER.unpack_from(data, 0)
+    if signature != b"DIRC" or version not in (2, 3, 4):
+        raise ValueError(f"unsupported git index (version {version})")
+    entries = []
+    offset = _INDEX_HEADER.size
+    previous = b""
+    unpack = _ENTRY.unpack_from
+    for _ in range(count):
+        start = offset
+        (_, _, mtime_s, mtime_ns, _, ino, mode, _, _, size,
+         sha, flags) = unpack(data, offset)
+        offset += _ENTRY.size
+        extended = 0
+        if flags & FLAG_EXTENDED and version >= 3:
+            (extended,) = _EXTENDED_FLAGS.unpack_from(data, offset)
+            offset += 2
+        if version == 4:
+            strip, offset = _read_varint(data, offset)
+            end = data.index(b"\0", offset)
+            name = previous[:len(previous) - strip] + data[offset:end]
+            offset = end + 1
+        else:
+            end = data.index(b"\0", offset)
+            name = data[offset:end]
+            # Entries are NUL-padded to a multiple of eight bytes
+            offset = start + ((end - start + 8) & ~7)
+        previous = name
+        if extended & FLAG_SKIP_WORKTREE:
+            continue
+        entries.append(IndexEntry(
+            name.decode("utf-8", "surrogateescape"), mtime_s, mtime_ns, ino,
+            mode, size, sha, flags, (flags >> 12) & 3))
+    return entries
+
+
+def _file_sig(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+def blob_sha1(path, st):
+    """Git blob id of a file or symlink on disk."""
+    if stat.S_ISLNK(st.st_mode):
+        data = os.fsencode(os.readlink(path))
+    else:
+        with open(path, "rb") as f:
+            data = f.read()
+    h = hashlib.sha1(b"blob %d\0" % len(data))
+    h.update(data)
+    return h.digest()
+
+
+class GitStatus:
+    """Snapshot of working tree changes, keyed by workspace-relative path."""
+
+    def __init__(self, branch="", files=None):
+        self.branch = branch
+        self.files = files or {}
+        self.dirs = set()
+        for rel in self.files:
+            parts = rel.split("/")[:-1]
+            for i in range(1, len(parts) + 1):
+                self.dirs.add("/".join(parts[:i]))
+
+    def counts(self):
+        changes = sum(1 for c in self.files.values() if c != UNTRACKED)
+        return changes, len(self.files) - changes
+
+
+class GitStatusService:
+    """
+    Background Git status provider.
+
+    The index is parsed only when .git/index changes. Each tracked file
+    is compared with its cached stat data, and only files whose stat
+    data differs (or that are racily clean) are hashed. Hashes are
+    remembered, so a file is hashed again only after it changes.
+    After the first full pass, file index notifications and index
+    rewrites narrow a refresh to the entries that could have changed;
+    a full pass still runs every `full_interval` seconds.
+    """
+
+    def __init__(self, workspace, file_index, debounce=0.15, poll_interval=2.0,
+                 full_interval=60.0):
+        found = find_git_dir(workspace)
+        if found is None:
+            raise ValueError(f"{workspace} is not inside a git repository")
+        self.repo_root, self.git_dir = found
+        self.workspace = os.path.abspath(workspace)
+        prefix = os.path.relpath(self.workspace, self.repo_root).replace(os.sep, "/")
+        self.prefix = "" if prefix == "." else prefix + "/"
+        self.file_index = file_index
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        self.full_interval = full_interval
+        self._last_full = 0.0
+        self._gitignore_sigs = {}   # workspace-relative dir -> .gitignore sig
+        self._load_ignore()
+
+        self.status = GitStatus()
+        self.last_refresh_ms = 0.0
+        self._listeners = []
+        self._entries = {}
+        self._by_dir = {}
+        self._index_sig = None
+        self._index_mtime_ns = 0
+        self._head_sig = None
+        self._modified = {}
+        self._untracked_files = {}
+        self._hash_cache = {}
+        self._branch = ""
+
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._dirty_dirs = set()
+        self._full = True
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @classmethod
+    def for_workspace(cls, workspace, file_index):
+        """Create a service, or return None outside a repository."""
+        if find_git_dir(workspace) is None:
+            return None
+        return cls(workspace, file_index)
+
+    def _load_ignore(self):
+        """Fresh ignore rules: the .gitignore files plus .git/info/exclude."""
+        path = os.path.join(self.git_dir, "info", "exclude")
+        self._exclude_sig = _file_sig(path)
+        ignore = IgnoreRules(self.repo_root)
+        try:
+            with open(path, encoding="utf-8") as f:
+                ignore.add_patterns(f.read())
+        except OSError:
+            pass
+        self.ignore = ignore
+
+    # --- Lifecycle ----------------------------------------------------
+
+    def start(self):
+        self.file_index.subscribe(self._on_index_changed)
+        # First refresh right away rather than after a poll interval
+        self._wake.set()
+        self._thread = threading.Thread(target=self._run, name="GitStatus", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.file_index.unsubscribe(self._on_index_changed)
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def subscribe(self, callback):
+        """Call `callback(GitStatus)` from the service thread after changes."""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def request_refresh(self, dirs=None):
+        """Schedule a refresh of some workspace directories, or everything."""
+        with self._lock:
+            if dirs is None:
+                self._full = True
+            else:
+                self._dirty_dirs.update(dirs)
+        self._wake.set()
+
+    def _on_index_changed(self, changed):
+        self.request_refresh(changed)
+
+    # --- Thread -------------------------------------------------------
+
+    def _run(self):
+        while not self._stop.is_set():
+            woke = self._wake.wait(self.poll_interval)
+            if self._stop.is_set():
+                return
+            if woke:
+                # Coalesce bursts of file system events
+                time.sleep(self.debounce)
+            elif time.monotonic() - self._last_full > self.full_interval:
+                # Catch edits the file index could not report
+                self.request_refresh()
+            self._wake.clear()
+            try:
+                self.refresh()
+            except Exception:
+                log.exception("git status refresh failed")
+
+    def refresh(self):
+        """Bring the status up to date; runs on the service thread."""
+        start = time.perf_counter()
+        with self._lock:
+            full, dirs = self._full, self._dirty_dirs
+            self._full, self._dirty_dirs = False, set()
+
+        if self._check_ignore(dirs):
+            full = True
+        head_changed = self._check_head()
+        index_delta = self._check_index()
+        if index_delta is None:
+            full = True
+        if not full and not dirs and not index_delta and not head_changed:
+            return False
+
+        if full:
+            changed = self._compare(None)
+            untracked = self._untracked(None)
+            self._last_full = time.monotonic()
+        else:
+            paths = set(index_delta)
+            for d in dirs:
+                paths.update(self._by_dir.get(self.prefix + d if d else self.prefix.rstrip("/"), ()))
+            changed = self._compare(paths)
+            untracked = self._untracked(dirs, index_delta)
+        self.last_refresh_ms = (time.perf_counter() - start) * 1000
+        if not (changed or untracked or head_changed or full):
+            return False
+
+        plen = len(self.prefix)
+        files = {path[plen:]: code for path, code in self._modified.items()}
+        files.update(self._untracked_files)
+        self.status = GitStatus(self._branch, files)
+        for callback in list(self._listeners):
+            try:
+                callback(self.status)
+            except Exception:
+                log.exception("git status listener failed")
+        return True
+
+    def _check_ignore(self, dirs):
+        """
+        Reload the ignore rules if .git/info/exclude or the .gitignore of
+        one of `dirs` changed; True if so. Runs on the service thread, the
+        only one reading the rules.
+        """
+        changed = False
+        for d in dirs:
+            sig = _file_sig(os.path.join(self.workspace, *d.split("/"), ".gitignore"))
+            if sig != self._gitignore_sigs.get(d):
+                self._gitignore_sigs[d] = sig
+                changed = True
+        if _file_sig(os.path.join(self.git_dir, "info", "exclude")) != self._exclude_sig:
+            self._load_ignore()
+            return True
+        if changed:
+            self.ignore.invalidate()
+        return changed
+
+    def _check_head(self):
+        path = os.path.join(self.git_dir, "HEAD")
+        try:
+            st = os.stat(path)
+        except OSError:
+            return False
+        sig = (st.st_mtime_ns, st.st_size)
+        if sig == self._head_sig:
+            return False
+        self._head_sig = sig
+        try:
+            with open(path, encoding="utf-8") as f:
+                head = f.read().strip()
+        except OSError:
+            head = ""
+        if head.startswith("ref:"):
+            self._branch = head.rpartition("/")[2]
+        else:
+            self._branch = head[:7]
+        return True
+
+    def _check_index(self):
+        """
+        Re-parse .git/index if it changed.
+
+        Returns the set of paths whose index entry was added, removed
+        or rewritten, or None when every entry has to be compared.
+        """
+        path = os.path.join(self.git_dir, "index")
+        try:
+            st = os.stat(path)
+        except OSError:
+            if self._index_sig is None:
+                return set()
+            self._index_sig = None
+            self._entries, self._by_dir = {}, {}
+            return None
+        sig = (st.st_mtime_ns, st.st_size, st.st_ino)
+        if sig == self._index_sig:
+            return set()
+        with open(path, "rb") as f:
+            data = f.read()
+        entries = {}
+        by_dir = {}
+        for entry in parse_index(data):
+            if entry.mode == GITLINK_MODE or not entry.path.startswith(self.prefix):
+                continue
+            existing = entries.get(entry.path)
+            if existing is not None and existing.stage == 0:
+                continue
+            entries[entry.path] = entry
+            by_dir.setdefault(entry.path.rpartition("/")[0], []).append(entry.path)
+
+        first = self._index_sig is None
+        old = self._entries
+        self._entries, self._by_dir = entries, by_dir
+        self._index_sig = sig
+        self._index_mtime_ns = st.st_mtime_ns
+        if first:
+            return None
+        delta = {p for p in old.keys() - entries.keys()}
+        for p, entry in entries.items():
+            previous = old.get(p)
+            if (previous is None or previous.sha != entry.sha
+                    or previous.mode != entry.mode or previous.stage != entry.stage
+                    or previous.flags != entry.flags):
+                delta.add(p)
+        return delta
+
+    def _entry_changed(self, entry, path):
+        """Status code of one tracked entry, or None if unchanged."""
+        if entry.stage:
+            return CONFLICT
+        try:
+            st = os.lstat(path)
+        except OSError:
+            return DELETED
+        if entry.flags & FLAG_ASSUME_VALID:
+            return None
+        mode_changed = (stat.S_IFMT(st.st_mode) != stat.S_IFMT(entry.mode)
+                        or (st.st_mode & 0o100) != (entry.mode & 0o100))
+        if mode_changed:
+            return MODIFIED
+        # Files touched in the same instant the index was written are
+        # "racily clean" and must be hashed, exactly as git does
+        racy = st.st_mtime_ns >= self._index_mtime_ns
+        seconds, nanos = divmod(st.st_mtime_ns, 1_000_000_000)
+        if (not racy
+                and (seconds & 0xFFFFFFFF) == entry.mtime_s
+                and (entry.mtime_ns == 0 or nanos == entry.mtime_ns)
+                and (st.st_size & 0xFFFFFFFF) == entry.size
+                and (entry.ino == 0 or (st.st_ino & 0xFFFFFFFF) == entry.ino)):
+            return None
+        key = (st.st_mtime_ns, st.st_size, st.st_ino)
+        cached = self._hash_cache.get(entry.path)
+        if cached is not None and cached[0] == key:
+            sha = cached[1]
+        else:
+            try:
+                sha = blob_sha1(path, st)
+            except OSError:
+                return DELETED
+            self._hash_cache[entry.path] = (key, sha)
+        return None if sha == entry.sha else MODIFIED
+
+    def _compare(self, paths):
+        """Compare tracked entries (all, or the given paths) with disk."""
+        if paths is None:
+            paths = list(self._entries)
+            self._modified = {}
+        root = self.repo_root
+        changed = False
+        for rel in paths:
+            entry = self._entries.get(rel)
+            if entry is None:
+                code = None  # No longer tracked
+            else:
+                code = self._entry_changed(entry, os.path.join(root, rel))
+            if self._modified.get(rel) != code:
+                changed = True
+                if code is None:
+                    del self._modified[rel]
+                else:
+                    self._modified[rel] = code
+        return changed
+
+    def _untracked(self, dirs, index_delta=()):
+        """Refresh untracked files (workspace-relative) from the file index."""
+        entries, ignore, prefix = self._entries, self.ignore, self.prefix
+        old = self._untracked_files
+        plen = len(prefix)
+        if dirs is None:
+            candidates = [rel for rel, _, _ in self.file_index.iter_files()]
+            current = {}
+        else:
+            # Paths that left or entered the index may change state too
+            candidates = [p[plen:] for p in index_delta]
+            for d in dirs:
+                for name, is_dir in self.file_index.list_dir(d):
+                    if not is_dir:
+                        candidates.append(f"{d}/{name}" if d else name)
+            current = {rel: code for rel, code in old.items()
+                       if rel.rpartition("/")[0] not in dirs and prefix + rel not in index_delta}
+        for rel in candidates:
+            path = prefix + rel
+            if path not in entries and not ignore.is_ignored(path) \
+                    and (dirs is None or self.file_index.stat(rel) is not None):
+                current[rel] = UNTRACKED
+        self._untracked_files = current
+        return current.keys() != old.keys()
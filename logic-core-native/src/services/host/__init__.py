@@ -0,0 +1,4 @@
+"""
+LogicCore v2 - Service Host
+Out-of-process backend that runs heavy work away from the GUI.
+"""
@@ -0,0 +1,38 @@
+"""
+LogicCore v2 - Service Host
+Process entry point; started by HostClient as `python -m src.services.host`.
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+
+from .server import HostServer
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="logiccore-host")
+    parser.add_argument("--fd", type=int, required=True,
+                        help="connected Unix socket inherited from the GUI")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--processes", type=int,
+                        default=max(1, (os.cpu_count() or 2) - 1),
+                        help="worker processes for CPU-bound methods")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING,
+                        format="[host %(process)d] %(levelname)s %(name)s: %(message)s")
+    # Ctrl+C in the terminal reaches the whole process group; the host
+    # goes away when the GUI closes the socket instead
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+
+    sock = socket.socket(fileno=args.fd)
+    try:
+        HostServer(sock, workers=args.workers, processes=args.processes).serve()
+    finally:
+        sock.close()
+
+
+if __name__ == "__main__":
+    main()
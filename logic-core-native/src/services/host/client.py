@@ -0,0 +1,311 @@
+"""
+LogicCore v2 - Service Host Client
+Starts, supervises and talks to the service host process.
+"""
+import itertools
+import logging
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+from ..metrics import default_registry
+from ..output import log as output_log
+from .protocol import (
+    REQUEST, RESULT, ERROR, CANCEL, CANCELLED,
+    FrameReader, decode, discard, encode, send_frame
+)
+
+
+log = logging.getLogger(__name__)
+
+# Directory holding the `src` package, put on the host's PYTHONPATH
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__)))))
+
+
+class HostError(Exception):
+    """A request failed inside the host."""
+
+    def __init__(self, type_name, message, remote_traceback=""):
+        super().__init__(f"{type_name}: {message}")
+        self.type_name = type_name
+        self.remote_traceback = remote_traceback
+
+
+class HostUnavailable(HostError):
+    """The host is not running or exited while the request was in flight."""
+
+    def __init__(self, message):
+        super().__init__("HostUnavailable", message)
+
+
+class HostBusy(Exception):
+    """No request slot became free within the timeout."""
+
+
+class HostFuture(Future):
+    """Result of a host request; `cancel()` also cancels it in the host."""
+
+    def __init__(self, client, request_id, method):
+        super().__init__()
+        self.client = client
+        self.request_id = request_id
+        self.method = method
+        self.started = time.perf_counter()
+
+    def cancel(self):
+        if not super().cancel():
+            return False
+        self.client._cancel(self)
+        return True
+
+
+class _Connection:
+    """One host process and its socket."""
+
+    def __init__(self, proc, sock):
+        self.proc = proc
+        self.sock = sock
+        self.pending = {}   # request id -> HostFuture
+        self.closed = False
+
+
+class HostClient:
+    """
+    Supervised connection to the service host.
+
+    The host runs as `python -m src.services.host` on one end of a
+    Unix socket pair. Requests go out as binary frames, each holding one
+    of `max_inflight` slots until the host answers; `submit` blocks for
+    a slot, so a producer cannot queue unbounded work. If the host
+    exits, pending requests fail with HostUnavailable and it is started
+    again with exponential backoff, up to `max_restarts` per
+    `restart_window` seconds.
+    """
+
+    def __init__(self, workers=None, max_inflight=64, max_restarts=5,
+                 restart_window=60.0, backoff=(0.1, 5.0)):
+        self.workers = workers or max(2, os.cpu_count() or 2)
+        self.max_inflight = max_inflight
+        self.max_restarts = max_restarts
+        self.restart_window = restart_window
+        self.backoff = backoff
+        self.restarts = 0
+        self._restart_times = []
+        self._slots = threading.BoundedSemaphore(max_inflight)
+        self._ids = itertools.count(1)
+        self._send_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._started = False
+        self._ready = threading.Event()
+        self._stopping = threading.Event()
+
+    @property
+    def pid(self):
+        conn = self._conn
+        return conn.proc.pid if conn is not None else None
+
+    def is_running(self):
+        return self._ready.is_set()
+
+    # --- Lifecycle ------------------------------------------------------
+
+    def start(self):
+        """Start the host process (returns without waiting for it)."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        self._stopping.clear()
+        self._spawn()
+
+    def _spawn(self):
+        parent, child = socket.socketpair(socket.AF_UNIX, socket.SOCK_STREAM)
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            p for p in (ROOT, env.get("PYTHONPATH")) if p)
+        try:
+            proc = subprocess.Popen(
+                [sys.executable, "-m", "src.services.host",
+                 "--fd", str(child.fileno()), "--workers", str(self.workers)],
+                pass_fds=(child.fileno(),), env=env, stdin=subprocess.DEVNULL,
+            )
+        except OSError:
+            parent.close()
+            log.exception("cannot start service host")
+            return
+        finally:
+            child.close()
+        conn = _Connection(proc, parent)
+        self._conn = conn
+        self._ready.set()
+        threading.Thread(target=self._read_loop, args=(conn,),
+                         name="host-reader", daemon=True).start()
+
+    def stop(self, timeout=2.0):
+        """Close the connection and wait for the host to exit."""
+        self._stopping.set()
+        self._ready.clear()
+        self._started = False
+        conn, self._conn = self._conn, None
+        if conn is None:
+            return
+        self._close(conn)
+        try:
+            conn.proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            conn.proc.kill()
+            conn.proc.wait()
+
+    def _close(self, conn):
+        with self._lock:
+            if conn.closed:
+                return
+            conn.closed = True
+        try:
+            conn.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        conn.sock.close()
+
+    # --- Requests -------------------------------------------------------
+
+    def submit(self, method, *args, timeout=None):
+        """
+        Send a request; returns a HostFuture.
+
+        Starts the host on first use. Blocks while `max_inflight`
+        requests are outstanding and raises HostBusy if no slot frees up
+        within `timeout` seconds.
+        """
+        if not self._started:
+            self.start()
+        if not self._slots.acquire(timeout=timeout):
+            raise HostBusy(f"{self.max_inflight} requests in flight")
+        if not self._ready.wait(5.0 if timeout is None else timeout):
+            self._slots.release()
+            raise HostUnavailable("service host is not running")
+        request_id = next(self._ids) & 0xFFFFFFFF
+        future = HostFuture(self, request_id, method)
+        flags, body = encode((method, args))
+        with self._lock:
+            conn = self._conn
+            if conn is None or conn.closed:
+                conn = None
+            else:
+                conn.pending[request_id] = future
+        if conn is None:
+            discard(flags, body)
+            self._slots.release()
+            raise HostUnavailable("service host is restarting")
+        try:
+            with self._send_lock:
+                send_frame(conn.sock, request_id, REQUEST, flags, body)
+        except OSError:
+            # The reader notices the broken connection and fails `future`
+            discard(flags, body)
+        return future
+
+    def call(self, method, *args, timeout=None):
+        """Run a request and wait for its result."""
+        future = self.submit(method, *args, timeout=timeout)
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            future.cancel()
+            raise
+
+    def _cancel(self, future):
+        conn = self._conn
+        if conn is None or future.request_id not in conn.pending:
+            return
+        try:
+            with self._send_lock:
+                send_frame(conn.sock, future.request_id, CANCEL)
+        except OSError:
+            pass
+
+    # --- Reader thread --------------------------------------------------
+
+    def _read_loop(self, conn):
+        reader = FrameReader(conn.sock)
+        try:
+            while True:
+                frame = reader.read()
+                if frame is None:
+                    break
+                self._dispatch(conn, *frame)
+        except Exception:
+            if not conn.closed:
+                log.exception("service host connection failed")
+        self._on_disconnect(conn)
+
+    def _dispatch(self, conn, request_id, kind, flags, body):
+        with self._lock:
+            future = conn.pending.pop(request_id, None)
+        if future is None:
+            # Decoding frees any shared memory the reply carries
+            if kind == RESULT:
+                decode(flags, body)
+            else:
+                discard(flags, body)
+            return
+        self._slots.release()
+        default_registry.observe("host.latency_ms",
+                                 (time.perf_counter() - future.started) * 1000.0)
+        if future.cancelled():
+            if kind == RESULT:
+                decode(flags, body)
+            else:
+                discard(flags, body)
+        elif kind == RESULT:
+            try:
+                future.set_result(decode(flags, body))
+            except Exception as e:
+                future.set_exception(e)
+        elif kind == ERROR:
+            future.set_exception(HostError(*decode(flags, body)))
+        elif kind == CANCELLED:
+            future.set_exception(HostError("Cancelled", f"{future.method} was cancelled"))
+
+    def _on_disconnect(self, conn):
+        self._close(conn)
+        with self._lock:
+            pending, conn.pending = conn.pending, {}
+            if self._conn is conn:
+                self._conn = None
+                self._ready.clear()
+        for future in pending.values():
+            self._slots.release()
+            if not future.cancelled():
+                future.set_exception(HostUnavailable("service host exited"))
+        code = conn.proc.wait()
+        if self._stopping.is_set():
+            return
+        log.warning("service host exited with code %s", code)
+        output_log("LogicCore", f"Service host exited with code {code}")
+        self._restart()
+
+    def _restart(self):
+        now = time.monotonic()
+        self._restart_times = [t for t in self._restart_times
+                               if now - t < self.restart_window]
+        if len(self._restart_times) >= self.max_restarts:
+            output_log("LogicCore", "Service host keeps crashing; not restarting")
+            return
+        low, high = self.backoff
+        delay = min(high, low * (2 ** len(self._restart_times)))
+        self._restart_times.append(now)
+        if self._stopping.wait(delay):
+            return
+        self.restarts += 1
+        default_registry.incr("host.restarts")
+        self._spawn()
+
+
+default_host = HostClient()
@@ -0,0 +1,113 @@
+"""
+LogicCore v2 - Service Host Handlers
+Methods the service host exposes to the GUI.
+"""
+import os
+import threading
+import time
+
+from .protocol import SharedBlob, encode
+
+
+HANDLERS = {}
+# Methods run in the host's process pool rather than on its threads
+IN_PROCESS = set()
+
+
+class Cancelled(Exception):
+    """Raised inside a handler whose request was cancelled."""
+
+
+class CancelToken:
+    """Passed to every handler; long-running handlers poll it."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def check(self):
+        if self._event.is_set():
+            raise Cancelled()
+
+    def wait(self, seconds):
+        """Sleep up to `seconds`; True if cancelled meanwhile."""
+        return self._event.wait(seconds)
+
+
+def handler(name, in_process=False):
+    """
+    Register `func(token, *args)` as host method `name`. CPU-bound
+    methods pass `in_process`; they run in a worker process, take no
+    token and can only be cancelled before they start.
+    """
+    def register(func):
+        HANDLERS[name] = func
+        if in_process:
+            IN_PROCESS.add(name)
+        return func
+    return register
+
+
+def call_in_process(method, args):
+    """Worker process entry point: run `method`, encode its result."""
+    # Written to shared memory here, so a large result is not copied
+    # through the host on its way to the GUI
+    return encode(HANDLERS[method](*args))
+
+
+@handler("ping")
+def ping(token):
+    return "pong"
+
+
+@handler("echo")
+def echo(token, value):
+    return value
+
+
+@handler("sleep")
+def sleep(token, seconds):
+    """Wait `seconds`, or until cancelled."""
+    start = time.monotonic()
+    if token.wait(seconds):
+        raise Cancelled()
+    return time.monotonic() - start
+
+
+@handler("read_file")
+def read_file(token, path):
+    """File contents as a SharedBlob, read straight into shared memory."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        blob = SharedBlob(size)
+        try:
+            view = blob.buf
+            done = 0
+            while done < size:
+                token.check()
+                n = f.readinto(view[done:done + (8 << 20)])
+                if not n:
+                    break
+                done += n
+        except BaseException:
+            blob.release()
+            raise
+    return blob
+
+
+@handler("symbols.index_chunk", in_process=True)
+def index_symbols(root, files):
+    from .. import symbols
+    return symbols.index_chunk(root, files)
+
+
+@handler("retrieval.chunk_files", in_process=True)
+def chunk_files(root, files):
+    from .. import retrieval
+    return retrieval.chunk_files(root, files)
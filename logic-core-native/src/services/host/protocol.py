@@ -0,0 +1,349 @@
+"""
+LogicCore v2 - Service Host Protocol
+Binary framing and shared-memory payloads for the GUI <-> host channel.
+
+Every frame is a 12-byte header followed by the body:
+
+    u32 body length | u32 request id | u8 kind | u8 flags | u16 reserved
+
+Bodies are pickles. A pickle larger than SHM_THRESHOLD is written to a
+shared memory segment and only the segment name travels on the socket
+(FLAG_SHM); the receiver unpickles straight from the mapping. Sending a
+segment hands it over: the receiver keeps it and writes its own next
+large body into it, so big transfers reuse pages that are already
+faulted in rather than paying for fresh ones every time.
+
+A `SharedBlob` pickles as its segment name, so a blob passed as an
+argument or returned from a handler is not copied at all.
+"""
+import atexit
+import mmap
+import os
+import pickle
+import secrets
+import struct
+import sys
+import threading
+from multiprocessing import resource_tracker, shared_memory
+
+import _posixshmem
+
+
+HEADER = struct.Struct("<IIBBH")
+
+# Frame kinds
+REQUEST = 1     # body: (method, args)
+RESULT = 2      # body: result
+ERROR = 3       # body: (exception type name, message, traceback text)
+CANCEL = 4      # no body; cancels request id
+CANCELLED = 5   # no body; the host dropped request id
+
+# Frame flags
+FLAG_SHM = 1
+
+# Pickles at least this large go through shared memory
+SHM_THRESHOLD = 64 * 1024
+# Inline bodies larger than this are a protocol error
+MAX_INLINE = 16 * 1024 * 1024
+
+SHM_PREFIX = "lc_"
+# New segments are sized in steps of this, so they fit later bodies
+SEGMENT_ALIGN = 1 << 20
+# Received segments kept for reuse
+SEGMENT_CACHE = 4
+SEGMENT_CACHE_BYTES = 128 << 20
+
+# Body of a FLAG_SHM frame: pickle length, segment size, then the name
+_SHM_REF = struct.Struct("<QQ")
+
+# Fault the pages of a mapping in up front rather than one at a time
+_POPULATE = getattr(mmap, "MAP_POPULATE", 0)
+
+
+class ProtocolError(Exception):
+    """The peer sent a malformed frame."""
+
+
+def _open_shm(name=None, size=0):
+    """Create (name=None) or attach a segment that we unlink ourselves."""
+    if name is None:
+        name = SHM_PREFIX + secrets.token_hex(8)
+        create = True
+    else:
+        create = False
+    if sys.version_info >= (3, 13):
+        return shared_memory.SharedMemory(name, create=create, size=size, track=False)
+    shm = shared_memory.SharedMemory(name, create=create, size=size)
+    # Older versions register every segment with the resource tracker,
+    # which would unlink it when this process exits or warn about leaks
+    try:
+        resource_tracker.unregister(shm._name, "shared_memory")
+    except Exception:
+        pass
+    return shm
+
+
+class SharedBlob:
+    """
+    A byte buffer living in shared memory.
+
+    Either side creates one, fills `buf` (e.g. with `readinto`) and
+    passes it in a request or returns it from a handler; only the
+    segment name is pickled. The receiver maps the same pages; call
+    `release()` (or drop the last reference) to unmap and unlink the
+    segment. Pickling a blob hands it over, so the sending side then
+    only unmaps its copy of the mapping, even if it received the blob
+    itself (e.g. a handler returning its argument).
+    """
+
+    def __init__(self, size, name=None):
+        self.size = size
+        self._shm = _open_shm(name, max(1, size))
+        self.name = self._shm.name
+        # Received blobs are unlinked once dropped; created ones are not
+        self._unlink_on_del = name is not None
+        self.buf = self._shm.buf[:size]
+
+    @classmethod
+    def _attach(cls, name, size):
+        return cls(size, name)
+
+    def __reduce__(self):
+        self._unlink_on_del = False    # The receiver unlinks it
+        return SharedBlob._attach, (self.name, self.size)
+
+    def __len__(self):
+        return self.size
+
+    def tobytes(self):
+        return self.buf.tobytes()
+
+    def detach(self):
+        """Unmap without unlinking (e.g. after handing the blob over)."""
+        if self._shm is not None:
+            self.buf.release()
+            self._shm.close()
+            self._shm = None
+
+    def release(self):
+        """Unmap and unlink the segment."""
+        shm = self._shm
+        if shm is None:
+            return
+        self.detach()
+        try:
+            _unlink(shm.name)
+        except FileNotFoundError:
+            pass
+
+    def __del__(self):
+        try:
+            if self._unlink_on_del:
+                self.release()
+            else:
+                self.detach()
+        except Exception:
+            pass
+
+
+def _unlink(name):
+    # SharedMemory.unlink() would also talk to the resource tracker
+    _posixshmem.shm_unlink("/" + name)
+
+
+# --- Segments ---------------------------------------------------------------
+
+def _create_segment(size):
+    name = SHM_PREFIX + secrets.token_hex(8)
+    fd = _posixshmem.shm_open("/" + name, os.O_CREAT | os.O_EXCL | os.O_RDWR, 0o600)
+    try:
+        os.ftruncate(fd, size)
+    except OSError:
+        _unlink(name)
+        raise
+    finally:
+        os.close(fd)
+    return name
+
+
+def _map_segment(name, length):
+    """Map the first `length` bytes of a segment, pages faulted in."""
+    fd = _posixshmem.shm_open("/" + name, os.O_RDWR, 0o600)
+    try:
+        return mmap.mmap(fd, length, flags=mmap.MAP_SHARED | _POPULATE)
+    finally:
+        os.close(fd)
+
+
+class _SegmentCache:
+    """
+    Segments this process received, to write its next large bodies into.
+
+    Whoever holds a segment is its only user: `take` removes it from the
+    cache before the body is written and the frame then hands it to the
+    peer, which puts it in its own cache once it has read it.
+    """
+
+    def __init__(self, max_count=SEGMENT_CACHE, max_bytes=SEGMENT_CACHE_BYTES):
+        self.max_count = max_count
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._segments = []     # (size, name), oldest first
+
+    def take(self, length):
+        """(name, size) of a segment holding at least `length` bytes."""
+        with self._lock:
+            fits = [entry for entry in self._segments if entry[0] >= length]
+            if fits:
+                entry = min(fits)
+                self._segments.remove(entry)
+                return entry[1], entry[0]
+        size = -(-length // SEGMENT_ALIGN) * SEGMENT_ALIGN
+        return _create_segment(size), size
+
+    def give(self, name, size):
+        """Keep a segment for reuse, unlinking the oldest beyond the limits."""
+        evicted = []
+        with self._lock:
+            self._segments.append((size, name))
+            while (len(self._segments) > self.max_count
+                   or sum(entry[0] for entry in self._segments) > self.max_bytes):
+                evicted.append(self._segments.pop(0))
+        for _, old in evicted:
+            _unlink_quietly(old)
+
+    def clear(self):
+        with self._lock:
+            segments, self._segments = self._segments, []
+        for _, name in segments:
+            _unlink_quietly(name)
+
+
+def _unlink_quietly(name):
+    try:
+        _unlink(name)
+    except FileNotFoundError:
+        pass
+
+
+_segments = _SegmentCache()
+atexit.register(_segments.clear)
+
+
+# --- Encoding -------------------------------------------------------------
+
+class _Parts:
+    """File object keeping what a Pickler writes, without joining it."""
+
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def write(self, data):
+        self.parts.append(data)
+        self.size += len(data)
+        return len(data)
+
+
+def encode(obj):
+    """(flags, body bytes) for `obj`."""
+    out = _Parts()
+    # Large bytes objects reach write() as they are, so a big pickle is
+    # copied once, straight into the segment
+    pickle.Pickler(out, protocol=5).dump(obj)
+    if out.size < SHM_THRESHOLD:
+        return 0, b"".join(out.parts)
+    name, size = _segments.take(out.size)
+    try:
+        mapping = _map_segment(name, out.size)
+        try:
+            position = 0
+            for part in out.parts:
+                mapping[position:position + len(part)] = part
+                position += len(part)
+        finally:
+            mapping.close()
+    except BaseException:
+        _unlink_quietly(name)
+        raise
+    return FLAG_SHM, _SHM_REF.pack(out.size, size) + name.encode("ascii")
+
+
+def decode(flags, body):
+    """Object carried by a frame body; keeps its segment for reuse."""
+    if not flags & FLAG_SHM:
+        return pickle.loads(body)
+    length, size = _SHM_REF.unpack_from(body)
+    name = bytes(body[_SHM_REF.size:]).decode("ascii")
+    try:
+        mapping = _map_segment(name, length)
+        try:
+            with memoryview(mapping) as view:
+                obj = pickle.loads(view)
+        finally:
+            mapping.close()
+    except BaseException:
+        _unlink_quietly(name)
+        raise
+    _segments.give(name, size)
+    return obj
+
+
+def discard(flags, body):
+    """Free the segment of a frame that will not be decoded."""
+    if flags & FLAG_SHM:
+        _unlink_quietly(bytes(body[_SHM_REF.size:]).decode("ascii"))
+
+
+# --- Socket I/O -----------------------------------------------------------
+
+def pack(request_id, kind, flags=0, body=b""):
+    return HEADER.pack(len(body), request_id, kind, flags, 0) + body
+
+
+def send_frame(sock, request_id, kind, flags=0, body=b""):
+    sock.sendall(pack(request_id, kind, flags, body))
+
+
+class FrameReader:
+    """Reads whole frames from a blocking socket into a reusable buffer."""
+
+    def __init__(self, sock, bufsize=256 * 1024):
+        self.sock = sock
+        self._buf = bytearray(bufsize)
+        self._view = memoryview(self._buf)
+        self._start = 0
+        self._end = 0
+
+    def _fill(self, need):
+        """Ensure `need` unread bytes; False on EOF."""
+        while self._end - self._start < need:
+            if self._start and self._end == self._start:
+                self._start = self._end = 0
+            if len(self._buf) - self._start < need:
+                # Compact, growing the buffer for big frames
+                pending = self._buf[self._start:self._end]
+                if len(self._buf) < need:
+                    self._buf = bytearray(need)
+                    self._view = memoryview(self._buf)
+                self._buf[:len(pending)] = pending
+                self._start, self._end = 0, len(pending)
+            n = self.sock.recv_into(self._view[self._end:])
+            if n == 0:
+                return False
+            self._end += n
+        return True
+
+    def read(self):
+        """(request id, kind, flags, body bytes), or None at EOF."""
+        if not self._fill(HEADER.size):
+            return None
+        length, request_id, kind, flags, _ = HEADER.unpack_from(self._buf, self._start)
+        if length > MAX_INLINE:
+            raise ProtocolError(f"frame of {length} bytes")
+        self._start += HEADER.size
+        if not self._fill(length):
+            return None
+        body = bytes(self._view[self._start:self._start + length])
+        self._start += length
+        return request_id, kind, flags, body
@@ -0,0 +1,166 @@
+"""
+LogicCore v2 - Service Host Server
+Request loop run inside the host process.
+"""
+import logging
+import multiprocessing
+import threading
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from .handlers import HANDLERS, IN_PROCESS, Cancelled, CancelToken, call_in_process
+from .protocol import (
+    REQUEST, RESULT, ERROR, CANCEL, CANCELLED,
+    FrameReader, SharedBlob, decode, discard, encode, send_frame
+)
+
+
+log = logging.getLogger(__name__)
+
+
+class HostServer:
+    """
+    Serves requests from one GUI connection.
+
+    Requests run on a thread pool, except IN_PROCESS methods, which the
+    thread hands to a pool of `processes` worker processes shared by
+    every window of the GUI. At most `max_pending` requests may be
+    queued or running; beyond that the server stops reading the socket,
+    so the GUI's writes block instead of the host buffering without
+    bound.
+    """
+
+    def __init__(self, sock, workers=4, processes=2, max_pending=256):
+        self.sock = sock
+        self.reader = FrameReader(sock)
+        self.pool = ThreadPoolExecutor(workers, thread_name_prefix="host")
+        self.processes = processes
+        self._process_pool = None
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._send_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._requests = {}     # request id -> (CancelToken, Future)
+
+    def serve(self):
+        """Handle frames until the GUI closes the connection."""
+        try:
+            while True:
+                frame = self.reader.read()
+                if frame is None:
+                    break
+                request_id, kind, flags, body = frame
+                if kind == REQUEST:
+                    self._slots.acquire()
+                    self._start(request_id, flags, body)
+                elif kind == CANCEL:
+                    self._cancel(request_id)
+                else:
+                    discard(flags, body)
+        except OSError:
+            pass
+        finally:
+            with self._lock:
+                for token, _ in self._requests.values():
+                    token.cancel()
+            self.pool.shutdown(wait=True, cancel_futures=True)
+            if self._process_pool is not None:
+                self._process_pool.shutdown(wait=True, cancel_futures=True)
+
+    def _start(self, request_id, flags, body):
+        token = CancelToken()
+        with self._lock:
+            self._requests[request_id] = (token, None)
+            future = self.pool.submit(self._run, request_id, token, flags, body)
+            self._requests[request_id] = (token, future)
+
+    def _cancel(self, request_id):
+        with self._lock:
+            entry = self._requests.get(request_id)
+            if entry is None:
+                return  # already answered
+            token, future = entry
+            token.cancel()
+        if future is not None and future.cancel():
+            self._finish(request_id)
+            self._send(request_id, CANCELLED)
+
+    def _finish(self, request_id):
+        with self._lock:
+            self._requests.pop(request_id, None)
+        self._slots.release()
+
+    def _run(self, request_id, token, flags, body):
+        try:
+            method, args = decode(flags, body)
+            if method in IN_PROCESS:
+                self._run_in_process(request_id, token, method, args)
+                return
+            func = HANDLERS.get(method)
+            if func is None:
+                raise LookupError(f"unknown method: {method}")
+            result = func(token, *args)
+            if token.cancelled:
+                if isinstance(result, SharedBlob):
+                    result.release()
+                raise Cancelled()
+            reply = (RESULT,) + encode(result)
+        except Cancelled:
+            reply = (CANCELLED, 0, b"")
+        except Exception as e:
+            reply = (ERROR,) + encode((type(e).__name__, str(e), traceback.format_exc()))
+        self._finish(request_id)
+        if not self._send(request_id, *reply) and reply[0] == RESULT:
+            if isinstance(result, SharedBlob):
+                result.release()
+
+    # --- Worker processes -----------------------------------------------
+
+    def _executor(self):
+        with self._lock:
+            if self._process_pool is None:
+                # The host runs threads too; never fork it
+                context = multiprocessing.get_context("spawn")
+                self._process_pool = ProcessPoolExecutor(self.processes, mp_context=context)
+            return self._process_pool
+
+    def _run_in_process(self, request_id, token, method, args):
+        """Hand a request to the process pool; the reply is sent when it is done."""
+        future = self._executor().submit(call_in_process, method, args)
+        with self._lock:
+            # A later CANCEL drops it from the queue itself
+            self._requests[request_id] = (token, future)
+            cancelled = token.cancelled
+        if cancelled and future.cancel():
+            self._finish(request_id)
+            self._send(request_id, CANCELLED)
+            return
+        future.add_done_callback(lambda f: self._process_done(request_id, token, f))
+
+    def _process_done(self, request_id, token, future):
+        if future.cancelled():
+            return  # _cancel answered it
+        try:
+            reply = (RESULT,) + future.result()
+        except BrokenProcessPool as e:
+            with self._lock:
+                if self._process_pool is not None and self._process_pool._broken:
+                    self._process_pool = None
+            reply = (ERROR,) + encode((type(e).__name__, str(e), ""))
+        except Exception as e:
+            text = "".join(traceback.format_exception(e))
+            reply = (ERROR,) + encode((type(e).__name__, str(e), text))
+        if token.cancelled:
+            discard(*reply[1:])
+            reply = (CANCELLED, 0, b"")
+        self._finish(request_id)
+        self._send(request_id, *reply)
+
+    def _send(self, request_id, kind, flags=0, body=b""):
+        try:
+            with self._send_lock:
+                send_frame(self.sock, request_id, kind, flags, body)
+            return True
+        except OSError:
+            discard(flags, body)
+            return False
@@ -0,0 +1,151 @@
+"""
+LogicCore v2 - Ignore Rules
+.gitignore matching for workspace-relative paths.
+"""
+import os
+import re
+
+
+def _translate(pattern):
+    """Translate a gitignore glob into a regular expression."""
+    i, n = 0, len(pattern)
+    out = []
+    while i < n:
+        c = pattern[i]
+        if c == "*":
+            if pattern[i:i + 3] == "**/":
+                out.append("(?:.*/)?")
+                i += 3
+                continue
+            if pattern[i:i + 2] == "**":
+                out.append(".*")
+                i += 2
+                continue
+            out.append("[^/]*")
+        elif c == "?":
+            out.append("[^/]")
+        elif c == "[":
+            j = pattern.find("]", i + 1)
+            if j == -1:
+                out.append(re.escape(c))
+            else:
+                body = pattern[i + 1:j]
+                if body.startswith("!"):
+                    body = "^" + body[1:]
+                out.append(f"[{body}]")
+                i = j
+        elif c == "\\" and i + 1 < n:
+            i += 1
+            out.append(re.escape(pattern[i]))
+        else:
+            out.append(re.escape(c))
+        i += 1
+    return "".join(out)
+
+
+class IgnoreRule:
+    """One line of a .gitignore file."""
+
+    __slots__ = ("base", "negate", "dir_only", "anchored", "regex")
+
+    def __init__(self, base, line):
+        self.base = base
+        self.negate = line.startswith("!")
+        if self.negate:
+            line = line[1:]
+        self.dir_only = line.endswith("/")
+        line = line.rstrip("/")
+        self.anchored = "/" in line
+        line = line.lstrip("/")
+        self.regex = re.compile(_translate(line))
+
+    def matches(self, rel, is_dir):
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not rel.startswith(self.base + "/"):
+                return False
+            rel = rel[len(self.base) + 1:]
+        if self.anchored:
+            return self.regex.fullmatch(rel) is not None
+        return self.regex.fullmatch(rel.rpartition("/")[2]) is not None
+
+
+def parse_gitignore(text, base=""):
+    """Parse .gitignore contents into rules relative to `base`."""
+    rules = []
+    for line in text.splitlines():
+        if not line.strip() or line.startswith("#"):
+            continue
+        if not line.endswith("\\ "):
+            line = line.rstrip()
+        rules.append(IgnoreRule(base, line))
+    return rules
+
+
+class IgnoreRules:
+    """
+    .gitignore rules of a workspace.
+
+    Nested .gitignore files are read lazily the first time a path
+    below their directory is checked. Directory verdicts are cached,
+    so checking every file of a large tree stays cheap.
+    """
+
+    def __init__(self, root, extra_patterns=(".git/",)):
+        self.root = os.path.abspath(root)
+        self._extra = parse_gitignore("\n".join(extra_patterns))
+        self._rules = {}
+        self._dir_cache = {}
+
+    def _rules_for(self, rel_dir):
+        rules = self._rules.get(rel_dir)
+        if rules is None:
+            path = os.path.join(self.root, *rel_dir.split("/"), ".gitignore")
+            try:
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    rules = parse_gitignore(f.read(), rel_dir)
+            except OSError:
+                rules = []
+            self._rules[rel_dir] = rules
+        return rules
+
+    def _match(self, rel, is_dir):
+        ignored = False
+        for rule in self._extra:
+            if rule.matches(rel, is_dir):
+                ignored = not rule.negate
+        parts = rel.split("/")
+        for depth in range(len(parts)):
+            rel_dir = "/".join(parts[:depth])
+            for rule in self._rules_for(rel_dir):
+                if rule.matches(rel, is_dir):
+                    ignored = not rule.negate
+        return ignored
+
+    def is_dir_ignored(self, rel):
+        cached = self._dir_cache.get(rel)
+        if cached is None:
+            parent = rel.rpartition("/")[0]
+            cached = (bool(parent) and self.is_dir_ignored(parent)) or self._match(rel, True)
+            self._dir_cache[rel] = cached
+        return cached
+
+    def is_ignored(self, rel, is_dir=False):
+        """True if the workspace-relative path is excluded by .gitignore."""
+        if is_dir:
+            return self.is_dir_ignored(rel)
+        parent = rel.rpartition("/")[0]
+        if parent and self.is_dir_ignored(parent):
+            return True
+        return self._match(rel, False)
+
+    def add_patterns(self, text):
+        """Add root-level gitignore-style patterns (e.g. .git/info/exclude)."""
+        self._extra += parse_gitignore(text)
+        self._dir_cache.clear()
+
+    def invalidate(self):
+        """Forget parsed rules after a .gitignore file changed."""
+        self._rules.clear()
+        self._dir_cache.clear()
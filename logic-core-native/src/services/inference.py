@@ -0,0 +1,340 @@
+"""
+LogicCore v2 - Inference Gateway
+Coalesced, micro-batched and cached calls to a local model.
+"""
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+from .metrics import default_registry
+from .paths import cache_dir
+
+
+log = logging.getLogger(__name__)
+
+MAX_BATCH = 16
+# Longest a request waits for others to share its batch
+MAX_WAIT = 0.010
+CACHE_ENTRIES = 4096
+CACHE_TTL = 24 * 3600.0
+
+
+class LocalModel:
+    """
+    What the gateway calls: `generate(prompts, params)` returns one
+    response per prompt, all produced with the same `params`, and
+    `stream(prompt, params)` yields one response piece by piece.
+    """
+
+    name = "model"
+    max_batch = MAX_BATCH
+
+    def generate(self, prompts, params):
+        raise NotImplementedError
+
+    def stream(self, prompt, params):
+        yield self.generate([prompt], params)[0]
+
+
+class StandInModel(LocalModel):
+    """
+    Deterministic local stand-in for a real model.
+
+    A call costs `latency` seconds plus `per_prompt` for each prompt,
+    like a batched forward pass, and answers with a digest of the
+    prompt so identical prompts get identical responses.
+    """
+
+    name = "stand-in"
+
+    def __init__(self, latency=0.020, per_prompt=0.002, max_batch=MAX_BATCH, per_token=0.005):
+        self.latency = latency
+        self.per_prompt = per_prompt
+        self.max_batch = max_batch
+        self.per_token = per_token
+        self.calls = 0
+
+    def generate(self, prompts, params):
+        self.calls += 1
+        time.sleep(self.latency + self.per_prompt * len(prompts))
+        return [f"[{self.name}] {len(p)} chars, "
+                f"{hashlib.blake2b(p.encode('utf-8'), digest_size=6).hexdigest()}"
+                for p in prompts]
+
+    def stream(self, prompt, params):
+        """The response as words, `per_token` seconds apart."""
+        self.calls += 1
+        time.sleep(self.latency)
+        words = self.generate([prompt], params)[0].split(" ")
+        for i, word in enumerate(words):
+            time.sleep(self.per_token)
+            yield word if i == 0 else " " + word
+
+
+class ResponseCache:
+    """
+    Prompt -> response cache: an in-memory LRU in front of an SQLite
+    store, both with a time to live.
+
+    Disk entries are written in batches by `put_many` and survive
+    restarts; a disk hit is copied back into memory. Expired rows are
+    purged when the store opens and every `purge_every` writes.
+    """
+
+    def __init__(self, path=None, entries=CACHE_ENTRIES, ttl=CACHE_TTL, purge_every=1000):
+        self.entries = entries
+        self.ttl = ttl
+        self.purge_every = purge_every
+        self._memory = OrderedDict()    # key -> (response, expires)
+        self._lock = threading.Lock()
+        self._writes = 0
+        self._db = None
+        if path is not None:
+            try:
+                self._db = sqlite3.connect(path, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL")
+                self._db.execute("PRAGMA synchronous=NORMAL")
+                self._db.execute("CREATE TABLE IF NOT EXISTS responses "
+                                 "(key TEXT PRIMARY KEY, response TEXT, expires REAL)")
+                self._purge()
+            except sqlite3.Error as e:
+                log.warning("response cache %s unavailable: %s", path, e)
+                self._db = None
+
+    @classmethod
+    def default(cls):
+        return cls(os.path.join(cache_dir("inference"), "responses.sqlite"))
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    return entry[0]
+                del self._memory[key]
+            if self._db is None:
+                return None
+            try:
+                row = self._db.execute("SELECT response, expires FROM responses WHERE key = ?",
+                                       (key,)).fetchone()
+            except sqlite3.Error as e:
+                log.warning("response cache read failed: %s", e)
+                return None
+            if row is None or row[1] <= now:
+                return None
+            self._remember(key, row[0], row[1])
+            return row[0]
+
+    def put_many(self, items):
+        """Store [(key, response)]."""
+        expires = time.time() + self.ttl
+        with self._lock:
+            for key, response in items:
+                self._remember(key, response, expires)
+            if self._db is None:
+                return
+            try:
+                with self._db:
+                    self._db.executemany("INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                                         [(key, response, expires) for key, response in items])
+            except sqlite3.Error as e:
+                log.warning("response cache write failed: %s", e)
+                return
+            self._writes += len(items)
+            if self._writes >= self.purge_every:
+                self._writes = 0
+                self._purge()
+
+    def _remember(self, key, response, expires):
+        self._memory[key] = (response, expires)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.entries:
+            self._memory.popitem(last=False)
+
+    def _purge(self):
+        with self._db:
+            self._db.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class _Request:
+    __slots__ = ("key", "prompt", "params", "group", "future", "queued", "cache")
+
+    def __init__(self, key, prompt, params, group, cache):
+        self.key = key
+        self.prompt = prompt
+        self.params = params
+        self.group = group
+        self.future = Future()
+        self.queued = time.perf_counter()
+        self.cache = cache
+
+
+class InferenceGateway:
+    """
+    Single entry point for model calls from every feature.
+
+    `submit` answers from the response cache when it can. Otherwise a
+    request identical to one already in flight shares its Future
+    instead of calling the model again. The rest queue for a batcher
+    thread, which groups requests with the same parameters into a
+    batch of up to `max_batch` prompts. The batch is sent once it is
+    full or its oldest request has waited `max_wait` seconds, so a lone
+    request is delayed by at most that much. The hit rate, batch sizes
+    and time spent queued are reported to the metrics registry.
+    """
+
+    def __init__(self, model, cache=None, max_batch=None, max_wait=MAX_WAIT,
+                 registry=default_registry):
+        self.model = model
+        self.cache = cache
+        self.max_batch = max_batch or model.max_batch
+        self.max_wait = max_wait
+        self.registry = registry
+        self._queue = []
+        self._inflight = {}     # key -> Future
+        self._wake = threading.Condition()
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name="Inference", daemon=True)
+        self._thread.start()
+
+    def key(self, prompt, params):
+        text = json.dumps([self.model.name, prompt, params], sort_keys=True, separators=(",", ":"))
+        return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+    def submit(self, prompt, params=None, use_cache=True):
+        """
+        Ask for a response to `prompt`; returns a Future of the text.
+
+        Pass `use_cache=False` for sampled (non-deterministic) calls
+        whose answer should not be reused.
+        """
+        params = params or {}
+        key = self.key(prompt, params)
+        registry = self.registry
+        registry.incr("inference.requests")
+        if use_cache and self.cache is not None:
+            response = self.cache.get(key)
+            registry.observe("inference.hit_pct", 0.0 if response is None else 100.0)
+            if response is not None:
+                future = Future()
+                future.set_result(response)
+                return future
+        with self._wake:
+            if self._stopping:
+                raise RuntimeError("inference gateway is shut down")
+            # Sampled calls neither share a running request nor offer theirs
+            future = self._inflight.get(key) if use_cache else None
+            if future is not None:
+                registry.incr("inference.coalesced")
+                return future
+            group = json.dumps(params, sort_keys=True)
+            request = _Request(key, prompt, params, group, use_cache)
+            if use_cache:
+                self._inflight[key] = request.future
+            self._queue.append(request)
+            self._wake.notify()
+        return request.future
+
+    def generate(self, prompt, params=None, timeout=None):
+        """Blocking form of `submit`."""
+        return self.submit(prompt, params).result(timeout)
+
+    def stream(self, prompt, params=None, use_cache=True):
+        """
+        Yield the response to `prompt` as the model produces it; a
+        cached response comes out in one piece. Streamed calls are not
+        batched, but their full response is cached like any other.
+        """
+        params = params or {}
+        key = self.key(prompt, params)
+        self.registry.incr("inference.requests")
+        if use_cache and self.cache is not None:
+            response = self.cache.get(key)
+            self.registry.observe("inference.hit_pct", 0.0 if response is None else 100.0)
+            if response is not None:
+                yield response
+                return
+        pieces = []
+        for piece in self.model.stream(prompt, params):
+            pieces.append(piece)
+            yield piece
+        if use_cache and self.cache is not None:
+            self.cache.put_many([(key, "".join(pieces))])
+
+    def _next_batch(self):
+        """Wait for a batch to be due; None when shutting down."""
+        with self._wake:
+            while True:
+                if self._stopping:
+                    return None
+                if not self._queue:
+                    self._wake.wait()
+                    continue
+                first = self._queue[0]
+                batch = [r for r in self._queue if r.group == first.group][:self.max_batch]
+                due = first.queued + self.max_wait - time.perf_counter()
+                if len(batch) >= self.max_batch or due <= 0:
+                    taken = set(map(id, batch))
+                    self._queue = [r for r in self._queue if id(r) not in taken]
+                    return batch
+                self._wake.wait(due)
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            started = time.perf_counter()
+            for request in batch:
+                self.registry.observe("inference.queue_ms", (started - request.queued) * 1000.0)
+            self.registry.observe("inference.batch_size", len(batch))
+            try:
+                responses = self.model.generate([r.prompt for r in batch], batch[0].params)
+                if len(responses) != len(batch):
+                    raise RuntimeError(f"model returned {len(responses)} responses "
+                                       f"for {len(batch)} prompts")
+            except Exception as e:
+                log.warning("model call failed: %s", e)
+                self._finish(batch, exception=e)
+                continue
+            self.registry.observe("inference.model_ms", (time.perf_counter() - started) * 1000.0)
+            if self.cache is not None:
+                self.cache.put_many([(r.key, text) for r, text in zip(batch, responses) if r.cache])
+            self._finish(batch, responses)
+
+    def _finish(self, batch, responses=None, exception=None):
+        with self._wake:
+            for request in batch:
+                if self._inflight.get(request.key) is request.future:
+                    del self._inflight[request.key]
+        for i, request in enumerate(batch):
+            if exception is not None:
+                request.future.set_exception(exception)
+            else:
+                request.future.set_result(responses[i])
+
+    def shutdown(self):
+        """Stop the batcher; queued requests fail with RuntimeError."""
+        with self._wake:
+            self._stopping = True
+            queued, self._queue = self._queue, []
+            self._wake.notify()
+        self._thread.join(timeout=2)
+        self._finish(queued, exception=RuntimeError("inference gateway is shut down"))
+        if self.cache is not None:
+            self.cache.close()
+
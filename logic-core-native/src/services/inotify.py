@@ -0,0 +1,89 @@
+"""
+LogicCore v2 - inotify
+Minimal ctypes binding to the Linux inotify API.
+"""
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+
+
+IN_ACCESS = 0x00000001
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_DONT_FOLLOW = 0x02000000
+IN_ISDIR = 0x40000000
+
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def is_supported():
+    return sys.platform.startswith("linux") and ctypes.util.find_library("c") is not None
+
+
+class Inotify:
+    """An inotify instance with a blocking-with-timeout event reader."""
+
+    def __init__(self):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self._libc.inotify_rm_watch.argtypes = [ctypes.c_int, ctypes.c_int]
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+
+    def add_watch(self, path, mask):
+        """Watch a path; returns the watch descriptor."""
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), mask)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), path)
+        return wd
+
+    def rm_watch(self, wd):
+        if self._libc.inotify_rm_watch(self.fd, wd) < 0:
+            err = ctypes.get_errno()
+            if err != errno.EINVAL:
+                raise OSError(err, os.strerror(err))
+
+    def read_events(self, timeout=None):
+        """Wait up to `timeout` seconds and return (wd, mask, cookie, name) tuples."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return []
+        events = []
+        while True:
+            try:
+                data = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+                offset += _EVENT_HEADER.size
+                name = data[offset:offset + length].rstrip(b"\0")
+                offset += length
+                events.append((wd, mask, cookie, os.fsdecode(name)))
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
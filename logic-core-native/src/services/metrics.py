@@ -0,0 +1,242 @@
+"""
+LogicCore v2 - Metrics
+Process and system metrics sampled from /proc into fixed-size rings.
+"""
+import logging
+import os
+import threading
+import time
+from array import array
+
+from .timeseries import TimeSeries
+
+
+log = logging.getLogger(__name__)
+
+# Samples kept per series
+RING_SIZE = 600
+
+
+class Ring:
+    """Fixed-size ring of (timestamp, value) samples backed by arrays."""
+
+    def __init__(self, capacity=RING_SIZE):
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self.head = 0   # next write position
+        self.count = 0
+
+    def append(self, t, value):
+        self.times[self.head] = t
+        self.values[self.head] = value
+        self.head = (self.head + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def last(self, default=0.0):
+        if not self.count:
+            return default
+        return self.values[self.head - 1]
+
+    def samples(self):
+        """(times, values) arrays in chronological order."""
+        if self.count < self.capacity:
+            return self.times[:self.count], self.values[:self.count]
+        h = self.head
+        return self.times[h:] + self.times[:h], self.values[h:] + self.values[:h]
+
+
+class MetricsRegistry:
+    """
+    Named sample series plus counters and observations.
+
+    Counters and observations are accumulated by any thread and turned
+    into per-second rates and means each time the sampler ticks. Every
+    sample also goes into a rolled-up TimeSeries for long history.
+    """
+
+    def __init__(self):
+        self._series = {}
+        self._history = {}
+        self._counters = {}
+        self._observations = {}
+        self._lock = threading.Lock()
+
+    def series(self, name):
+        ring = self._series.get(name)
+        if ring is None:
+            with self._lock:
+                ring = self._series.setdefault(name, Ring())
+        return ring
+
+    def history(self, name):
+        """Rolled-up TimeSeries for series `name`."""
+        series = self._history.get(name)
+        if series is None:
+            with self._lock:
+                series = self._history.setdefault(name, TimeSeries())
+        return series
+
+    def names(self):
+        with self._lock:
+            return list(self._series)
+
+    def record(self, name, value, t=None):
+        """Append one sample to series `name`."""
+        t = time.time() if t is None else t
+        self.series(name).append(t, value)
+        self.history(name).add(t, value)
+
+    def last(self, name, default=0.0):
+        ring = self._series.get(name)
+        return default if ring is None else ring.last(default)
+
+    def incr(self, name, n=1):
+        """Count an event; reported as `name` per second."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + n
+
+    def observe(self, name, value):
+        """Add an observation; reported as the mean per tick."""
+        with self._lock:
+            total, count = self._observations.get(name, (0.0, 0))
+            self._observations[name] = (total + value, count + 1)
+
+    def record_request(self, latency):
+        """One handled request taking `latency` seconds."""
+        self.incr("requests")
+        self.observe("latency_ms", latency * 1000.0)
+
+    def collect(self, t, dt):
+        """Fold counters and observations into series (sampler thread)."""
+        with self._lock:
+            counters, self._counters = self._counters, {}
+            observations, self._observations = self._observations, {}
+            for name in self._series:
+                if name.endswith("/s") and name[:-2] not in counters:
+                    counters[name[:-2]] = 0
+        for name, n in counters.items():
+            self.record(name + "/s", n / dt if dt > 0 else 0.0, t)
+        for name, (total, count) in observations.items():
+            self.record(name, total / count, t)
+
+
+def _read(fd):
+    return os.pread(fd, 4096, 0)
+
+
+class ProcSampler:
+    """
+    Background thread reading /proc/self/stat, /proc/self/status and
+    /proc/stat once per interval.
+
+    The files stay open and are re-read with pread, so a tick costs a
+    few syscalls. The sampler times itself with thread_time and backs
+    off its interval while its own CPU use is over `budget`.
+    """
+
+    def __init__(self, registry, interval=1.0, budget=0.005, max_interval=10.0):
+        self.registry = registry
+        self.base_interval = interval
+        self.interval = interval
+        self.budget = budget
+        self.max_interval = max_interval
+        self.ticks = os.sysconf("SC_CLK_TCK")
+        self.page_size = os.sysconf("SC_PAGE_SIZE")
+        self.cpus = os.cpu_count() or 1
+        self._stop = threading.Event()
+        self._thread = None
+        self._fds = []
+        self._prev = None
+
+    @staticmethod
+    def is_supported():
+        return os.path.exists("/proc/self/stat")
+
+    def start(self):
+        """Start sampling (again, after `stop`); False where /proc is missing."""
+        if not self.is_supported():
+            return False
+        if self._thread is not None:
+            return True
+        self._stop.clear()
+        self._prev = None
+        self._fds = [os.open(p, os.O_RDONLY) for p in
+                     ("/proc/self/stat", "/proc/self/status", "/proc/stat")]
+        self._thread = threading.Thread(target=self._run, name="MetricsSampler", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+        for fd in self._fds:
+            os.close(fd)
+        self._fds = []
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.thread_time()
+            try:
+                self.sample()
+            except Exception:
+                log.exception("metrics sample failed")
+            cost = time.thread_time() - started
+            overhead = cost / self.interval
+            self.registry.record("sampler.overhead_pct", overhead * 100.0)
+            if overhead > self.budget:
+                self.interval = min(self.interval * 2, self.max_interval)
+            elif overhead < self.budget / 4 and self.interval > self.base_interval:
+                self.interval = max(self.interval / 2, self.base_interval)
+            self._stop.wait(self.interval)
+
+    def sample(self):
+        """Take one sample of every /proc metric."""
+        now = time.time()
+        wall = time.monotonic()
+        stat_fd, status_fd, system_fd = self._fds
+
+        # /proc/self/stat: fields after the parenthesised command name
+        stat = _read(stat_fd)
+        fields = stat[stat.rindex(b")") + 2:].split()
+        cpu_ticks = int(fields[11]) + int(fields[12])  # utime + stime
+        threads = int(fields[17])
+
+        # /proc/self/status: resident set size
+        status = _read(status_fd)
+        pos = status.find(b"VmRSS:")
+        rss_kb = int(status[pos + 6:status.index(b"kB", pos)]) if pos != -1 else 0
+
+        # /proc/stat: aggregate line "cpu user nice system idle iowait ..."
+        system = _read(system_fd)
+        cpu_line = system[:system.index(b"\n")].split()[1:]
+        totals = [int(v) for v in cpu_line]
+        total = sum(totals)
+        idle = totals[3] + (totals[4] if len(totals) > 4 else 0)
+
+        registry = self.registry
+        registry.record("memory.rss_mb", rss_kb / 1024.0, now)
+        registry.record("threads", threads, now)
+        if self._prev is not None:
+            prev_wall, prev_ticks, prev_total, prev_idle = self._prev
+            dt = wall - prev_wall
+            if dt > 0:
+                # Percent of one core, as `top` reports it
+                registry.record("cpu.process_pct",
+                                100.0 * (cpu_ticks - prev_ticks) / self.ticks / dt, now)
+                busy = (total - prev_total) - (idle - prev_idle)
+                span = total - prev_total
+                registry.record("cpu.system_pct", 100.0 * busy / span if span else 0.0, now)
+                registry.collect(now, dt)
+        self._prev = (wall, cpu_ticks, total, idle)
+
+
+default_registry = MetricsRegistry()
+
+
+def record_request(latency):
+    """Record a request on the application-wide registry."""
+    default_registry.record_request(latency)
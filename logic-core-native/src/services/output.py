@@ -0,0 +1,219 @@
+"""
+LogicCore v2 - Output Service
+Named output channels that any subsystem can write to from any thread.
+"""
+import threading
+import time
+from collections import deque
+
+
+CHUNK_LINES = 4096
+# Queued writes past this are folded into lines by the writer, so a
+# channel nobody flushes stays within its max_lines
+MAX_PENDING = 10_000
+
+
+class LineBuffer:
+    """
+    Append-only line storage split into fixed-size chunks.
+
+    Full chunks are never modified again, so readers on other threads
+    can scan them without copying. With `max_lines` set, whole chunks
+    are dropped from the front; line numbers keep counting up and
+    `first` is the oldest line still held.
+    """
+
+    def __init__(self, max_lines=None):
+        self.max_lines = max_lines
+        self.chunks = [[]]
+        self.first = 0  # absolute index of chunks[0][0]
+
+    def append(self, lines):
+        tail = self.chunks[-1]
+        for line in lines:
+            if len(tail) >= CHUNK_LINES:
+                tail = []
+                self.chunks.append(tail)
+            tail.append(line)
+        if self.max_lines is not None:
+            while len(self.chunks) > 1 and self.end - self.first - CHUNK_LINES >= self.max_lines:
+                self.chunks.pop(0)
+                self.first += CHUNK_LINES
+
+    @property
+    def end(self):
+        """Absolute index one past the last line."""
+        return self.first + (len(self.chunks) - 1) * CHUNK_LINES + len(self.chunks[-1])
+
+    def __len__(self):
+        return self.end - self.first
+
+    def get(self, index):
+        offset = index - self.first
+        return self.chunks[offset // CHUNK_LINES][offset % CHUNK_LINES]
+
+    def slice(self, start, stop):
+        """Lines with absolute indices in [start, stop)."""
+        start = max(start, self.first)
+        stop = min(stop, self.end)
+        out = []
+        while start < stop:
+            offset = start - self.first
+            chunk = self.chunks[offset // CHUNK_LINES]
+            lo = offset % CHUNK_LINES
+            hi = min(len(chunk), lo + stop - start)
+            out.extend(chunk[lo:hi])
+            start += hi - lo
+        return out
+
+    def snapshot(self):
+        """
+        (first, chunks, end) view for readers on other threads.
+
+        Take it on the flushing thread; the chunks it lists are never
+        rewritten, and the tail only grows past `end`.
+        """
+        return self.first, tuple(self.chunks), self.end
+
+    def clear(self):
+        self.first = self.end
+        self.chunks = [[]]
+
+
+def iter_snapshot(snapshot, start):
+    """Yield (absolute index, lines) pieces of a snapshot from `start` on."""
+    first, chunks, end = snapshot
+    start = max(start, first)
+    while start < end:
+        offset = start - first
+        chunk = chunks[offset // CHUNK_LINES]
+        lo = offset % CHUNK_LINES
+        hi = min(len(chunk), lo + end - start)
+        yield start, chunk[lo:hi]
+        start += hi - lo
+
+
+class OutputChannel:
+    """
+    One named stream of output lines.
+
+    `write` only appends to a deque, which is atomic and never blocks
+    the writer; pending text is split into lines and moved into the
+    buffer by `flush`, which the UI calls once per frame. While nothing
+    flushes (the Output tab is not built yet), writers fold the queue
+    into lines that keep only the last `max_lines`.
+    """
+
+    def __init__(self, name, max_lines=None):
+        self.name = name
+        self.buffer = LineBuffer(max_lines)
+        self.generation = 0  # bumped by clear()
+        self._pending = deque()
+        self._folded = deque(maxlen=max_lines)
+        self._partial = ""
+        self._lock = threading.Lock()
+
+    def write(self, text):
+        """Queue text; lines end at '\\n'. Safe from any thread."""
+        if text:
+            self._pending.append(text)
+            if len(self._pending) > MAX_PENDING:
+                self._fold()
+
+    def append_line(self, text):
+        self.write(text + "\n")
+
+    def _fold(self):
+        with self._lock:
+            pending = self._pending
+            text = self._partial + "".join([pending.popleft() for _ in range(len(pending))])
+            lines = text.split("\n")
+            self._partial = lines.pop()
+            self._folded.extend(lines)
+
+    def flush(self, limit=50_000):
+        """
+        Move up to `limit` queued writes into the buffer.
+
+        Returns the number of new lines; the rest waits for the next
+        call so one flush cannot stall a frame.
+        """
+        if not self._pending and not self._folded:
+            return 0
+        with self._lock:
+            folded = list(self._folded)
+            self._folded.clear()
+            # Take only what is queued now; writers keep appending meanwhile
+            pending = self._pending
+            parts = [pending.popleft() for _ in range(min(len(pending), limit))]
+            text = self._partial + "".join(parts)
+            lines = text.split("\n")
+            self._partial = lines.pop()
+            self.buffer.append(folded + lines)
+            return len(folded) + len(lines)
+
+    def clear(self):
+        with self._lock:
+            self._pending.clear()
+            self._folded.clear()
+            self._partial = ""
+            self.buffer.clear()
+            self.generation += 1
+
+
+class OutputService:
+    """Registry of output channels."""
+
+    def __init__(self, max_lines=5_000_000):
+        self.max_lines = max_lines
+        self._channels = {}
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def channel(self, name):
+        """Get or create a channel."""
+        channel = self._channels.get(name)
+        if channel is not None:
+            return channel
+        with self._lock:
+            channel = self._channels.get(name)
+            if channel is None:
+                channel = OutputChannel(name, self.max_lines)
+                self._channels[name] = channel
+                listeners = list(self._listeners)
+            else:
+                listeners = []
+        for callback in listeners:
+            callback(channel)
+        return channel
+
+    def channels(self):
+        with self._lock:
+            return list(self._channels.values())
+
+    def flush(self):
+        """Flush every channel; returns the channels that received lines."""
+        return [c for c in self.channels() if c.flush()]
+
+    def subscribe(self, callback):
+        """Call `callback(channel)` whenever a channel is created."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            if callback in self._listeners:
+                self._listeners.remove(callback)
+
+
+default_service = OutputService()
+
+
+def get_channel(name):
+    """Channel `name` on the application-wide output service."""
+    return default_service.channel(name)
+
+
+def log(name, text):
+    """Write a timestamped line to channel `name`."""
+    default_service.channel(name).append_line(f"[{time.strftime('%H:%M:%S')}] {text}")
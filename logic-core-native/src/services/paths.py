@@ -0,0 +1,45 @@
+"""
+LogicCore v2 - Service Paths
+Locations for on-disk caches and state shared by the backend services.
+"""
+import hashlib
+import os
+import sys
+
+
+APP_DIR_NAME = "logiccore"
+
+
+def _base_dir(env_var, fallback):
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get(env_var) or os.path.expanduser(fallback)
+    return os.path.join(base, APP_DIR_NAME)
+
+
+def cache_dir(*parts):
+    """Return (and create) a directory under the user cache folder."""
+    path = os.path.join(_base_dir("XDG_CACHE_HOME", "~/.cache"), *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def state_dir(*parts):
+    """Return (and create) a directory under the user state folder."""
+    path = os.path.join(_base_dir("XDG_STATE_HOME", "~/.local/state"), *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def runtime_dir(*parts):
+    """Return (and create) a private per-user directory for sockets."""
+    path = os.path.join(_base_dir("XDG_RUNTIME_DIR", "~/.local/state"), *parts)
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    return path
+
+
+def workspace_key(root):
+    """Stable short key identifying a workspace folder."""
+    root = os.path.abspath(root)
+    return hashlib.sha1(root.encode("utf-8", "surrogateescape")).hexdigest()[:16]
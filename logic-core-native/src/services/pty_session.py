@@ -0,0 +1,131 @@
+"""
+LogicCore v2 - PTY Session
+A shell running on a pseudo-terminal, read by a dedicated thread.
+"""
+import fcntl
+import logging
+import os
+import signal
+import struct
+import subprocess
+import termios
+import threading
+
+
+log = logging.getLogger(__name__)
+
+READ_SIZE = 64 * 1024
+
+
+def default_shell():
+    return os.environ.get("SHELL") or "/bin/sh"
+
+
+class PtySession:
+    """
+    Child process attached to a pseudo-terminal.
+
+    `on_data(bytes)` is called from the reader thread for every chunk
+    the child writes. The reader blocks inside the callback, so a slow
+    consumer throttles the child through the kernel's PTY buffer
+    instead of buffering output in memory.
+    """
+
+    def __init__(self, argv=None, cwd=None, env=None, on_data=None, on_exit=None,
+                 rows=24, cols=80):
+        self.argv = argv or [default_shell(), "-i"]
+        self.cwd = cwd
+        self.env = dict(os.environ if env is None else env)
+        self.env.setdefault("TERM", "xterm-256color")
+        self.env.setdefault("COLORTERM", "truecolor")
+        self.on_data = on_data
+        self.on_exit = on_exit
+        self.rows = rows
+        self.cols = cols
+        self.process = None
+        self._master = -1
+        self._thread = None
+
+    def start(self):
+        """Spawn the child on a new PTY and start the reader thread."""
+        master, slave = os.openpty()
+        self._set_size(slave, self.rows, self.cols)
+        try:
+            self.process = subprocess.Popen(
+                self.argv, cwd=self.cwd, env=self.env,
+                stdin=slave, stdout=slave, stderr=slave,
+                start_new_session=True, close_fds=True,
+                preexec_fn=_make_controlling_tty,
+            )
+        finally:
+            os.close(slave)
+        self._master = master
+        self._thread = threading.Thread(target=self._read_loop, name="PtyReader", daemon=True)
+        self._thread.start()
+
+    def _read_loop(self):
+        while True:
+            try:
+                data = os.read(self._master, READ_SIZE)
+            except OSError:
+                break  # EIO once the child side is closed
+            if not data:
+                break
+            if self.on_data is not None:
+                try:
+                    self.on_data(data)
+                except Exception:
+                    log.exception("terminal output handler failed")
+        code = self.process.wait() if self.process is not None else None
+        if self.on_exit is not None:
+            self.on_exit(code)
+
+    def write(self, data):
+        """Send input bytes to the child."""
+        if self._master < 0:
+            return
+        view = memoryview(data)
+        while view:
+            try:
+                written = os.write(self._master, view)
+            except OSError:
+                return
+            view = view[written:]
+
+    def resize(self, rows, cols):
+        """Tell the child about a new terminal size."""
+        self.rows, self.cols = rows, cols
+        if self._master >= 0:
+            self._set_size(self._master, rows, cols)
+
+    @staticmethod
+    def _set_size(fd, rows, cols):
+        try:
+            fcntl.ioctl(fd, termios.TIOCSWINSZ, struct.pack("HHHH", rows, cols, 0, 0))
+        except OSError:
+            pass
+
+    def is_running(self):
+        return self.process is not None and self.process.poll() is None
+
+    def close(self):
+        """Hang up the child's process group and release the PTY."""
+        if self.process is not None and self.process.poll() is None:
+            try:
+                os.killpg(self.process.pid, signal.SIGHUP)
+            except OSError:
+                pass
+        if self._master >= 0:
+            os.close(self._master)
+            self._master = -1
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+
+def _make_controlling_tty():
+    """Make the PTY slave (stdin) the child's controlling terminal."""
+    try:
+        fcntl.ioctl(0, termios.TIOCSCTTY, 0)
+    except OSError:
+        pass
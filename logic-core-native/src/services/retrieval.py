@@ -0,0 +1,778 @@
+"""
+LogicCore v2 - Retrieval Index
+BM25 ranking of fixed-size workspace chunks over sparse term postings,
+used to pick the snippets sent with an AI Chat prompt.
+"""
+import hashlib
+import json
+import logging
+import mmap
+import multiprocessing
+import os
+import re
+import struct
+import threading
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+try:
+    import numpy
+except ImportError:  # The index is unavailable without numpy
+    numpy = None
+
+from .file_index import in_dirs
+from .ignore import IgnoreRules
+from .metrics import default_registry
+from .paths import cache_dir, workspace_key
+
+try:
+    from .host.client import HostUnavailable, default_host
+except ImportError:  # No shared memory / Unix sockets (e.g. Windows)
+    HostUnavailable = default_host = None
+
+
+log = logging.getLogger(__name__)
+
+INDEX_MAGIC = b"LCRX"
+INDEX_VERSION = 1
+
+# Lines per chunk; chunks do not overlap
+CHUNK_LINES = 40
+# Files per worker task
+BATCH_FILES = 64
+# Fewer stale files than this are read on the index thread itself
+INLINE_FILES = 16
+MAX_FILE_SIZE = 1024 * 1024
+BINARY_SNIFF = 8192
+# Refreshes are written as new segments; past this many they are merged
+MAX_SEGMENTS = 6
+# ... and also once this share of the indexed chunks is deleted
+MAX_DEAD_SHARE = 0.25
+# Terms found in more chunks than this share only rescore chunks that
+# rarer query terms found
+COMMON_TERM_SHARE = 0.1
+# Only look for a pruning threshold before terms with more postings than
+# this share of a segment's chunks
+PRUNE_CHECK_SHARE = 1 / 64
+# Best chunks so far that common terms rescore, at most
+MAX_CANDIDATES = 4096
+# Every this many scores are sampled to find a floor for the best ones
+SAMPLE_STRIDE = 64
+REFRESH_DELAY = 0.5
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+_IDENTIFIER = re.compile(r"[A-Za-z0-9_]+")
+# Parts of an identifier, split at underscores and camelCase humps
+# ("HTTPServer" -> "HTTP", "Server")
+_WORD = re.compile(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])|[0-9]+")
+
+_HEADER = struct.Struct("<4sHHqq")
+_SECTION = struct.Struct("<qq")
+# Column name -> numpy dtype; file paths are UTF-8 data plus offsets
+SECTIONS = (
+    ("term_hash", "<i8"),       # sorted term hashes
+    ("term_offsets", "<i8"),    # len(term_hash) + 1 offsets into the postings
+    ("post_chunk", "<u4"),      # chunk of each posting, ascending per term
+    ("post_tf", "<u2"),         # term frequency in that chunk
+    ("chunk_file", "<u4"),
+    ("chunk_line", "<u4"),      # first line of the chunk (1-based)
+    ("chunk_len", "<u4"),       # tokens in the chunk
+    ("file_size", "<i8"),
+    ("file_mtime", "<i8"),
+    ("paths.data", "<u1"),
+    ("paths.offsets", "<i8"),
+)
+
+_hashes = {}
+
+
+def tokenize(text):
+    """
+    Lowercased tokens of `text`: every identifier made of several parts
+    as a whole, then its parts of at least two characters.
+    """
+    tokens = []
+    for identifier in _IDENTIFIER.findall(text):
+        parts = _WORD.findall(identifier)
+        if len(parts) > 1:
+            tokens.append(identifier.lower())
+        tokens += [part.lower() for part in parts if len(part) > 1]
+    return tokens
+
+
+def term_hash(term):
+    """Stable 63-bit hash of a term, the same in every process."""
+    value = _hashes.get(term)
+    if value is None:
+        digest = hashlib.blake2b(term.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little") >> 1
+        if len(_hashes) < 1 << 20:
+            _hashes[term] = value
+    return value
+
+
+def chunk_file(root, rel):
+    """
+    Worker helper: the chunks of one file as arrays (lines, lengths,
+    term counts, term hashes, frequencies), or None if it is unreadable
+    or binary.
+    """
+    try:
+        with open(os.path.join(root, *rel.split("/")), "rb") as f:
+            data = f.read(MAX_FILE_SIZE + 1)
+    except OSError:
+        return None
+    if len(data) > MAX_FILE_SIZE or b"\0" in data[:BINARY_SNIFF]:
+        return None
+    lines = data.decode("utf-8", "replace").split("\n")
+    starts, lengths, counts = array("I"), array("I"), array("I")
+    terms, tfs = array("q"), array("H")
+    for first in range(0, len(lines), CHUNK_LINES):
+        tokens = tokenize("\n".join(lines[first:first + CHUNK_LINES]))
+        if not tokens:
+            continue
+        frequencies = {}
+        for token in tokens:
+            frequencies[token] = frequencies.get(token, 0) + 1
+        starts.append(first + 1)
+        lengths.append(len(tokens))
+        counts.append(len(frequencies))
+        for token, tf in frequencies.items():
+            terms.append(term_hash(token))
+            tfs.append(min(tf, 0xFFFF))
+    return starts, lengths, counts, terms, tfs
+
+
+def chunk_files(root, files):
+    """
+    Worker entry point: chunk a batch of relpaths. Returns
+    [(relpath, size, mtime_ns, chunks)] with `chunks` as returned by
+    `chunk_file`.
+    """
+    results = []
+    for rel in files:
+        try:
+            st = os.stat(os.path.join(root, *rel.split("/")))
+        except OSError:
+            continue
+        results.append((rel, st.st_size, st.st_mtime_ns, chunk_file(root, rel)))
+    return results
+
+
+class Passage:
+    """One retrieved chunk: lines `line` to `end_line` of `path`."""
+
+    __slots__ = ("path", "line", "end_line", "score")
+
+    def __init__(self, path, line, end_line, score):
+        self.path = path
+        self.line = line
+        self.end_line = end_line
+        self.score = score
+
+    def __repr__(self):
+        return f"Passage({self.path}:{self.line}-{self.end_line}, {self.score:.2f})"
+
+
+class Segment:
+    """
+    Immutable part of the index: chunks, their files and the postings
+    from term to chunk in CSR form (the postings of term i are
+    `post_chunk/post_tf[term_offsets[i]:term_offsets[i + 1]]`).
+    """
+
+    def __init__(self, name, columns, mapped=None):
+        self.name = name
+        self.columns = columns
+        self.mapped = mapped
+        for column, _ in SECTIONS:
+            if "." not in column:
+                setattr(self, column, columns[column])
+        self._paths = (columns["paths.data"], columns["paths.offsets"])
+
+    def __len__(self):
+        return len(self.chunk_file)
+
+    def file_count(self):
+        return len(self.file_size)
+
+    def path(self, i):
+        data, offsets = self._paths
+        return bytes(data[offsets[i]:offsets[i + 1]]).decode("utf-8", "surrogateescape")
+
+    def paths(self):
+        return [self.path(i) for i in range(self.file_count())]
+
+    @classmethod
+    def build(cls, name, paths, sizes, mtimes, chunk_file, chunk_line, chunk_len,
+              post_term, post_chunk, post_tf):
+        """Segment from postings in any order; sorts them by term."""
+        order = numpy.argsort(post_term, kind="stable")
+        post_term = post_term[order]
+        hashes, starts = numpy.unique(post_term, return_index=True)
+        encoded = [p.encode("utf-8", "surrogateescape") for p in paths]
+        offsets = numpy.zeros(len(encoded) + 1, numpy.int64)
+        offsets[1:] = numpy.cumsum(numpy.fromiter(map(len, encoded), numpy.int64, len(encoded)))
+        columns = {
+            "term_hash": hashes.astype(numpy.int64),
+            "term_offsets": numpy.append(starts, len(post_term)).astype(numpy.int64),
+            "post_chunk": post_chunk[order].astype(numpy.uint32),
+            "post_tf": post_tf[order].astype(numpy.uint16),
+            "chunk_file": numpy.asarray(chunk_file, numpy.uint32),
+            "chunk_line": numpy.asarray(chunk_line, numpy.uint32),
+            "chunk_len": numpy.asarray(chunk_len, numpy.uint32),
+            "file_size": numpy.asarray(sizes, numpy.int64),
+            "file_mtime": numpy.asarray(mtimes, numpy.int64),
+            "paths.data": numpy.frombuffer(b"".join(encoded), numpy.uint8),
+            "paths.offsets": offsets,
+        }
+        return cls(name, columns)
+
+    @classmethod
+    def from_files(cls, name, results):
+        """Segment from worker results [(relpath, size, mtime_ns, chunks)]."""
+        paths, sizes, mtimes = [], [], []
+        chunk_file, lines, lengths = array("I"), array("I"), array("I")
+        counts, terms, tfs = array("I"), array("q"), array("H")
+        for rel, size, mtime_ns, chunks in results:
+            file_id = len(paths)
+            paths.append(rel)
+            sizes.append(size)
+            mtimes.append(mtime_ns)
+            if chunks is None:
+                continue
+            starts, chunk_lengths, chunk_counts, chunk_terms, chunk_tfs = chunks
+            chunk_file.extend([file_id] * len(starts))
+            lines.extend(starts)
+            lengths.extend(chunk_lengths)
+            counts.extend(chunk_counts)
+            terms.extend(chunk_terms)
+            tfs.extend(chunk_tfs)
+        post_chunk = numpy.repeat(numpy.arange(len(lines), dtype=numpy.uint32),
+                                  numpy.frombuffer(counts, numpy.uint32))
+        return cls.build(name, paths, sizes, mtimes, chunk_file, lines, lengths,
+                         numpy.frombuffer(terms, numpy.int64), post_chunk,
+                         numpy.frombuffer(tfs, numpy.uint16))
+
+    @classmethod
+    def merge(cls, name, parts):
+        """One segment from [(segment, dead_files)], leaving out dead files."""
+        paths, sizes, mtimes = [], [], []
+        files, lines, lengths, terms, chunks, tfs = [], [], [], [], [], []
+        chunk_base = 0
+        for segment, dead_files in parts:
+            live_files = numpy.ones(segment.file_count(), bool)
+            live_files[list(dead_files)] = False
+            file_map = numpy.cumsum(live_files) - 1 + len(paths)
+            live = live_files[segment.chunk_file]
+            chunk_map = numpy.cumsum(live) - 1 + chunk_base
+            for i in numpy.flatnonzero(live_files):
+                paths.append(segment.path(i))
+            sizes.append(segment.file_size[live_files])
+            mtimes.append(segment.file_mtime[live_files])
+            files.append(file_map[segment.chunk_file[live]])
+            lines.append(segment.chunk_line[live])
+            lengths.append(segment.chunk_len[live])
+            post_term = numpy.repeat(segment.term_hash, numpy.diff(segment.term_offsets))
+            keep = live[segment.post_chunk]
+            terms.append(post_term[keep])
+            chunks.append(chunk_map[segment.post_chunk[keep]])
+            tfs.append(segment.post_tf[keep])
+            chunk_base += int(live.sum())
+        join = numpy.concatenate
+        return cls.build(name, paths, join(sizes), join(mtimes), join(files), join(lines),
+                         join(lengths), join(terms), join(chunks), join(tfs))
+
+    def save(self, path):
+        """Write the segment to `path` atomically."""
+        offset = _HEADER.size + _SECTION.size * len(SECTIONS)
+        table, body = [], []
+        for column, _ in SECTIONS:
+            data = memoryview(numpy.ascontiguousarray(self.columns[column])).cast("B")
+            pad = -offset % 8
+            body += [b"\0" * pad, data]
+            offset += pad
+            table.append(_SECTION.pack(offset, len(data)))
+            offset += len(data)
+        header = _HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(SECTIONS),
+                              len(self), len(self.term_hash))
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(header)
+            f.write(b"".join(table))
+            for part in body:
+                f.write(part)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, name, path):
+        """Map a saved segment; its columns are views of the file. None if invalid."""
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(mapped) < _HEADER.size:
+            return None
+        magic, version, count, _, _ = _HEADER.unpack_from(mapped, 0)
+        if magic != INDEX_MAGIC or version != INDEX_VERSION or count != len(SECTIONS):
+            return None
+        columns = {}
+        for i, (column, dtype) in enumerate(SECTIONS):
+            offset, length = _SECTION.unpack_from(mapped, _HEADER.size + i * _SECTION.size)
+            if offset + length > len(mapped):
+                return None
+            columns[column] = numpy.frombuffer(mapped, dtype, length // numpy.dtype(dtype).itemsize,
+                                               offset)
+        return cls(name, columns, mapped)
+
+
+class _Part:
+    """A segment as seen by queries: which chunks are dead, and BM25 norms."""
+
+    __slots__ = ("segment", "dead_files", "dead", "norm")
+
+    def __init__(self, segment, dead_files):
+        self.segment = segment
+        self.dead_files = frozenset(dead_files)
+        if dead_files:
+            self.dead = numpy.flatnonzero(numpy.isin(segment.chunk_file, list(dead_files)))
+        else:
+            self.dead = numpy.zeros(0, numpy.int64)
+        self.norm = None
+
+    def live_chunks(self):
+        return len(self.segment) - len(self.dead)
+
+    def live_tokens(self):
+        lengths = self.segment.chunk_len
+        return int(lengths.sum(dtype=numpy.int64)) - int(lengths[self.dead].sum(dtype=numpy.int64))
+
+
+class _State:
+    """Everything a query reads; replaced as a whole by refreshes."""
+
+    __slots__ = ("parts", "chunks", "avgdl")
+
+    def __init__(self, parts):
+        self.parts = parts
+        self.chunks = sum(p.live_chunks() for p in parts)
+        tokens = sum(p.live_tokens() for p in parts)
+        self.avgdl = tokens / self.chunks if self.chunks else 1.0
+        for part in parts:
+            lengths = part.segment.chunk_len.astype(numpy.float32)
+            part.norm = K1 * (1 - B + B * lengths / numpy.float32(self.avgdl))
+
+
+class RetrievalIndex:
+    """
+    Workspace retrieval index service.
+
+    Text files listed by the `FileIndex` are cut into chunks of
+    CHUNK_LINES lines and tokenized in the service host's worker
+    processes (or a process pool of its own where there is no host).
+    Each refresh writes the chunks it read as a new memory-mapped
+    segment, and marks the chunks of the files' previous versions dead;
+    once there are too many segments or dead chunks they are merged into
+    one. `search` scores every chunk with BM25 using one vectorized pass
+    over the postings of each query term. Document frequencies count
+    dead chunks until the next merge, which only slightly skews the
+    scores.
+
+    Like the symbol index, a later session re-reads only files whose
+    size or mtime changed.
+    """
+
+    def __init__(self, root, file_index, path=None, workers=None, registry=default_registry,
+                 host=default_host):
+        self.root = os.path.abspath(root)
+        self.file_index = file_index
+        self.path = path or cache_dir("retrieval", workspace_key(self.root))
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.registry = registry
+        self.host = host
+        self.ignore = IgnoreRules(self.root)
+        self.ready = threading.Event()
+        self._state = None
+        self._files = {}        # relpath -> (part index, file index, size, mtime_ns)
+        self._next = 0
+        self._pool = None
+        self._stop = threading.Event()
+        self._wake = threading.Condition()
+        self._pending = set()
+        self._thread = None
+
+    @property
+    def available(self):
+        return numpy is not None
+
+    # --- Lifecycle ----------------------------------------------------
+
+    def start(self):
+        if self._thread is not None:
+            return
+        if numpy is None:
+            log.info("retrieval index disabled: numpy is not installed")
+            self.ready.set()
+            return
+        self.file_index.subscribe(self._on_index_changed)
+        self._thread = threading.Thread(target=self._run, name="RetrievalIndex", daemon=True)
+        self._thread.start()
+
+    def wait_ready(self, timeout=None):
+        return self.ready.wait(timeout)
+
+    def shutdown(self):
+        self.file_index.unsubscribe(self._on_index_changed)
+        self._stop.set()
+        with self._wake:
+            self._wake.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _on_index_changed(self, changed):
+        with self._wake:
+            self._pending.update(changed)
+            self._wake.notify()
+
+    def _run(self):
+        self.load()
+        self.file_index.wait_ready()
+        try:
+            self.refresh()
+        except Exception:
+            log.exception("retrieval index refresh failed")
+        self.ready.set()
+        while not self._stop.is_set():
+            with self._wake:
+                while not self._pending and not self._stop.is_set():
+                    self._wake.wait()
+            if self._stop.wait(REFRESH_DELAY):
+                break
+            with self._wake:
+                dirs, self._pending = self._pending, set()
+            self.ignore.invalidate()
+            try:
+                self.refresh(dirs)
+            except Exception:
+                log.exception("retrieval index refresh failed")
+
+    def _executor(self):
+        if self._pool is None:
+            # Never fork a process that is running Qt threads
+            context = multiprocessing.get_context("spawn")
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=context)
+        return self._pool
+
+    def _submit(self, batch):
+        """Chunk `batch` in the service host, or in our own pool without one."""
+        if self.host is not None:
+            try:
+                return self.host.submit("retrieval.chunk_files", self.root, batch)
+            except HostUnavailable:
+                log.warning("service host unavailable; chunking files in-process")
+                self.host = None
+        return self._executor().submit(chunk_files, self.root, batch)
+
+    # --- Persistence --------------------------------------------------
+
+    def _manifest_path(self):
+        return os.path.join(self.path, "manifest.json")
+
+    def load(self):
+        """Map the segments saved by an earlier session."""
+        try:
+            with open(self._manifest_path(), encoding="utf-8") as f:
+                manifest = json.load(f)
+        except (OSError, ValueError):
+            manifest = None
+        parts = []
+        if manifest is not None and manifest.get("version") == INDEX_VERSION:
+            for entry in manifest["segments"]:
+                segment = Segment.load(entry["name"], os.path.join(self.path, entry["name"]))
+                if segment is None:
+                    log.warning("retrieval segment %s unreadable; rebuilding", entry["name"])
+                    parts = []
+                    break
+                parts.append(_Part(segment, entry["dead_files"]))
+            else:
+                self._next = manifest["next"]
+        self._files = {}
+        for p, part in enumerate(parts):
+            segment = part.segment
+            for i in range(segment.file_count()):
+                if i not in part.dead_files:
+                    self._files[segment.path(i)] = (p, i, int(segment.file_size[i]),
+                                                    int(segment.file_mtime[i]))
+        self._state = _State(parts)
+        self._remove_strays({part.segment.name for part in parts})
+
+    def _save_manifest(self, parts):
+        manifest = {
+            "version": INDEX_VERSION,
+            "next": self._next,
+            "segments": [{"name": part.segment.name, "dead_files": sorted(part.dead_files)}
+                         for part in parts],
+        }
+        tmp = self._manifest_path() + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, self._manifest_path())
+
+    def _remove_strays(self, keep):
+        for name in os.listdir(self.path):
+            if name.startswith("seg-") and name not in keep:
+                try:
+                    os.remove(os.path.join(self.path, name))
+                except OSError:
+                    pass  # Still mapped on Windows; removed next time
+
+    def _new_name(self):
+        self._next += 1
+        return f"seg-{self._next:06d}.bin"
+
+    # --- Indexing -----------------------------------------------------
+
+    def refresh(self, dirs=None):
+        """
+        Bring the index up to date with the file index, within `dirs`
+        if given. Runs on the index thread, or after `load` and before
+        `start`; returns the number of files read.
+        """
+        start = time.perf_counter()
+        current = {}
+        for rel, _, _ in self.file_index.iter_files():
+            if dirs is not None and not in_dirs(rel, dirs):
+                continue
+            if self.ignore.is_ignored(rel):
+                continue
+            # Files edited in place while the workspace was closed keep
+            # their directory's mtime, so the file index snapshot does
+            # not notice them; stat them here.
+            try:
+                st = os.stat(self.file_index.abspath(rel))
+            except OSError:
+                continue
+            current[rel] = (st.st_size, st.st_mtime_ns)
+        if dirs is None:
+            removed = [p for p in self._files if p not in current]
+        else:
+            removed = [p for p in self._files if p not in current and in_dirs(p, dirs)]
+        stale = [rel for rel, (size, mtime_ns) in current.items()
+                 if self._files.get(rel, (0, 0, None, None))[2:] != (size, mtime_ns)]
+        if not stale and not removed:
+            return 0
+        results = self._read(stale)
+        if self._stop.is_set():
+            return 0
+
+        parts = list(self._state.parts)
+        dead = [set(part.dead_files) for part in parts]
+        for rel in removed + [r[0] for r in results]:
+            known = self._files.pop(rel, None)
+            if known is not None:
+                dead[known[0]].add(known[1])
+        if results:
+            segment = Segment.from_files(self._new_name(), results)
+            segment.save(os.path.join(self.path, segment.name))
+            parts.append(_Part(segment, ()))
+            dead.append(set())
+            for i, (rel, size, mtime_ns, _) in enumerate(results):
+                self._files[rel] = (len(parts) - 1, i, size, mtime_ns)
+        parts = [part if part.dead_files == dead[p] else _Part(part.segment, dead[p])
+                 for p, part in enumerate(parts)]
+        total = sum(len(part.segment) for part in parts)
+        dead_chunks = sum(len(part.dead) for part in parts)
+        if len(parts) > MAX_SEGMENTS or (total and dead_chunks > total * MAX_DEAD_SHARE):
+            parts = self._merge(parts)
+        self._save_manifest(parts)
+        self._state = _State(parts)
+        self._remove_strays({part.segment.name for part in parts})
+
+        elapsed = time.perf_counter() - start
+        self.registry.observe("retrieval.refresh_ms", elapsed * 1000)
+        log.info("retrieval index: %d files read, %d removed, %d chunks in %d segments (%.0f ms)",
+                 len(results), len(removed), self._state.chunks, len(parts), elapsed * 1000)
+        return len(results)
+
+    def _read(self, stale):
+        if len(stale) < INLINE_FILES:
+            return chunk_files(self.root, stale)
+        batches = [stale[i:i + BATCH_FILES] for i in range(0, len(stale), BATCH_FILES)]
+        pending = set()
+        window = self.workers * 4
+        position = 0
+        results = []
+        while (position < len(batches) or pending) and not self._stop.is_set():
+            while position < len(batches) and len(pending) < window:
+                pending.add(self._submit(batches[position]))
+                position += 1
+            done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    results += future.result()
+                except Exception:
+                    log.exception("retrieval index worker failed")
+        for future in pending:
+            future.cancel()
+        return results
+
+    def _merge(self, parts):
+        segment = Segment.merge(self._new_name(), [(p.segment, p.dead_files) for p in parts])
+        segment.save(os.path.join(self.path, segment.name))
+        merged = Segment.load(segment.name, os.path.join(self.path, segment.name)) or segment
+        self._files = {}
+        for i in range(merged.file_count()):
+            self._files[merged.path(i)] = (0, i, int(merged.file_size[i]),
+                                           int(merged.file_mtime[i]))
+        return [_Part(merged, ())]
+
+    # --- Queries ------------------------------------------------------
+
+    def chunk_count(self):
+        state = self._state
+        return state.chunks if state is not None else 0
+
+    def search(self, query, k=8):
+        """The `k` chunks ranking highest for `query` under BM25."""
+        state = self._state
+        if state is None or not state.chunks:
+            return []
+        start = time.perf_counter()
+        hashes = numpy.array(sorted({term_hash(t) for t in tokenize(query)}), numpy.int64)
+        if not len(hashes):
+            return []
+        # Where each term's postings are in each segment
+        spans = []
+        df = numpy.zeros(len(hashes), numpy.int64)
+        for part in state.parts:
+            terms = part.segment.term_hash
+            offsets = part.segment.term_offsets
+            pos = numpy.searchsorted(terms, hashes)
+            found = pos < len(terms)
+            found[found] = terms[pos[found]] == hashes[found]
+            first = numpy.where(found, offsets[numpy.minimum(pos, len(terms) - 1)], 0)
+            last = numpy.where(found, offsets[numpy.minimum(pos + 1, len(terms))], 0)
+            spans.append((first, last))
+            df += last - first
+        n = state.chunks
+        idf = numpy.log(1 + (n - df + 0.5) / (df + 0.5))
+        # Rarest terms first, so they pick the candidates
+        order = [int(t) for t in numpy.argsort(df, kind="stable") if df[t] > 0]
+        terms = [(idf[t], df[t] > n * COMMON_TERM_SHARE) for t in order]
+        hits = []
+        for part, (first, last) in zip(state.parts, spans):
+            postings = [(first[t], last[t]) for t in order]
+            for score, c in _top_chunks(part, postings, terms, k):
+                hits.append((score, part, c))
+        hits.sort(key=lambda hit: -hit[0])
+        passages = []
+        for score, part, c in hits[:k]:
+            segment = part.segment
+            line = int(segment.chunk_line[c])
+            passages.append(Passage(segment.path(int(segment.chunk_file[c])), line,
+                                    line + CHUNK_LINES - 1, score))
+        self.registry.observe("retrieval.query_ms", (time.perf_counter() - start) * 1000)
+        return passages
+
+    def passage_text(self, passage):
+        """The current text of a passage's lines, or "" if unreadable."""
+        try:
+            with open(self.file_index.abspath(passage.path), encoding="utf-8",
+                      errors="replace") as f:
+                lines = []
+                for number, line in enumerate(f, 1):
+                    if number > passage.end_line:
+                        break
+                    if number >= passage.line:
+                        lines.append(line)
+        except OSError:
+            return ""
+        return "".join(lines)
+
+
+def _bm25(idf, tf, norm):
+    """Term scores of postings; `norm` (gathered per posting) is overwritten."""
+    tf = tf.astype(numpy.float32)
+    norm += tf
+    tf *= numpy.float32(idf * (K1 + 1))
+    tf /= norm
+    return tf
+
+
+def _best(scores, k):
+    """Positions of the `k` highest positive scores, in no order."""
+    floor = 0.0
+    if len(scores) > SAMPLE_STRIDE * k:
+        sample = scores[::SAMPLE_STRIDE]
+        sample = sample[sample > 0]
+        if len(sample) >= k:
+            # The k-th best of a sample is no better than the k-th best
+            # overall, so it bounds the candidates from below
+            floor = numpy.partition(sample, -k)[-k]
+    best = numpy.flatnonzero(scores >= floor) if floor else numpy.flatnonzero(scores > 0)
+    if len(best) > k:
+        best = best[numpy.argpartition(scores[best], -k)[-k:]]
+    return best
+
+
+def _top_chunks(part, postings, terms, k):
+    """
+    [(score, chunk)] of the `k` best live chunks of one segment.
+
+    Terms come rarest first. Each one's postings are scored in a single
+    vectorized pass, until the terms left could not lift a chunk that
+    has no score yet into the top k (MaxScore pruning), or until a
+    common term comes up: from then on only the best MAX_CANDIDATES
+    chunks scored so far are looked up in the remaining postings, which
+    are sorted by chunk.
+    """
+    segment = part.segment
+    size = len(segment)
+    scores = numpy.zeros(size, numpy.float32)
+    later = sum(float(idf) * (K1 + 1) for idf, _ in terms)
+    candidates = None
+    scored = False
+    for (first, last), (idf, common) in zip(postings, terms):
+        if candidates is None and scored and (common or last - first > size * PRUNE_CHECK_SHARE):
+            scores[part.dead] = 0
+            if common:
+                candidates = numpy.sort(_best(scores, MAX_CANDIDATES))
+            else:
+                best = _best(scores, k)
+                threshold = scores[best].min() if len(best) == k else 0.0
+                if threshold and later <= threshold:
+                    candidates = numpy.flatnonzero(scores > threshold - later)
+        later -= float(idf) * (K1 + 1)
+        if last == first:
+            continue
+        ids = segment.post_chunk[first:last]
+        if candidates is None:
+            ids = ids.astype(numpy.intp)
+            contribution = _bm25(idf, segment.post_tf[first:last], part.norm[ids])
+            if scored:
+                scores[ids] += contribution
+            else:
+                scores[ids] = contribution
+            scored = True
+        elif len(candidates):
+            pos = numpy.searchsorted(ids, candidates.astype(ids.dtype))
+            pos[pos == len(ids)] = 0
+            found = ids[pos] == candidates
+            chunks = candidates[found]
+            scores[chunks] += _bm25(idf, segment.post_tf[first:last][pos[found]],
+                                    part.norm[chunks])
+    scores[part.dead] = 0
+    if candidates is None:
+        best = _best(scores, k)
+    else:
+        best = candidates[_best(scores[candidates], k)]
+    return [(float(scores[c]), int(c)) for c in best]
@@ -0,0 +1,396 @@
+"""
+LogicCore v2 - Search Engine
+Parallel full-text workspace search. Files are read through mmap in a
+process pool and results are streamed back chunk by chunk. Between
+searches the trigram index is filled in the background.
+"""
+import logging
+import mmap
+import multiprocessing
+import os
+import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from .ignore import IgnoreRules
+from .metrics import record_request
+from .paths import cache_dir, workspace_key
+from .trigram_index import TrigramIndex, build_postings, MAX_INDEXED_SIZE
+
+
+log = logging.getLogger(__name__)
+
+# Files per worker task; small enough that cancellation is prompt
+CHUNK_SIZE = 64
+# Files per trigram indexing task; larger, so fewer postings merges
+INDEX_CHUNK_SIZE = 256
+# Files larger than this are skipped entirely
+MAX_FILE_SIZE = 64 * 1024 * 1024
+# How much of a file is sniffed for NUL bytes
+BINARY_SNIFF = 8192
+MAX_LINE_PREVIEW = 240
+
+
+class SearchQuery:
+    """A search pattern and its options."""
+
+    def __init__(self, text, regex=False, case_sensitive=False, whole_word=False,
+                 max_matches_per_file=1000):
+        self.text = text
+        self.regex = regex
+        self.case_sensitive = case_sensitive
+        self.whole_word = whole_word
+        self.max_matches_per_file = max_matches_per_file
+
+    def compile(self):
+        """Bytes pattern and flags for the workers."""
+        pattern = self.text if self.regex else re.escape(self.text)
+        if self.whole_word:
+            pattern = rf"\b(?:{pattern})\b"
+        flags = re.MULTILINE | (0 if self.case_sensitive else re.IGNORECASE)
+        return pattern.encode("utf-8"), flags
+
+    @property
+    def literal(self):
+        """Literal text usable for trigram narrowing, if any."""
+        return None if self.regex else self.text
+
+
+class FileMatches:
+    """Matches found in one file."""
+
+    __slots__ = ("path", "matches")
+
+    def __init__(self, path, matches):
+        self.path = path
+        self.matches = matches
+
+    def __repr__(self):
+        return f"FileMatches({self.path!r}, {len(self.matches)} matches)"
+
+
+def _search_file(path, regex, limit):
+    """Search one file; returns [(line, column, preview)] or None if binary."""
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if mm.find(b"\0", 0, min(size, BINARY_SNIFF)) != -1:
+                return None
+            matches = []
+            line_no, counted_to = 0, 0
+            for m in regex.finditer(mm):
+                start = m.start()
+                line_no += mm[counted_to:start].count(b"\n")
+                counted_to = start
+                line_start = mm.rfind(b"\n", 0, start) + 1
+                line_end = mm.find(b"\n", start)
+                if line_end == -1:
+                    line_end = size
+                preview = mm[line_start:min(line_end, line_start + MAX_LINE_PREVIEW)]
+                matches.append((line_no + 1, start - line_start,
+                                preview.decode("utf-8", "replace").rstrip("\r")))
+                if len(matches) >= limit:
+                    break
+            return matches
+
+
+def search_chunk(root, files, pattern, flags, limit):
+    """Worker entry point: search a chunk of relpaths; returns [(relpath, matches)]."""
+    regex = re.compile(pattern, flags)
+    results = []
+    for rel in files:
+        try:
+            matches = _search_file(os.path.join(root, rel), regex, limit)
+        except (OSError, ValueError):
+            continue
+        if matches:
+            results.append((rel, matches))
+    return results
+
+
+def index_chunk(root, files):
+    """
+    Worker entry point: trigrams of a chunk of (relpath, mtime_ns,
+    file_id) files. Returns (indexed, postings): the (file_id, mtime_ns)
+    pairs covered by the `postings` blob. Files changed since the file
+    index saw them are left out.
+    """
+    indexed, contents = [], []
+    for rel, mtime_ns, file_id in files:
+        try:
+            with open(os.path.join(root, rel), "rb") as f:
+                if os.fstat(f.fileno()).st_mtime_ns != mtime_ns:
+                    continue
+                data = f.read(MAX_INDEXED_SIZE + 1)
+        except OSError:
+            continue
+        if len(data) > MAX_INDEXED_SIZE:
+            continue  # Always searched directly
+        indexed.append((file_id, mtime_ns))
+        # Binary files are indexed with no trigrams; searches skip them
+        if b"\0" not in data[:BINARY_SNIFF]:
+            contents.append((file_id, data))
+    return indexed, build_postings(contents) if contents else b""
+
+
+def _lower_priority():
+    """Indexing worker initializer: yield the CPU to searches."""
+    if hasattr(os, "nice"):
+        os.nice(10)
+
+
+class SearchHandle:
+    """A running search that can be cancelled."""
+
+    def __init__(self, query):
+        self.query = query
+        self.cancelled = threading.Event()
+        self.done = threading.Event()
+        self.file_count = 0
+        self.match_count = 0
+        self.elapsed = 0.0
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def is_cancelled(self):
+        return self.cancelled.is_set()
+
+
+class SearchEngine:
+    """
+    Workspace search service.
+
+    Candidate files come from the `FileIndex`, filtered by .gitignore.
+    Each search runs on its own coordinator thread that fans chunks
+    out to a shared process pool and hands every finished chunk to
+    `on_results` as soon as it arrives. Starting a new search through
+    `search()` cancels the one still in flight.
+
+    Searches never read trigrams. Once one finishes, an indexing thread
+    reads the files the trigram index does not cover yet in a worker
+    process of its own, at a lower priority, and only hands it work
+    while no search is running; later literal searches then only read
+    the files that can contain the text.
+    """
+
+    def __init__(self, root, file_index, workers=None, use_trigrams=True):
+        self.root = os.path.abspath(root)
+        self.file_index = file_index
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.ignore = IgnoreRules(self.root)
+        self.trigrams = None
+        if use_trigrams:
+            self.trigrams = TrigramIndex(os.path.join(
+                cache_dir("search"), workspace_key(self.root) + ".tri"))
+        self._trigrams_loaded = False
+        self._load_lock = threading.Lock()
+        self._pool = None
+        self._index_pool = None
+        self._pool_lock = threading.Lock()
+        self._current = None
+        self._search_lock = threading.Lock()
+        self._ignore_lock = threading.Lock()
+        self._running = 0           # searches in flight
+        self._idle = threading.Condition()
+        self._indexer = None
+        self._closed = threading.Event()
+        file_index.subscribe(self._on_index_changed)
+
+    def _executor(self):
+        with self._pool_lock:
+            if self._pool is None:
+                # Never fork a process that is running Qt threads
+                context = multiprocessing.get_context("spawn")
+                self._pool = ProcessPoolExecutor(self.workers, mp_context=context)
+            return self._pool
+
+    def _index_executor(self):
+        with self._pool_lock:
+            if self._closed.is_set():
+                raise RuntimeError("search engine is shut down")
+            if self._index_pool is None:
+                context = multiprocessing.get_context("spawn")
+                self._index_pool = ProcessPoolExecutor(1, mp_context=context,
+                                                       initializer=_lower_priority)
+            return self._index_pool
+
+    def _on_index_changed(self, changed):
+        # A .gitignore may be among the changes; rules are re-read lazily
+        with self._ignore_lock:
+            self.ignore.invalidate()
+
+    def search(self, query, on_results, on_done=None):
+        """
+        Start a search; returns its `SearchHandle`.
+
+        `on_results(handle, [FileMatches])` and `on_done(handle)` are
+        called from the coordinator thread.
+        """
+        with self._search_lock:
+            if self._current is not None:
+                self._current.cancel()
+            handle = SearchHandle(query)
+            self._current = handle
+            thread = threading.Thread(target=self._run, name="Search",
+                                      args=(handle, on_results, on_done), daemon=True)
+            thread.start()
+        return handle
+
+    def cancel(self):
+        with self._search_lock:
+            if self._current is not None:
+                self._current.cancel()
+                self._current = None
+
+    def _files(self, max_size):
+        """(relpath, size, mtime_ns) of the workspace files not ignored."""
+        with self._ignore_lock:
+            return [f for f in self.file_index.iter_files()
+                    if f[1] <= max_size and not self.ignore.is_ignored(f[0])]
+
+    def _load_trigrams(self):
+        with self._load_lock:
+            if not self._trigrams_loaded:
+                self.trigrams.load()
+                self._trigrams_loaded = True
+
+    def candidates(self, query):
+        """Files to search as (relpath, size, mtime_ns), narrowed by trigrams."""
+        self.file_index.wait_ready()
+        files = self._files(MAX_FILE_SIZE)
+        literal = query.literal
+        if self.trigrams is None or not literal:
+            return files
+        self._load_trigrams()
+        hits = self.trigrams.candidates(literal)
+        if hits is None:
+            return files
+        index = self.trigrams
+        return [f for f in files if f[0] in hits or not index.is_indexed(f[0], f[2])]
+
+    def _run(self, handle, on_results, on_done):
+        start = time.perf_counter()
+        with self._idle:
+            self._running += 1
+        try:
+            files = self.candidates(handle.query)
+            if not handle.is_cancelled():
+                self._fan_out(handle, files, on_results)
+        except Exception:
+            log.exception("search failed")
+        finally:
+            with self._idle:
+                self._running -= 1
+                self._idle.notify_all()
+        handle.elapsed = time.perf_counter() - start
+        handle.done.set()
+        if not handle.is_cancelled():
+            record_request(handle.elapsed)
+            if on_done is not None:
+                on_done(handle)
+        if self.trigrams is not None:
+            self._start_indexer()
+
+    def _fan_out(self, handle, files, on_results):
+        pattern, flags = handle.query.compile()
+        limit = handle.query.max_matches_per_file
+        pool = self._executor()
+        paths = [rel for rel, _, _ in files]
+        chunks = [paths[i:i + CHUNK_SIZE] for i in range(0, len(paths), CHUNK_SIZE)]
+        pending = set()
+        window = self.workers * 4
+        position = 0
+        while (position < len(chunks) or pending) and not handle.is_cancelled():
+            while position < len(chunks) and len(pending) < window:
+                pending.add(pool.submit(search_chunk, self.root, chunks[position],
+                                        pattern, flags, limit))
+                position += 1
+            done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    results = future.result()
+                except Exception:
+                    log.exception("search worker failed")
+                    continue
+                handle.file_count += CHUNK_SIZE
+                if results and not handle.is_cancelled():
+                    batch = [FileMatches(rel, matches) for rel, matches in results]
+                    handle.match_count += sum(len(b.matches) for b in batch)
+                    on_results(handle, batch)
+        for future in pending:
+            future.cancel()
+        handle.file_count = min(handle.file_count, len(files))
+
+    # --- Trigram indexing ---------------------------------------------
+
+    def _start_indexer(self):
+        with self._idle:
+            if self._indexer is not None or self._closed.is_set():
+                return
+            self._indexer = threading.Thread(target=self._index, name="SearchIndexer",
+                                             daemon=True)
+            self._indexer.start()
+
+    def _index(self):
+        """Index the files the trigram index does not cover, between searches."""
+        index = self.trigrams
+        # Ids reserved here must survive until their postings are merged
+        index.hold()
+        try:
+            self._load_trigrams()
+            files = [(rel, mtime_ns) for rel, _, mtime_ns in self._files(MAX_INDEXED_SIZE)]
+            todo = []
+            for rel, mtime_ns in files:
+                file_id = index.reserve(rel, mtime_ns)
+                if file_id is not None:
+                    todo.append((rel, mtime_ns, file_id))
+            self._fan_out_index(todo)
+        except Exception:
+            if not self._closed.is_set():
+                log.exception("trigram indexing failed")
+        finally:
+            index.release()
+            with self._idle:
+                self._indexer = None
+        index.save()
+
+    def _fan_out_index(self, files):
+        pool = self._index_executor()
+        chunks = [files[i:i + INDEX_CHUNK_SIZE] for i in range(0, len(files), INDEX_CHUNK_SIZE)]
+        pending = set()
+        position = 0
+        while (position < len(chunks) or pending) and not self._closed.is_set():
+            if position < len(chunks) and not pending:
+                with self._idle:
+                    # Searches get the CPU; wait for them to finish
+                    if self._running:
+                        self._idle.wait(0.1)
+                        continue
+                pending.add(pool.submit(index_chunk, self.root, chunks[position]))
+                position += 1
+            done, pending = wait(pending, timeout=0.1)
+            for future in done:
+                try:
+                    indexed, postings = future.result()
+                except Exception:
+                    log.exception("trigram index worker failed")
+                    continue
+                self.trigrams.merge(postings, indexed)
+        for future in pending:
+            future.cancel()
+
+    def shutdown(self):
+        self.cancel()
+        self._closed.set()
+        self.file_index.unsubscribe(self._on_index_changed)
+        with self._pool_lock:
+            for pool in (self._pool, self._index_pool):
+                if pool is not None:
+                    pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = self._index_pool = None
+        if self.trigrams is not None:
+            self.trigrams.save()
@@ -0,0 +1,223 @@
+"""
+LogicCore v2 - Session Snapshots
+Compact binary snapshot of a workspace window's state and warm caches,
+written on close and periodically, read back through mmap on launch.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+from array import array
+
+from .metrics import default_registry
+from .paths import state_dir, workspace_key
+
+
+log = logging.getLogger(__name__)
+
+SESSION_MAGIC = b"LCSN"
+SESSION_VERSION = 1
+# Seconds between background snapshots
+SAVE_INTERVAL = 60.0
+
+_HEADER = struct.Struct("<4sII")    # magic, version, section count
+_ENTRY = struct.Struct("<16sQQ")    # name, offset, length
+_I64 = struct.Struct("<q")
+_U32 = struct.Struct("<I")
+
+
+class Writer:
+    """Builds one section's payload from typed fields."""
+
+    def __init__(self):
+        self._parts = []
+
+    def put_int(self, value):
+        self._parts.append(_I64.pack(value))
+
+    def put_ints(self, values):
+        values = array("q", values)
+        self._parts += [_U32.pack(len(values)), values.tobytes()]
+
+    def put_bytes(self, data):
+        self._parts += [_U32.pack(len(data)), bytes(data)]
+
+    def put_str(self, text):
+        self.put_bytes(text.encode("utf-8", "surrogateescape"))
+
+    def put_strs(self, texts):
+        encoded = [t.encode("utf-8", "surrogateescape") for t in texts]
+        self.put_ints([len(e) for e in encoded])
+        self.put_bytes(b"".join(encoded))
+
+    def payload(self):
+        return b"".join(self._parts)
+
+
+class Reader:
+    """Reads back a Writer's fields, in order, from a buffer."""
+
+    def __init__(self, data):
+        self._view = memoryview(data)
+        self._offset = 0
+
+    def _unpack(self, fmt):
+        try:
+            (value,) = fmt.unpack_from(self._view, self._offset)
+        except struct.error:
+            raise ValueError("truncated section") from None
+        self._offset += fmt.size
+        return value
+
+    def get_int(self):
+        return self._unpack(_I64)
+
+    def get_ints(self):
+        count = self._unpack(_U32)
+        start = self._offset
+        self._offset = start + 8 * count
+        if self._offset > len(self._view):
+            raise ValueError("truncated section")
+        values = array("q")
+        values.frombytes(self._view[start:self._offset])
+        return values
+
+    def get_bytes(self):
+        """The field as a view into the buffer; copy it to keep it."""
+        length = self._unpack(_U32)
+        start = self._offset
+        self._offset = start + length
+        if self._offset > len(self._view):
+            raise ValueError("truncated section")
+        return self._view[start:self._offset]
+
+    def get_str(self):
+        return bytes(self.get_bytes()).decode("utf-8", "surrogateescape")
+
+    def get_strs(self):
+        lengths = self.get_ints()
+        text = bytes(self.get_bytes())
+        out, offset = [], 0
+        for length in lengths:
+            out.append(text[offset:offset + length].decode("utf-8", "surrogateescape"))
+            offset += length
+        return out
+
+
+class Session:
+    """
+    Sections of a snapshot file, mapped rather than read.
+
+    Opening only parses the section table; each section is decoded
+    when asked for, so state needed for the first frame can be restored
+    before the rest of the file has even been paged in.
+    """
+
+    def __init__(self, data, sections):
+        self._data = data
+        self.sections = sections
+
+    @classmethod
+    def load(cls, path):
+        """Map the snapshot at `path`; None if it is missing or unusable."""
+        try:
+            with open(path, "rb") as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):   # ValueError: empty file
+            return None
+        try:
+            magic, version, count = _HEADER.unpack_from(data, 0)
+            if magic != SESSION_MAGIC or version != SESSION_VERSION:
+                return None
+            sections = {}
+            for i in range(count):
+                name, offset, length = _ENTRY.unpack_from(data, _HEADER.size + i * _ENTRY.size)
+                if offset + length > len(data):
+                    raise ValueError("section past end of file")
+                sections[name.rstrip(b"\0").decode("ascii")] = (offset, length)
+        except (struct.error, ValueError, UnicodeDecodeError):
+            log.warning("ignoring corrupt session snapshot %s", path)
+            return None
+        return cls(data, sections)
+
+    def __contains__(self, name):
+        return name in self.sections
+
+    def raw(self, name):
+        """A section's bytes (copied out of the map), or None."""
+        entry = self.sections.get(name)
+        if entry is None:
+            return None
+        offset, length = entry
+        return self._data[offset:offset + length]
+
+    def reader(self, name):
+        data = self.raw(name)
+        return Reader(data) if data is not None else None
+
+
+def encode_session(sections):
+    """File bytes for {name: payload}."""
+    names = list(sections)
+    offset = _HEADER.size + len(names) * _ENTRY.size
+    parts = [_HEADER.pack(SESSION_MAGIC, SESSION_VERSION, len(names))]
+    for name in names:
+        parts.append(_ENTRY.pack(name.encode("ascii"), offset, len(sections[name])))
+        offset += len(sections[name])
+    parts += [sections[name] for name in names]
+    return b"".join(parts)
+
+
+class SessionStore:
+    """
+    The snapshot file of one workspace.
+
+    Saves may run on a background thread; they are numbered so an older
+    snapshot never overwrites a newer one, and one identical to the last
+    written is skipped.
+    """
+
+    def __init__(self, workspace, path=None, registry=default_registry):
+        self.path = path or os.path.join(state_dir("sessions"),
+                                         workspace_key(workspace) + ".session")
+        self.registry = registry
+        self._lock = threading.Lock()
+        self._issued = 0
+        self._written = 0
+        self._digest = None
+
+    def load(self):
+        return Session.load(self.path)
+
+    def save(self, sections, wait=True):
+        """Write {name: payload}; in the background unless `wait`."""
+        with self._lock:
+            self._issued += 1
+            seq = self._issued
+        if wait:
+            self._write(seq, sections)
+        else:
+            threading.Thread(target=self._write, args=(seq, sections),
+                             name="session-save", daemon=True).start()
+
+    def _write(self, seq, sections):
+        start = time.perf_counter()
+        data = encode_session(sections)
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        with self._lock:
+            if seq < self._written or digest == self._digest:
+                return
+            tmp = self.path + ".tmp"
+            try:
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, self.path)
+            except OSError as e:
+                log.warning("could not save session: %s", e)
+                return
+            self._written = seq
+            self._digest = digest
+        self.registry.observe("session.save_ms", (time.perf_counter() - start) * 1000)
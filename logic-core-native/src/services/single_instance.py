@@ -0,0 +1,86 @@
+"""
+LogicCore v2 - Single Instance
+Hands a launch over to the instance already running.
+
+The running instance listens with a QLocalServer (see
+ui/instance_server.py). A new launch sends it its arguments as one JSON
+line and exits once it answers "ok". On POSIX the server is a Unix
+socket at a known path, so the launch connects with the standard
+library and never pays for importing Qt.
+"""
+import json
+import os
+import socket
+import sys
+
+from .paths import APP_DIR_NAME, runtime_dir
+
+
+# Seconds to reach the running instance, and for it to accept the launch
+CONNECT_TIMEOUT = 0.5
+REPLY_TIMEOUT = 5.0
+
+_USE_UNIX_SOCKET = sys.platform != "win32" and hasattr(socket, "AF_UNIX")
+
+
+def server_name():
+    """QLocalServer name: a socket path on POSIX, a pipe name on Windows."""
+    if _USE_UNIX_SOCKET:
+        return os.path.join(runtime_dir(), "instance.sock")
+    return f"{APP_DIR_NAME}-{os.environ.get('USERNAME', 'user')}"
+
+
+def encode_launch(argv, cwd):
+    return json.dumps({"argv": list(argv), "cwd": cwd}).encode("utf-8") + b"\n"
+
+
+def decode_launch(line):
+    """(argv, cwd) from a launch message; ValueError if it is malformed."""
+    try:
+        message = json.loads(line)
+        argv, cwd = message["argv"], message["cwd"]
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"bad launch message: {e}") from None
+    if not isinstance(argv, list) or not isinstance(cwd, str):
+        raise ValueError("bad launch message")
+    if not all(isinstance(a, str) for a in argv):
+        raise ValueError("bad launch message")
+    return argv, cwd
+
+
+def forward(argv, cwd=None):
+    """Send `argv` to the running instance; True if it took the launch over."""
+    message = encode_launch(argv, cwd or os.getcwd())
+    if not _USE_UNIX_SOCKET:
+        return _forward_local_socket(message)
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(server_name())
+            sock.sendall(message)
+            sock.settimeout(REPLY_TIMEOUT)
+            reply = b""
+            while not reply.endswith(b"\n"):
+                data = sock.recv(64)
+                if not data:
+                    break
+                reply += data
+    except OSError:
+        # No instance, or a stale socket left by one that crashed
+        return False
+    return reply == b"ok\n"
+
+
+def _forward_local_socket(message):
+    """forward() through QLocalSocket, for platforms without Unix sockets."""
+    from PySide6.QtNetwork import QLocalSocket
+
+    sock = QLocalSocket()
+    sock.connectToServer(server_name())
+    if not sock.waitForConnected(int(CONNECT_TIMEOUT * 1000)):
+        return False
+    sock.write(message)
+    sock.waitForBytesWritten(int(CONNECT_TIMEOUT * 1000))
+    ok = sock.waitForReadyRead(int(REPLY_TIMEOUT * 1000)) and bytes(sock.readLine()) == b"ok\n"
+    sock.disconnectFromServer()
+    return ok
@@ -0,0 +1,87 @@
+"""
+LogicCore v2 - Startup Profiler
+Phase timings from process start to the first painted frame.
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+
+def _process_age():
+    """Seconds since the kernel started this process, or None off Linux."""
+    try:
+        with open("/proc/self/stat", "rb") as f:
+            stat = f.read()
+        start_ticks = int(stat[stat.rindex(b")") + 2:].split()[19])
+        with open("/proc/uptime", "rb") as f:
+            uptime = float(f.read().split()[0])
+        return uptime - start_ticks / os.sysconf("SC_CLK_TCK")
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+class StartupProfiler:
+    """
+    Records nested startup phases.
+
+    Disabled by default, in which case `phase` and `mark` cost a branch.
+    Times are relative to `begin()`; the time the interpreter spent
+    before that is taken from /proc when available.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.t0 = time.perf_counter()
+        self.pre_main = None
+        self.phases = []   # (depth, name, start, duration)
+        self.marks = []    # (name, time)
+        self.notes = []
+        self._depth = 0
+
+    def begin(self):
+        self.enabled = True
+        self.t0 = time.perf_counter()
+        self.pre_main = _process_age()
+
+    @contextmanager
+    def phase(self, name):
+        if not self.enabled:
+            yield
+            return
+        entry = [self._depth, name, time.perf_counter() - self.t0, 0.0]
+        self.phases.append(entry)
+        self._depth += 1
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            entry[3] = time.perf_counter() - self.t0 - entry[2]
+
+    def mark(self, name):
+        """Record a point in time, e.g. the first frame."""
+        if self.enabled:
+            self.marks.append((name, time.perf_counter() - self.t0))
+
+    def note(self, text):
+        if self.enabled:
+            self.notes.append(text)
+
+    def report(self):
+        lines = ["Startup profile"]
+        if self.pre_main is not None:
+            lines.append(f"  {'interpreter + main module':<40}{self.pre_main * 1000:9.1f} ms")
+        for depth, name, start, duration in self.phases:
+            label = "  " * depth + name
+            lines.append(f"  {label:<40}{duration * 1000:9.1f} ms   @ {start * 1000:7.1f}")
+        for name, t in self.marks:
+            total = t + (self.pre_main or 0.0)
+            lines.append(f"  {name:<40}{t * 1000:9.1f} ms   ({total * 1000:.1f} ms since exec)")
+        lines.extend(f"  {note}" for note in self.notes)
+        return "\n".join(lines)
+
+    def print_report(self, stream=None):
+        print(self.report(), file=stream or sys.stderr, flush=True)
+
+
+profiler = StartupProfiler()
@@ -0,0 +1,232 @@
+"""
+LogicCore v2 - Token Streaming
+Bounded, cancellable token streams from generator or async sources,
+drained by one consumer.
+"""
+import asyncio
+import inspect
+import logging
+import threading
+from collections import deque
+
+
+log = logging.getLogger(__name__)
+
+# Characters a stream buffers before its producer blocks
+STREAM_CAPACITY = 64 * 1024
+
+
+class StreamCancelled(Exception):
+    """Raised in a producer pushing to a cancelled stream."""
+
+
+class TokenStream:
+    """
+    Text pushed by one producer thread and taken by one consumer.
+
+    `push` blocks while `capacity` characters are waiting, so a
+    producer faster than the UI is slowed down instead of growing the
+    buffer without bound. `drain` takes everything waiting at once.
+    """
+
+    def __init__(self, hub, name="", capacity=STREAM_CAPACITY):
+        self.hub = hub
+        self.name = name
+        self.capacity = capacity
+        self.tokens = 0
+        self.error = None
+        self._parts = deque()
+        self._size = 0
+        self._closed = False
+        self._cancelled = False
+        self._cond = threading.Condition()
+
+    def push(self, text, timeout=None):
+        """
+        Append `text`, waiting while the stream is full; raises
+        StreamCancelled once the consumer has cancelled it, and
+        TimeoutError if it stays full for `timeout` seconds.
+        """
+        with self._cond:
+            if not self._cond.wait_for(
+                    lambda: self._size < self.capacity or self._cancelled, timeout):
+                raise TimeoutError(f"stream {self.name!r} is full")
+            self._append(text)
+        self.hub._notify()
+
+    def try_push(self, text):
+        """Append `text` unless the stream is full; never blocks."""
+        with self._cond:
+            if self._size >= self.capacity and not self._cancelled:
+                return False
+            self._append(text)
+        self.hub._notify()
+        return True
+
+    def _append(self, text):
+        if self._cancelled:
+            raise StreamCancelled(self.name)
+        if self._closed:
+            raise ValueError(f"stream {self.name!r} is closed")
+        self._parts.append(text)
+        self._size += len(text)
+        self.tokens += 1
+
+    def close(self, error=None):
+        """End the stream; `error` is the exception that ended it, if any."""
+        with self._cond:
+            self._closed = True
+            self.error = error
+        self.hub._notify()
+
+    def cancel(self):
+        """Stop the stream: queued text is dropped and the producer's next push raises."""
+        with self._cond:
+            self._cancelled = True
+            self._closed = True
+            self._parts.clear()
+            self._size = 0
+            self._cond.notify_all()
+        self.hub._notify()
+
+    def is_cancelled(self):
+        return self._cancelled
+
+    def drain(self, limit=None):
+        """(text, finished): what is waiting, up to about `limit` characters."""
+        with self._cond:
+            parts = self._parts
+            if limit is None or self._size <= limit:
+                taken = list(parts)
+                parts.clear()
+                self._size = 0
+            else:
+                taken = []
+                size = 0
+                while parts and size < limit:
+                    part = parts.popleft()
+                    taken.append(part)
+                    size += len(part)
+                self._size -= size
+            self._cond.notify_all()
+            return "".join(taken), self._closed and not parts
+
+
+class StreamHub:
+    """
+    The streams feeding one consumer.
+
+    `wake()` is called from a producer thread when data arrives while
+    the hub is idle; the consumer then calls `drain` until it reports
+    the hub idle again. So, however many tokens arrive, the consumer is
+    woken once per busy period, not once per token. A Qt consumer
+    passes a queued signal's `emit` as `wake`.
+    """
+
+    def __init__(self, wake=None):
+        self.wake = wake
+        self._streams = []
+        self._lock = threading.Lock()
+        self._idle = True
+
+    def open(self, name="", capacity=STREAM_CAPACITY):
+        stream = TokenStream(self, name, capacity)
+        with self._lock:
+            self._streams.append(stream)
+        self._notify()
+        return stream
+
+    def start(self, source, name="", capacity=STREAM_CAPACITY):
+        """
+        Stream the tokens of `source`, an iterable or async iterable of
+        strings, from a producer thread; returns the TokenStream.
+        """
+        stream = self.open(name, capacity)
+        self.produce(source, stream)
+        return stream
+
+    def produce(self, source, stream):
+        """Feed `source` into an open `stream` from a new producer thread."""
+        thread = threading.Thread(target=self._produce, args=(source, stream),
+                                  name=f"Stream {stream.name}".strip(), daemon=True)
+        thread.start()
+
+    def _produce(self, source, stream):
+        try:
+            if inspect.isasyncgen(source) or hasattr(source, "__aiter__"):
+                asyncio.run(feed_async(stream, source))
+            else:
+                feed(stream, source)
+        except StreamCancelled:
+            pass
+        except Exception as e:
+            log.warning("stream %r failed: %s", stream.name, e)
+            stream.close(e)
+            return
+        stream.close()
+
+    def _notify(self):
+        with self._lock:
+            if not self._idle:
+                return
+            self._idle = False
+        if self.wake is not None:
+            self.wake()
+
+    def drain(self, limit=None):
+        """
+        [(stream, text, finished)] for every stream with news, dropping
+        finished streams. Returns None instead when the hub has no
+        streams left, marking it idle.
+        """
+        with self._lock:
+            streams = list(self._streams)
+        out = []
+        done = []
+        for stream in streams:
+            text, finished = stream.drain(limit)
+            if text or finished:
+                out.append((stream, text, finished))
+            if finished:
+                done.append(stream)
+        with self._lock:
+            for stream in done:
+                self._streams.remove(stream)
+            if not self._streams and not out:
+                self._idle = True
+                return None
+        return out
+
+    def streams(self):
+        with self._lock:
+            return list(self._streams)
+
+    def cancel_all(self):
+        for stream in self.streams():
+            stream.cancel()
+
+
+def feed(stream, tokens):
+    """Push every token of an iterable, closing it early if cancelled."""
+    try:
+        for token in tokens:
+            stream.push(token)
+    finally:
+        close = getattr(tokens, "close", None)
+        if close is not None:
+            close()
+
+
+async def feed_async(stream, tokens):
+    """
+    Push every token of an async iterable. A full stream is waited on
+    in a worker thread, so the event loop keeps running.
+    """
+    try:
+        async for token in tokens:
+            if not stream.try_push(token):
+                await asyncio.to_thread(stream.push, token)
+    finally:
+        close = getattr(tokens, "aclose", None)
+        if close is not None:
+            await close()
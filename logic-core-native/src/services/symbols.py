@@ -0,0 +1,507 @@
+"""
+LogicCore v2 - Symbol Index
+Workspace definitions, imports and references of Python files, parsed
+with `ast` in a process pool and kept in SQLite between sessions.
+"""
+import ast
+import hashlib
+import logging
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+from .file_index import in_dirs
+from .ignore import IgnoreRules
+from .metrics import default_registry
+from .paths import cache_dir, workspace_key
+
+try:
+    from .host.client import HostUnavailable, default_host
+except ImportError:  # No shared memory / Unix sockets (e.g. Windows)
+    HostUnavailable = default_host = None
+
+
+log = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+PYTHON_SUFFIXES = (".py", ".pyi", ".pyw")
+# Files per worker task
+CHUNK_SIZE = 64
+# Fewer stale files than this are parsed on the index thread itself
+INLINE_FILES = 16
+# Larger files are listed but not parsed
+MAX_FILE_SIZE = 4 * 1024 * 1024
+# Wait for changes to settle before refreshing
+REFRESH_DELAY = 0.3
+
+# Definition kinds
+CLASS = "class"
+FUNCTION = "function"
+METHOD = "method"
+VARIABLE = "variable"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL,
+    size INTEGER, mtime_ns INTEGER, hash BLOB);
+CREATE TABLE IF NOT EXISTS symbols (
+    file_id INTEGER, name TEXT, key TEXT, qualname TEXT, kind TEXT,
+    line INTEGER, col INTEGER);
+CREATE TABLE IF NOT EXISTS refs (
+    file_id INTEGER, name TEXT, line INTEGER, col INTEGER);
+CREATE TABLE IF NOT EXISTS imports (
+    file_id INTEGER, module TEXT, name TEXT, alias TEXT, line INTEGER);
+CREATE INDEX IF NOT EXISTS symbols_key ON symbols (key);
+CREATE INDEX IF NOT EXISTS symbols_file ON symbols (file_id);
+CREATE INDEX IF NOT EXISTS refs_name ON refs (name);
+CREATE INDEX IF NOT EXISTS refs_file ON refs (file_id);
+CREATE INDEX IF NOT EXISTS imports_file ON imports (file_id);
+"""
+
+
+class Symbol:
+    """A definition found by the index."""
+
+    __slots__ = ("name", "qualname", "kind", "path", "line", "col")
+
+    def __init__(self, name, qualname, kind, path, line, col):
+        self.name = name
+        self.qualname = qualname
+        self.kind = kind
+        self.path = path
+        self.line = line
+        self.col = col
+
+    def __repr__(self):
+        return f"Symbol({self.qualname!r}, {self.kind}, {self.path}:{self.line})"
+
+
+class _Extractor(ast.NodeVisitor):
+    """Collects the rows of one module."""
+
+    def __init__(self):
+        self.symbols = []   # (name, qualname, kind, line, col)
+        self.refs = set()   # (name, line, col)
+        self.imports = []   # (module, name, alias, line)
+        self._scope = []    # (qualname prefix, is class)
+
+    def _define(self, name, kind, node):
+        prefix = self._scope[-1][0] + "." if self._scope else ""
+        self.symbols.append((name, prefix + name, kind, node.lineno, node.col_offset))
+
+    def _body(self, node, qualname, is_class):
+        self._scope.append((qualname, is_class))
+        for child in node.body:
+            self.visit(child)
+        self._scope.pop()
+
+    def visit_ClassDef(self, node):
+        self._define(node.name, CLASS, node)
+        for child in node.decorator_list + node.bases + node.keywords:
+            self.visit(child)
+        self._body(node, self.symbols[-1][1], True)
+
+    def visit_FunctionDef(self, node):
+        in_class = bool(self._scope) and self._scope[-1][1]
+        self._define(node.name, METHOD if in_class else FUNCTION, node)
+        for child in node.decorator_list:
+            self.visit(child)
+        self.visit(node.args)
+        if node.returns is not None:
+            self.visit(node.returns)
+        self._body(node, self.symbols[-1][1], False)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def _assigned(self, target):
+        # Module and class attributes only; locals are not worth indexing
+        if isinstance(target, ast.Name):
+            if not self._scope or self._scope[-1][1]:
+                self._define(target.id, VARIABLE, target)
+        elif isinstance(target, (ast.Tuple, ast.List)):
+            for element in target.elts:
+                self._assigned(element)
+
+    def visit_Assign(self, node):
+        for target in node.targets:
+            self._assigned(target)
+        self.generic_visit(node)
+
+    def visit_AnnAssign(self, node):
+        self._assigned(node.target)
+        self.generic_visit(node)
+
+    def visit_Import(self, node):
+        for alias in node.names:
+            self.imports.append((alias.name, "", alias.asname or "", node.lineno))
+
+    def visit_ImportFrom(self, node):
+        module = "." * node.level + (node.module or "")
+        for alias in node.names:
+            self.imports.append((module, alias.name, alias.asname or "", node.lineno))
+
+    def visit_Name(self, node):
+        if not isinstance(node.ctx, ast.Store):
+            self.refs.add((node.id, node.lineno, node.col_offset))
+
+    def visit_Attribute(self, node):
+        if not isinstance(node.ctx, ast.Store):
+            # Point at the attribute name, not the start of the expression
+            line = node.end_lineno
+            self.refs.add((node.attr, line, max(0, node.end_col_offset - len(node.attr))))
+        self.visit(node.value)
+
+
+def parse_source(source):
+    """(symbols, refs, imports) rows of Python source; SyntaxError if invalid."""
+    extractor = _Extractor()
+    extractor.visit(ast.parse(source))
+    return extractor.symbols, sorted(extractor.refs), extractor.imports
+
+
+def index_chunk(root, files):
+    """
+    Worker entry point: index a chunk of (relpath, old_hash) files.
+
+    Returns [(relpath, size, mtime_ns, hash, rows)]. `rows` is None if
+    the content still has `old_hash`, so the rows already stored are
+    kept; a file that cannot be parsed is stored with no rows.
+    """
+    results = []
+    for rel, old_hash in files:
+        path = os.path.join(root, *rel.split("/"))
+        try:
+            with open(path, "rb") as f:
+                st = os.fstat(f.fileno())
+                data = f.read(MAX_FILE_SIZE + 1)
+        except OSError:
+            continue
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        if digest == old_hash:
+            rows = None
+        elif len(data) > MAX_FILE_SIZE:
+            rows = ([], [], [])
+        else:
+            try:
+                rows = parse_source(data)
+            except (SyntaxError, ValueError, RecursionError):
+                rows = ([], [], [])
+        results.append((rel, st.st_size, st.st_mtime_ns, digest, rows))
+    return results
+
+
+class SymbolIndex:
+    """
+    Workspace symbol index service.
+
+    Python files listed by the `FileIndex` are parsed in the service
+    host's worker processes, which every window shares (or in a process
+    pool of its own where there is no host), and their definitions,
+    imports and references stored in an SQLite database in WAL mode. A
+    file is parsed again only once its size or mtime changes, and then
+    only if its content hash changed too, so a later session just
+    re-checks what was edited while it was closed. Changes reported by
+    the file index are picked up the same way.
+
+    Lookups can come from any thread while the index thread writes;
+    each thread reads through its own connection.
+    """
+
+    def __init__(self, root, file_index, db_path=None, workers=None,
+                 registry=default_registry, host=default_host):
+        self.root = os.path.abspath(root)
+        self.file_index = file_index
+        self.db_path = db_path or os.path.join(
+            cache_dir("symbols"), workspace_key(self.root) + ".sqlite")
+        self.workers = workers or max(1, (os.cpu_count() or 2) - 1)
+        self.registry = registry
+        self.host = host
+        self.ignore = IgnoreRules(self.root)
+        self.ready = threading.Event()
+        self.file_count = 0
+        self._files = {}            # path -> (id, size, mtime_ns, hash)
+        self._local = threading.local()
+        self._pool = None
+        self._stop = threading.Event()
+        self._wake = threading.Condition()
+        self._pending = set()       # changed directories not yet refreshed
+        self._thread = None
+
+    # --- Lifecycle ----------------------------------------------------
+
+    def start(self):
+        """Open the database and keep it up to date on a background thread."""
+        if self._thread is not None:
+            return
+        self.file_index.subscribe(self._on_index_changed)
+        self._thread = threading.Thread(target=self._run, name="SymbolIndex", daemon=True)
+        self._thread.start()
+
+    def wait_ready(self, timeout=None):
+        """Block until the first refresh is done."""
+        return self.ready.wait(timeout)
+
+    def shutdown(self):
+        self.file_index.unsubscribe(self._on_index_changed)
+        self._stop.set()
+        with self._wake:
+            self._wake.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def _connect(self):
+        """This thread's connection to the database."""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.db_path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def _open(self):
+        db = self._connect()
+        version = db.execute("PRAGMA user_version").fetchone()[0]
+        if version != SCHEMA_VERSION:
+            with db:
+                for table in ("files", "symbols", "refs", "imports"):
+                    db.execute(f"DROP TABLE IF EXISTS {table}")
+            db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        db.executescript(_SCHEMA)
+        self._files = {path: (file_id, size, mtime_ns, digest) for file_id, path, size, mtime_ns, digest
+                       in db.execute("SELECT id, path, size, mtime_ns, hash FROM files")}
+        return db
+
+    # --- Indexing -----------------------------------------------------
+
+    def _on_index_changed(self, changed):
+        with self._wake:
+            self._pending.update(changed)
+            self._wake.notify()
+
+    def _run(self):
+        try:
+            db = self._open()
+        except sqlite3.Error as e:
+            log.warning("symbol index %s unavailable: %s", self.db_path, e)
+            self.ready.set()
+            return
+        self.file_index.wait_ready()
+        try:
+            self.refresh(db)
+        except Exception:
+            log.exception("symbol index refresh failed")
+        self.ready.set()
+        while not self._stop.is_set():
+            with self._wake:
+                while not self._pending and not self._stop.is_set():
+                    self._wake.wait()
+            # Let a burst of changes settle into one refresh
+            if self._stop.wait(REFRESH_DELAY):
+                break
+            with self._wake:
+                dirs, self._pending = self._pending, set()
+            self.ignore.invalidate()
+            try:
+                self.refresh(db, dirs)
+            except Exception:
+                log.exception("symbol index refresh failed")
+        db.close()
+
+    def _executor(self):
+        if self._pool is None:
+            # Never fork a process that is running Qt threads
+            context = multiprocessing.get_context("spawn")
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=context)
+        return self._pool
+
+    def _submit(self, chunk):
+        """Parse `chunk` in the service host, or in our own pool without one."""
+        if self.host is not None:
+            try:
+                return self.host.submit("symbols.index_chunk", self.root, chunk)
+            except HostUnavailable:
+                log.warning("service host unavailable; indexing symbols in-process")
+                self.host = None
+        return self._executor().submit(index_chunk, self.root, chunk)
+
+    def refresh(self, db=None, dirs=None):
+        """
+        Bring the index up to date with the file index, within `dirs`
+        (relative directories, and everything below them) if given.
+        Runs on the index thread, or before `start`; returns the number
+        of files parsed.
+        """
+        db = db or self._connect()
+        start = time.perf_counter()
+        current = {}
+        for rel, _, _ in self.file_index.iter_files():
+            if not rel.endswith(PYTHON_SUFFIXES):
+                continue
+            if dirs is not None and not in_dirs(rel, dirs):
+                continue
+            if self.ignore.is_ignored(rel):
+                continue
+            # The file index snapshot only re-lists directories whose
+            # mtime changed, which misses files edited in place while
+            # the workspace was closed; stat them here instead.
+            try:
+                st = os.stat(self.file_index.abspath(rel))
+            except OSError:
+                continue
+            current[rel] = (st.st_size, st.st_mtime_ns)
+        if dirs is None:
+            removed = [p for p in self._files if p not in current]
+        else:
+            removed = [p for p in self._files if p not in current and in_dirs(p, dirs)]
+        stale = []
+        for rel, (size, mtime_ns) in current.items():
+            known = self._files.get(rel)
+            if known is None or known[1] != size or known[2] != mtime_ns:
+                stale.append((rel, known[3] if known else None))
+        if removed:
+            with db:
+                self._delete(db, [self._files.pop(p)[0] for p in removed])
+        parsed = 0
+        if len(stale) < INLINE_FILES:
+            if stale:
+                parsed = self._store(db, index_chunk(self.root, stale))
+        else:
+            parsed = self._fan_out(db, stale)
+        self.file_count = len(self._files)
+        elapsed = time.perf_counter() - start
+        if stale or removed:
+            self.registry.observe("symbols.refresh_ms", elapsed * 1000)
+            log.info("symbol index: %d files checked, %d parsed, %d removed in %.0f ms",
+                     len(stale), parsed, len(removed), elapsed * 1000)
+        return parsed
+
+    def _fan_out(self, db, stale):
+        chunks = [stale[i:i + CHUNK_SIZE] for i in range(0, len(stale), CHUNK_SIZE)]
+        pending = set()
+        window = self.workers * 4
+        position = 0
+        parsed = 0
+        while (position < len(chunks) or pending) and not self._stop.is_set():
+            while position < len(chunks) and len(pending) < window:
+                pending.add(self._submit(chunks[position]))
+                position += 1
+            done, pending = wait(pending, timeout=0.1, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    results = future.result()
+                except Exception:
+                    log.exception("symbol index worker failed")
+                    continue
+                parsed += self._store(db, results)
+        for future in pending:
+            future.cancel()
+        return parsed
+
+    def _delete(self, db, file_ids):
+        ids = [(i,) for i in file_ids]
+        for table in ("symbols", "refs", "imports"):
+            db.executemany(f"DELETE FROM {table} WHERE file_id = ?", ids)
+        db.executemany("DELETE FROM files WHERE id = ?", ids)
+
+    def _store(self, db, results):
+        """Write one chunk of worker results; returns how many were parsed."""
+        parsed = 0
+        with db:
+            for rel, size, mtime_ns, digest, rows in results:
+                known = self._files.get(rel)
+                if rows is None and known is not None:
+                    db.execute("UPDATE files SET size = ?, mtime_ns = ? WHERE id = ?",
+                               (size, mtime_ns, known[0]))
+                    self._files[rel] = (known[0], size, mtime_ns, digest)
+                    continue
+                if known is not None:
+                    self._delete(db, [known[0]])
+                file_id = db.execute(
+                    "INSERT INTO files (path, size, mtime_ns, hash) VALUES (?, ?, ?, ?)",
+                    (rel, size, mtime_ns, digest)).lastrowid
+                self._files[rel] = (file_id, size, mtime_ns, digest)
+                symbols, refs, imports = rows or ((), (), ())
+                db.executemany("INSERT INTO symbols VALUES (?, ?, ?, ?, ?, ?, ?)",
+                               [(file_id, name, name.lower(), qualname, kind, line, col)
+                                for name, qualname, kind, line, col in symbols])
+                db.executemany("INSERT INTO refs VALUES (?, ?, ?, ?)",
+                               [(file_id, name, line, col) for name, line, col in refs])
+                db.executemany("INSERT INTO imports VALUES (?, ?, ?, ?, ?)",
+                               [(file_id,) + row for row in imports])
+                parsed += 1
+        self.registry.incr("symbols.parsed", parsed)
+        return parsed
+
+    # --- Queries ------------------------------------------------------
+
+    def _query(self, sql, args):
+        start = time.perf_counter()
+        try:
+            rows = self._connect().execute(sql, args).fetchall()
+        except sqlite3.Error as e:
+            log.warning("symbol query failed: %s", e)
+            return []
+        self.registry.observe("symbols.query_ms", (time.perf_counter() - start) * 1000)
+        return rows
+
+    def find_symbol(self, query, limit=100):
+        """
+        Definitions whose name starts with `query` (case-insensitive),
+        shortest names first. "Class.meth" narrows by the qualified name.
+        """
+        scope, _, prefix = query.rpartition(".")
+        prefix = prefix.lower()
+        if not prefix and not scope:
+            return []
+        sql = ("SELECT s.name, s.qualname, s.kind, f.path, s.line, s.col "
+               "FROM symbols s JOIN files f ON f.id = s.file_id "
+               "WHERE s.key >= ? AND s.key < ?")
+        args = [prefix, prefix + "\uffff"]
+        if scope:
+            sql += " AND s.qualname LIKE ?"
+            args.append(f"%{scope}.{prefix}%")
+        sql += " ORDER BY length(s.name), s.name, f.path LIMIT ?"
+        args.append(limit)
+        return [Symbol(*row) for row in self._query(sql, args)]
+
+    def definitions(self, name):
+        """Every definition of exactly `name`."""
+        rows = self._query(
+            "SELECT s.name, s.qualname, s.kind, f.path, s.line, s.col "
+            "FROM symbols s JOIN files f ON f.id = s.file_id "
+            "WHERE s.key = ? AND s.name = ? ORDER BY f.path, s.line",
+            (name.lower(), name))
+        return [Symbol(*row) for row in rows]
+
+    def references(self, name, limit=5000):
+        """
+        (path, line, col) of uses of `name`, as a name or an attribute.
+        A file's references are stored together and in line order, so
+        the index returns them grouped by file without sorting.
+        """
+        return self._query(
+            "SELECT f.path, r.line, r.col FROM refs r JOIN files f ON f.id = r.file_id "
+            "WHERE r.name = ? LIMIT ?",
+            (name, limit))
+
+    def symbols_in(self, path):
+        """Definitions of one file, in source order."""
+        rows = self._query(
+            "SELECT s.name, s.qualname, s.kind, f.path, s.line, s.col "
+            "FROM symbols s JOIN files f ON f.id = s.file_id "
+            "WHERE f.path = ? ORDER BY s.line", (path,))
+        return [Symbol(*row) for row in rows]
+
+    def imports_of(self, path):
+        """(module, name, alias, line) imports of one file."""
+        return self._query(
+            "SELECT i.module, i.name, i.alias, i.line FROM imports i "
+            "JOIN files f ON f.id = i.file_id WHERE f.path = ? ORDER BY i.line", (path,))
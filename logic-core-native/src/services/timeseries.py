@@ -0,0 +1,146 @@
+"""
+LogicCore v2 - Time Series
+Fixed-memory metric history with 1 s / 10 s / 60 s rollups.
+"""
+import threading
+from array import array
+
+
+# (bucket seconds, buckets kept): 1 hour, 6 hours and 3 days
+DEFAULT_LEVELS = ((1, 3600), (10, 2160), (60, 4320))
+
+
+class RollupLevel:
+    """
+    One resolution of a series: a ring of bucket means.
+
+    Samples are averaged into the open bucket; when time moves past
+    it, the mean is written to the ring and the next bucket opens.
+    """
+
+    def __init__(self, step, capacity):
+        self.step = step
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self.values = array("d", bytes(8 * capacity))
+        self.head = 0
+        self.count = 0
+        self._bucket = None
+        self._sum = 0.0
+        self._n = 0
+
+    def add(self, t, value):
+        bucket = t - t % self.step
+        if bucket != self._bucket:
+            self._close()
+            self._bucket = bucket
+        self._sum += value
+        self._n += 1
+
+    def _close(self):
+        if self._n:
+            self.times[self.head] = self._bucket
+            self.values[self.head] = self._sum / self._n
+            self.head = (self.head + 1) % self.capacity
+            if self.count < self.capacity:
+                self.count += 1
+        self._sum = 0.0
+        self._n = 0
+
+    def span(self):
+        return self.step * self.capacity
+
+    def since(self, start):
+        """(times, values) of closed buckets plus the open one, from `start`."""
+        if self.count < self.capacity:
+            times, values = self.times[:self.count], self.values[:self.count]
+        else:
+            h = self.head
+            times = self.times[h:] + self.times[:h]
+            values = self.values[h:] + self.values[:h]
+        if self._n:
+            times.append(self._bucket)
+            values.append(self._sum / self._n)
+        lo, hi = 0, len(times)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if times[mid] < start:
+                lo = mid + 1
+            else:
+                hi = mid
+        return times[lo:], values[lo:]
+
+
+class TimeSeries:
+    """A metric recorded at every rollup level at once."""
+
+    def __init__(self, levels=DEFAULT_LEVELS):
+        self.levels = [RollupLevel(step, capacity) for step, capacity in levels]
+        self.last_time = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, t, value):
+        with self._lock:
+            self.last_time = t
+            for level in self.levels:
+                level.add(t, value)
+
+    def window(self, seconds, now=None):
+        """
+        (times, values) covering the last `seconds`, from the finest
+        level that still holds that much history.
+        """
+        now = self.last_time if now is None else now
+        for level in self.levels:
+            if level.span() >= seconds:
+                break
+        with self._lock:
+            return level.since(now - seconds)
+
+    def points(self, seconds, threshold, now=None):
+        """The last `seconds` downsampled to at most `threshold` points."""
+        times, values = self.window(seconds, now)
+        return lttb(times, values, threshold)
+
+
+def lttb(xs, ys, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps the first and last points and, from each of `threshold - 2`
+    buckets, the point forming the largest triangle with the previous
+    kept point and the next bucket's average, which preserves peaks.
+    """
+    n = len(xs)
+    if threshold >= n or threshold < 3:
+        return array("d", xs), array("d", ys)
+    out_x = array("d", [xs[0]])
+    out_y = array("d", [ys[0]])
+    every = (n - 2) / (threshold - 2)
+    a = 0
+    for i in range(threshold - 2):
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        # Average of the next bucket (the last point for the final bucket)
+        if end < next_end:
+            count = next_end - end
+            avg_x = sum(xs[end:next_end]) / count
+            avg_y = sum(ys[end:next_end]) / count
+        else:
+            avg_x, avg_y = xs[n - 1], ys[n - 1]
+        ax, ay = xs[a], ys[a]
+        best = -1.0
+        chosen = start
+        dx, dy = avg_x - ax, avg_y - ay
+        for j in range(start, end):
+            area = abs(dx * (ys[j] - ay) - (xs[j] - ax) * dy)
+            if area > best:
+                best = area
+                chosen = j
+        out_x.append(xs[chosen])
+        out_y.append(ys[chosen])
+        a = chosen
+    out_x.append(xs[n - 1])
+    out_y.append(ys[n - 1])
+    return out_x, out_y
@@ -0,0 +1,281 @@
+"""
+LogicCore v2 - Trigram Index
+On-disk trigram index that narrows the candidate files for literal
+searches.
+"""
+import logging
+import os
+import struct
+import threading
+from array import array
+
+try:
+    import numpy
+except ImportError:  # Trigrams are then collected in pure Python
+    numpy = None
+
+
+log = logging.getLogger(__name__)
+
+INDEX_MAGIC = b"LCTG"
+INDEX_VERSION = 1
+
+# Larger files are always searched directly
+MAX_INDEXED_SIZE = 512 * 1024
+
+_HEADER = struct.Struct("<4sHII")
+_FILE = struct.Struct("<qH")
+_POSTING = struct.Struct("<II")
+
+
+def trigrams_of(data):
+    """Set of the case-folded byte trigrams found in `data`."""
+    data = bytes(data).lower()
+    return {(data[i] << 16) | (data[i + 1] << 8) | data[i + 2]
+            for i in range(len(data) - 2)}
+
+
+if numpy is not None:
+    _LOWER = numpy.arange(256, dtype=numpy.uint32)
+    _LOWER[ord("A"):ord("Z") + 1] += ord("a") - ord("A")
+
+
+def _trigram_array(data):
+    """Sorted unique case-folded trigrams of `data` as a uint32 array."""
+    codes = _LOWER[numpy.frombuffer(data, dtype=numpy.uint8)]
+    if len(codes) < 3:
+        return numpy.empty(0, dtype=numpy.uint32)
+    return numpy.unique((codes[:-2] << 16) | (codes[1:-1] << 8) | codes[2:])
+
+
+def build_postings(files):
+    """
+    Group the trigrams of several files into one postings blob.
+
+    `files` holds (file_id, contents) pairs; the blob is what
+    `TrigramIndex.merge` expects, so the per-trigram work happens in
+    the worker that read the files. With numpy the whole chunk is
+    handled in a few vectorized passes.
+    """
+    if numpy is None:
+        return _build_postings_slow(files)
+    grams = [_trigram_array(data) for _, data in files]
+    if not grams:
+        return b""
+    ids = numpy.concatenate([numpy.full(len(g), file_id, dtype=numpy.uint32)
+                             for (file_id, _), g in zip(files, grams)])
+    grams = numpy.concatenate(grams)
+    order = numpy.argsort(grams, kind="stable")
+    grams, ids = grams[order], ids[order]
+    keys, starts, counts = numpy.unique(grams, return_index=True, return_counts=True)
+    # Each group is (trigram, count) followed by its file ids
+    out = numpy.empty(2 * len(keys) + len(ids), dtype="<u4")
+    heads = starts + 2 * numpy.arange(len(keys))
+    out[heads] = keys
+    out[heads + 1] = counts
+    out[numpy.arange(len(ids)) + 2 * numpy.repeat(numpy.arange(1, len(keys) + 1), counts)] = ids
+    return out.tobytes()
+
+
+def _build_postings_slow(files):
+    grouped = {}
+    for file_id, data in files:
+        for gram in trigrams_of(data):
+            ids = grouped.get(gram)
+            if ids is None:
+                grouped[gram] = array("I", (file_id,))
+            else:
+                ids.append(file_id)
+    parts = []
+    for gram, ids in grouped.items():
+        parts += [_POSTING.pack(gram, len(ids)), ids.tobytes()]
+    return b"".join(parts)
+
+
+def query_trigrams(literal):
+    """Trigrams every file containing `literal` must have."""
+    data = literal.encode("utf-8").lower()
+    return {(data[i] << 16) | (data[i + 1] << 8) | data[i + 2]
+            for i in range(len(data) - 2)}
+
+
+class TrigramIndex:
+    """
+    Posting lists from trigram to file ids.
+
+    Files are added by the search engine's indexer, between searches.
+    A file whose mtime no longer matches the index (or that could not
+    be indexed) is treated as unindexed, so the index can only ever
+    widen the candidate set, never lose a match. File ids stay put
+    while the indexer holds the index, so ids it reserved are still
+    valid when it merges their postings.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.files = []
+        self.mtimes = array("q")
+        self.ids = {}
+        self.postings = {}
+        self.stale = 0
+        self.dirty = False
+        self._holders = 0
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()
+
+    def hold(self):
+        """Keep file ids stable (no compaction) until the matching `release`."""
+        with self._lock:
+            self._holders += 1
+
+    def release(self):
+        with self._lock:
+            self._holders -= 1
+
+    def reserve(self, rel, mtime_ns):
+        """
+        Allocate a file id for `rel` as read at `mtime_ns`.
+
+        Returns None if the file is already indexed at that mtime.
+        """
+        with self._lock:
+            old = self.ids.get(rel)
+            if old is not None:
+                if self.mtimes[old] == mtime_ns:
+                    return None
+                if self.mtimes[old] < 0:
+                    return old  # Reserved by a search that never got to it
+                self.stale += 1
+            file_id = len(self.files)
+            self.files.append(rel)
+            self.mtimes.append(-1)
+            self.ids[rel] = file_id
+            return file_id
+
+    def merge(self, blob, indexed):
+        """Add a postings blob and mark `indexed` (id, mtime_ns) as current."""
+        view = memoryview(blob)
+        offset = 0
+        with self._lock:
+            postings = self.postings
+            while offset < len(view):
+                gram, count = _POSTING.unpack_from(view, offset)
+                offset += _POSTING.size
+                ids = postings.get(gram)
+                if ids is None:
+                    ids = postings[gram] = array("I")
+                ids.frombytes(view[offset:offset + 4 * count])
+                offset += 4 * count
+            for file_id, mtime_ns in indexed:
+                self.mtimes[file_id] = mtime_ns
+            self.dirty = True
+
+    def is_indexed(self, rel, mtime_ns):
+        file_id = self.ids.get(rel)
+        return file_id is not None and self.mtimes[file_id] == mtime_ns
+
+    def candidates(self, literal):
+        """Set of indexed paths that may contain `literal`, or None."""
+        grams = query_trigrams(literal)
+        if not grams:
+            return None
+        with self._lock:
+            lists = []
+            for gram in grams:
+                ids = self.postings.get(gram)
+                if ids is None:
+                    return set()
+                lists.append(ids)
+            lists.sort(key=len)
+            result = set(lists[0])
+            for ids in lists[1:]:
+                result.intersection_update(ids)
+                if not result:
+                    break
+            files, current = self.files, self.ids
+            return {files[i] for i in result if current.get(files[i]) == i}
+
+    def compact(self):
+        """Drop superseded file ids once they make up half the index."""
+        with self._lock:
+            if self._holders or self.stale * 2 < len(self.files):
+                return
+            remap = {}
+            files, mtimes = [], array("q")
+            for rel, old in self.ids.items():
+                if self.mtimes[old] < 0:
+                    continue
+                remap[old] = len(files)
+                files.append(rel)
+                mtimes.append(self.mtimes[old])
+            postings = {}
+            for gram, ids in self.postings.items():
+                kept = array("I", (remap[i] for i in ids if i in remap))
+                if kept:
+                    postings[gram] = kept
+            self.files, self.mtimes, self.postings = files, mtimes, postings
+            self.ids = {rel: i for i, rel in enumerate(files)}
+            self.stale = 0
+
+    # --- Persistence --------------------------------------------------
+
+    def save(self):
+        with self._save_lock:
+            self._save()
+
+    def _save(self):
+        if not self.dirty:
+            return
+        self.compact()
+        with self._lock:
+            parts = [_HEADER.pack(INDEX_MAGIC, INDEX_VERSION,
+                                  len(self.files), len(self.postings))]
+            for rel, mtime_ns in zip(self.files, self.mtimes):
+                name = rel.encode("utf-8", "surrogateescape")
+                parts += [_FILE.pack(mtime_ns, len(name)), name]
+            for gram, ids in self.postings.items():
+                parts += [_POSTING.pack(gram, len(ids)), ids.tobytes()]
+            self.dirty = False
+        tmp = self.path + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(b"".join(parts))
+            os.replace(tmp, self.path)
+        except OSError as e:
+            log.warning("could not save trigram index: %s", e)
+
+    def load(self):
+        try:
+            with open(self.path, "rb") as f:
+                data = memoryview(f.read())
+        except OSError:
+            return False
+        try:
+            magic, version, n_files, n_grams = _HEADER.unpack_from(data, 0)
+            if magic != INDEX_MAGIC or version != INDEX_VERSION:
+                return False
+            offset = _HEADER.size
+            files, mtimes = [], array("q")
+            for _ in range(n_files):
+                mtime_ns, length = _FILE.unpack_from(data, offset)
+                offset += _FILE.size
+                files.append(bytes(data[offset:offset + length])
+                             .decode("utf-8", "surrogateescape"))
+                mtimes.append(mtime_ns)
+                offset += length
+            postings = {}
+            for _ in range(n_grams):
+                gram, count = _POSTING.unpack_from(data, offset)
+                offset += _POSTING.size
+                ids = array("I")
+                ids.frombytes(data[offset:offset + 4 * count])
+                offset += 4 * count
+                postings[gram] = ids
+        except (struct.error, ValueError):
+            log.warning("ignoring corrupt trigram index %s", self.path)
+            return False
+        with self._lock:
+            self.files, self.mtimes, self.postings = files, mtimes, postings
+            self.ids = {rel: i for i, rel in enumerate(files)}
+            self.stale = 0
+        return True
@@ -0,0 +1,192 @@
+"""
+LogicCore v2 - Stall Watchdog
+Detects event-loop stalls and captures the main thread's Python stack.
+"""
+import collections
+import logging
+import logging.handlers
+import os
+import sys
+import threading
+import time
+import traceback
+
+from .metrics import default_registry
+from .paths import state_dir
+
+
+log = logging.getLogger(__name__)
+
+# Upper bounds (ms) of the stall histogram buckets; the last is open-ended
+HISTOGRAM_BOUNDS = (100, 250, 500, 1000, 2500, 5000)
+
+# Stalls kept in memory for the METRICS tab
+MAX_STALLS = 200
+
+# Stack depth written to the log and kept per stall
+STACK_LIMIT = 40
+
+
+class Stall:
+    """One stall: when it started, how long it lasted and where."""
+
+    __slots__ = ("started", "duration", "frames")
+
+    def __init__(self, started, duration, frames):
+        self.started = started      # wall-clock time
+        self.duration = duration    # seconds
+        self.frames = frames        # traceback.StackSummary, innermost last
+
+    def location(self):
+        """Innermost frame as "file.py:line func", or "" if not captured."""
+        if not self.frames:
+            return ""
+        frame = self.frames[-1]
+        return f"{os.path.basename(frame.filename)}:{frame.lineno} {frame.name}"
+
+    def format_stack(self):
+        if not self.frames:
+            return "  (stack not captured)\n"
+        return "".join(self.frames.format())
+
+
+def bucket_label(index):
+    if index == 0:
+        return f"<{HISTOGRAM_BOUNDS[0]}ms"
+    if index == len(HISTOGRAM_BOUNDS):
+        return f">{HISTOGRAM_BOUNDS[-1] / 1000:g}s"
+    high = HISTOGRAM_BOUNDS[index]
+    return f"<{high}ms" if high < 1000 else f"<{high / 1000:g}s"
+
+
+class Watchdog:
+    """
+    Heartbeat monitor for the UI thread.
+
+    The UI thread calls `beat()` from a timer every `interval` seconds.
+    A background thread checks the age of the last beat; once it exceeds
+    `interval + budget` the loop is considered stalled and the main
+    thread's stack is taken from `sys._current_frames()` while it is
+    still stuck. The next beat closes the stall, which is then counted
+    in the histogram, kept for the UI, logged and reported to listeners
+    on the UI thread.
+    """
+
+    def __init__(self, budget=0.05, interval=0.025, registry=None, log_path=None):
+        self.budget = budget
+        self.interval = interval
+        self.registry = registry or default_registry
+        self.log_path = log_path
+        self.histogram = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        self.stalls = collections.deque(maxlen=MAX_STALLS)
+        self.total = 0
+        self._main_ident = threading.main_thread().ident
+        self._last_beat = time.monotonic()
+        self._stack = None
+        self._lock = threading.Lock()
+        self._listeners = []
+        self._logger = None
+        self._thread = None
+        self._stop = threading.Event()
+
+    # --- Lifecycle ------------------------------------------------------
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._open_log()
+        self._last_beat = time.monotonic()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="stall-watchdog",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def is_running(self):
+        return self._thread is not None
+
+    def _open_log(self):
+        if self._logger is not None:
+            return
+        path = self.log_path or os.path.join(state_dir("logs"), "stalls.log")
+        self._logger = logging.getLogger("logiccore.stalls")
+        self._logger.propagate = False
+        self._logger.setLevel(logging.INFO)
+        if not self._logger.handlers:
+            try:
+                handler = logging.handlers.RotatingFileHandler(
+                    path, maxBytes=1_000_000, backupCount=3, encoding="utf-8")
+            except OSError:
+                log.warning("cannot open stall log %s", path)
+                return
+            handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self._logger.addHandler(handler)
+
+    # --- UI thread ------------------------------------------------------
+
+    def beat(self):
+        """Heartbeat; call from a UI-thread timer every `interval`."""
+        now = time.monotonic()
+        previous, self._last_beat = self._last_beat, now
+        gap = now - previous
+        if gap <= self.interval + self.budget:
+            return
+        with self._lock:
+            captured, self._stack = self._stack, None
+        # Only a stack taken during this gap belongs to this stall
+        frames = captured[1] if captured and captured[0] == previous else None
+        self._record(Stall(time.time() - gap, gap - self.interval, frames))
+
+    def _record(self, stall):
+        ms = stall.duration * 1000.0
+        index = 0
+        while index < len(HISTOGRAM_BOUNDS) and ms >= HISTOGRAM_BOUNDS[index]:
+            index += 1
+        self.histogram[index] += 1
+        self.total += 1
+        self.stalls.append(stall)
+        self.registry.incr("stalls")
+        self.registry.observe("stall_ms", ms)
+        if self._logger is not None:
+            self._logger.info("UI stall %.0f ms\n%s", ms, stall.format_stack().rstrip("\n"))
+        for callback in list(self._listeners):
+            callback(stall)
+
+    def subscribe(self, callback):
+        """Call `callback(stall)` on the UI thread after each stall."""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    # --- Watchdog thread ------------------------------------------------
+
+    def _run(self):
+        poll = max(0.005, self.budget / 2)
+        captured_for = None
+        while not self._stop.wait(poll):
+            last = self._last_beat
+            if time.monotonic() - last <= self.interval + self.budget:
+                continue
+            if captured_for == last:
+                continue  # already have this stall's stack
+            captured_for = last
+            frames = self.capture()
+            with self._lock:
+                self._stack = (last, frames)
+
+    def capture(self):
+        """Stack of the main thread right now, innermost frame last."""
+        frame = sys._current_frames().get(self._main_ident)
+        if frame is None:
+            return None
+        return traceback.extract_stack(frame, limit=STACK_LIMIT)
+
+
+default_watchdog = Watchdog()
@@ -2,82 +2,334 @@
 LogicCore v2 - Bottom Panel
 Native Qt bottom panel with terminal and metrics tabs.
 """
+import time
+
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QTabWidget, QTextEdit, QLabel, QFrame, QGridLayout
+    QTabWidget, QLabel, QFrame, QGridLayout, QAbstractScrollArea
+)
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QFont, QColor, QPainter
+
+from .lazy import LazyWidget
+from .output_view import OutputView
+from .sparkline import Sparkline
+from .stall_view import StallView
+from .terminal_screen import (
+    TerminalScreen, BOLD, ITALIC, UNDERLINE, INVERSE
 )
-from PySide6.QtCore import Qt
-from PySide6.QtGui import QFont, QTextCharFormat, QColor
+from .theme import set_role, theme
+from ..services.metrics import default_registry
+from ..services.output import default_service as output_service, get_channel
+from ..services.startup import profiler
+from ..services.watchdog import default_watchdog
+
+try:
+    from ..services.pty_session import PtySession
+except ImportError:  # No PTY support (e.g. Windows)
+    PtySession = None
 
 
 class MetricCard(QFrame):
-    """Display a single metric value."""
+    """
+    Display a single metric value.
+
+    `set_value` can be called as often as data arrives; the label is
+    repainted at most `max_rate` times per second.
+    """
     
-    def __init__(self, label, value, unit, color="#3b82f6"):
+    def __init__(self, label, value, unit, tone="accent", max_rate=4):
         super().__init__()
+        self._min_gap = 1.0 / max_rate
+        self._last_paint = 0.0
+        self._pending = None
+        self._throttle = QTimer(self)
+        self._throttle.setSingleShot(True)
+        self._throttle.timeout.connect(self._apply)
         
-        self.setStyleSheet(f"""
-            MetricCard {{
-                background-color: #121214;
-                border: 1px solid #2a2a30;
-                border-radius: 4px;
-            }}
-        """)
+        self.setAttribute(Qt.WA_StyledBackground, True)
         
         layout = QVBoxLayout(self)
         layout.setContentsMargins(12, 12, 12, 12)
         layout.setSpacing(4)
         
         # Label
-        label_widget = QLabel(label)
-        label_widget.setStyleSheet("color: #52525b; font-size: 10px; font-weight: 600;")
+        label_widget = set_role(QLabel(label), "metricLabel")
         layout.addWidget(label_widget)
         
         # Value
         value_layout = QHBoxLayout()
         value_layout.setSpacing(4)
         
-        value_widget = QLabel(value)
-        value_widget.setStyleSheet(f"color: {color}; font-size: 24px; font-weight: 600;")
-        value_layout.addWidget(value_widget)
+        self.value_widget = set_role(QLabel(value), "metricValue", tone=tone)
+        value_layout.addWidget(self.value_widget)
         
-        unit_widget = QLabel(unit)
-        unit_widget.setStyleSheet("color: #52525b; font-size: 11px;")
+        unit_widget = set_role(QLabel(unit), "unit")
         unit_widget.setAlignment(Qt.AlignBottom)
         value_layout.addWidget(unit_widget)
         
         value_layout.addStretch()
         layout.addLayout(value_layout)
+        
+        # History
+        self.sparkline = Sparkline(tone)
+        layout.addWidget(self.sparkline)
+    
+    def set_history(self, times, values):
+        """Show a downsampled history under the value."""
+        self.sparkline.set_points(times, values)
+    
+    def set_value(self, value):
+        """Show a new value (text or number), throttled to the repaint rate."""
+        self._pending = value
+        if self._throttle.isActive():
+            return
+        wait = self._last_paint + self._min_gap - time.monotonic()
+        if wait > 0:
+            self._throttle.start(int(wait * 1000) + 1)
+        else:
+            self._apply()
+    
+    def _apply(self):
+        value = self._pending
+        if isinstance(value, float):
+            value = f"{value:.1f}" if value < 100 else f"{value:.0f}"
+        text = str(value)
+        if text != self.value_widget.text():
+            self.value_widget.setText(text)
+        self._last_paint = time.monotonic()
 
 
-class TerminalWidget(QTextEdit):
-    """Simple terminal-like text display."""
-    
-    def __init__(self):
+class TerminalWidget(QAbstractScrollArea):
+    """
+    Terminal backed by a shell on a PTY.
+
+    Output is parsed on the PTY reader thread into a bounded
+    TerminalScreen; a frame timer repaints at most once per frame, and
+    only the visible lines are drawn. The timer runs, and paces the
+    reader, only while the terminal is shown.
+    """
+
+    FRAME_MS = 16
+    PADDING = 8
+
+    def __init__(self, workspace=None, scrollback=10000):
         super().__init__()
-        
-        self.setReadOnly(True)
+        self.workspace = workspace
+        self.screen = TerminalScreen(scrollback)
+        self.session = None
+        self._colors = {}
+        self._follow = True
+
         self.setFont(QFont("JetBrains Mono", 11))
-        self.setStyleSheet("""
-            QTextEdit {
-                background-color: #0a0a0b;
-                color: #a1a1aa;
-                border: none;
-                padding: 8px;
-            }
-        """)
-        
+        self.setFocusPolicy(Qt.StrongFocus)
+        self.viewport().setAutoFillBackground(False)
+        self.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+
+        self._frame = QTimer(self)
+        self._frame.setInterval(self.FRAME_MS)
+        self._frame.timeout.connect(self._on_frame)
+
         # Initial content
         self.append_line("➜ LogicCore Terminal v2.0", "#3b82f6")
         self.append_line("System ready.", "#52525b")
         self.append_line("")
-    
+
     def append_line(self, text, color="#a1a1aa"):
         """Append a colored line to the terminal."""
-        cursor = self.textCursor()
-        format = QTextCharFormat()
-        format.setForeground(QColor(color))
-        cursor.insertText(text + "\n", format)
+        self.screen.append_line(text, color)
+
+    # --- Saved state ----------------------------------------------------
+
+    def save_state(self, writer, limit=2000):
+        """Write the last `limit` lines of scrollback with their styles."""
+        styles, lines = self.screen.history(limit)
+        writer.put_strs(fg or "" for fg, _, _ in styles)
+        writer.put_strs(bg or "" for _, bg, _ in styles)
+        writer.put_ints(flags for _, _, flags in styles)
+        writer.put_ints(len(line) for line in lines)
+        writer.put_strs(text for line in lines for text, _ in line)
+        writer.put_ints(style for line in lines for _, style in line)
+
+    def restore_state(self, reader):
+        """Show scrollback saved by `save_state` above the current output."""
+        fgs, bgs, flags = reader.get_strs(), reader.get_strs(), reader.get_ints()
+        counts, texts, ids = reader.get_ints(), reader.get_strs(), reader.get_ints()
+        styles = [(fg or None, bg or None, f) for fg, bg, f in zip(fgs, bgs, flags)]
+        lines, run = [], 0
+        for count in counts:
+            lines.append(tuple(zip(texts[run:run + count], ids[run:run + count])))
+            run += count
+        self.screen.restore(styles, lines)
+
+    # --- Session --------------------------------------------------------
+
+    def start_session(self):
+        """Spawn the shell; called lazily the first time the widget is shown."""
+        if self.session is not None or PtySession is None:
+            return
+        rows, cols = self._grid_size()
+        self.session = PtySession(cwd=self.workspace, on_data=self.screen.feed,
+                                  on_exit=self._on_exit, rows=rows, cols=cols)
+        try:
+            self.session.start()
+        except OSError as e:
+            self.session = None
+            self.append_line(f"Failed to start shell: {e}", "#ef4444")
+
+    def _on_exit(self, code):
+        # Reader thread: only touch the screen, which is lock-protected
+        self.screen.append_line(f"[process exited with code {code}]", "#52525b")
+
+    def close_session(self):
+        self._frame.stop()
+        self.screen.set_paced(False)
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+    # --- Rendering ------------------------------------------------------
+
+    def _line_height(self):
+        return self.fontMetrics().height()
+
+    def _grid_size(self):
+        metrics = self.fontMetrics()
+        rows = max(1, (self.viewport().height() - 2 * self.PADDING) // metrics.height())
+        cols = max(1, (self.viewport().width() - 2 * self.PADDING)
+                   // max(1, metrics.horizontalAdvance("M")))
+        return rows, cols
+
+    def _on_frame(self):
+        if not self.screen.take_changes():
+            return
+        self._update_scrollbar()
+        self.viewport().update()
+
+    def _update_scrollbar(self):
+        bar = self.verticalScrollBar()
+        rows, _ = self._grid_size()
+        maximum = max(0, self.screen.line_count() - rows)
+        bar.blockSignals(True)
+        bar.setRange(0, maximum)
+        bar.setPageStep(rows)
+        if self._follow:
+            bar.setValue(maximum)
+        bar.blockSignals(False)
+
+    def _on_scrolled(self, value):
+        self._follow = value >= self.verticalScrollBar().maximum()
+        self.viewport().update()
+
+    def _color(self, name):
+        color = self._colors.get(name)
+        if color is None:
+            color = self._colors[name] = QColor(name)
+        return color
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        painter.fillRect(self.viewport().rect(), theme.color("bg"))
+        metrics = self.fontMetrics()
+        line_height = metrics.height()
+        ascent = metrics.ascent()
+        char_width = metrics.horizontalAdvance("M")
+        rows = self.viewport().height() // line_height + 1
+        first = self.verticalScrollBar().value()
+        styles = self.screen.styles
+        base_font = self.font()
+
+        y = self.PADDING
+        for line in self.screen.lines(first, rows):
+            x = self.PADDING
+            for text, style_id in line:
+                fg, bg, flags = styles.get(style_id)
+                if flags & INVERSE:
+                    fg, bg = bg or theme.tokens["bg"], fg or theme.tokens["text_muted"]
+                width = len(text) * char_width
+                if bg:
+                    painter.fillRect(x, y, width, line_height, self._color(bg))
+                if flags & (BOLD | ITALIC | UNDERLINE):
+                    font = QFont(base_font)
+                    font.setBold(bool(flags & BOLD))
+                    font.setItalic(bool(flags & ITALIC))
+                    font.setUnderline(bool(flags & UNDERLINE))
+                    painter.setFont(font)
+                else:
+                    painter.setFont(base_font)
+                painter.setPen(self._color(fg) if fg else theme.color("text_muted"))
+                painter.drawText(x, y + ascent, text)
+                x += width
+                if x > self.viewport().width():
+                    break
+            y += line_height
+        painter.end()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        rows, cols = self._grid_size()
+        if self.session is not None:
+            self.session.resize(rows, cols)
+        self._update_scrollbar()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.screen.set_paced(True)
+        self._frame.start()
+        self.start_session()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        # Hidden: no repaints, and a busy shell is not held up meanwhile
+        self._frame.stop()
+        self.screen.set_paced(False)
+
+    # --- Input ----------------------------------------------------------
+
+    def keyPressEvent(self, event):
+        if self.session is None:
+            return super().keyPressEvent(event)
+        data = self._key_bytes(event)
+        if data:
+            self._follow = True
+            self.session.write(data)
+
+    def _key_bytes(self, event):
+        key = event.key()
+        mods = event.modifiers()
+        if key in _KEY_SEQUENCES:
+            return _KEY_SEQUENCES[key]
+        if mods & Qt.ControlModifier and Qt.Key_A <= key <= Qt.Key_Z:
+            return bytes([key - Qt.Key_A + 1])
+        text = event.text()
+        if not text:
+            return b""
+        data = text.encode("utf-8")
+        if mods & Qt.AltModifier:
+            data = b"\x1b" + data
+        return data
+
+    def focusNextPrevChild(self, next):
+        # Keep Tab for shell completion
+        return False
+
+
+_KEY_SEQUENCES = {
+    Qt.Key_Return: b"\r",
+    Qt.Key_Enter: b"\r",
+    Qt.Key_Backspace: b"\x7f",
+    Qt.Key_Tab: b"\t",
+    Qt.Key_Escape: b"\x1b",
+    Qt.Key_Up: b"\x1b[A",
+    Qt.Key_Down: b"\x1b[B",
+    Qt.Key_Right: b"\x1b[C",
+    Qt.Key_Left: b"\x1b[D",
+    Qt.Key_Home: b"\x1b[H",
+    Qt.Key_End: b"\x1b[F",
+    Qt.Key_Delete: b"\x1b[3~",
+    Qt.Key_PageUp: b"\x1b[5~",
+    Qt.Key_PageDown: b"\x1b[6~",
+}
 
 
 class BottomPanel(QWidget):
@@ -85,84 +337,106 @@ class BottomPanel(QWidget):
     Native bottom panel with terminal and metrics tabs.
     """
     
-    def __init__(self, parent=None):
+    # Span of metric history shown under each card
+    history_seconds = 3600
+    
+    def __init__(self, parent=None, workspace=None):
         super().__init__(parent)
         
         self.setMinimumHeight(150)
-        self.setStyleSheet("""
-            BottomPanel {
-                background-color: #0a0a0b;
-                border-top: 1px solid #2a2a30;
-            }
-        """)
+        self.setAttribute(Qt.WA_StyledBackground, True)
         
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
         
         # Tab widget
-        tabs = QTabWidget()
-        tabs.setStyleSheet("""
-            QTabWidget::pane {
-                border: none;
-                background-color: #0a0a0b;
-            }
-            QTabBar::tab {
-                background-color: #0a0a0b;
-                color: #52525b;
-                padding: 8px 16px;
-                border: none;
-                border-bottom: 2px solid transparent;
-                font-size: 10px;
-                font-weight: 600;
-            }
-            QTabBar::tab:selected {
-                color: #eeeeee;
-                border-bottom: 2px solid #3b82f6;
-            }
-            QTabBar::tab:hover {
-                color: #a1a1aa;
-            }
-        """)
+        self.tabs = tabs = QTabWidget()
         
         # Terminal tab
-        terminal = TerminalWidget()
-        tabs.addTab(terminal, "TERMINAL")
-        
-        # Metrics tab
-        metrics = self.create_metrics_panel()
-        tabs.addTab(metrics, "METRICS")
-        
-        # Output tab
-        output = QTextEdit()
-        output.setReadOnly(True)
-        output.setFont(QFont("JetBrains Mono", 11))
-        output.setStyleSheet("""
-            QTextEdit {
-                background-color: #0a0a0b;
-                color: #a1a1aa;
-                border: none;
-                padding: 8px;
-            }
-        """)
-        output.setPlainText("Ready.")
-        tabs.addTab(output, "OUTPUT")
+        with profiler.phase("Terminal"):
+            self.terminal = TerminalWidget(workspace)
+        tabs.addTab(self.terminal, "TERMINAL")
+        
+        # Metrics and output tabs are built when first opened
+        self.metric_cards = {}
+        self.stall_view = None
+        tabs.addTab(LazyWidget(self.create_metrics_panel, "Metrics tab"), "METRICS")
+        
+        self.output = None
+        get_channel("LogicCore").append_line("Ready.")
+        tabs.addTab(LazyWidget(self.create_output_view, "Output tab"), "OUTPUT")
         
         layout.addWidget(tabs)
     
+    def shutdown(self):
+        """Stop the terminal session, output view and stall list."""
+        self.terminal.close_session()
+        if self.output is not None:
+            self.output.shutdown()
+        if self.stall_view is not None:
+            self.stall_view.shutdown()
+    
+    def create_output_view(self):
+        self.output = OutputView(output_service)
+        return self.output
+    
     def create_metrics_panel(self):
         """Create the metrics dashboard."""
-        panel = QWidget()
-        panel.setStyleSheet("background-color: #0a0a0b;")
+        panel = set_role(QWidget(), "view")
         
         layout = QGridLayout(panel)
         layout.setContentsMargins(16, 16, 16, 16)
         layout.setSpacing(12)
         
-        # Metric cards
-        layout.addWidget(MetricCard("THROUGHPUT", "0", "REQ/S", "#3b82f6"), 0, 0)
-        layout.addWidget(MetricCard("LATENCY", "0.0", "MS", "#eab308"), 0, 1)
-        layout.addWidget(MetricCard("CPU LOAD", "0", "%", "#ef4444"), 0, 2)
-        layout.addWidget(MetricCard("MEMORY", "0", "MB", "#a1a1aa"), 0, 3)
+        # Metric cards, keyed by registry series
+        self.metric_cards = {
+            "requests/s": MetricCard("THROUGHPUT", "0", "REQ/S", "accent"),
+            "latency_ms": MetricCard("LATENCY", "0.0", "MS", "warning"),
+            "cpu.process_pct": MetricCard("CPU LOAD", "0", "%", "error"),
+            "memory.rss_mb": MetricCard("MEMORY", "0", "MB", "muted"),
+            # Inference gateway
+            "inference.requests/s": MetricCard("INFERENCE", "0", "REQ/S", "accent"),
+            "inference.hit_pct": MetricCard("CACHE HITS", "0", "%", "muted"),
+            "inference.batch_size": MetricCard("BATCH SIZE", "0", "REQ", "warning"),
+            "inference.queue_ms": MetricCard("QUEUE WAIT", "0.0", "MS", "error"),
+        }
+        columns = 4
+        for i, card in enumerate(self.metric_cards.values()):
+            layout.addWidget(card, i // columns, i % columns)
+        rows = (len(self.metric_cards) + columns - 1) // columns
+        
+        # Event-loop stalls caught by the watchdog
+        self.stall_view = StallView(default_watchdog)
+        layout.addWidget(self.stall_view, rows, 0, 1, columns)
+        layout.setRowStretch(rows, 1)
+        
+        self._metrics_timer = QTimer(self)
+        self._metrics_timer.setInterval(250)
+        self._metrics_timer.timeout.connect(self.update_metrics)
+        self._metrics_timer.start()
+        
+        self._history_timer = QTimer(self)
+        self._history_timer.setInterval(1000)
+        self._history_timer.timeout.connect(self.update_history)
+        self._history_timer.start()
         
         return panel
+    
+    def update_metrics(self):
+        """Push the latest registry samples into the cards."""
+        if not self.metric_cards or not self.metric_cards["requests/s"].isVisible():
+            return
+        for name, card in self.metric_cards.items():
+            ring = default_registry.series(name)
+            if ring.count:
+                card.set_value(ring.last())
+    
+    def update_history(self):
+        """Redraw the sparklines from the rolled-up history."""
+        if not self.metric_cards or not self.metric_cards["requests/s"].isVisible():
+            return
+        for name, card in self.metric_cards.items():
+            history = default_registry.history(name)
+            card.set_history(*history.points(self.history_seconds,
+                                             card.sparkline.point_budget()))
@@ -0,0 +1,120 @@
+"""
+LogicCore v2 - Chat View
+Sidebar AI Chat panel: workspace-grounded prompts streamed from the
+local model.
+"""
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QPlainTextEdit, QPushButton
+)
+from PySide6.QtCore import Qt
+
+from .stream_flusher import StreamFlusher, TextEditSink
+from .theme import set_role
+from ..services.chat_context import gather_context
+from ..services.inference import InferenceGateway, ResponseCache, StandInModel
+
+
+class ChatView(QWidget):
+    """
+    Chat panel over the inference gateway.
+
+    Each question is sent with context picked from the retrieval and
+    symbol indexes. Context is gathered on the stream's producer
+    thread, and the answer reaches the transcript through a
+    StreamFlusher, so the UI thread only appends text once per frame.
+    The gateway is created with the first question.
+    """
+
+    def __init__(self, retrieval=None, symbols=None, model=None, parent=None):
+        super().__init__(parent)
+        self.retrieval = retrieval
+        self.symbols = symbols
+        self.model = model
+        self.gateway = None
+        self.flusher = StreamFlusher(self)
+        self._stream = None
+
+        set_role(self, "view")
+        self.setAttribute(Qt.WA_StyledBackground, True)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        # Header
+        header = set_role(QWidget(), "header")
+        header.setFixedHeight(36)
+        header_layout = QHBoxLayout(header)
+        header_layout.setContentsMargins(12, 0, 12, 0)
+        header_layout.addWidget(set_role(QLabel("AI CHAT"), "header"))
+        header_layout.addStretch()
+        clear_button = set_role(QPushButton("Clear"), "link")
+        clear_button.clicked.connect(self.clear)
+        header_layout.addWidget(clear_button)
+        layout.addWidget(header)
+
+        # Transcript
+        self.transcript = set_role(QPlainTextEdit(), "transcript")
+        self.transcript.setReadOnly(True)
+        layout.addWidget(self.transcript)
+
+        # Status
+        self.status_label = set_role(QLabel(""), "status")
+        self.status_label.setContentsMargins(12, 2, 12, 4)
+        self.status_label.setWordWrap(True)
+        layout.addWidget(self.status_label)
+
+        # Prompt row
+        prompt_row = QWidget()
+        prompt_layout = QHBoxLayout(prompt_row)
+        prompt_layout.setContentsMargins(8, 4, 8, 8)
+        prompt_layout.setSpacing(4)
+        self.prompt_edit = QLineEdit()
+        self.prompt_edit.setPlaceholderText("Ask about this workspace")
+        self.prompt_edit.returnPressed.connect(self.send)
+        prompt_layout.addWidget(self.prompt_edit)
+        layout.addWidget(prompt_row)
+
+    def focus_prompt(self):
+        self.prompt_edit.setFocus()
+
+    def send(self):
+        """Ask the current prompt; an answer still streaming is cancelled."""
+        question = self.prompt_edit.text().strip()
+        if not question:
+            return
+        self.prompt_edit.clear()
+        if self._stream is not None:
+            self._stream.cancel()
+        if self.gateway is None:
+            self.gateway = InferenceGateway(self.model or StandInModel(), ResponseCache.default())
+        self.transcript.appendPlainText(f"\n> {question}\n")
+        self.status_label.setText("Thinking…")
+        sink = TextEditSink(self.transcript)
+        stream = self.flusher.start(self._answer(question, self.gateway), sink, name="chat")
+        # Delivered on this thread, so it cannot finish before this is set
+        sink.on_finished = lambda: self._on_finished(stream)
+        self._stream = stream
+
+    def _answer(self, question, gateway):
+        """Token source for one answer; runs on the producer thread."""
+        prompt, sources = gather_context(question, self.retrieval, self.symbols)
+        if sources:
+            yield "[context: " + ", ".join(sources) + "]\n"
+        yield from gateway.stream(prompt)
+        yield "\n"
+
+    def _on_finished(self, stream):
+        if stream is self._stream:
+            self._stream = None
+            self.status_label.setText("")
+
+    def clear(self):
+        if self._stream is not None:
+            self._stream.cancel()
+        self.transcript.clear()
+
+    def shutdown(self):
+        self.flusher.shutdown()
+        if self.gateway is not None:
+            self.gateway.shutdown()
+            self.gateway = None
@@ -0,0 +1,438 @@
+"""
+LogicCore v2 - File Tree Model
+Lazy, model-backed Explorer tree. Directories are listed on a worker
+thread only when their node is expanded, and loaded directories follow
+the workspace file index.
+"""
+import os
+
+from PySide6.QtCore import (
+    Qt, QAbstractItemModel, QModelIndex, QObject, QRunnable,
+    QThreadPool, Signal
+)
+from PySide6.QtGui import QColor
+
+from .git_view import GIT_STATUS_ROLE, STATUS_COLORS
+
+
+FILE_ICONS = {
+    ".py": "🐍",
+    ".pyi": "🐍",
+}
+FOLDER_ICON = "📁"
+DEFAULT_FILE_ICON = "📄"
+
+# Children are inserted in slices so a 100k-entry directory does not
+# stall the view on expand; the view pulls the rest as it scrolls.
+FETCH_BATCH = 1000
+
+# Node states
+UNLOADED, LOADING, LOADED = 0, 1, 2
+
+
+class FileNode:
+    """A single Explorer entry, kept small for very large trees."""
+
+    __slots__ = ("name", "parent", "row", "children", "is_dir", "state",
+                 "pending")
+
+    def __init__(self, name, parent, row, is_dir):
+        self.name = name
+        self.parent = parent
+        self.row = row
+        self.is_dir = is_dir
+        self.children = None
+        self.state = UNLOADED
+        self.pending = None
+
+    def parts(self):
+        """Path components below the workspace root node."""
+        parts = []
+        node = self
+        while node.parent is not None and node.parent.parent is not None:
+            parts.append(node.name)
+            node = node.parent
+        parts.reverse()
+        return parts
+
+    def path(self, root):
+        """Absolute path of this node."""
+        return os.path.join(root, *self.parts())
+
+    def relpath(self):
+        """Workspace-relative path of this node ("" for the root)."""
+        return "/".join(self.parts())
+
+    def subtree_size(self):
+        """Number of loaded nodes below this one."""
+        if not self.children:
+            return 0
+        total = len(self.children)
+        for child in self.children:
+            if child.children:
+                total += child.subtree_size()
+        return total
+
+
+def scan_directory(path):
+    """List a directory as sorted (name, is_dir) pairs, folders first."""
+    entries = []
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    is_dir = entry.is_dir()
+                except OSError:
+                    is_dir = False
+                entries.append((entry.name, is_dir))
+    except OSError:
+        return []
+    entries.sort(key=lambda e: (not e[1], e[0].casefold()))
+    return entries
+
+
+def _runs(rows):
+    """Contiguous (first, last) runs of an ascending list of rows."""
+    runs = []
+    for row in rows:
+        if runs and runs[-1][1] == row - 1:
+            runs[-1][1] = row
+        else:
+            runs.append([row, row])
+    return runs
+
+
+class _ListingSignals(QObject):
+    finished = Signal(object, object)
+    refreshed = Signal(object, object)
+    changed = Signal(object)
+
+
+class _ListingTask(QRunnable):
+    """Worker task that lists one directory and hands the listing to `done`."""
+
+    def __init__(self, node, rel, lister, done):
+        super().__init__()
+        self.node = node
+        self.rel = rel
+        self.lister = lister
+        self.done = done
+
+    def run(self):
+        self.done(self.node, self.lister(self.rel))
+
+
+class FileTreeModel(QAbstractItemModel):
+    """
+    Explorer tree model over a workspace directory.
+
+    Nothing below the root is read up front: `fetchMore` hands the
+    directory to a worker thread and the children are inserted when
+    the listing arrives. Collapsed subtrees are released again once
+    the model holds more than `max_nodes` entries.
+
+    With a `FileIndex`, listings come from the index and loaded
+    directories are re-listed on the same pool and updated in place
+    when the index reports changes.
+    """
+
+    def __init__(self, root_path, parent=None, file_index=None,
+                 max_nodes=200_000):
+        super().__init__(parent)
+        self.root_path = os.path.abspath(root_path)
+        self.file_index = file_index
+        self.max_nodes = max_nodes
+        self.node_count = 1
+        self.git_status = None
+
+        # Invisible root holding the single visible workspace node
+        self._invisible = FileNode("", None, 0, True)
+        self._invisible.state = LOADED
+        name = os.path.basename(self.root_path.rstrip(os.sep)) or self.root_path
+        self.root_node = FileNode(name, self._invisible, 0, True)
+        self._invisible.children = [self.root_node]
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(2)
+        self._signals = _ListingSignals()
+        self._signals.finished.connect(self._on_listing)
+        self._signals.refreshed.connect(self._on_refresh)
+        self._refreshing = {}   # node -> changed again while being listed
+        self._signals.changed.connect(self.refresh_dirs)
+        if file_index is not None:
+            self.lister = file_index.list_dir
+            file_index.subscribe(self._signals.changed.emit)
+        else:
+            self.lister = self._scan
+
+    def _scan(self, rel):
+        return scan_directory(os.path.join(self.root_path, *rel.split("/")))
+
+    def shutdown(self):
+        """Detach from the file index."""
+        if self.file_index is not None:
+            self.file_index.unsubscribe(self._signals.changed.emit)
+
+    # --- QAbstractItemModel -------------------------------------------
+
+    def index(self, row, column, parent=QModelIndex()):
+        parent_node = self.node_from_index(parent)
+        children = parent_node.children
+        if children is None or not 0 <= row < len(children) or column != 0:
+            return QModelIndex()
+        return self.createIndex(row, column, children[row])
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        node = index.internalPointer()
+        parent_node = node.parent
+        if parent_node is None or parent_node is self._invisible:
+            return QModelIndex()
+        return self.createIndex(self._row(parent_node), 0, parent_node)
+
+    def rowCount(self, parent=QModelIndex()):
+        node = self.node_from_index(parent)
+        return len(node.children) if node.children else 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return 1
+
+    def hasChildren(self, parent=QModelIndex()):
+        node = self.node_from_index(parent)
+        if node.state == LOADED and not node.pending:
+            return bool(node.children)
+        return node.is_dir
+
+    def canFetchMore(self, parent):
+        node = self.node_from_index(parent)
+        if not node.is_dir:
+            return False
+        return node.state == UNLOADED or bool(node.pending)
+
+    def fetchMore(self, parent):
+        node = self.node_from_index(parent)
+        if node.pending:
+            self._insert_pending(node, parent)
+            return
+        if node.state != UNLOADED:
+            return
+        node.state = LOADING
+        task = _ListingTask(node, node.relpath(), self.lister, self._signals.finished.emit)
+        self._pool.start(task)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        node = index.internalPointer()
+        if role == Qt.DisplayRole:
+            return f"{self.icon_for(node)} {node.name}"
+        if role == Qt.ToolTipRole:
+            return node.path(self.root_path)
+        if role in (GIT_STATUS_ROLE, Qt.ForegroundRole) and self.git_status is not None:
+            code = self.git_code(node)
+            if code is None:
+                return None
+            return code if role == GIT_STATUS_ROLE else QColor(STATUS_COLORS[code])
+        return None
+
+    def git_code(self, node):
+        """Git badge for a node: a status letter, a dot for folders, or None."""
+        rel = node.relpath()
+        if node.is_dir:
+            return "•" if rel and rel in self.git_status.dirs else None
+        return self.git_status.files.get(rel)
+
+    def set_git_status(self, status):
+        """Apply a new GitStatus, repainting only rows whose badge changed."""
+        old = self.git_status
+        self.git_status = status
+        affected = set(status.files) | status.dirs
+        if old is not None:
+            affected |= set(old.files) | old.dirs
+            affected = {rel for rel in affected
+                        if old.files.get(rel) != status.files.get(rel)
+                        or (rel in old.dirs) != (rel in status.dirs)}
+        for rel in affected:
+            node = self.find_node(rel)
+            if node is not None:
+                index = self.index_for_node(node)
+                self.dataChanged.emit(index, index, [Qt.ForegroundRole, GIT_STATUS_ROLE])
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable
+
+    # --- Helpers ------------------------------------------------------
+
+    def node_from_index(self, index):
+        if index.isValid():
+            return index.internalPointer()
+        return self._invisible
+
+    def index_for_node(self, node):
+        if node is self._invisible:
+            return QModelIndex()
+        return self.createIndex(self._row(node), 0, node)
+
+    @staticmethod
+    def _row(node):
+        """node.row, corrected if an update has moved the node and not renumbered yet."""
+        siblings = node.parent.children
+        row = node.row
+        if row >= len(siblings) or siblings[row] is not node:
+            row = node.row = siblings.index(node)
+        return row
+
+    def root_index(self):
+        return self.index_for_node(self.root_node)
+
+    def file_path(self, index):
+        """Absolute path for an index."""
+        return self.node_from_index(index).path(self.root_path)
+
+    @staticmethod
+    def icon_for(node):
+        if node.is_dir:
+            return FOLDER_ICON
+        return FILE_ICONS.get(os.path.splitext(node.name)[1], DEFAULT_FILE_ICON)
+
+    def _on_listing(self, node, entries):
+        """Receive a directory listing from the worker pool."""
+        if node.state != LOADING:
+            return  # Released while the listing was in flight
+        node.state = LOADED
+        node.children = []
+        node.pending = entries
+        index = self.index_for_node(node)
+        if not entries:
+            # Let the view drop the expand arrow
+            self.dataChanged.emit(index, index)
+            return
+        self._insert_pending(node, index)
+
+    def _insert_pending(self, node, index):
+        batch = node.pending[:FETCH_BATCH]
+        rest = node.pending[FETCH_BATCH:]
+        first = len(node.children)
+        self.beginInsertRows(index, first, first + len(batch) - 1)
+        node.children.extend(
+            FileNode(name, node, first + i, is_dir)
+            for i, (name, is_dir) in enumerate(batch)
+        )
+        node.pending = rest or None
+        self.node_count += len(batch)
+        self.endInsertRows()
+
+    def release(self, index):
+        """Drop the loaded children of a collapsed directory."""
+        node = self.node_from_index(index)
+        if node is self.root_node or not node.children:
+            if node.state == LOADING:
+                node.state = UNLOADED
+            return
+        count = len(node.children)
+        removed = node.subtree_size()
+        self.beginRemoveRows(index, 0, count - 1)
+        node.children = None
+        node.pending = None
+        node.state = UNLOADED
+        self.node_count -= removed
+        self.endRemoveRows()
+
+    def on_collapsed(self, index):
+        """Release collapsed subtrees once the node budget is exceeded."""
+        if self.node_count > self.max_nodes:
+            self.release(index)
+
+    # --- Index updates ------------------------------------------------
+
+    def find_node(self, rel):
+        """Loaded node for a workspace-relative path, or None."""
+        node = self.root_node
+        for name in rel.split("/") if rel else []:
+            if not node.children:
+                return None
+            node = next((c for c in node.children if c.name == name), None)
+            if node is None:
+                return None
+        return node
+
+    def refresh_dirs(self, rels):
+        """Re-list, on the worker pool, loaded directories the index reports as changed."""
+        for rel in rels:
+            node = self.find_node(rel)
+            if node is None or node.state != LOADED:
+                continue
+            if node in self._refreshing:
+                # One listing per directory at a time, so they land in order
+                self._refreshing[node] = True
+                continue
+            self._refreshing[node] = False
+            self._pool.start(_ListingTask(node, rel, self.lister, self._signals.refreshed.emit))
+
+    def _on_refresh(self, node, entries):
+        changed_again = self._refreshing.pop(node, False)
+        if node.state != LOADED or not self._attached(node):
+            return  # Released while the listing was in flight
+        self._apply_listing(node, entries)
+        if changed_again:
+            self.refresh_dirs([node.relpath()])
+
+    def _attached(self, node):
+        while node.parent is not None:
+            siblings = node.parent.children
+            if not siblings or node.row >= len(siblings) or siblings[node.row] is not node:
+                return False
+            node = node.parent
+        return node is self._invisible
+
+    def _apply_listing(self, node, entries):
+        """Update a loaded directory in place, keeping expanded children."""
+        index = self.index_for_node(node)
+        if node.pending:
+            # Partially inserted; drop the rows shown so far (release
+            # keeps the root's) and start over with the new listing
+            if node.children:
+                removed = node.subtree_size()
+                self.beginRemoveRows(index, 0, len(node.children) - 1)
+                node.children = []
+                node.pending = None
+                self.node_count -= removed
+                self.endRemoveRows()
+            node.state = LOADING
+            self._on_listing(node, entries)
+            return
+
+        # Rows are renumbered once at the end; until then _row()
+        # corrects any that Qt asks for
+        wanted = set(entries)
+        children = node.children
+        gone = [row for row, child in enumerate(children)
+                if (child.name, child.is_dir) not in wanted]
+        for first, last in reversed(_runs(gone)):
+            self.beginRemoveRows(index, first, last)
+            for child in children[first:last + 1]:
+                self.node_count -= 1 + child.subtree_size()
+            del children[first:last + 1]
+            self.endRemoveRows()
+
+        # Children now follow the listing's order, so inserting the
+        # first run first puts each entry at its listed row
+        present = {(child.name, child.is_dir) for child in children}
+        added = [row for row, entry in enumerate(entries) if entry not in present]
+        for first, last in _runs(added):
+            self.beginInsertRows(index, first, last)
+            children[first:first] = [
+                FileNode(name, node, row, is_dir)
+                for row, (name, is_dir) in enumerate(entries[first:last + 1], first)
+            ]
+            self.node_count += last - first + 1
+            self.endInsertRows()
+
+        if gone or added:
+            for row, child in enumerate(children):
+                child.row = row
+        if not children:
+            self.dataChanged.emit(index, index)
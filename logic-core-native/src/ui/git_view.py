@@ -0,0 +1,112 @@
+"""
+LogicCore v2 - Git View
+Source control panel fed by the Git status service.
+"""
+import os
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTreeWidget, QTreeWidgetItem,
+    QStyledItemDelegate
+)
+from PySide6.QtCore import Qt, Signal
+from PySide6.QtGui import QColor
+
+from .theme import set_role
+from ..services.git_status import UNTRACKED
+
+
+STATUS_COLORS = {
+    "M": "#eab308",
+    "D": "#ef4444",
+    "C": "#ef4444",
+    "U": "#22c55e",
+    "•": "#a16207",
+}
+
+# Item data role carrying a file's status letter
+GIT_STATUS_ROLE = Qt.UserRole + 1
+
+# Longest list rendered per group
+MAX_LISTED = 5000
+
+
+class GitView(QWidget):
+    """
+    Source control panel listing changed and untracked files.
+    """
+
+    open_requested = Signal(str, int)
+
+    def __init__(self, workspace, parent=None):
+        super().__init__(parent)
+        self.workspace = workspace
+
+        set_role(self, "view")
+        self.setAttribute(Qt.WA_StyledBackground, True)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        # Header
+        header = set_role(QWidget(), "header")
+        header.setFixedHeight(36)
+        header_layout = QHBoxLayout(header)
+        header_layout.setContentsMargins(12, 0, 12, 0)
+        header_label = set_role(QLabel("SOURCE CONTROL"), "header")
+        header_layout.addWidget(header_label)
+        header_layout.addStretch()
+        self.branch_label = set_role(QLabel(""), "branch")
+        header_layout.addWidget(self.branch_label)
+        layout.addWidget(header)
+
+        # Changes
+        self.tree = QTreeWidget()
+        self.tree.setHeaderHidden(True)
+        self.tree.setIndentation(12)
+        self.tree.setUniformRowHeights(True)
+        self.tree.itemActivated.connect(self._on_item_activated)
+        layout.addWidget(self.tree)
+
+    def set_status(self, status):
+        """Show a new GitStatus snapshot."""
+        self.branch_label.setText(f"⎇ {status.branch}" if status.branch else "")
+        changes = sorted((p, c) for p, c in status.files.items() if c != UNTRACKED)
+        untracked = sorted(p for p, c in status.files.items() if c == UNTRACKED)
+
+        self.tree.setUpdatesEnabled(False)
+        self.tree.clear()
+        self._add_group("Changes", changes)
+        self._add_group("Untracked", [(p, UNTRACKED) for p in untracked])
+        self.tree.setUpdatesEnabled(True)
+
+    def _add_group(self, title, files):
+        if not files:
+            return
+        group = QTreeWidgetItem(self.tree, [f"{title}  ({len(files)})"])
+        group.setFlags(Qt.ItemIsEnabled)
+        for path, code in files[:MAX_LISTED]:
+            item = QTreeWidgetItem(group, [f"{code}  {os.path.basename(path)}"])
+            item.setToolTip(0, path)
+            item.setData(0, Qt.UserRole, path)
+            item.setForeground(0, QColor(STATUS_COLORS.get(code, "#a1a1aa")))
+        group.setExpanded(True)
+
+    def _on_item_activated(self, item, column):
+        path = item.data(0, Qt.UserRole)
+        if path:
+            self.open_requested.emit(os.path.join(self.workspace, path), 0)
+
+
+class GitBadgeDelegate(QStyledItemDelegate):
+    """Paints the Git status letter at the right edge of a tree row."""
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        code = index.data(GIT_STATUS_ROLE)
+        if not code:
+            return
+        painter.save()
+        painter.setPen(QColor(STATUS_COLORS.get(code, "#a1a1aa")))
+        rect = option.rect.adjusted(0, 0, -10, 0)
+        painter.drawText(rect, Qt.AlignRight | Qt.AlignVCenter, code)
+        painter.restore()
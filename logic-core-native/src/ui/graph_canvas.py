@@ -0,0 +1,436 @@
+"""
+LogicCore v2 - Graph Canvas
+Pan/zoom view of a pipeline graph, drawing only what is in view.
+"""
+import math
+import threading
+from collections import OrderedDict
+
+from PySide6.QtWidgets import QGraphicsScene, QGraphicsView
+from PySide6.QtCore import Qt, QLineF, QPointF, QRectF, QRunnable, QThreadPool, Signal
+from PySide6.QtGui import QColor, QFont, QFontMetricsF, QPainter, QPainterPath, QPen
+
+from ..graph.spatial import QuadTree
+from .theme import theme
+
+
+# Zoom levels (view scale) where the drawing gets simpler
+DETAIL_SCALE = 0.45     # above: rounded nodes, labels, curved edges
+BLOCK_SCALE = 0.15      # above: plain rectangles, straight edges
+                        # below: density cells and bundled edges
+MIN_SCALE = 0.002
+# Graphs up to this size are cheap enough to draw as blocks at any zoom
+MAX_BLOCKS = 4000
+MAX_SCALE = 4.0
+# Screen size of an overview cell; edges are bundled between squares
+# of BUNDLE_CELLS x BUNDLE_CELLS cells
+CELL_PIXELS = 12
+BUNDLE_CELLS = 4
+# Per-frame limits: beyond these, the heaviest bundles are drawn and
+# edges are drawn straight instead of curved
+MAX_BUNDLES = 3000
+MAX_CURVES = 1500
+# Edges longer than this many view widths are drawn straight
+LONG_EDGE = 3
+# Curved edge paths kept between frames
+ROUTE_CACHE = 20000
+
+
+def _mix(base, color, amount):
+    """Opaque `color` over `base` at `amount` (0-1); cheaper to fill than alpha."""
+    return QColor.fromRgbF(
+        base.redF() + (color.redF() - base.redF()) * amount,
+        base.greenF() + (color.greenF() - base.greenF()) * amount,
+        base.blueF() + (color.blueF() - base.blueF()) * amount)
+
+
+def _curve(graph, a, b):
+    """Start, control x positions and end of the edge from node a to b."""
+    sx, sy = graph.x[a] + graph.w[a], graph.y[a] + graph.h[a] / 2
+    ex, ey = graph.x[b], graph.y[b] + graph.h[b] / 2
+    bend = max(40.0, abs(ex - sx) / 2)
+    return sx, sy, sx + bend, ex - bend, ex, ey
+
+
+class _Overview:
+    """
+    Nodes binned into square cells, and edges bundled per pair of
+    bundle squares, at one zoom level.
+    """
+
+    def __init__(self, cell, cells, links):
+        self.cell = cell
+        self.cells = cells          # (cx, cy) -> node count
+        self.links = links          # ((bx, by), (bx, by)) -> edge count
+        self._rects = None
+        self._bundles = None        # (lines by rank, QuadTree of ranks)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def build(cls, graph, cell):
+        cells = {}
+        keys = []
+        for x, y, w, h in zip(graph.x, graph.y, graph.w, graph.h):
+            key = (int((x + w / 2) // cell), int((y + h / 2) // cell))
+            cells[key] = cells.get(key, 0) + 1
+            keys.append((key[0] // BUNDLE_CELLS, key[1] // BUNDLE_CELLS))
+        links = {}
+        for source, target in zip(graph.sources, graph.targets):
+            pair = (keys[source], keys[target])
+            if pair[0] != pair[1]:
+                links[pair] = links.get(pair, 0) + 1
+        return cls(cell, cells, links)
+
+    def coarser(self):
+        """The same overview with cells twice as large."""
+        cells = {}
+        for (cx, cy), count in self.cells.items():
+            key = (cx >> 1, cy >> 1)
+            cells[key] = cells.get(key, 0) + count
+        links = {}
+        for (a, b), count in self.links.items():
+            pair = ((a[0] >> 1, a[1] >> 1), (b[0] >> 1, b[1] >> 1))
+            if pair[0] != pair[1]:
+                links[pair] = links.get(pair, 0) + count
+        return _Overview(self.cell * 2, cells, links)
+
+    def rects(self):
+        """(cx, cy) -> (shade 0-3, QRectF), made on first use."""
+        if self._rects is None:
+            cell = self.cell
+            self._rects = {
+                (cx, cy): (min(3, count.bit_length() // 2), QRectF(cx * cell, cy * cell, cell, cell))
+                for (cx, cy), count in self.cells.items()
+            }
+        return self._rects
+
+    def prepare(self):
+        """
+        Make the shapes both `rects` and `bundles` draw from. Called from
+        the pool and the UI thread; a second caller waits for the first.
+        """
+        self.rects()
+        with self._lock:
+            if self._bundles is not None:
+                return
+            span = self.cell * BUNDLE_CELLS
+            half = span / 2
+            ranked = sorted(self.links.items(), key=lambda item: -item[1])
+            lines = []
+            boxes = []
+            for rank, (((ax, ay), (bx, by)), count) in enumerate(ranked):
+                line = QLineF(ax * span + half, ay * span + half, bx * span + half, by * span + half)
+                lines.append((min(4, count.bit_length() // 2 + 1), line))
+                boxes.append((min(line.x1(), line.x2()), min(line.y1(), line.y2()),
+                              max(line.x1(), line.x2()), max(line.y1(), line.y2()), rank))
+            self._bundles = (lines, QuadTree.build(boxes))
+
+    def bundles(self, x0, y0, x1, y1, limit):
+        """Up to `limit` (width, QLineF) bundles in view, heaviest first."""
+        if self._bundles is None:
+            self.prepare()
+        lines, tree = self._bundles
+        ranks = tree.query(x0, y0, x1, y1)
+        if len(ranks) > limit:
+            ranks.sort()
+            del ranks[limit:]
+        return [lines[rank] for rank in ranks]
+
+
+class _PrepareTask(QRunnable):
+    """Makes the overview shapes ahead of time, coarsest level first."""
+
+    def __init__(self, overviews):
+        super().__init__()
+        self.overviews = overviews
+        self.cancelled = False
+
+    def run(self):
+        for overview in self.overviews:
+            if self.cancelled:
+                return
+            overview.prepare()
+
+
+class GraphCanvas(QGraphicsView):
+    """
+    Graph view that scales to very large graphs.
+
+    Nothing is added to the scene as items: nodes and edges live in
+    quadtrees, and each frame queries them for the exposed rectangle
+    only. How much is drawn depends on the zoom level: full nodes with
+    labels and curved edges up close, plain rectangles and straight
+    lines further out, and below BLOCK_SCALE a density map of nodes
+    with edges bundled between its cells. Shapes, curved edge paths and
+    the overview bins are made once and reused by later frames.
+    """
+
+    # F5: run the pipeline shown
+    run_requested = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.graph = None
+        self._prepare_task = None
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._clear()
+
+        self.setScene(QGraphicsScene(self))
+        self.setDragMode(QGraphicsView.ScrollHandDrag)
+        self.setTransformationAnchor(QGraphicsView.AnchorUnderMouse)
+        self.setResizeAnchor(QGraphicsView.AnchorViewCenter)
+        self.setViewportUpdateMode(QGraphicsView.FullViewportUpdate)
+        self.setOptimizationFlags(QGraphicsView.DontSavePainterState
+                                  | QGraphicsView.DontAdjustForAntialiasing)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setFrameShape(QGraphicsView.NoFrame)
+
+        self._font = QFont(self.font())
+        self._font.setPixelSize(13)
+        self._metrics = QFontMetricsF(self._font)
+
+    def _clear(self):
+        self._nodes = QuadTree.build([])
+        self._edges = QuadTree.build([])
+        self._node_rects = []           # node index -> QRectF
+        self._edge_boxes = []           # edge index -> (x0, y0, x1, y1, index)
+        self._edge_lines = []           # edge index -> QLineF
+        self._routes = OrderedDict()    # edge index -> QPainterPath
+        self._labels = {}               # node index -> elided label
+        self._overviews = {}            # log2(cell size) -> _Overview
+
+    # --- Graph ----------------------------------------------------------
+
+    def set_graph(self, graph):
+        """Show `graph` (a graph.model.Graph, or None to clear) and fit it."""
+        self.graph = graph
+        if self._prepare_task is not None:
+            self._prepare_task.cancelled = True
+            self._prepare_task = None
+        self._clear()
+        if graph is None:
+            self.scene().setSceneRect(QRectF())
+            self.viewport().update()
+            return
+        columns = (graph.x, graph.y, graph.w, graph.h)
+        self._nodes = QuadTree.build([(x, y, x + w, y + h, i)
+                                      for i, (x, y, w, h) in enumerate(zip(*columns))])
+        self._node_rects = [QRectF(x, y, w, h) for x, y, w, h in zip(*columns)]
+        boxes, lines = self._edge_boxes, self._edge_lines
+        for i, (source, target) in enumerate(zip(graph.sources, graph.targets)):
+            sx, sy, c1, c2, ex, ey = _curve(graph, source, target)
+            # The curve stays inside its control points
+            boxes.append((min(sx, c2, ex), min(sy, ey), max(sx, c1, ex), max(sy, ey), i))
+            lines.append(QLineF(sx, sy, ex, ey))
+        self._edges = QuadTree.build(boxes)
+        x0, y0, x1, y1 = graph.bounds()
+        # Leave room to pan past the edges of the graph
+        margin = max(x1 - x0, y1 - y0, 1000.0)
+        self.scene().setSceneRect(QRectF(x0 - margin, y0 - margin,
+                                         x1 - x0 + 2 * margin, y1 - y0 + 2 * margin))
+        if len(graph) > MAX_BLOCKS:
+            self._prepare_overviews()
+        self.fit_graph()
+
+    def _prepare_overviews(self):
+        # Bin every overview level now (coarser ones derive cheaply from
+        # the finest); their shapes are made on the pool meanwhile.
+        self._overview(MIN_SCALE)
+        self._prepare_task = _PrepareTask(
+            [self._overviews[k] for k in sorted(self._overviews, reverse=True)])
+        self._pool.start(self._prepare_task)
+
+    def fit_graph(self):
+        if self.graph is None or not len(self.graph):
+            return
+        x0, y0, x1, y1 = self.graph.bounds()
+        self.fitInView(QRectF(x0, y0, x1 - x0, y1 - y0), Qt.KeepAspectRatio)
+        self._clamp_zoom()
+
+    def zoom(self):
+        return self.transform().m11()
+
+    def _clamp_zoom(self):
+        scale = self.zoom()
+        if scale < MIN_SCALE or scale > MAX_SCALE:
+            factor = min(MAX_SCALE, max(MIN_SCALE, scale)) / scale
+            self.scale(factor, factor)
+
+    def _route(self, edge):
+        """Curved path of an edge from the source's right to the target's left."""
+        path = self._routes.get(edge)
+        if path is not None:
+            self._routes.move_to_end(edge)
+            return path
+        graph = self.graph
+        sx, sy, c1, c2, ex, ey = _curve(graph, graph.sources[edge], graph.targets[edge])
+        path = QPainterPath(QPointF(sx, sy))
+        path.cubicTo(c1, sy, c2, ey, ex, ey)
+        self._routes[edge] = path
+        if len(self._routes) > ROUTE_CACHE:
+            self._routes.popitem(last=False)
+        return path
+
+    def _label(self, i):
+        label = self._labels.get(i)
+        if label is None:
+            graph = self.graph
+            label = self._metrics.elidedText(graph.label(i), Qt.ElideRight, graph.w[i] - 20)
+            self._labels[i] = label
+        return label
+
+    def _overview(self, scale):
+        """Overview whose cells are about CELL_PIXELS on screen."""
+        level = max(0, math.ceil(math.log2(CELL_PIXELS / scale)))
+        overview = self._overviews.get(level)
+        if overview is None:
+            # Derive from the nearest finer level, which is much cheaper
+            # than binning every node again.
+            finer = [k for k in self._overviews if k < level]
+            if finer:
+                k = max(finer)
+                overview = self._overviews[k]
+            else:
+                k = max(0, math.ceil(math.log2(CELL_PIXELS / BLOCK_SCALE)))
+                overview = _Overview.build(self.graph, float(1 << k))
+                self._overviews[k] = overview
+            for k in range(k + 1, level + 1):
+                overview = overview.coarser()
+                self._overviews[k] = overview
+        return overview
+
+    # --- Rendering ------------------------------------------------------
+
+    def drawBackground(self, painter, rect):
+        painter.fillRect(rect, theme.color("surface"))
+        if self.graph is None or not len(self.graph):
+            self._draw_hint(painter)
+            return
+        scale = self.zoom()
+        x0, y0, x1, y1 = rect.left(), rect.top(), rect.right(), rect.bottom()
+        if scale >= DETAIL_SCALE:
+            self._draw_detail(painter, x0, y0, x1, y1)
+        elif scale >= BLOCK_SCALE or len(self.graph) <= MAX_BLOCKS:
+            self._draw_blocks(painter, x0, y0, x1, y1)
+        else:
+            self._draw_overview(painter, scale, x0, y0, x1, y1)
+
+    def _draw_hint(self, painter):
+        painter.save()
+        painter.resetTransform()
+        painter.setPen(theme.color("text_dim"))
+        painter.drawText(self.viewport().rect(), Qt.AlignCenter,
+                         "Open a graph.json file to show it here")
+        painter.restore()
+
+    def _draw_detail(self, painter, x0, y0, x1, y1):
+        graph = self.graph
+        edges = self._edges.query(x0, y0, x1, y1)
+        # Curves only for edges that fit on screen, and not too many
+        longest = LONG_EDGE * max(x1 - x0, y1 - y0)
+        curves = len(edges) <= MAX_CURVES
+        boxes, lines = self._edge_boxes, []
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        painter.setPen(QPen(theme.color("text_dim"), 1.5))
+        painter.setBrush(Qt.NoBrush)
+        for edge in edges:
+            box = boxes[edge]
+            if curves and box[2] - box[0] < longest and box[3] - box[1] < longest:
+                painter.drawPath(self._route(edge))
+            else:
+                lines.append(self._edge_lines[edge])
+        painter.setRenderHint(QPainter.Antialiasing, False)
+        painter.drawLines(lines)
+
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        painter.setBrush(theme.color("hover"))
+        painter.setFont(self._font)
+        border = QPen(theme.color("border"), 1)
+        text = theme.color("text")
+        muted = theme.color("text_muted")
+        rects = self._node_rects
+        for i in self._nodes.query(x0, y0, x1, y1):
+            box = rects[i]
+            half = graph.h[i] / 2
+            painter.setPen(border)
+            painter.drawRoundedRect(box, 6, 6)
+            painter.setPen(text)
+            painter.drawText(box.adjusted(10, 6, -10, -half), Qt.AlignLeft | Qt.AlignVCenter,
+                             self._label(i))
+            kind = graph.kind(i)
+            if kind:
+                painter.setPen(muted)
+                painter.drawText(box.adjusted(10, half, -10, -6),
+                                 Qt.AlignLeft | Qt.AlignVCenter, kind)
+        painter.setRenderHint(QPainter.Antialiasing, False)
+
+    def _draw_blocks(self, painter, x0, y0, x1, y1):
+        lines = self._edge_lines
+        pen = QPen(theme.color("text_dim"), 1)
+        pen.setCosmetic(True)   # 1 px at any zoom
+        painter.setPen(pen)
+        painter.drawLines([lines[edge] for edge in self._edges.query(x0, y0, x1, y1)])
+
+        rects = self._node_rects
+        painter.setPen(Qt.NoPen)
+        painter.setBrush(theme.color("border"))
+        painter.drawRects([rects[i] for i in self._nodes.query(x0, y0, x1, y1)])
+
+    def _draw_overview(self, painter, scale, x0, y0, x1, y1):
+        overview = self._overview(scale)
+
+        # Cells: shaded by how many nodes they hold
+        cell = overview.cell
+        cx0, cy0 = int(x0 // cell), int(y0 // cell)
+        cx1, cy1 = int(x1 // cell), int(y1 // cell)
+        cells = overview.rects()
+        by_shade = ([], [], [], [])
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) < len(cells):
+            for cy in range(cy0, cy1 + 1):
+                for cx in range(cx0, cx1 + 1):
+                    found = cells.get((cx, cy))
+                    if found is not None:
+                        by_shade[found[0]].append(found[1])
+        else:
+            for (cx, cy), (shade, rect) in cells.items():
+                if cx0 <= cx <= cx1 and cy0 <= cy <= cy1:
+                    by_shade[shade].append(rect)
+        painter.setPen(Qt.NoPen)
+        base = theme.color("surface")
+        color = theme.color("accent")
+        for shade, rects in enumerate(by_shade):
+            if rects:
+                painter.setBrush(_mix(base, color, 0.12 + 0.1 * shade))
+                painter.drawRects(rects)
+
+        # Bundles: one line per pair of squares, wider for more edges
+        by_width = {}
+        for width, line in overview.bundles(x0, y0, x1, y1, MAX_BUNDLES):
+            by_width.setdefault(width, []).append(line)
+        color = theme.color("text_muted")
+        for width, lines in by_width.items():
+            pen = QPen(_mix(base, color, 0.3 + 0.15 * width), width)
+            pen.setCosmetic(True)
+            painter.setPen(pen)
+            painter.drawLines(lines)
+
+    # --- Input ----------------------------------------------------------
+
+    def wheelEvent(self, event):
+        delta = event.angleDelta().y()
+        if not delta:
+            return
+        factor = 1.0015 ** delta
+        scale = self.zoom()
+        factor = min(MAX_SCALE, max(MIN_SCALE, scale * factor)) / scale
+        self.scale(factor, factor)
+
+    def keyPressEvent(self, event):
+        if event.key() == Qt.Key_F:
+            self.fit_graph()
+        elif event.key() == Qt.Key_F5:
+            self.run_requested.emit()
+        else:
+            super().keyPressEvent(event)
@@ -0,0 +1,188 @@
+"""
+LogicCore v2 - Instance Server
+Serves launches handed over by later runs of main.py, and keeps the
+windows they open.
+"""
+import os
+import re
+
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtNetwork import QLocalServer, QLocalSocket
+
+from ..services import single_instance
+from ..services.output import log
+
+
+# "file:line" on the command line opens the file at that line
+_LINE_SUFFIX = re.compile(r"^(.*):(\d+)$")
+
+
+class InstanceServer(QObject):
+    """
+    Local server a new launch forwards its arguments to.
+
+    Each connection carries one launch; it is acknowledged before it is
+    handled, so the launching process can exit straight away.
+    """
+
+    launch_requested = Signal(list, str)    # argv, cwd
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.server = QLocalServer(self)
+        self.server.setSocketOptions(QLocalServer.UserAccessOption)
+        self.server.newConnection.connect(self._on_connection)
+
+    def listen(self):
+        """Start serving; False if another instance already is."""
+        name = single_instance.server_name()
+        # With UserAccessOption, listen() replaces any socket at `name`,
+        # even a live one, so only a socket nobody accepts on may go
+        if not _refuses_connections(name):
+            log("LogicCore", "Single instance server: another instance is listening")
+            return False
+        QLocalServer.removeServer(name)
+        if self.server.listen(name):
+            return True
+        log("LogicCore", f"Single instance server: {self.server.errorString()}")
+        return False
+
+    def close(self):
+        self.server.close()
+
+    def _on_connection(self):
+        while self.server.hasPendingConnections():
+            sock = self.server.nextPendingConnection()
+            sock.readyRead.connect(lambda sock=sock: self._read(sock))
+            sock.disconnected.connect(sock.deleteLater)
+
+    def _read(self, sock):
+        if not sock.canReadLine():
+            return
+        try:
+            argv, cwd = single_instance.decode_launch(bytes(sock.readLine()))
+        except ValueError as e:
+            log("LogicCore", f"Ignored launch: {e}")
+            sock.disconnectFromServer()
+            return
+        sock.write(b"ok\n")
+        sock.flush()
+        sock.disconnectFromServer()
+        self.launch_requested.emit(argv, cwd)
+
+
+def _refuses_connections(name):
+    """True if connecting to `name` is refused, i.e. nobody listens there."""
+    sock = QLocalSocket()
+    sock.connectToServer(name)
+    if sock.waitForConnected(int(single_instance.CONNECT_TIMEOUT * 1000)):
+        sock.abort()
+        return False
+    return sock.error() in (QLocalSocket.ConnectionRefusedError,
+                            QLocalSocket.ServerNotFoundError)
+
+
+def resolve_target(target, cwd):
+    """(workspace, file, line) for a command-line path; file is None for a folder."""
+    if target is None:
+        return os.path.abspath(cwd), None, 0
+    line = 0
+    path = os.path.abspath(os.path.join(cwd, target))
+    match = _LINE_SUFFIX.match(path)
+    if match and not os.path.exists(path) and os.path.isfile(match.group(1)):
+        path, line = match.group(1), int(match.group(2))
+    if os.path.isfile(path):
+        return os.path.dirname(path), path, line
+    return path, None, 0
+
+
+class WindowManager(QObject):
+    """
+    Main windows of this process, at most one per workspace.
+
+    With `keep_warm`, the process outlives its last window: a hidden
+    window for the last workspace is built in its place, so the next
+    launch forwarded here only has to show it. The process-wide
+    `sampler`, if given, runs while any window is open.
+    """
+
+    def __init__(self, app, window_factory, keep_warm=False, sampler=None):
+        super().__init__(app)
+        self.app = app
+        self.window_factory = window_factory
+        self.keep_warm = keep_warm
+        self.sampler = sampler
+        self.windows = []
+        self.spare = None
+        self._quitting = False
+        app.setQuitOnLastWindowClosed(not keep_warm)
+
+    def open(self, target=None, cwd=None):
+        """Show the window for `target` (a folder or a file), making one if needed."""
+        workspace, path, line = resolve_target(target, cwd or os.getcwd())
+        window = self._window_for(path or workspace)
+        if window is None:
+            window = self._take_spare(workspace) or self._create(workspace)
+            self.windows.append(window)
+            if self.sampler is not None:
+                self.sampler.start()
+        window.show()
+        window.raise_()
+        window.activateWindow()
+        if path is not None:
+            window.open_file(path, line)
+        return window
+
+    def quit(self):
+        """Close every window (unsaved-changes prompts may keep some) and the spare."""
+        self._quitting = True
+        for window in list(self.windows):
+            window.close()
+        if self.windows:
+            self._quitting = False
+            return
+        self._close_spare()
+        self.app.quit()
+
+    def _window_for(self, path):
+        best = None
+        for window in self.windows:
+            root = window.workspace
+            if path == root or path.startswith(root.rstrip(os.sep) + os.sep):
+                if best is None or len(root) > len(best.workspace):
+                    best = window
+        return best
+
+    def _create(self, workspace):
+        window = self.window_factory(workspace)
+        window.closed.connect(lambda window=window: self._on_closed(window))
+        return window
+
+    def _take_spare(self, workspace):
+        spare, self.spare = self.spare, None
+        if spare is not None and spare.workspace != workspace:
+            spare.close()
+            return None
+        return spare
+
+    def _close_spare(self):
+        if self.spare is not None:
+            spare, self.spare = self.spare, None
+            spare.close()
+
+    def _on_closed(self, window):
+        if window in self.windows:
+            self.windows.remove(window)
+        window.deleteLater()
+        workspace = window.workspace
+        if not self.windows and self.sampler is not None:
+            self.sampler.stop()
+        if not self.windows and self.keep_warm and self.spare is None and not self._quitting:
+            # After the close has finished, so its services are down first
+            QTimer.singleShot(0, lambda: self._prepare_spare(workspace))
+
+    def _prepare_spare(self, workspace):
+        if self.windows or self.spare is not None or self._quitting:
+            return
+        self.spare = self._create(workspace)
+        log("LogicCore", f"Kept a warm window for {workspace}")
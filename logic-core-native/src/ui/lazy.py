@@ -0,0 +1,44 @@
+"""
+LogicCore v2 - Lazy Widget
+Placeholder that builds its real widget the first time it is shown.
+"""
+from PySide6.QtWidgets import QWidget, QVBoxLayout
+
+from ..services.startup import profiler
+
+
+# Cleared by --no-defer to build everything up front
+DEFER = True
+
+
+class LazyWidget(QWidget):
+    """
+    Stand-in for a hidden tab or view.
+
+    `factory()` runs on the first showEvent (or `ensure_built()`), and
+    the result fills this widget.
+    """
+
+    def __init__(self, factory, name="", parent=None):
+        super().__init__(parent)
+        self.factory = factory
+        self.name = name
+        self._widget = None
+        self._layout = QVBoxLayout(self)
+        self._layout.setContentsMargins(0, 0, 0, 0)
+        self._layout.setSpacing(0)
+        if DEFER:
+            profiler.note(f"deferred: {name}")
+        else:
+            self.ensure_built()
+
+    def ensure_built(self):
+        if self._widget is None:
+            with profiler.phase(f"{self.name} (on first show)" if DEFER else self.name):
+                self._widget = self.factory()
+                self._layout.addWidget(self._widget)
+        return self._widget
+
+    def showEvent(self, event):
+        self.ensure_built()
+        super().showEvent(event)
@@ -2,16 +2,35 @@
 LogicCore v2 - Main Window
 Native Qt main window with custom frameless design.
 """
+import os
+import time
+
 from PySide6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QSplitter, QFrame
+    QSplitter, QTabWidget, QTabBar, QMessageBox
 )
-from PySide6.QtCore import Qt, QSize
-from PySide6.QtGui import QColor
+from PySide6.QtCore import Qt, QSize, QTimer, Signal
+from PySide6.QtGui import QColor, QKeySequence, QShortcut
 
 from .titlebar import TitleBar
 from .sidebar import Sidebar
 from .bottom_panel import BottomPanel
+from .graph_canvas import GraphCanvas
+from .quick_open import QuickOpen
+from ..editor.document import Document
+from ..editor.editor_view import EditorView
+from ..editor.highlighter import SyntaxHighlighter
+from ..graph.storage import is_graph_file, load_graph
+from ..pipeline.engine import PipelineEngine
+from ..services.file_index import FileIndex
+from ..services.retrieval import RetrievalIndex
+from ..services.search import SearchEngine
+from ..services.session import SAVE_INTERVAL, SessionStore, Writer
+from ..services.symbols import SymbolIndex
+from ..services.git_status import GitStatusService
+from ..services.metrics import default_registry
+from ..services.output import log
+from ..services.startup import profiler
 
 
 class MainWindow(QMainWindow):
@@ -19,9 +38,27 @@ class MainWindow(QMainWindow):
     Main application window with native frameless design.
     """
     
-    def __init__(self):
+    # Emitted once the window has closed and its services are down
+    closed = Signal()
+    
+    def __init__(self, workspace=None):
         super().__init__()
         
+        # Workspace services
+        self.workspace = os.path.abspath(workspace or os.getcwd())
+        with profiler.phase("Workspace services"):
+            self.file_index = FileIndex(self.workspace)
+            self.file_index.start()
+            log("LogicCore", f"Workspace: {self.workspace}")
+            self.search_engine = SearchEngine(self.workspace, self.file_index)
+            self.symbol_index = SymbolIndex(self.workspace, self.file_index)
+            self.symbol_index.start()
+            self.retrieval_index = RetrievalIndex(self.workspace, self.file_index)
+            self.retrieval_index.start()
+            self.git_service = GitStatusService.for_workspace(self.workspace, self.file_index)
+            if self.git_service is not None:
+                self.git_service.start()
+        
         # Frameless window with custom title bar
         self.setWindowFlags(Qt.FramelessWindowHint)
         self.setAttribute(Qt.WA_TranslucentBackground, False)
@@ -33,11 +70,6 @@ class MainWindow(QMainWindow):
         # Central widget
         central_widget = QWidget()
         central_widget.setObjectName("centralWidget")
-        central_widget.setStyleSheet("""
-            #centralWidget {
-                background-color: #0a0a0b;
-            }
-        """)
         self.setCentralWidget(central_widget)
         
         # Main layout
@@ -46,7 +78,8 @@ class MainWindow(QMainWindow):
         main_layout.setSpacing(0)
         
         # Title bar
-        self.title_bar = TitleBar(self)
+        with profiler.phase("TitleBar"):
+            self.title_bar = TitleBar(self)
         main_layout.addWidget(self.title_bar)
         
         # Content area (horizontal split)
@@ -56,55 +89,241 @@ class MainWindow(QMainWindow):
         content_layout.setSpacing(0)
         
         # Sidebar
-        self.sidebar = Sidebar()
+        with profiler.phase("Sidebar"):
+            self.sidebar = Sidebar(workspace=self.workspace, file_index=self.file_index,
+                                   search_engine=self.search_engine,
+                                   git_service=self.git_service,
+                                   symbol_index=self.symbol_index,
+                                   retrieval_index=self.retrieval_index)
         content_layout.addWidget(self.sidebar)
         
         # Main splitter (vertical: canvas/editor + bottom panel)
-        main_splitter = QSplitter(Qt.Vertical)
+        self.main_splitter = main_splitter = QSplitter(Qt.Vertical)
         main_splitter.setHandleWidth(1)
-        main_splitter.setStyleSheet("""
-            QSplitter::handle {
-                background-color: #2a2a30;
-            }
-        """)
-        
-        # Canvas placeholder (will be replaced with Godot embed)
-        self.canvas_area = QFrame()
+        
+        # Graph canvas
+        self.canvas_area = GraphCanvas()
         self.canvas_area.setObjectName("canvasArea")
-        self.canvas_area.setStyleSheet("""
-            #canvasArea {
-                background-color: #121214;
-                border: none;
-            }
-        """)
         self.canvas_area.setMinimumHeight(300)
+        self.canvas_area.run_requested.connect(self.run_pipeline)
+        self.pipeline_engine = None     # made on the first run
+        self._pipeline_run = None
+        
+        # Editor tabs; the canvas stays the first, unclosable tab
+        self.editor_tabs = QTabWidget()
+        self.editor_tabs.setObjectName("editorTabs")
+        self.editor_tabs.setTabsClosable(True)
+        self.editor_tabs.setMovable(True)
+        self.editor_tabs.addTab(self.canvas_area, "CANVAS")
+        self.editor_tabs.tabBar().setTabButton(0, QTabBar.RightSide, None)
+        self.editor_tabs.tabCloseRequested.connect(self.close_tab)
+        self.sidebar.open_requested.connect(self.open_file)
         
         # Bottom panel
-        self.bottom_panel = BottomPanel()
+        with profiler.phase("BottomPanel"):
+            self.bottom_panel = BottomPanel(workspace=self.workspace)
         
-        main_splitter.addWidget(self.canvas_area)
+        main_splitter.addWidget(self.editor_tabs)
         main_splitter.addWidget(self.bottom_panel)
         main_splitter.setSizes([600, 200])
         
         content_layout.addWidget(main_splitter)
         main_layout.addWidget(content_widget)
         
+        # Quick Open (Ctrl+P) floats over the content
+        self.quick_open = QuickOpen(self.file_index, self)
+        self.quick_open.open_requested.connect(self.open_file)
+        quick_open_shortcut = QShortcut(QKeySequence("Ctrl+P"), self)
+        quick_open_shortcut.activated.connect(self.quick_open.popup)
+        
         # Status bar
-        self.create_status_bar(main_layout)
+        with profiler.phase("Status bar"):
+            self.create_status_bar(main_layout)
         
         # Window dragging
         self._drag_pos = None
+        
+        # Last session: what the first frame shows now, the rest after it
+        with profiler.phase("Session"):
+            self.session_store = SessionStore(self.workspace)
+            self._session = self.session_store.load()
+            if self._session is not None:
+                self.restore_session()
+        self._save_timer = QTimer(self)
+        self._save_timer.setInterval(int(SAVE_INTERVAL * 1000))
+        self._save_timer.timeout.connect(lambda: self.save_session(wait=False))
+        self._save_timer.start()
+    
+    def open_file(self, path, line=0):
+        """Open `path` in an editor tab (or switch to it); `line` is 1-based, 0 for none."""
+        path = os.path.abspath(path)
+        if is_graph_file(path):
+            return self.open_graph(path)
+        for i in range(self.editor_tabs.count()):
+            view = self.editor_tabs.widget(i)
+            if isinstance(view, EditorView) and view.document.path == path:
+                break
+        else:
+            try:
+                document = Document.open(path)
+            except (OSError, ValueError) as e:
+                log("LogicCore", f"Cannot open {path}: {e}")
+                return None
+            view = EditorView(document)
+            if SyntaxHighlighter.supports(document):
+                view.set_highlighter(SyntaxHighlighter(document))
+            i = self.editor_tabs.addTab(view, os.path.basename(path))
+            self.editor_tabs.setTabToolTip(i, path)
+            view.modified_changed.connect(
+                lambda modified, view=view: self._on_modified(view, modified))
+        self.editor_tabs.setCurrentWidget(view)
+        if line > 0:
+            view.go_to_line(line - 1)
+        view.setFocus()
+        return view
+    
+    def open_graph(self, path):
+        """Show a graph file on the canvas tab."""
+        try:
+            graph = load_graph(path)
+        except (OSError, ValueError) as e:
+            log("LogicCore", f"Cannot open {path}: {e}")
+            return None
+        log("LogicCore", f"Graph {os.path.basename(path)}: "
+                         f"{len(graph)} nodes, {graph.edge_count()} edges")
+        self.canvas_area.set_graph(graph)
+        self.editor_tabs.setCurrentWidget(self.canvas_area)
+        self.canvas_area.setFocus()
+        return self.canvas_area
+    
+    def run_pipeline(self):
+        """Run the graph on the canvas; progress goes to the Pipeline channel."""
+        graph = self.canvas_area.graph
+        if graph is None:
+            return
+        if self.pipeline_engine is None:
+            self.pipeline_engine = PipelineEngine()
+        if self._pipeline_run is not None:
+            self._pipeline_run.cancel()
+        log("Pipeline", f"Running {len(graph)} nodes")
+        self._pipeline_run = self.pipeline_engine.start(graph, on_done=self._on_pipeline_done)
+    
+    def _on_pipeline_done(self, run):
+        # Called on the pipeline thread; output channels are thread-safe
+        if run.is_cancelled():
+            log("Pipeline", "Run cancelled")
+            return
+        for i, error in run.errors.items():
+            log("Pipeline", f"{run.graph.ids[i]}: {type(error).__name__}: {error}")
+        log("Pipeline", f"Finished: {run.summary()}")
+    
+    def _on_modified(self, view, modified):
+        i = self.editor_tabs.indexOf(view)
+        if i != -1:
+            name = os.path.basename(view.document.path)
+            self.editor_tabs.setTabText(i, f"● {name}" if modified else name)
+    
+    def close_tab(self, index):
+        view = self.editor_tabs.widget(index)
+        if not isinstance(view, EditorView):
+            return
+        if view.document.modified:
+            answer = QMessageBox.question(
+                self, "Unsaved changes",
+                f"Save changes to {os.path.basename(view.document.path)}?",
+                QMessageBox.Save | QMessageBox.Discard | QMessageBox.Cancel)
+            if answer == QMessageBox.Cancel:
+                return
+            if answer == QMessageBox.Save:
+                view.save()
+        self.editor_tabs.removeTab(index)
+        if view.highlighter is not None:
+            view.highlighter.shutdown()
+        view.document.close()
+        view.deleteLater()
+    
+    # --- Session ------------------------------------------------------
+    
+    def session_sections(self):
+        """{name: payload} snapshot of the window's state."""
+        sections = {}
+        writer = Writer()
+        writer.put_bytes(self.saveGeometry().data())
+        writer.put_bytes(self.main_splitter.saveState().data())
+        writer.put_str(self.sidebar.active_view())
+        writer.put_int(self.bottom_panel.tabs.currentIndex())
+        sections["window"] = writer.payload()
+        writer = Writer()
+        self.bottom_panel.terminal.save_state(writer)
+        sections["terminal"] = writer.payload()
+        search = self.sidebar.search_state()
+        if search is not None:
+            sections["search"] = search
+        writer = Writer()
+        writer.put_strs(self.sidebar.expanded_dirs())
+        sections["explorer"] = writer.payload()
+        views = [self.editor_tabs.widget(i) for i in range(self.editor_tabs.count())]
+        views = [view for view in views if isinstance(view, EditorView)]
+        writer = Writer()
+        writer.put_strs(view.document.path for view in views)
+        current = self.editor_tabs.currentWidget()
+        writer.put_int(views.index(current) if current in views else -1)
+        sections["editors"] = writer.payload()
+        writer = Writer()
+        self.quick_open.save_state(writer)
+        sections["quick_open"] = writer.payload()
+        return sections
+    
+    def save_session(self, wait=True):
+        self.session_store.save(self.session_sections(), wait=wait)
+    
+    def restore_session(self):
+        """Apply the parts of the last session the first frame shows."""
+        start = time.perf_counter()
+        session = self._session
+        try:
+            reader = session.reader("window")
+            if reader is not None:
+                self.restoreGeometry(bytes(reader.get_bytes()))
+                self.main_splitter.restoreState(bytes(reader.get_bytes()))
+                view = reader.get_str()
+                if view:
+                    self.sidebar.show_view(view)
+                self.bottom_panel.tabs.setCurrentIndex(reader.get_int())
+            reader = session.reader("terminal")
+            if reader is not None:
+                self.bottom_panel.terminal.restore_state(reader)
+            search = session.raw("search")
+            if search is not None:
+                self.sidebar.restore_search(search)
+        except ValueError as e:
+            log("LogicCore", f"Ignored session state: {e}")
+        default_registry.observe("session.restore_ms", (time.perf_counter() - start) * 1000)
+        QTimer.singleShot(0, self._restore_session_rest)
+    
+    def _restore_session_rest(self):
+        session, self._session = self._session, None
+        try:
+            reader = session.reader("explorer")
+            if reader is not None:
+                self.sidebar.restore_expanded(reader.get_strs())
+            reader = session.reader("editors")
+            if reader is not None:
+                paths, current = reader.get_strs(), reader.get_int()
+                views = [self.open_file(path) if os.path.isfile(path) else None for path in paths]
+                if 0 <= current < len(views) and views[current] is not None:
+                    self.editor_tabs.setCurrentWidget(views[current])
+            reader = session.reader("quick_open")
+            if reader is not None:
+                self.quick_open.restore_state(reader)
+        except ValueError as e:
+            log("LogicCore", f"Ignored session state: {e}")
     
     def create_status_bar(self, layout):
         """Create native status bar."""
         status_bar = QWidget()
         status_bar.setFixedHeight(22)
-        status_bar.setStyleSheet("""
-            background-color: #121214;
-            border-top: 1px solid #2a2a30;
-            color: #52525b;
-            font-size: 11px;
-        """)
+        status_bar.setObjectName("statusBar")
         
         status_layout = QHBoxLayout(status_bar)
         status_layout.setContentsMargins(12, 0, 12, 0)
@@ -112,7 +331,7 @@ class MainWindow(QMainWindow):
         from PySide6.QtWidgets import QLabel
         
         ready_label = QLabel("● LOGIC.CORE READY")
-        ready_label.setStyleSheet("color: #3b82f6;")
+        ready_label.setObjectName("readyLabel")
         status_layout.addWidget(ready_label)
         
         status_layout.addStretch()
@@ -123,6 +342,35 @@ class MainWindow(QMainWindow):
         
         layout.addWidget(status_bar)
     
+    def closeEvent(self, event):
+        """Save the session and shut down workspace services."""
+        self._save_timer.stop()
+        self.save_session()
+        for i in reversed(range(self.editor_tabs.count())):
+            view = self.editor_tabs.widget(i)
+            if isinstance(view, EditorView):
+                self.close_tab(i)
+                if self.editor_tabs.indexOf(view) != -1:
+                    event.ignore()  # cancelled at the unsaved-changes prompt
+                    self._save_timer.start()
+                    return
+        self.bottom_panel.shutdown()
+        self.sidebar.tree_model.shutdown()
+        if self.sidebar.chat_view is not None:
+            self.sidebar.chat_view.shutdown()
+        self.search_engine.shutdown()
+        self.symbol_index.shutdown()
+        self.retrieval_index.shutdown()
+        if self.pipeline_engine is not None:
+            if self._pipeline_run is not None:
+                self._pipeline_run.cancel()
+            self.pipeline_engine.shutdown()
+        if self.git_service is not None:
+            self.git_service.stop()
+        self.file_index.stop()
+        super().closeEvent(event)
+        self.closed.emit()
+    
     def mousePressEvent(self, event):
         """Handle window dragging."""
         if event.button() == Qt.LeftButton:
@@ -0,0 +1,330 @@
+"""
+LogicCore v2 - Output View
+Virtualized log view over the output service's channels.
+"""
+from array import array
+from bisect import bisect_left
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit, QComboBox,
+    QPushButton, QAbstractScrollArea
+)
+from PySide6.QtCore import Qt, QObject, QRunnable, QThreadPool, QTimer, Signal
+from PySide6.QtGui import QFont, QPainter
+
+from .theme import set_role, theme
+from ..services.output import iter_snapshot
+
+
+# Filter results are handed to the UI this many scanned lines at a time
+FILTER_BATCH = 200_000
+
+
+class _OutputSignals(QObject):
+    channel_added = Signal(object)
+    filtered = Signal(object, object, int, bool)  # token, matches, scanned up to, final
+
+
+class _FilterTask(QRunnable):
+    """Scans a buffer snapshot for lines containing a needle."""
+
+    def __init__(self, token, snapshot, start, needle, case_sensitive, signals):
+        super().__init__()
+        self.token = token
+        self.snapshot = snapshot
+        self.start = start
+        self.needle = needle if case_sensitive else needle.lower()
+        self.case_sensitive = case_sensitive
+        self.signals = signals
+
+    def run(self):
+        needle = self.needle
+        fold = not self.case_sensitive
+        matches = array("q")
+        scanned = 0
+        upto = self.start
+        for base, lines in iter_snapshot(self.snapshot, self.start):
+            if self.token.cancelled:
+                return
+            if fold:
+                hits = [i for i, line in enumerate(lines, base) if needle in line.lower()]
+            else:
+                hits = [i for i, line in enumerate(lines, base) if needle in line]
+            matches.extend(hits)
+            scanned += len(lines)
+            upto = base + len(lines)
+            if scanned >= FILTER_BATCH:
+                self.signals.filtered.emit(self.token, matches, upto, False)
+                matches = array("q")
+                scanned = 0
+        self.signals.filtered.emit(self.token, matches, max(upto, self.snapshot[2]), True)
+
+
+class _FilterToken:
+    __slots__ = ("cancelled",)
+
+    def __init__(self):
+        self.cancelled = False
+
+
+class LogView(QAbstractScrollArea):
+    """
+    Plain-text line list that paints only the rows in view.
+
+    Shows either every line of a channel or, with a filter active,
+    the lines whose absolute indices are in `matches`.
+    """
+
+    PADDING = 8
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.channel = None
+        self.matches = None
+        self._follow = True
+
+        self.setFont(QFont("JetBrains Mono", 11))
+        self.verticalScrollBar().valueChanged.connect(self._on_scrolled)
+
+    def set_channel(self, channel):
+        self.channel = channel
+        self.matches = None
+        self._follow = True
+        self.refresh()
+
+    def set_matches(self, matches):
+        self.matches = matches
+        self.refresh()
+
+    def _first_match(self):
+        """Position of the first match whose line is still buffered."""
+        return bisect_left(self.matches, self.channel.buffer.first)
+
+    def row_count(self):
+        if self.channel is None:
+            return 0
+        if self.matches is not None:
+            return len(self.matches) - self._first_match()
+        return len(self.channel.buffer)
+
+    def _visible_rows(self):
+        return max(1, (self.viewport().height() - self.PADDING) // self.fontMetrics().height())
+
+    def refresh(self):
+        """Update the scroll range after new lines; follow the tail if at the bottom."""
+        bar = self.verticalScrollBar()
+        rows = self._visible_rows()
+        maximum = max(0, self.row_count() - rows)
+        bar.blockSignals(True)
+        bar.setRange(0, maximum)
+        bar.setPageStep(rows)
+        if self._follow:
+            bar.setValue(maximum)
+        bar.blockSignals(False)
+        self.viewport().update()
+
+    def _on_scrolled(self, value):
+        self._follow = value >= self.verticalScrollBar().maximum()
+        self.viewport().update()
+
+    def _rows(self, first, count):
+        buffer = self.channel.buffer
+        if self.matches is None:
+            start = buffer.first + first
+            return buffer.slice(start, start + count)
+        offset = self._first_match() + first
+        return [buffer.get(i) for i in self.matches[offset:offset + count]]
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        painter.fillRect(self.viewport().rect(), theme.color("bg"))
+        if self.channel is None:
+            return
+        metrics = self.fontMetrics()
+        line_height = metrics.height()
+        rows = self.viewport().height() // line_height + 1
+        painter.setPen(theme.color("text_muted"))
+        y = self.PADDING // 2 + metrics.ascent()
+        for line in self._rows(self.verticalScrollBar().value(), rows):
+            painter.drawText(self.PADDING, y, line)
+            y += line_height
+        painter.end()
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.refresh()
+
+
+class OutputView(QWidget):
+    """
+    OUTPUT tab: channel picker, filter box and a virtualized log.
+
+    The output service is flushed once per frame. Filtering runs on a
+    worker over a snapshot of the channel, then keeps up with new lines
+    incrementally.
+    """
+
+    FRAME_MS = 16
+
+    def __init__(self, service, parent=None, debounce_ms=150):
+        super().__init__(parent)
+        self.service = service
+        self._token = None
+        self._matches = None
+        self._filtered_upto = 0
+        self._filter_running = False
+        self._generation = 0
+
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(1)
+        self._signals = _OutputSignals()
+        self._signals.channel_added.connect(self._add_channel)
+        self._signals.filtered.connect(self._on_filtered)
+
+        set_role(self, "view")
+        self.setAttribute(Qt.WA_StyledBackground, True)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        # Toolbar
+        toolbar = QWidget()
+        toolbar_layout = QHBoxLayout(toolbar)
+        toolbar_layout.setContentsMargins(8, 4, 8, 4)
+        toolbar_layout.setSpacing(6)
+
+        self.channel_box = QComboBox()
+        self.channel_box.setMinimumWidth(140)
+        self.channel_box.currentIndexChanged.connect(self._on_channel_changed)
+        toolbar_layout.addWidget(self.channel_box)
+
+        self.filter_edit = set_role(QLineEdit(), "compact")
+        self.filter_edit.setPlaceholderText("Filter")
+        toolbar_layout.addWidget(self.filter_edit)
+
+        self.count_label = set_role(QLabel(""), "status")
+        toolbar_layout.addWidget(self.count_label)
+        toolbar_layout.addStretch()
+
+        clear_button = set_role(QPushButton("Clear"), "link")
+        clear_button.clicked.connect(self.clear_channel)
+        toolbar_layout.addWidget(clear_button)
+        layout.addWidget(toolbar)
+
+        # Log
+        self.log_view = LogView()
+        layout.addWidget(self.log_view)
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self.apply_filter)
+        self.filter_edit.textChanged.connect(lambda _: self._debounce.start())
+
+        service.subscribe(self._signals.channel_added.emit)
+        for channel in service.channels():
+            self._add_channel(channel)
+
+        self._frame = QTimer(self)
+        self._frame.setInterval(self.FRAME_MS)
+        self._frame.timeout.connect(self._on_frame)
+        self._frame.start()
+
+    def _add_channel(self, channel):
+        if self.channel_box.findText(channel.name) == -1:
+            self.channel_box.addItem(channel.name, channel)
+
+    def show_channel(self, name):
+        index = self.channel_box.findText(name)
+        if index != -1:
+            self.channel_box.setCurrentIndex(index)
+
+    def current_channel(self):
+        return self.channel_box.currentData()
+
+    def _on_channel_changed(self, index):
+        channel = self.current_channel()
+        self.log_view.set_channel(channel)
+        if channel is not None:
+            self._generation = channel.generation
+        self.apply_filter()
+
+    def clear_channel(self):
+        channel = self.current_channel()
+        if channel is not None:
+            channel.clear()
+
+    def _on_frame(self):
+        changed = self.service.flush()
+        channel = self.current_channel()
+        if channel is None:
+            return
+        if channel.generation != self._generation:
+            self._generation = channel.generation
+            self.apply_filter()
+        elif channel in changed:
+            if self._token is not None:
+                self._schedule_filter()
+            self.log_view.refresh()
+            self._update_count()
+
+    # --- Filtering ------------------------------------------------------
+
+    def apply_filter(self):
+        """Restart filtering for the current text (UI thread)."""
+        self._debounce.stop()
+        if self._token is not None:
+            self._token.cancelled = True
+        self._token = None
+        self._matches = None
+        channel = self.current_channel()
+        text = self.filter_edit.text()
+        if channel is None or not text:
+            self.log_view.set_matches(None)
+            self._update_count()
+            return
+        self._token = _FilterToken()
+        self._matches = array("q")
+        self._filtered_upto = channel.buffer.first
+        self._filter_running = False
+        self.log_view.set_matches(self._matches)
+        self._schedule_filter()
+
+    def _schedule_filter(self):
+        """Filter lines appended since the last pass, one task at a time."""
+        channel = self.current_channel()
+        if self._filter_running or self._filtered_upto >= channel.buffer.end:
+            return
+        text = self.filter_edit.text()
+        case_sensitive = text != text.lower()  # smart case
+        self._filter_running = True
+        self._pool.start(_FilterTask(self._token, channel.buffer.snapshot(),
+                                     self._filtered_upto, text, case_sensitive,
+                                     self._signals))
+
+    def _on_filtered(self, token, matches, upto, final):
+        if token is not self._token:
+            return  # superseded filter
+        self._matches.extend(matches)
+        self._filtered_upto = upto
+        self.log_view.refresh()
+        self._update_count()
+        if final:
+            self._filter_running = False
+            self._schedule_filter()
+
+    def _update_count(self):
+        channel = self.current_channel()
+        if channel is None:
+            self.count_label.setText("")
+        elif self._matches is not None:
+            self.count_label.setText(f"{self.log_view.row_count():,} of {len(channel.buffer):,} lines")
+        else:
+            self.count_label.setText(f"{len(channel.buffer):,} lines")
+
+    def shutdown(self):
+        self._frame.stop()
+        if self._token is not None:
+            self._token.cancelled = True
+        self.service.unsubscribe(self._signals.channel_added.emit)
+        self._pool.waitForDone(1000)
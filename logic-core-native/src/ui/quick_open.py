@@ -0,0 +1,228 @@
+"""
+LogicCore v2 - Quick Open
+Ctrl+P file finder: fuzzy matches workspace paths as you type.
+"""
+import re
+import threading
+import time
+
+from PySide6.QtWidgets import (
+    QApplication, QFrame, QVBoxLayout, QLabel, QLineEdit, QListWidget, QListWidgetItem
+)
+from PySide6.QtCore import Qt, QEvent, QObject, QTimer, Signal
+
+from .theme import set_role
+from ..services import fuzzy
+from ..services.metrics import default_registry
+
+
+# Matching per step, so the list repaints at least once a frame
+FRAME_BUDGET = 0.012
+# Path indexes up to this size are kept in the session snapshot
+WARM_INDEX_BYTES = 8 * 1024 * 1024
+# "path:line" jumps to a line
+_LINE_SUFFIX = re.compile(r"^(.*?):(\d+)$")
+
+
+class _QuickOpenSignals(QObject):
+    built = Signal(object)
+
+
+class QuickOpen(QFrame):
+    """
+    Prompt floating over the top of the main window.
+
+    The path index is built on a thread the first time the finder opens
+    and again after the workspace's files change. Each keystroke
+    narrows the matcher's earlier work and runs it for one frame's
+    budget; what is left of a large workspace runs in later steps from
+    the event loop, the list showing the best matches so far.
+    """
+
+    open_requested = Signal(str, int)
+
+    def __init__(self, file_index, parent):
+        super().__init__(parent)
+        self.file_index = file_index
+        self.index = None
+        self.matcher = None
+        self._line = 0
+        self._shown = []
+        self._stale = True
+        self._building = False
+        self._warm = None
+        self._signals = _QuickOpenSignals()
+        self._signals.built.connect(self._on_built)
+        file_index.subscribe(self._on_files_changed)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(0)
+        self._timer.timeout.connect(self._step)
+
+        self.setObjectName("quickOpen")
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(6, 6, 6, 6)
+        layout.setSpacing(4)
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("Search files by name (append :line to go to a line)")
+        self.query_edit.textChanged.connect(self._on_text_changed)
+        self.query_edit.installEventFilter(self)
+        layout.addWidget(self.query_edit)
+        self.result_list = QListWidget()
+        self.result_list.setFocusPolicy(Qt.NoFocus)
+        self.result_list.itemActivated.connect(self.accept)
+        self.result_list.itemClicked.connect(self.accept)
+        layout.addWidget(self.result_list)
+        self.status_label = set_role(QLabel(""), "status")
+        layout.addWidget(self.status_label)
+        self.hide()
+
+    def popup(self):
+        """Show the finder over the parent window, query selected."""
+        parent = self.parentWidget()
+        width = min(640, parent.width() - 40)
+        self.setGeometry((parent.width() - width) // 2, 40, width, 360)
+        self.show()
+        self.raise_()
+        self.query_edit.setFocus()
+        self.query_edit.selectAll()
+        if self.index is None and self._warm is not None:
+            # Last session's index answers until the fresh one is built
+            self._use_index(fuzzy.PathIndex(*self._warm))
+        if self._stale and not self._building:
+            self._build()
+        if self.index is None:
+            self.status_label.setText("Indexing files…")
+
+    def dismiss(self):
+        self._timer.stop()
+        self.hide()
+        parent = self.parentWidget()
+        if parent is not None:
+            parent.setFocus()
+
+    def accept(self, item=None):
+        item = item or self.result_list.currentItem()
+        if item is None:
+            return
+        path = item.data(Qt.UserRole)
+        self.dismiss()
+        self.open_requested.emit(self.file_index.abspath(path), self._line)
+
+    # --- Index --------------------------------------------------------
+
+    def _on_files_changed(self, dirs):
+        # Called on the file index thread; the next popup rebuilds
+        self._stale = True
+
+    def _build(self):
+        if not fuzzy.available:
+            self.status_label.setText("Quick Open needs numpy")
+            return
+        self._stale = False
+        self._building = True
+
+        def run():
+            self.file_index.wait_ready()
+            start = time.perf_counter()
+            index = fuzzy.PathIndex.from_file_index(self.file_index)
+            default_registry.observe("quick_open.build_ms", (time.perf_counter() - start) * 1000)
+            self._signals.built.emit(index)
+
+        threading.Thread(target=run, name="quick-open-index", daemon=True).start()
+
+    def _on_built(self, index):
+        self._building = False
+        self._warm = None
+        self._use_index(index)
+
+    def _use_index(self, index):
+        self.index = index
+        self.matcher = fuzzy.FuzzyMatcher(index)
+        self._shown = []
+        self._on_text_changed(self.query_edit.text())
+
+    # --- Session ------------------------------------------------------
+
+    def save_state(self, writer):
+        """Keep a small workspace's path index, so the next launch starts warm."""
+        if self.index is not None:
+            data, offsets = self.index.data, self.index.offsets
+        else:
+            data, offsets = self._warm or (b"", None)
+        if offsets is None or len(data) > WARM_INDEX_BYTES:
+            data, offsets = b"", None
+        writer.put_bytes(data)
+        writer.put_bytes(offsets.tobytes() if offsets is not None else b"")
+
+    def restore_state(self, reader):
+        data = bytes(reader.get_bytes())
+        offsets = bytes(reader.get_bytes())
+        if data and fuzzy.available:
+            self._warm = (data, fuzzy.numpy.frombuffer(offsets, fuzzy.numpy.int64))
+
+    # --- Matching -----------------------------------------------------
+
+    def _on_text_changed(self, text):
+        match = _LINE_SUFFIX.match(text.strip())
+        query, self._line = (match.group(1), int(match.group(2))) if match else (text, 0)
+        if self.matcher is None:
+            return
+        self.matcher.set_query(query)
+        self._step()
+
+    def _step(self):
+        start = time.perf_counter()
+        done = self.matcher.step(FRAME_BUDGET)
+        default_registry.observe("quick_open.step_ms", (time.perf_counter() - start) * 1000)
+        self._show(self.matcher.results())
+        if not self.matcher.query:
+            self.status_label.setText(f"{len(self.index):,} files")
+        elif done:
+            self.status_label.setText(f"{self.matcher.matched:,} matches")
+        else:
+            self.status_label.setText(f"{self.matcher.matched:,} matches, "
+                                      f"{self.matcher.progress():.0%} searched")
+            self._timer.start()
+
+    def _show(self, paths):
+        if paths == self._shown:
+            return
+        self._shown = paths
+        self.result_list.clear()
+        for path in paths:
+            directory, _, name = path.rpartition("/")
+            item = QListWidgetItem(f"{name}    {directory}" if directory else name)
+            item.setData(Qt.UserRole, path)
+            item.setToolTip(path)
+            self.result_list.addItem(item)
+        if paths:
+            self.result_list.setCurrentRow(0)
+
+    # --- Keys ---------------------------------------------------------
+
+    def eventFilter(self, obj, event):
+        if obj is self.query_edit and event.type() == QEvent.KeyPress:
+            key = event.key()
+            if key in (Qt.Key_Up, Qt.Key_Down):
+                row = self.result_list.currentRow() + (1 if key == Qt.Key_Down else -1)
+                if 0 <= row < self.result_list.count():
+                    self.result_list.setCurrentRow(row)
+                return True
+            if key in (Qt.Key_Return, Qt.Key_Enter):
+                self.accept()
+                return True
+            if key == Qt.Key_Escape:
+                self.dismiss()
+                return True
+        elif obj is self.query_edit and event.type() == QEvent.FocusOut:
+            # Clicking elsewhere closes the finder
+            QTimer.singleShot(0, self._check_focus)
+        return super().eventFilter(obj, event)
+
+    def _check_focus(self):
+        focus = QApplication.focusWidget()
+        if self.isVisible() and (focus is None or not self.isAncestorOf(focus)):
+            self._timer.stop()
+            self.hide()
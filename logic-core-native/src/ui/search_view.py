@@ -0,0 +1,287 @@
+"""
+LogicCore v2 - Search View
+Sidebar search panel that streams results from the search engine.
+"""
+import linecache
+import os
+import re
+import time
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QLineEdit,
+    QPushButton, QTreeWidget, QTreeWidgetItem, QMenu
+)
+from PySide6.QtCore import Qt, QObject, QTimer, Signal
+
+from .theme import set_role
+from ..services.search import FileMatches, SearchQuery
+
+
+# Stop adding items past this many matches; the count keeps going
+MAX_DISPLAYED_MATCHES = 5000
+# Queries starting with this look up symbol definitions instead
+SYMBOL_PREFIX = "#"
+# Matches of the last search kept in the session snapshot
+MAX_SAVED_MATCHES = 1000
+
+
+class _SearchSignals(QObject):
+    results = Signal(object, object)
+    done = Signal(object)
+
+
+class SearchView(QWidget):
+    """
+    Search panel: query box, options and a streamed result tree.
+
+    Typing restarts the search after a short debounce; the engine
+    cancels the previous search, and batches from a cancelled search
+    are ignored when they arrive. With a symbol index, "#name" lists
+    the definitions starting with name instead, and their context menu
+    finds references.
+    """
+
+    open_requested = Signal(str, int)
+
+    def __init__(self, engine, parent=None, debounce_ms=200, symbols=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.symbols = symbols
+        self._handle = None
+        self._displayed = 0
+        self._recent = []
+
+        self._signals = _SearchSignals()
+        self._signals.results.connect(self._on_results)
+        self._signals.done.connect(self._on_done)
+
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(debounce_ms)
+        self._debounce.timeout.connect(self.start_search)
+
+        set_role(self, "view")
+        self.setAttribute(Qt.WA_StyledBackground, True)
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(0)
+
+        # Header
+        header = set_role(QWidget(), "header")
+        header.setFixedHeight(36)
+        header_layout = QHBoxLayout(header)
+        header_layout.setContentsMargins(12, 0, 12, 0)
+        header_label = set_role(QLabel("SEARCH"), "header")
+        header_layout.addWidget(header_label)
+        header_layout.addStretch()
+        layout.addWidget(header)
+
+        # Query row
+        query_row = QWidget()
+        query_layout = QHBoxLayout(query_row)
+        query_layout.setContentsMargins(8, 8, 8, 4)
+        query_layout.setSpacing(4)
+
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText(
+            "Search  (#name for symbols)" if symbols is not None else "Search")
+        self.query_edit.textChanged.connect(lambda _: self._debounce.start())
+        self.query_edit.returnPressed.connect(self.start_search)
+        query_layout.addWidget(self.query_edit)
+
+        self.case_button = self._create_toggle("Aa", "Match Case")
+        self.word_button = self._create_toggle("ab", "Match Whole Word")
+        self.regex_button = self._create_toggle(".*", "Use Regular Expression")
+        for button in (self.case_button, self.word_button, self.regex_button):
+            query_layout.addWidget(button)
+        layout.addWidget(query_row)
+
+        # Status
+        self.status_label = set_role(QLabel(""), "status")
+        self.status_label.setContentsMargins(12, 2, 12, 4)
+        layout.addWidget(self.status_label)
+
+        # Results
+        self.results = QTreeWidget()
+        self.results.setHeaderHidden(True)
+        self.results.setIndentation(12)
+        self.results.setUniformRowHeights(True)
+        self.results.itemActivated.connect(self._on_item_activated)
+        self.results.setContextMenuPolicy(Qt.CustomContextMenu)
+        self.results.customContextMenuRequested.connect(self._show_context_menu)
+        layout.addWidget(self.results)
+
+    def _create_toggle(self, text, tooltip):
+        button = set_role(QPushButton(text), "toggle")
+        button.setCheckable(True)
+        button.setToolTip(tooltip)
+        button.setFixedSize(26, 24)
+        button.toggled.connect(lambda _: self._debounce.start())
+        return button
+
+    def focus_query(self):
+        self.query_edit.setFocus()
+        self.query_edit.selectAll()
+
+    def start_search(self):
+        """Cancel the running search and start one for the current query."""
+        self._debounce.stop()
+        self.results.clear()
+        self._displayed = 0
+        self._recent = []
+        text = self.query_edit.text()
+        if not text:
+            self.engine.cancel()
+            self._handle = None
+            self.status_label.setText("")
+            return
+        if self.symbols is not None and text.startswith(SYMBOL_PREFIX):
+            self.engine.cancel()
+            self._handle = None
+            self.show_symbols(text[len(SYMBOL_PREFIX):].strip())
+            return
+        query = SearchQuery(
+            text,
+            regex=self.regex_button.isChecked(),
+            case_sensitive=self.case_button.isChecked(),
+            whole_word=self.word_button.isChecked(),
+        )
+        try:
+            re.compile(*query.compile())
+        except re.error as e:
+            self.engine.cancel()
+            self._handle = None
+            self.status_label.setText(f"Invalid pattern: {e}")
+            return
+        self.status_label.setText("Searching…")
+        self._handle = self.engine.search(query, self._signals.results.emit,
+                                          self._signals.done.emit)
+
+    def _on_results(self, handle, batch):
+        """Append a streamed batch of file matches (UI thread)."""
+        if handle is not self._handle:
+            return
+        self._add_matches(batch)
+        self.status_label.setText(f"{handle.match_count} results — searching…")
+
+    def _add_matches(self, batch):
+        self.results.setUpdatesEnabled(False)
+        for file_matches in batch:
+            if self._displayed >= MAX_DISPLAYED_MATCHES:
+                break
+            if self._displayed < MAX_SAVED_MATCHES:
+                self._recent.append(file_matches)
+            path = file_matches.path
+            name = os.path.basename(path)
+            file_item = QTreeWidgetItem(self.results,
+                                        [f"{name}  {os.path.dirname(path)}"])
+            file_item.setData(0, Qt.UserRole, (path, 0))
+            file_item.setToolTip(0, path)
+            for line, column, preview in file_matches.matches:
+                item = QTreeWidgetItem(file_item, [f"{line}: {preview.strip()}"])
+                item.setData(0, Qt.UserRole, (path, line))
+                self._displayed += 1
+            file_item.setExpanded(True)
+        self.results.setUpdatesEnabled(True)
+
+    def _on_done(self, handle):
+        if handle is not self._handle:
+            return
+        files = self.results.topLevelItemCount()
+        self.status_label.setText(
+            f"{handle.match_count} results in {files} files "
+            f"({handle.elapsed * 1000:.0f} ms)")
+
+    def save_state(self, writer):
+        """Write the query, its options and the first of its matches."""
+        writer.put_str(self.query_edit.text())
+        writer.put_ints([self.case_button.isChecked(), self.word_button.isChecked(),
+                         self.regex_button.isChecked()])
+        matches = [match for fm in self._recent for match in fm.matches]
+        writer.put_strs(fm.path for fm in self._recent)
+        writer.put_ints(len(fm.matches) for fm in self._recent)
+        writer.put_ints(line for line, _, _ in matches)
+        writer.put_ints(column for _, column, _ in matches)
+        writer.put_strs(preview for _, _, preview in matches)
+
+    def restore_state(self, reader):
+        """Show a search saved by `save_state` without running it again."""
+        text = reader.get_str()
+        options = reader.get_ints()
+        paths, counts = reader.get_strs(), reader.get_ints()
+        lines, columns, previews = reader.get_ints(), reader.get_ints(), reader.get_strs()
+        widgets = (self.query_edit, self.case_button, self.word_button, self.regex_button)
+        for widget in widgets:
+            widget.blockSignals(True)
+        self.query_edit.setText(text)
+        for button, checked in zip(widgets[1:], options):
+            button.setChecked(bool(checked))
+        for widget in widgets:
+            widget.blockSignals(False)
+        batch, start = [], 0
+        for path, count in zip(paths, counts):
+            batch.append(FileMatches(path, list(zip(lines[start:start + count],
+                                                    columns[start:start + count],
+                                                    previews[start:start + count]))))
+            start += count
+        self._add_matches(batch)
+        if text:
+            self.status_label.setText(f"{start} results from the last session "
+                                      "— press Enter to search again")
+
+    def show_symbols(self, query):
+        """List the definitions matching `query` from the symbol index."""
+        if not query:
+            self.status_label.setText("Type a symbol name")
+            return
+        symbols = self.symbols.find_symbol(query, limit=500)
+        for symbol in symbols:
+            item = QTreeWidgetItem(self.results, [
+                f"{symbol.qualname}  {symbol.kind} · {symbol.path}:{symbol.line}"])
+            item.setData(0, Qt.UserRole, (symbol.path, symbol.line))
+            item.setData(0, Qt.UserRole + 1, symbol.name)
+            item.setToolTip(0, symbol.path)
+        if not self.symbols.ready.is_set():
+            self.status_label.setText(f"{len(symbols)} symbols — indexing…")
+        else:
+            self.status_label.setText(f"{len(symbols)} symbols")
+
+    def show_references(self, name):
+        """List the uses of `name`, grouped by file like text matches."""
+        self.engine.cancel()
+        self._handle = None
+        self.results.clear()
+        start = time.perf_counter()
+        references = self.symbols.references(name, limit=MAX_DISPLAYED_MATCHES)
+        elapsed = time.perf_counter() - start
+        self.results.setUpdatesEnabled(False)
+        file_item = None
+        for path, line, column in references:
+            if file_item is None or file_item.data(0, Qt.UserRole)[0] != path:
+                file_item = QTreeWidgetItem(self.results, [
+                    f"{os.path.basename(path)}  {os.path.dirname(path)}"])
+                file_item.setData(0, Qt.UserRole, (path, 0))
+                file_item.setToolTip(0, path)
+                file_item.setExpanded(True)
+            preview = linecache.getline(os.path.join(self.engine.root, path), line)
+            item = QTreeWidgetItem(file_item, [f"{line}: {preview.strip()}"])
+            item.setData(0, Qt.UserRole, (path, line))
+        linecache.clearcache()
+        self.results.setUpdatesEnabled(True)
+        self.status_label.setText(
+            f"{len(references)} references to {name} in "
+            f"{self.results.topLevelItemCount()} files ({elapsed * 1000:.0f} ms)")
+
+    def _show_context_menu(self, pos):
+        item = self.results.itemAt(pos)
+        name = item.data(0, Qt.UserRole + 1) if item is not None else None
+        if not name:
+            return
+        menu = QMenu(self)
+        menu.addAction("Go to Definition", lambda: self._on_item_activated(item, 0))
+        menu.addAction(f"Find References to {name}", lambda: self.show_references(name))
+        menu.exec(self.results.viewport().mapToGlobal(pos))
+
+    def _on_item_activated(self, item, column):
+        path, line = item.data(0, Qt.UserRole)
+        self.open_requested.emit(os.path.join(self.engine.root, path), line)
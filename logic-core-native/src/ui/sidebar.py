@@ -2,14 +2,28 @@
 LogicCore v2 - Sidebar
 Native Qt sidebar with activity bar and file tree.
 """
+import os
+
 from PySide6.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QPushButton,
-    QTreeWidget, QTreeWidgetItem, QLabel, QFrame,
-    QScrollArea
+    QTreeView, QLabel, QFrame, QScrollArea, QStackedWidget, QMenu, QApplication
 )
-from PySide6.QtCore import Qt, QSize
+from PySide6.QtCore import Qt, QSize, QObject, Signal
 from PySide6.QtGui import QIcon
 
+from .file_tree import FileTreeModel
+from .search_view import SearchView
+from .chat_view import ChatView
+from .git_view import GitView, GitBadgeDelegate
+from .lazy import LazyWidget
+from .theme import set_role, theme
+from ..services.session import Reader, Writer
+from ..services.startup import profiler
+
+
+class _GitSignals(QObject):
+    status = Signal(object)
+
 
 class ActivityButton(QPushButton):
     """Activity bar icon button."""
@@ -19,22 +33,6 @@ class ActivityButton(QPushButton):
         self.setFixedSize(48, 40)
         self.setToolTip(tooltip)
         self.setCheckable(True)
-        self.setStyleSheet("""
-            QPushButton {
-                background-color: transparent;
-                border: none;
-                border-left: 2px solid transparent;
-                color: #52525b;
-                font-size: 18px;
-            }
-            QPushButton:hover {
-                color: #a1a1aa;
-            }
-            QPushButton:checked {
-                color: #eeeeee;
-                border-left: 2px solid #3b82f6;
-            }
-        """)
 
 
 class Sidebar(QWidget):
@@ -42,16 +40,22 @@ class Sidebar(QWidget):
     Native sidebar with activity bar and content panel.
     """
     
-    def __init__(self, parent=None):
+    open_requested = Signal(str, int)
+    
+    def __init__(self, parent=None, workspace=None, file_index=None,
+                 search_engine=None, git_service=None, symbol_index=None,
+                 retrieval_index=None):
         super().__init__(parent)
+        self.workspace = workspace or os.getcwd()
+        self.file_index = file_index
+        self.search_engine = search_engine
+        self.symbol_index = symbol_index
+        self.retrieval_index = retrieval_index
+        self.git_service = git_service
+        self.views = {}
         
         self.setFixedWidth(280)
-        self.setStyleSheet("""
-            Sidebar {
-                background-color: #0a0a0b;
-                border-right: 1px solid #2a2a30;
-            }
-        """)
+        self.setAttribute(Qt.WA_StyledBackground, True)
         
         layout = QHBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
@@ -61,15 +65,32 @@ class Sidebar(QWidget):
         activity_bar = self.create_activity_bar()
         layout.addWidget(activity_bar)
         
-        # Content panel
-        content_panel = self.create_content_panel()
-        layout.addWidget(content_panel)
+        # Content panel, one view per activity
+        # Inactive views are built the first time they are shown
+        self.content_stack = QStackedWidget()
+        with profiler.phase("Explorer"):
+            self.add_view("Explorer", self.create_content_panel())
+        self.search_view = None
+        self.git_view = None
+        self.chat_view = None
+        self._git_status = None
+        self._saved_search = None
+        self._to_expand = set()
+        if self.search_engine is not None:
+            self.add_view("Search", LazyWidget(self.create_search_view, "Search view"))
+        if self.git_service is not None:
+            self.add_view("Git", LazyWidget(self.create_git_view, "Git view"))
+            self._git_signals = _GitSignals()
+            self._git_signals.status.connect(self.on_git_status)
+            self.git_service.subscribe(self._git_signals.status.emit)
+        self.add_view("AI Chat", LazyWidget(self.create_chat_view, "AI Chat view"))
+        layout.addWidget(self.content_stack)
     
     def create_activity_bar(self):
         """Create the leftmost icon bar."""
         bar = QWidget()
         bar.setFixedWidth(48)
-        bar.setStyleSheet("background-color: #0a0a0b; border-right: 1px solid #2a2a30;")
+        bar.setObjectName("activityBar")
         
         layout = QVBoxLayout(bar)
         layout.setContentsMargins(0, 8, 0, 8)
@@ -98,6 +119,8 @@ class Sidebar(QWidget):
         
         # Settings at bottom
         settings_btn = ActivityButton("⚙", "Settings")
+        settings_btn.setCheckable(False)
+        settings_btn.clicked.connect(lambda: self.show_settings_menu(settings_btn))
         layout.addWidget(settings_btn)
         
         return bar
@@ -106,75 +129,159 @@ class Sidebar(QWidget):
         """Handle activity button clicks."""
         for btn in self.activity_buttons:
             btn.setChecked(btn == clicked_button)
+        self.show_view(clicked_button.toolTip())
+    
+    def show_settings_menu(self, button):
+        """Pop up the settings menu next to the settings button."""
+        menu = QMenu(self)
+        themes = menu.addMenu("Color Theme")
+        for name in theme.names():
+            action = themes.addAction(name.title())
+            action.setCheckable(True)
+            action.setChecked(name == theme.name)
+            action.triggered.connect(
+                lambda checked, n=name: theme.apply(QApplication.instance(), n))
+        menu.exec(button.mapToGlobal(button.rect().topRight()))
+    
+    def create_search_view(self):
+        self.search_view = SearchView(self.search_engine, symbols=self.symbol_index)
+        self.search_view.open_requested.connect(self.open_requested)
+        if self._saved_search is not None:
+            self.search_view.restore_state(Reader(self._saved_search))
+        return self.search_view
+    
+    def create_git_view(self):
+        self.git_view = GitView(self.workspace)
+        self.git_view.open_requested.connect(self.open_requested)
+        if self._git_status is not None:
+            self.git_view.set_status(self._git_status)
+        return self.git_view
+    
+    def create_chat_view(self):
+        self.chat_view = ChatView(self.retrieval_index, self.symbol_index)
+        return self.chat_view
+    
+    def on_git_status(self, status):
+        """Forward a Git status snapshot to the Git view and Explorer."""
+        self._git_status = status
+        if self.git_view is not None:
+            self.git_view.set_status(status)
+        self.tree_model.set_git_status(status)
+    
+    def add_view(self, name, widget):
+        """Register the content view shown for an activity."""
+        self.views[name] = widget
+        self.content_stack.addWidget(widget)
+    
+    def show_view(self, name):
+        """Switch the content panel to an activity's view."""
+        widget = self.views.get(name)
+        if widget is None:
+            return
+        if isinstance(widget, LazyWidget):
+            widget.ensure_built()
+        self.content_stack.setCurrentWidget(widget)
+        for btn in self.activity_buttons:
+            btn.setChecked(btn.toolTip() == name)
+        if name == "Search" and self.search_view is not None:
+            self.search_view.focus_query()
+        elif name == "AI Chat" and self.chat_view is not None:
+            self.chat_view.focus_prompt()
+    
+    def active_view(self):
+        """Name of the view in the content panel."""
+        current = self.content_stack.currentWidget()
+        return next((name for name, widget in self.views.items() if widget is current), "")
+    
+    def search_state(self):
+        """Saved state of the Search view; the last session's if it was never opened."""
+        if self.search_view is None:
+            return self._saved_search
+        writer = Writer()
+        self.search_view.save_state(writer)
+        return writer.payload()
+    
+    def restore_search(self, data):
+        """Restore a `search_state`, now or when the Search view is built."""
+        self._saved_search = data
+        if self.search_view is not None:
+            self.search_view.restore_state(Reader(data))
+    
+    def expanded_dirs(self):
+        """Workspace-relative paths of the expanded Explorer folders."""
+        expanded = []
+        stack = [self.tree_model.root_node]
+        while stack:
+            for child in stack.pop().children or ():
+                if child.children and self.tree.isExpanded(self.tree_model.index_for_node(child)):
+                    expanded.append(child.relpath())
+                    stack.append(child)
+        return expanded
+    
+    def restore_expanded(self, rels):
+        """Expand Explorer folders as their parents' listings arrive."""
+        if not self._to_expand:
+            self.tree_model.rowsInserted.connect(self._expand_restored)
+        self._to_expand.update(rels)
+        self._expand_restored()
+    
+    def _expand_restored(self, *args):
+        model = self.tree_model
+        for rel in list(self._to_expand):
+            node = model.find_node(rel)
+            if node is not None:
+                self._to_expand.discard(rel)
+                index = model.index_for_node(node)
+                self.tree.expand(index)
+                # A hidden tree does not fetch, and the Explorer may not be showing
+                if model.canFetchMore(index):
+                    model.fetchMore(index)
+                continue
+            # Gone since the last session: its parent is listed without it
+            parent = model.find_node(rel.rpartition("/")[0])
+            if parent is not None and parent.children is not None and not parent.pending:
+                self._to_expand.discard(rel)
+        if not self._to_expand:
+            model.rowsInserted.disconnect(self._expand_restored)
+    
+    def on_tree_activated(self, index):
+        """Open files activated in the Explorer."""
+        if not self.tree_model.node_from_index(index).is_dir:
+            self.open_requested.emit(self.tree_model.file_path(index), 0)
     
     def create_content_panel(self):
         """Create the file tree / content area."""
-        panel = QWidget()
-        panel.setStyleSheet("background-color: #0a0a0b;")
+        panel = set_role(QWidget(), "view")
         
         layout = QVBoxLayout(panel)
         layout.setContentsMargins(0, 0, 0, 0)
         layout.setSpacing(0)
         
         # Header
-        header = QWidget()
+        header = set_role(QWidget(), "header")
         header.setFixedHeight(36)
-        header.setStyleSheet("""
-            background-color: #121214;
-            border-bottom: 1px solid #2a2a30;
-        """)
         header_layout = QHBoxLayout(header)
         header_layout.setContentsMargins(12, 0, 12, 0)
         
-        header_label = QLabel("EXPLORER")
-        header_label.setStyleSheet("color: #52525b; font-size: 10px; font-weight: 600; letter-spacing: 1px;")
+        header_label = set_role(QLabel("EXPLORER"), "header")
         header_layout.addWidget(header_label)
         header_layout.addStretch()
         
         layout.addWidget(header)
         
         # File tree
-        tree = QTreeWidget()
+        self.tree_model = FileTreeModel(self.workspace, self, self.file_index)
+        tree = QTreeView()
+        tree.setModel(self.tree_model)
         tree.setHeaderHidden(True)
         tree.setIndentation(16)
-        tree.setStyleSheet("""
-            QTreeWidget {
-                background-color: #0a0a0b;
-                border: none;
-                color: #a1a1aa;
-                font-size: 12px;
-            }
-            QTreeWidget::item {
-                height: 26px;
-                padding-left: 4px;
-            }
-            QTreeWidget::item:hover {
-                background-color: #1e1e22;
-            }
-            QTreeWidget::item:selected {
-                background-color: #1e1e22;
-                color: #eeeeee;
-            }
-            QTreeWidget::branch {
-                background-color: #0a0a0b;
-            }
-        """)
-        
-        # Sample tree items
-        root = QTreeWidgetItem(tree, ["📁 workspace"])
-        root.setExpanded(True)
-        
-        src = QTreeWidgetItem(root, ["📁 src"])
-        src.setExpanded(True)
-        QTreeWidgetItem(src, ["🐍 main.py"])
-        QTreeWidgetItem(src, ["🐍 utils.py"])
-        
-        services = QTreeWidgetItem(src, ["📁 services"])
-        QTreeWidgetItem(services, ["🐍 security.py"])
-        QTreeWidgetItem(services, ["🐍 environment.py"])
-        
-        QTreeWidgetItem(root, ["📄 graph.json"])
-        QTreeWidgetItem(root, ["📄 README.md"])
+        tree.setUniformRowHeights(True)
+        tree.setObjectName("explorerTree")
+        tree.setItemDelegate(GitBadgeDelegate(tree))
+        tree.collapsed.connect(self.tree_model.on_collapsed)
+        tree.activated.connect(self.on_tree_activated)
+        tree.expand(self.tree_model.root_index())
+        self.tree = tree
         
         layout.addWidget(tree)
         
@@ -0,0 +1,69 @@
+"""
+LogicCore v2 - Sparkline
+Small line chart for metric history.
+"""
+from PySide6.QtWidgets import QWidget
+from PySide6.QtCore import Qt, QPointF
+from PySide6.QtGui import QColor, QPainter, QPainterPath, QPen
+
+from .theme import theme
+
+
+class Sparkline(QWidget):
+    """
+    Draws a pre-downsampled (times, values) series scaled to the widget.
+
+    The caller decides how many points to pass (see `point_budget`), so
+    painting cost does not depend on how long the history is.
+    """
+
+    def __init__(self, tone="accent", parent=None):
+        super().__init__(parent)
+        self.tone = tone
+        self._times = ()
+        self._values = ()
+        self.setFixedHeight(32)
+        self.setAttribute(Qt.WA_OpaquePaintEvent, False)
+
+    def point_budget(self):
+        """Points worth drawing at the current width: about one per 2 px."""
+        return max(3, self.width() // 2)
+
+    def set_points(self, times, values):
+        self._times = times
+        self._values = values
+        self.update()
+
+    def paintEvent(self, event):
+        times, values = self._times, self._values
+        if len(values) < 2:
+            return
+        t0, t1 = times[0], times[-1]
+        low, high = min(values), max(values)
+        if high == low:
+            high = low + 1.0
+        span = (t1 - t0) or 1.0
+        w = self.width() - 1
+        h = self.height() - 2
+
+        path = QPainterPath()
+        for i, (t, v) in enumerate(zip(times, values)):
+            point = QPointF((t - t0) / span * w, 1 + h - (v - low) / (high - low) * h)
+            if i:
+                path.lineTo(point)
+            else:
+                path.moveTo(point)
+
+        color = theme.color("text_muted" if self.tone == "muted" else self.tone)
+        fill = QColor(color)
+        fill.setAlpha(40)
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        area = QPainterPath(path)
+        area.lineTo(w, h + 1)
+        area.lineTo(0, h + 1)
+        area.closeSubpath()
+        painter.fillPath(area, fill)
+        painter.setPen(QPen(color, 1.2))
+        painter.drawPath(path)
+        painter.end()
@@ -0,0 +1,79 @@
+"""
+LogicCore v2 - Stall View
+Histogram and list of UI stalls caught by the watchdog.
+"""
+import time
+
+from PySide6.QtWidgets import (
+    QWidget, QVBoxLayout, QHBoxLayout, QLabel, QTreeWidget, QTreeWidgetItem
+)
+from PySide6.QtCore import Qt
+
+from .theme import set_role
+from ..services.watchdog import MAX_STALLS, bucket_label
+
+
+class StallView(QWidget):
+    """
+    Recent event-loop stalls, newest first.
+
+    Each row shows when the stall happened, how long it lasted and the
+    innermost frame of the captured stack; the full stack is in the
+    row's tooltip.
+    """
+
+    def __init__(self, watchdog, parent=None):
+        super().__init__(parent)
+        self.watchdog = watchdog
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.setSpacing(6)
+
+        header = QHBoxLayout()
+        header.addWidget(set_role(QLabel("UI STALLS"), "metricLabel"))
+        header.addStretch()
+        self.histogram_label = set_role(QLabel(), "status")
+        header.addWidget(self.histogram_label)
+        layout.addLayout(header)
+
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["TIME", "DURATION", "LOCATION"])
+        self.tree.setRootIsDecorated(False)
+        self.tree.setUniformRowHeights(True)
+        self.tree.setColumnWidth(0, 90)
+        self.tree.setColumnWidth(1, 90)
+        layout.addWidget(self.tree)
+
+        for stall in watchdog.stalls:
+            self.add_stall(stall)
+        self.update_histogram()
+        watchdog.subscribe(self.on_stall)
+
+    def shutdown(self):
+        self.watchdog.unsubscribe(self.on_stall)
+
+    def on_stall(self, stall):
+        self.add_stall(stall)
+        self.update_histogram()
+
+    def add_stall(self, stall):
+        item = QTreeWidgetItem([
+            time.strftime("%H:%M:%S", time.localtime(stall.started)),
+            f"{stall.duration * 1000:.0f} ms",
+            stall.location() or "(not captured)",
+        ])
+        item.setTextAlignment(1, Qt.AlignRight | Qt.AlignVCenter)
+        item.setToolTip(2, stall.format_stack().rstrip("\n"))
+        self.tree.insertTopLevelItem(0, item)
+        if self.tree.topLevelItemCount() > MAX_STALLS:
+            self.tree.takeTopLevelItem(MAX_STALLS)
+
+    def update_histogram(self):
+        counts = self.watchdog.histogram
+        if not self.watchdog.total:
+            self.histogram_label.setText("no stalls over "
+                                         f"{self.watchdog.budget * 1000:.0f} ms")
+            return
+        self.histogram_label.setText("   ".join(
+            f"{bucket_label(i)}: {n}" for i, n in enumerate(counts) if n))
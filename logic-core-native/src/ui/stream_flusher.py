@@ -0,0 +1,93 @@
+"""
+LogicCore v2 - Stream Flusher
+Delivers token streams to widgets at most once per frame.
+"""
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtGui import QTextCursor
+
+from ..services.streaming import STREAM_CAPACITY, StreamHub
+
+
+# Characters handed to a sink per frame; the rest waits a frame
+FRAME_CHARS = 256 * 1024
+
+
+class _FlusherSignals(QObject):
+    wake = Signal()
+
+
+class StreamFlusher(QObject):
+    """
+    Single UI-thread consumer of a StreamHub.
+
+    Each stream has a sink, `sink(text, finished)`, called on the UI
+    thread with everything its stream produced since the last frame.
+    The frame timer runs only while streams are open; producers wake
+    it with one queued signal per busy period rather than per token.
+    """
+
+    FRAME_MS = 16
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._signals = _FlusherSignals()
+        self._signals.wake.connect(self._on_wake)
+        self.hub = StreamHub(wake=self._signals.wake.emit)
+        self._sinks = {}
+        self._frame = QTimer(self)
+        self._frame.setInterval(self.FRAME_MS)
+        self._frame.timeout.connect(self.flush)
+
+    def open(self, sink, name="", capacity=STREAM_CAPACITY):
+        """A TokenStream whose text goes to `sink`; push to it from any thread."""
+        stream = self.hub.open(name, capacity)
+        self._sinks[stream] = sink
+        return stream
+
+    def start(self, source, sink, name="", capacity=STREAM_CAPACITY):
+        """Stream an iterable or async iterable of tokens into `sink`."""
+        # Register the sink before the producer thread can push
+        stream = self.open(sink, name, capacity)
+        self.hub.produce(source, stream)
+        return stream
+
+    def _on_wake(self):
+        if not self._frame.isActive():
+            self._frame.start()
+
+    def flush(self):
+        """Hand every stream's new text to its sink; runs once per frame."""
+        batch = self.hub.drain(FRAME_CHARS)
+        if batch is None:
+            self._frame.stop()
+            return
+        for stream, text, finished in batch:
+            sink = self._sinks.get(stream)
+            if finished:
+                self._sinks.pop(stream, None)
+            if sink is not None and (text or finished):
+                sink(text, finished)
+
+    def cancel_all(self):
+        self.hub.cancel_all()
+
+    def shutdown(self):
+        self.hub.cancel_all()
+        self._frame.stop()
+        self._sinks.clear()
+
+
+class TextEditSink:
+    """Appends streamed text to a QPlainTextEdit or QTextEdit."""
+
+    def __init__(self, widget, on_finished=None):
+        self.widget = widget
+        self.on_finished = on_finished
+
+    def __call__(self, text, finished):
+        if text:
+            cursor = QTextCursor(self.widget.document())
+            cursor.movePosition(QTextCursor.End)
+            cursor.insertText(text)
+        if finished and self.on_finished is not None:
+            self.on_finished()
@@ -0,0 +1,390 @@
+"""
+LogicCore v2 - Terminal Screen
+ANSI/VT output parser and bounded scrollback for the terminal widget.
+"""
+import codecs
+import re
+import threading
+
+
+# xterm base colors, tuned to the LogicCore palette
+ANSI_COLORS = [
+    "#27272a", "#ef4444", "#22c55e", "#eab308",
+    "#3b82f6", "#a855f7", "#06b6d4", "#a1a1aa",
+    "#52525b", "#f87171", "#4ade80", "#facc15",
+    "#60a5fa", "#c084fc", "#22d3ee", "#eeeeee",
+]
+
+BOLD = 1
+DIM = 2
+ITALIC = 4
+UNDERLINE = 8
+INVERSE = 16
+
+# Longer lines are wrapped so a single line cannot grow without bound
+MAX_LINE_LENGTH = 4096
+# Output parsed but not yet taken by the widget before the reader waits
+MAX_UNREAD = 1 << 20
+
+_CONTROL = re.compile(
+    r"\x1b\[([0-?]*)[ -/]*([@-~])"          # CSI
+    r"|\x1b\][^\x07\x1b]*(?:\x07|\x1b\\)"   # OSC (titles etc.)
+    r"|\x1b[P^_][^\x1b]*\x1b\\"             # DCS / PM / APC
+    r"|\x1b[()*+][0-9A-Za-z]"               # Charset designation
+    r"|\x1b[@-Z\\-_=>78]"                   # Other two-byte escapes
+    r"|[\r\n\b\t\x07\x0e\x0f]"
+)
+_SPECIAL = re.compile(r"[\x1b\r\b\t\x07\x0e\x0f]")
+
+
+def _color_256(n):
+    if n < 16:
+        return ANSI_COLORS[n]
+    if n < 232:
+        n -= 16
+        steps = (0, 95, 135, 175, 215, 255)
+        return "#%02x%02x%02x" % (steps[n // 36], steps[(n // 6) % 6], steps[n % 6])
+    level = 8 + (n - 232) * 10
+    return "#%02x%02x%02x" % (level, level, level)
+
+
+class StyleTable:
+    """Interns (fg, bg, flags) tuples so runs carry a small int."""
+
+    def __init__(self, limit=4096):
+        self.styles = [(None, None, 0)]
+        self._ids = {self.styles[0]: 0}
+        self.limit = limit
+
+    def intern(self, style):
+        style_id = self._ids.get(style)
+        if style_id is None:
+            if len(self.styles) >= self.limit:
+                return 0
+            style_id = len(self.styles)
+            self.styles.append(style)
+            self._ids[style] = style_id
+        return style_id
+
+    def get(self, style_id):
+        return self.styles[style_id]
+
+
+class LineRing:
+    """Fixed-capacity ring of lines with O(1) append and indexing."""
+
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self._items = [None] * capacity
+        self._start = 0
+        self.count = 0
+        self.total = 0
+
+    def append(self, item):
+        if self.count < self.capacity:
+            self._items[(self._start + self.count) % self.capacity] = item
+            self.count += 1
+        else:
+            self._items[self._start] = item
+            self._start = (self._start + 1) % self.capacity
+        self.total += 1
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return self._items[(self._start + index) % self.capacity]
+
+    def __len__(self):
+        return self.count
+
+    def clear(self):
+        self._items = [None] * self.capacity
+        self._start = 0
+        self.count = 0
+
+
+class TerminalScreen:
+    """
+    Parsed terminal output.
+
+    Bytes from the PTY are decoded and split into lines of styled runs,
+    each run a (text, style_id) pair. Finished lines go into a
+    fixed-size ring, so memory stays flat however much output arrives.
+    `feed` runs on the PTY reader thread; the widget reads through
+    `lines()` and polls `take_changes()` once per frame. While `paced`,
+    the reader waits once MAX_UNREAD bytes are parsed ahead of the last
+    frame, which throttles a flooding child through the PTY buffer.
+    """
+
+    def __init__(self, scrollback=10000):
+        self.ring = LineRing(scrollback)
+        self.styles = StyleTable()
+        self.lock = threading.Lock()
+        self._taken = threading.Condition(self.lock)
+        self._paced = False
+        self._unread = 0
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self._pending = ""
+        self._runs = []
+        self._length = 0
+        self._col = 0
+        self._fg = None
+        self._bg = None
+        self._flags = 0
+        self._style = 0
+        self._changed = False
+
+    # --- Reader thread --------------------------------------------------
+
+    def feed(self, data):
+        """Parse a chunk of raw PTY output."""
+        text = self._pending + self._decoder.decode(data)
+        self._pending = ""
+        # Hold back an escape sequence split across chunks
+        esc = text.rfind("\x1b")
+        if esc != -1 and len(text) - esc < 256:
+            m = _CONTROL.match(text, esc)
+            if m is None or m.end() > len(text):
+                self._pending = text[esc:]
+                text = text[:esc]
+        with self.lock:
+            while self._paced and self._unread >= MAX_UNREAD:
+                self._taken.wait()
+            self._parse(text)
+            self._unread += len(data)
+            self._changed = True
+
+    def set_paced(self, paced):
+        """Make `feed` wait for the widget's frames (only while it shows them)."""
+        with self.lock:
+            self._paced = paced
+            self._taken.notify_all()
+
+    def feed_text(self, text):
+        """Parse already-decoded output."""
+        with self.lock:
+            self._parse(text)
+            self._changed = True
+
+    def _parse(self, text):
+        if not _SPECIAL.search(text):
+            # Fast path: plain text and newlines only
+            parts = text.split("\n")
+            for part in parts[:-1]:
+                if part:
+                    self._write(part)
+                self._newline()
+            if parts[-1]:
+                self._write(parts[-1])
+            return
+        pos = 0
+        for m in _CONTROL.finditer(text):
+            start = m.start()
+            if start > pos:
+                self._write(text[pos:start])
+            pos = m.end()
+            token = m.group(0)
+            if token == "\n":
+                self._newline()
+            elif token == "\r":
+                self._col = 0
+            elif token == "\b":
+                self._col = max(0, self._col - 1)
+            elif token == "\t":
+                self._write(" " * (8 - self._col % 8))
+            elif m.group(2) is not None:
+                self._csi(m.group(1), m.group(2))
+        if pos < len(text):
+            self._write(text[pos:])
+
+    def _write(self, text):
+        while text:
+            room = MAX_LINE_LENGTH - self._col
+            if room <= 0:
+                self._newline()
+                continue
+            chunk, text = text[:room], text[room:]
+            if self._col == self._length:
+                runs = self._runs
+                if runs and runs[-1][1] == self._style:
+                    runs[-1] = (runs[-1][0] + chunk, self._style)
+                else:
+                    runs.append((chunk, self._style))
+                self._length += len(chunk)
+            else:
+                self._overwrite(chunk)
+            self._col += len(chunk)
+
+    def _overwrite(self, chunk):
+        """Write at a column inside the current line (after CR or cursor moves)."""
+        chars, styles = self._explode()
+        end = self._col + len(chunk)
+        if end > len(chars):
+            chars.extend(" " * (end - len(chars)))
+            styles.extend([0] * (end - len(styles)))
+        chars[self._col:end] = chunk
+        styles[self._col:end] = [self._style] * len(chunk)
+        self._implode(chars, styles)
+
+    def _explode(self):
+        chars, styles = [], []
+        for text, style in self._runs:
+            chars.extend(text)
+            styles.extend([style] * len(text))
+        return chars, styles
+
+    def _implode(self, chars, styles):
+        runs = []
+        start = 0
+        for i in range(1, len(chars) + 1):
+            if i == len(chars) or styles[i] != styles[start]:
+                runs.append(("".join(chars[start:i]), styles[start]))
+                start = i
+        self._runs = runs
+        self._length = len(chars)
+
+    def _newline(self):
+        self.ring.append(tuple(self._runs))
+        self._runs = []
+        self._length = 0
+        self._col = 0
+
+    def _csi(self, params, final):
+        if final == "m":
+            self._sgr(params)
+        elif final == "K":
+            mode = params or "0"
+            chars, styles = self._explode()
+            if mode == "0":
+                del chars[self._col:], styles[self._col:]
+            elif mode == "1":
+                for i in range(min(self._col + 1, len(chars))):
+                    chars[i] = " "
+            else:
+                chars, styles = [], []
+            self._implode(chars, styles)
+        elif final == "J" and params in ("2", "3"):
+            self.ring.clear()
+            self._runs, self._length, self._col = [], 0, 0
+        elif final in "GCD":
+            first = params.split(";")[0]
+            n = int(first) if first.isdigit() else 1
+            if final == "G":
+                self._col = min(max(0, n - 1), MAX_LINE_LENGTH)
+            elif final == "C":
+                self._col = min(self._col + n, MAX_LINE_LENGTH)
+            elif final == "D":
+                self._col = max(0, self._col - n)
+            if self._col > self._length:
+                self._runs.append((" " * (self._col - self._length), 0))
+                self._length = self._col
+
+    def _sgr(self, params):
+        codes = [int(p) if p.isdigit() else 0 for p in params.split(";")] if params else [0]
+        i = 0
+        while i < len(codes):
+            code = codes[i]
+            if code == 0:
+                self._fg = self._bg = None
+                self._flags = 0
+            elif code == 1:
+                self._flags |= BOLD
+            elif code == 2:
+                self._flags |= DIM
+            elif code == 3:
+                self._flags |= ITALIC
+            elif code == 4:
+                self._flags |= UNDERLINE
+            elif code == 7:
+                self._flags |= INVERSE
+            elif code == 22:
+                self._flags &= ~(BOLD | DIM)
+            elif code == 23:
+                self._flags &= ~ITALIC
+            elif code == 24:
+                self._flags &= ~UNDERLINE
+            elif code == 27:
+                self._flags &= ~INVERSE
+            elif 30 <= code <= 37:
+                self._fg = ANSI_COLORS[code - 30]
+            elif 90 <= code <= 97:
+                self._fg = ANSI_COLORS[code - 90 + 8]
+            elif code == 39:
+                self._fg = None
+            elif 40 <= code <= 47:
+                self._bg = ANSI_COLORS[code - 40]
+            elif 100 <= code <= 107:
+                self._bg = ANSI_COLORS[code - 100 + 8]
+            elif code == 49:
+                self._bg = None
+            elif code in (38, 48) and i + 1 < len(codes):
+                color = None
+                if codes[i + 1] == 5 and i + 2 < len(codes):
+                    color = _color_256(codes[i + 2] & 0xFF)
+                    i += 2
+                elif codes[i + 1] == 2 and i + 4 < len(codes):
+                    r, g, b = (c & 0xFF for c in codes[i + 2:i + 5])
+                    color = "#%02x%02x%02x" % (r, g, b)
+                    i += 4
+                if code == 38:
+                    self._fg = color
+                else:
+                    self._bg = color
+            i += 1
+        self._style = self.styles.intern((self._fg, self._bg, self._flags))
+
+    # --- UI thread ------------------------------------------------------
+
+    def append_line(self, text, color=None):
+        """Append a whole line in a single color, outside the parser state."""
+        with self.lock:
+            if self._runs:
+                self._newline()
+            style = self.styles.intern((color, None, 0)) if color else 0
+            self.ring.append(((text, style),) if text else ())
+            self._changed = True
+
+    def history(self, limit):
+        """(styles, lines) of the last `limit` finished lines, for session snapshots."""
+        with self.lock:
+            first = max(0, self.ring.count - limit)
+            return list(self.styles.styles), [self.ring[i] for i in range(first, self.ring.count)]
+
+    def restore(self, styles, lines):
+        """Put lines saved from an earlier session before the current ones."""
+        with self.lock:
+            ids = [self.styles.intern(style) for style in styles]
+            current = [self.ring[i] for i in range(self.ring.count)]
+            self.ring.clear()
+            for line in lines:
+                self.ring.append(tuple((text, ids[style]) for text, style in line))
+            for line in current:
+                self.ring.append(line)
+            self._changed = True
+
+    def take_changes(self):
+        """True if output arrived since the last call."""
+        with self.lock:
+            changed, self._changed = self._changed, False
+            self._unread = 0
+            self._taken.notify_all()
+            return changed
+
+    def line_count(self):
+        """Finished lines plus the line under construction."""
+        return self.ring.count + 1
+
+    def lines(self, first, count):
+        """Copy out up to `count` lines starting at `first`."""
+        with self.lock:
+            end = min(first + count, self.ring.count + 1)
+            out = []
+            for i in range(max(0, first), end):
+                out.append(self.ring[i] if i < self.ring.count else tuple(self._runs))
+            return out
+
+    def plain_text(self, first=0, count=None):
+        """Lines as plain strings, e.g. for copying or session snapshots."""
+        if count is None:
+            count = self.line_count()
+        return ["".join(text for text, _ in line) for line in self.lines(first, count)]
@@ -0,0 +1,423 @@
+"""
+LogicCore v2 - Theme
+Design tokens compiled into one application-wide stylesheet.
+"""
+import hashlib
+import json
+import logging
+import os
+from string import Template
+
+from PySide6.QtGui import QColor
+
+from ..services.paths import cache_dir
+
+
+log = logging.getLogger(__name__)
+
+THEMES = {
+    "dark": {
+        "bg": "#0a0a0b",
+        "surface": "#121214",
+        "border": "#2a2a30",
+        "hover": "#1e1e22",
+        "pressed": "#27272a",
+        "text": "#eeeeee",
+        "text_muted": "#a1a1aa",
+        "text_dim": "#52525b",
+        "accent": "#3b82f6",
+        "warning": "#eab308",
+        "error": "#ef4444",
+        "danger": "#dc2626",
+        "on_danger": "#ffffff",
+        "syntax_keyword": "#c084fc",
+        "syntax_builtin": "#22d3ee",
+        "syntax_string": "#86efac",
+        "syntax_comment": "#6b7280",
+        "syntax_number": "#fdba74",
+        "syntax_def": "#93c5fd",
+        "syntax_decorator": "#facc15",
+    },
+    "light": {
+        "bg": "#ffffff",
+        "surface": "#f4f4f5",
+        "border": "#d4d4d8",
+        "hover": "#e4e4e7",
+        "pressed": "#d4d4d8",
+        "text": "#18181b",
+        "text_muted": "#3f3f46",
+        "text_dim": "#71717a",
+        "accent": "#2563eb",
+        "warning": "#ca8a04",
+        "error": "#dc2626",
+        "danger": "#dc2626",
+        "on_danger": "#ffffff",
+        "syntax_keyword": "#7c3aed",
+        "syntax_builtin": "#0e7490",
+        "syntax_string": "#15803d",
+        "syntax_comment": "#71717a",
+        "syntax_number": "#c2410c",
+        "syntax_def": "#1d4ed8",
+        "syntax_decorator": "#a16207",
+    },
+}
+
+DEFAULT_THEME = "dark"
+
+# Widgets pick rules up through their class name, objectName or a
+# "role" / "tone" dynamic property; none of them set a stylesheet.
+STYLESHEET = Template("""
+#centralWidget {
+    background-color: $bg;
+}
+QSplitter::handle {
+    background-color: $border;
+}
+QMenu {
+    background-color: $surface;
+    border: 1px solid $border;
+    color: $text_muted;
+}
+QMenu::item:selected {
+    background-color: $hover;
+    color: $text;
+}
+#canvasArea {
+    background-color: $surface;
+    border: none;
+}
+
+/* Title bar */
+TitleBar {
+    background-color: $surface;
+    border-bottom: 1px solid $border;
+}
+QLabel[role="logo"] {
+    color: $accent;
+    font-size: 16px;
+}
+QLabel[role="title"] {
+    color: $text;
+    font-size: 13px;
+    font-weight: 600;
+    letter-spacing: 1px;
+}
+QFrame[role="separator"] {
+    background-color: $border;
+}
+QLabel[role="breadcrumb"] {
+    color: $text_dim;
+    font-size: 11px;
+}
+QPushButton[role="windowControl"] {
+    background-color: transparent;
+    border: none;
+    color: $text_muted;
+    font-size: 16px;
+    padding: 0;
+}
+QPushButton[role="windowControl"]:hover {
+    background-color: $pressed;
+    color: $text;
+}
+QPushButton#closeButton:hover {
+    background-color: $danger;
+    color: $on_danger;
+}
+
+/* Sidebar */
+Sidebar {
+    background-color: $bg;
+    border-right: 1px solid $border;
+}
+#activityBar {
+    background-color: $bg;
+    border-right: 1px solid $border;
+}
+ActivityButton {
+    background-color: transparent;
+    border: none;
+    border-left: 2px solid transparent;
+    color: $text_dim;
+    font-size: 18px;
+}
+ActivityButton:hover {
+    color: $text_muted;
+}
+ActivityButton:checked {
+    color: $text;
+    border-left: 2px solid $accent;
+}
+
+/* Panels */
+QWidget[role="view"] {
+    background-color: $bg;
+}
+QWidget[role="header"] {
+    background-color: $surface;
+    border-bottom: 1px solid $border;
+}
+QLabel[role="header"] {
+    color: $text_dim;
+    font-size: 10px;
+    font-weight: 600;
+    letter-spacing: 1px;
+}
+QLabel[role="status"] {
+    color: $text_dim;
+    font-size: 11px;
+}
+QLabel[role="branch"] {
+    color: $text_muted;
+    font-size: 11px;
+}
+QPlainTextEdit[role="transcript"] {
+    background-color: $bg;
+    border: none;
+    color: $text_muted;
+    font-size: 12px;
+    padding: 4px 8px;
+}
+
+/* Trees */
+QTreeView {
+    background-color: $bg;
+    border: none;
+    color: $text_muted;
+    font-size: 12px;
+}
+QTreeView::item {
+    height: 22px;
+}
+QTreeView::item:hover {
+    background-color: $hover;
+}
+QTreeView::item:selected {
+    background-color: $hover;
+    color: $text;
+}
+QTreeView::branch {
+    background-color: $bg;
+}
+QTreeView#explorerTree::item {
+    height: 26px;
+    padding-left: 4px;
+}
+
+/* Quick Open */
+QFrame#quickOpen {
+    background-color: $surface;
+    border: 1px solid $border;
+    border-radius: 4px;
+}
+QFrame#quickOpen QListWidget {
+    background-color: $surface;
+    border: none;
+    color: $text_muted;
+    font-size: 12px;
+}
+QFrame#quickOpen QListWidget::item {
+    height: 22px;
+    padding-left: 4px;
+}
+QFrame#quickOpen QListWidget::item:selected {
+    background-color: $hover;
+    color: $text;
+}
+
+/* Inputs */
+QLineEdit {
+    background-color: $surface;
+    border: 1px solid $border;
+    border-radius: 3px;
+    color: $text;
+    padding: 4px 6px;
+    font-size: 12px;
+}
+QLineEdit:focus {
+    border: 1px solid $accent;
+}
+QLineEdit[role="compact"] {
+    padding: 2px 6px;
+    font-size: 11px;
+}
+QComboBox {
+    background-color: $surface;
+    border: 1px solid $border;
+    border-radius: 3px;
+    color: $text_muted;
+    padding: 2px 6px;
+    font-size: 11px;
+}
+QPushButton[role="toggle"] {
+    background-color: transparent;
+    border: 1px solid transparent;
+    border-radius: 3px;
+    color: $text_dim;
+    font-size: 11px;
+}
+QPushButton[role="toggle"]:hover {
+    color: $text_muted;
+}
+QPushButton[role="toggle"]:checked {
+    color: $text;
+    border: 1px solid $accent;
+}
+QPushButton[role="link"] {
+    background-color: transparent;
+    border: none;
+    color: $text_dim;
+    font-size: 11px;
+}
+QPushButton[role="link"]:hover {
+    color: $text_muted;
+}
+
+/* Bottom panel */
+BottomPanel {
+    background-color: $bg;
+    border-top: 1px solid $border;
+}
+QTabWidget::pane {
+    border: none;
+    background-color: $bg;
+}
+QTabBar::tab {
+    background-color: $bg;
+    color: $text_dim;
+    padding: 8px 16px;
+    border: none;
+    border-bottom: 2px solid transparent;
+    font-size: 10px;
+    font-weight: 600;
+}
+QTabBar::tab:selected {
+    color: $text;
+    border-bottom: 2px solid $accent;
+}
+QTabBar::tab:hover {
+    color: $text_muted;
+}
+TerminalWidget, LogView, EditorView {
+    background-color: $bg;
+    border: none;
+}
+MetricCard {
+    background-color: $surface;
+    border: 1px solid $border;
+    border-radius: 4px;
+}
+QLabel[role="metricLabel"] {
+    color: $text_dim;
+    font-size: 10px;
+    font-weight: 600;
+}
+QLabel[role="metricValue"] {
+    font-size: 24px;
+    font-weight: 600;
+}
+QLabel[tone="accent"] { color: $accent; }
+QLabel[tone="warning"] { color: $warning; }
+QLabel[tone="error"] { color: $error; }
+QLabel[tone="muted"] { color: $text_muted; }
+QLabel[role="unit"] {
+    color: $text_dim;
+    font-size: 11px;
+}
+
+/* Status bar */
+#statusBar {
+    background-color: $surface;
+    border-top: 1px solid $border;
+}
+#statusBar QLabel {
+    color: $text_dim;
+    font-size: 11px;
+}
+#statusBar QLabel#readyLabel {
+    color: $accent;
+}
+""")
+
+
+class ThemeManager:
+    """
+    Current theme and its compiled stylesheet.
+
+    Compiled sheets are cached on disk under a hash of the template and
+    tokens, so an unchanged theme is read back rather than rebuilt.
+    Custom-painted widgets look colors up with `color(token)` at paint
+    time and follow theme switches without extra wiring.
+    """
+
+    def __init__(self, name=DEFAULT_THEME):
+        self.name = name
+        self.tokens = THEMES[name]
+        self._colors = {}
+        self._compiled = {}
+        self._listeners = []
+
+    def compile(self, name):
+        """Stylesheet text for theme `name`."""
+        sheet = self._compiled.get(name)
+        if sheet is not None:
+            return sheet
+        tokens = THEMES[name]
+        digest = hashlib.sha1(
+            (STYLESHEET.template + json.dumps(tokens, sort_keys=True)).encode("utf-8")
+        ).hexdigest()[:16]
+        path = os.path.join(cache_dir("theme"), f"{name}-{digest}.qss")
+        try:
+            with open(path, encoding="utf-8") as f:
+                sheet = f.read()
+        except OSError:
+            sheet = STYLESHEET.substitute(tokens)
+            try:
+                with open(path + ".tmp", "w", encoding="utf-8") as f:
+                    f.write(sheet)
+                os.replace(path + ".tmp", path)
+            except OSError:
+                log.warning("could not cache theme %s", name)
+        self._compiled[name] = sheet
+        return sheet
+
+    def apply(self, app, name=None):
+        """Install theme `name` (default: the current one) on the application."""
+        name = name or self.name
+        if name not in THEMES:
+            raise KeyError(f"unknown theme: {name}")
+        self.name = name
+        self.tokens = THEMES[name]
+        self._colors = {}
+        app.setStyleSheet(self.compile(name))
+        for callback in list(self._listeners):
+            callback(name)
+
+    def color(self, token):
+        """QColor for a token of the current theme."""
+        color = self._colors.get(token)
+        if color is None:
+            color = self._colors[token] = QColor(self.tokens[token])
+        return color
+
+    def names(self):
+        return list(THEMES)
+
+    def subscribe(self, callback):
+        """Call `callback(theme_name)` after each theme switch."""
+        self._listeners.append(callback)
+
+    def unsubscribe(self, callback):
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+
+theme = ThemeManager()
+
+
+def set_role(widget, role, **properties):
+    """Tag a widget for the stylesheet's [role=...] selectors."""
+    widget.setProperty("role", role)
+    for key, value in properties.items():
+        widget.setProperty(key, value)
+    return widget
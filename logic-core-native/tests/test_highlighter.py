@@ -0,0 +1,53 @@
+"""
+LogicCore v2 - Highlighter Tests
+Edits above and inside a viewport far down the file all get lexed.
+"""
+import os
+import tempfile
+import time
+import unittest
+
+from src.editor.document import Document
+from src.editor.highlighter import NORMAL, SyntaxHighlighter, lex_line
+
+
+LINES = 5000
+
+
+class ViewportEditTest(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.path = tempfile.mkstemp(suffix=".py")
+        with os.fdopen(fd, "w") as f:
+            f.write("".join(f"value_{i} = {i}  # line\n" for i in range(LINES)))
+        self.document = Document.open(self.path)
+        self.highlighter = SyntaxHighlighter(self.document)
+
+    def tearDown(self):
+        self.highlighter.shutdown()
+        self.document.close()
+        os.remove(self.path)
+
+    def wait_idle(self, timeout=3.0):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self.highlighter._lock:
+                if 1 not in self.highlighter._pending:
+                    return True
+            time.sleep(0.01)
+        return False
+
+    def test_edits_above_and_inside_view(self):
+        self.assertTrue(self.wait_idle())
+        self.highlighter.set_viewport(4000, 50)
+        self.document.insert(self.document.line_offset(10), "def above(): pass\n")
+        self.document.insert(self.document.line_offset(4030), "def inside(): pass\n")
+        self.assertTrue(self.wait_idle(), "highlighter left lines pending")
+        state = NORMAL
+        for line in range(self.document.line_count()):
+            spans, state = lex_line(self.document.line(line), state)
+            self.assertEqual(self.highlighter.spans(line), spans, f"line {line}")
+
+
+if __name__ == "__main__":
+    unittest.main()